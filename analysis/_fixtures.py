@@ -0,0 +1,37 @@
+"""
+Shared offline fixtures for the risk test scripts: synthetic raw price exports
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+PRICE_EXPORT = 'germany_dayahead_prices_raw_20250610_120000.csv'
+
+
+def hourly_prices(start: str = '2025-05-01', days: int = 40, noise: float = 0.0, seed: int = 0,
+                  decimals: int = None) -> pd.DataFrame:
+    """
+    Hourly day-ahead prices (€/MWh) following a daily curve that peaks at noon.
+
+    noise adds Gaussian noise with that standard deviation; decimals rounds the prices
+    (e.g. -1 for many ties at the quantile thresholds).
+    """
+    ds = pd.date_range(start, periods=24 * days, freq='h')
+    price = 100 + 60 * np.sin(2 * np.pi * (ds.hour.to_numpy() - 6) / 24)
+    if noise:
+        price = price + np.random.default_rng(seed).normal(0, noise, len(ds))
+    if decimals is not None:
+        price = np.round(price, decimals)
+    return pd.DataFrame({'ds': ds, 'price_eur_per_mwh': price})
+
+
+def write_price_export(app_data_dir: str, prices: pd.DataFrame = None, name: str = PRICE_EXPORT,
+                       **kwargs) -> str:
+    """Write prices (default: hourly_prices(**kwargs)) as a raw price export and return its path"""
+    if prices is None:
+        prices = hourly_prices(**kwargs)
+    path = os.path.join(app_data_dir, name)
+    prices[['ds', 'price_eur_per_mwh']].to_csv(path, index=False)
+    return path
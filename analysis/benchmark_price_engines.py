@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the price forecasting engines on a price export without touching the leaderboard
+
+Runs the leaderboard's walk-forward comparison (run_leaderboard/evaluate_engine in
+src/backend/forecasting/model_leaderboard.py) on the local price store or a raw
+SMARD CSV export, and prints the scores instead of promoting a champion. To rank
+the engines for production, use the leaderboard itself:
+    python -m src.backend.forecasting.model_leaderboard --folds 4 --horizon-hours 168
+
+Usage (from the project root):
+    python analysis/benchmark_price_engines.py --training-days 730 --folds 3
+    python analysis/benchmark_price_engines.py --csv app_data/germany_dayahead_prices_raw_<ts>.csv
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.model_leaderboard import ENGINES, evaluate_engine, run_leaderboard
+from src.backend.forecasting.tune_price_model import rolling_folds
+
+
+def load_prices(training_days: int, csv_path: str = None) -> pd.DataFrame:
+    """Load [ds, price_eur_per_mwh] from a CSV, the price store or the newest raw export"""
+    if csv_path is None:
+        from src.backend.forecasting.price_store import PriceStore
+        store = PriceStore(os.path.join('app_data', 'price_store'))
+        if store.partitions():
+            return store.load_prices(days=training_days)
+        exports = sorted(glob.glob(os.path.join('app_data', 'germany_dayahead_prices_raw_*.csv')))
+        if not exports:
+            raise FileNotFoundError("No price store or raw price export found in app_data")
+        csv_path = exports[-1]
+    df = pd.read_csv(csv_path, parse_dates=['ds'])[['ds', 'price_eur_per_mwh']]
+    return df[df['ds'] >= df['ds'].max() - pd.Timedelta(days=training_days)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the registered price engines on walk-forward splits")
+    parser.add_argument('--training-days', type=int, default=730)
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--horizon-hours', type=int, default=720)
+    parser.add_argument('--csv', default=None, help="Raw price CSV with ds and price_eur_per_mwh columns")
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=['prophet', 'ridge'])
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    df = load_prices(args.training_days, args.csv)
+    print(f"Loaded {len(df)} prices from {df['ds'].min()} to {df['ds'].max()}")
+
+    folds = rolling_folds(df, n_folds=args.folds, horizon_hours=args.horizon_hours)
+    board = run_leaderboard(args.engines, folds, max_workers=args.workers, evaluate=evaluate_engine)
+
+    print("\n" + "=" * 70)
+    print(f"Mean over {len(folds)} folds:")
+    for row in board:
+        if 'error' in row:
+            print(f"{row['engine']:14s} failed: {row['error']}")
+            continue
+        print(f"{row['engine']:14s} MAE {row['mae']:7.2f}  RMSE {row['rmse']:7.2f}  "
+              f"coverage {row['coverage']:6.1%}  fit {row['fit_seconds']:8.2f}s  CPU {row['cpu_seconds']:8.2f}s")
+    fit_seconds = {row['engine']: row['fit_seconds'] for row in board if 'fit_seconds' in row}
+    if {'prophet', 'ridge'} <= set(fit_seconds):
+        print(f"\nFourier-ridge fits {fit_seconds['prophet'] / fit_seconds['ridge']:.0f}x faster than Prophet")
+
+
+if __name__ == "__main__":
+    main()
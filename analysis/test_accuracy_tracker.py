@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental forecast accuracy ledger (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.accuracy_tracker import AccuracyTracker, horizon_bucket_labels
+from src.backend.forecasting.forecast_store import ForecastStore
+
+
+def _forecast(start: str, periods: int, value: float) -> pd.DataFrame:
+    ds = pd.date_range(start, periods=periods, freq='h')
+    return pd.DataFrame({'ds': ds, 'yhat': value, 'yhat_lower': value - 10, 'yhat_upper': value + 10})
+
+
+def _actuals(start: str, periods: int, value: float) -> pd.DataFrame:
+    return pd.DataFrame({'ds': pd.date_range(start, periods=periods, freq='h'), 'price_eur_per_mwh': value})
+
+
+def test_horizon_buckets():
+    """Lead times map to the documented buckets"""
+    labels = horizon_bucket_labels(np.array([1, 24, 25, 100, 200, 500, 1000]))
+    assert list(labels) == ['0-24h', '0-24h', '24-72h', '3-7d', '7-14d', '14-30d', '30d+']
+    print("✅ Lead times are bucketed correctly")
+
+
+def test_incremental_scoring():
+    """Only newly realized hours are scored, against every snapshot that covered them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        forecasts = ForecastStore(os.path.join(tmp, 'forecasts'))
+        # History up to 2025-06-01 23:00 (Berlin) is in-sample and must not be scored
+        forecasts.publish(_forecast('2025-06-01 00:00', 96, 100.0), issued_at=datetime(2025, 6, 1, 12),
+                          horizon_hours=72, meta={'history_end': '2025-06-01T23:00:00'})
+        forecasts.publish(_forecast('2025-06-02 00:00', 72, 80.0), issued_at=datetime(2025, 6, 2, 12),
+                          horizon_hours=48, meta={'history_end': '2025-06-02T23:00:00'})
+        tracker = AccuracyTracker(os.path.join(tmp, 'accuracy'))
+
+        # First sync: all of June 2nd is realized at 90 EUR/MWh
+        actuals = _actuals('2025-05-31 00:00', 72, 90.0)
+        result = tracker.update(actuals, forecasts)
+        # Only the first snapshot covers June 2nd out of sample
+        assert result == {'new_steps': 72, 'pairs': 24}
+        metrics = tracker.metrics()
+        assert metrics['overall']['n'] == 24
+        assert metrics['overall']['mae'] == 10.0
+        assert metrics['overall']['bias'] == 10.0
+        assert metrics['overall']['coverage'] == 1.0
+
+        # Re-running with the same data scores nothing
+        assert tracker.update(actuals, forecasts) == {'new_steps': 0, 'pairs': 0}
+
+        # Second sync adds June 3rd at 100 EUR/MWh: both snapshots cover it
+        actuals = _actuals('2025-05-31 00:00', 96, np.r_[np.full(72, 90.0), np.full(24, 100.0)])
+        result = tracker.update(actuals, forecasts)
+        assert result == {'new_steps': 24, 'pairs': 48}
+        metrics = tracker.metrics()
+        assert metrics['overall']['n'] == 72
+        # 24 errors of +10, 24 of 0 (first snapshot) and 24 of -20 (second snapshot)
+        assert np.isclose(metrics['overall']['mae'], 10.0)
+        assert np.isclose(metrics['overall']['rmse'], np.sqrt((24 * 100 + 24 * 400) / 72), atol=1e-3)
+        assert np.isclose(metrics['overall']['coverage'], 48 / 72, atol=1e-4)
+        assert sum(b['n'] for b in metrics['by_horizon'].values()) == 72
+        assert metrics['snapshots_scored'] == 2
+
+        print("✅ New hours are scored once against all covering snapshots")
+
+
+def test_ledger_persists():
+    """A new tracker instance continues from the stored watermark"""
+    with tempfile.TemporaryDirectory() as tmp:
+        forecasts = ForecastStore(os.path.join(tmp, 'forecasts'))
+        forecasts.publish(_forecast('2025-06-01 00:00', 48, 50.0), issued_at=datetime(2025, 6, 1))
+        AccuracyTracker(os.path.join(tmp, 'accuracy')).update(_actuals('2025-06-01 12:00', 12, 55.0), forecasts)
+
+        tracker = AccuracyTracker(os.path.join(tmp, 'accuracy'))
+        assert tracker.update(_actuals('2025-06-01 12:00', 12, 55.0), forecasts)['new_steps'] == 0
+        assert tracker.metrics()['overall']['n'] == 12
+        assert tracker.metrics()['by_horizon']['0-24h']['mae'] == 5.0
+
+        print("✅ Ledger survives restarts")
+
+
+def test_only_overlapping_snapshots_are_read():
+    """Snapshots are filtered on their index entry before any file is opened"""
+    opened = []
+
+    class CountingTracker(AccuracyTracker):
+        def _future_part(self, forecasts, entry):
+            opened.append(entry['key'])
+            return super()._future_part(forecasts, entry)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        forecasts = ForecastStore(os.path.join(tmp, 'forecasts'))
+        # One snapshot per day with 24h of history and a 48h horizon
+        for day in range(1, 11):
+            start = pd.Timestamp(2025, 6, day)
+            forecasts.publish(_forecast(str(start - pd.Timedelta(hours=24)), 72, 100.0),
+                              issued_at=datetime(2025, 6, day), horizon_hours=48,
+                              meta={'history_end': (start - pd.Timedelta(hours=1)).isoformat()})
+        CountingTracker(os.path.join(tmp, 'accuracy')).update(_actuals('2025-05-31 00:00', 24 * 8, 90.0), forecasts)
+
+        # The next sync realizes June 8th; a new tracker has no cached frames
+        opened.clear()
+        tracker = CountingTracker(os.path.join(tmp, 'accuracy'))
+        result = tracker.update(_actuals('2025-05-31 00:00', 24 * 9, 90.0), forecasts)
+        # Of the ten snapshots only those issued June 6th to 8th can reach June 8th by their
+        # index entry; June 7th covers all of it, June 8th its hours after 00:00 UTC
+        assert sorted(opened) == [e['key'] for e in forecasts.index()][5:8]
+        assert result == {'new_steps': 24, 'pairs': 24 + 21}
+
+        print("✅ Only snapshots overlapping the new hours are read")
+
+
+if __name__ == "__main__":
+    test_horizon_buckets()
+    test_incremental_scoring()
+    test_ledger_persists()
+    test_only_overlapping_snapshots_are_read()
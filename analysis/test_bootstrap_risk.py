@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the day-block bootstrap confidence intervals of the historic risk metrics (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.risk_analysis import RiskAnalysisContext, create_historic_risk_analysis
+
+from _fixtures import write_price_export
+
+
+def _consumption() -> pd.DataFrame:
+    rng = np.random.default_rng(22)
+    ds = pd.date_range('2025-05-01', '2025-06-09 23:00', freq='h')
+    value = rng.gamma(2.0, 0.3, len(ds)) * (1 + (ds.hour == 12))
+    return pd.DataFrame({'datetime': ds, 'value': value})
+
+
+def test_estimates_and_intervals():
+    """The estimates are the historic metrics and lie inside their intervals"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, noise=20, seed=21)
+        result = create_historic_risk_analysis(_consumption(), days=30, app_data_dir=tmp, bootstrap_resamples=500)
+        intervals = result['confidence_intervals']
+        assert intervals['n_resamples'] == 500 and intervals['num_days'] == 31
+
+        context = RiskAnalysisContext(_consumption(), days=30, app_data_dir=tmp)
+        correlation = context.coincidence_factor()['correlation']
+        for key, expected in (('user_weighted_price', result['user_weighted_price']),
+                              ('price_differential', result['price_differential']),
+                              ('price_differential_pct', result['price_differential_pct']),
+                              ('correlation', correlation)):
+            ci = intervals[key]
+            assert ci['estimate'] == expected, key
+            assert ci['lower'] <= ci['estimate'] <= ci['upper'], key
+            assert ci['std_error'] > 0, key
+
+        # Fixed seed: the same data gives the same intervals; wider blocks still cover the period
+        assert context.bootstrap_risk(n_resamples=500) == intervals
+        blocked = context.bootstrap_risk(n_resamples=500, block_days=7)
+        assert blocked['block_days'] == 7 and blocked['user_weighted_price']['estimate'] == result['user_weighted_price']
+        assert 'confidence_intervals' not in create_historic_risk_analysis(_consumption(), days=30, app_data_dir=tmp)
+    print("✅ Bootstrap intervals surround the historic metrics")
+
+
+def test_resample_matches_concatenated_days():
+    """A resample's weighted price equals the metric over the concatenated resampled days"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, noise=20, seed=21)
+        context = RiskAnalysisContext(_consumption(), days=30, app_data_dir=tmp)
+        merged = context.merged()
+        days = pd.date_range(merged['datetime'].min().normalize(), merged['datetime'].max().normalize(), freq='D')
+
+        # Rebuild the first resample of seed 0 and evaluate it directly
+        rng = np.random.default_rng(0)
+        picked = days[rng.integers(0, len(days), size=(1, len(days)))[0]]
+        sample = pd.concat([merged[merged['datetime'].dt.normalize() == day] for day in picked])
+        prices = pd.concat([context.prices[context.prices['datetime'].dt.normalize() == day] for day in picked])
+        weighted = sample['cost'].sum() / sample['value'].sum()
+        differential = weighted - prices['price_eur_per_kwh'].mean()
+        correlation = sample['value'].corr(sample['price_eur_per_kwh'])
+
+        single = context.bootstrap_risk(n_resamples=1, seed=0)
+        assert single['user_weighted_price']['lower'] == round(weighted, 4)
+        assert single['price_differential']['lower'] == round(differential, 4)
+        assert single['correlation']['lower'] == round(correlation, 4)
+    print("✅ Resampled sums equal the concatenated days")
+
+
+def test_speed_and_validation():
+    """1,000 resamples take milliseconds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, noise=20, seed=21)
+        context = RiskAnalysisContext(_consumption(), days=30, app_data_dir=tmp)
+        context.bootstrap_risk(n_resamples=10)  # build the daily sums once
+        start = time.perf_counter()
+        context.bootstrap_risk(n_resamples=1000)
+        assert time.perf_counter() - start < 0.5
+
+        for kwargs in ({'n_resamples': 0}, {'confidence': 1.0}, {'block_days': 0}, {'block_days': 400}):
+            try:
+                context.bootstrap_risk(**kwargs)
+                assert False, f"{kwargs} accepted"
+            except ValueError:
+                pass
+    print("✅ Bootstrap is fast and validates its parameters")
+
+
+if __name__ == "__main__":
+    test_estimates_and_intervals()
+    test_resample_matches_concatenated_days()
+    test_speed_and_validation()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the coincidence curve over all expensive-hour thresholds (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.risk_analysis import RiskAnalysisContext, calculate_coincidence_curve
+
+from _fixtures import write_price_export
+
+
+def _setup(tmp: str) -> pd.DataFrame:
+    # Rounded prices give many ties at the quantile thresholds
+    write_price_export(tmp, decimals=-1)
+    rng = np.random.default_rng(2)
+    consumption = pd.date_range('2025-05-10', '2025-06-08 23:00', freq='h')
+    return pd.DataFrame({'datetime': consumption, 'value': rng.gamma(2.0, 0.5, len(consumption))})
+
+
+def _brute_force(merged: pd.DataFrame, pct: float) -> tuple:
+    threshold = merged['price_eur_per_kwh'].quantile(1 - pct / 100)
+    expensive = merged['price_eur_per_kwh'] >= threshold
+    return (int(expensive.sum()), merged.loc[expensive, 'value'].sum() / merged['value'].sum() * 100,
+            merged.loc[expensive, 'cost'].sum() / merged['cost'].sum() * 100)
+
+
+def test_curve_matches_masks():
+    """Every curve point equals the quantile-and-mask computation, ties included"""
+    with tempfile.TemporaryDirectory() as tmp:
+        context = RiskAnalysisContext(_setup(tmp), days=21, app_data_dir=tmp)
+        result = context.coincidence_curve(step_pct=5)
+        curve = result['curve']
+        assert [p['expensive_hours_pct'] for p in curve] == [5.0 * i for i in range(1, 21)]
+        merged = context.merged()
+        for point in curve:
+            num, consumption_pct, cost_pct = _brute_force(merged, point['expensive_hours_pct'])
+            assert point['num_expensive_hours'] == num
+            assert np.isclose(point['consumption_coincidence_pct'], consumption_pct, atol=0.006)
+            assert np.isclose(point['cost_coincidence_pct'], cost_pct, atol=0.006)
+        assert curve[-1]['num_expensive_hours'] == result['total_hours']
+        assert curve[-1]['consumption_coincidence_pct'] == 100.0
+        shares = [p['consumption_coincidence_pct'] for p in curve]
+        assert shares == sorted(shares)
+        print("✅ Coincidence curve matches the per-threshold masks")
+
+
+def test_scalar_is_curve_point():
+    """The coincidence factor is a lookup on the curve"""
+    with tempfile.TemporaryDirectory() as tmp:
+        df = _setup(tmp)
+        context = RiskAnalysisContext(df, days=21, app_data_dir=tmp)
+        factor = context.coincidence_factor(20.0)
+        point = next(p for p in calculate_coincidence_curve(df, days=21, app_data_dir=tmp)['curve']
+                     if p['expensive_hours_pct'] == 20.0)
+        for key in ('num_expensive_hours', 'consumption_coincidence_pct', 'cost_coincidence_pct', 'price_threshold'):
+            assert factor[key] == point[key], key
+        merged = context.merged()
+        expensive = merged['price_eur_per_kwh'] >= factor['price_threshold'] - 1e-9
+        assert np.isclose(factor['avg_price_cheap_hours'], merged.loc[~expensive, 'price_eur_per_kwh'].mean(), atol=1e-4)
+        print("✅ Scalar coincidence factor is a point of the curve")
+
+
+def test_step_validation():
+    """Uneven steps end at 100% and invalid steps are rejected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        context = RiskAnalysisContext(_setup(tmp), days=21, app_data_dir=tmp)
+        curve = context.coincidence_curve(step_pct=30)['curve']
+        assert [p['expensive_hours_pct'] for p in curve] == [30.0, 60.0, 90.0, 100.0]
+        for step in (0, 101):
+            try:
+                context.coincidence_curve(step_pct=step)
+                assert False, f"step {step} accepted"
+            except ValueError:
+                pass
+        print("✅ Curve grid is validated")
+
+
+if __name__ == "__main__":
+    test_curve_matches_masks()
+    test_scalar_is_curve_point()
+    test_step_validation()
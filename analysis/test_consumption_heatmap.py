@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the calendar consumption/price heatmaps built with bincount (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.risk_analysis import RiskAnalysisContext, get_consumption_heatmap
+
+from _fixtures import hourly_prices, write_price_export
+
+
+def _consumption() -> pd.DataFrame:
+    ds = pd.date_range('2025-04-20', '2025-06-18 23:45', freq='15min')
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({'datetime': ds.astype(str), 'value': rng.gamma(2.0, 0.5, len(ds))})
+
+
+def test_heatmap_matches_groupby():
+    """Every binning equals a pandas groupby over the same hourly data"""
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_prices = hourly_prices(start='2025-04-01', days=80, noise=10, seed=2)
+        write_price_export(tmp, raw_prices)
+        df = _consumption()
+        context = RiskAnalysisContext(df, days=45, app_data_dir=tmp)
+        heatmaps = {binning: context.heatmap(binning) for binning in ('hour', 'hour_of_week', 'month_hour')}
+
+    # Hourly kWh of the last 45 days (15-minute kW readings x 0.25)
+    consumption = df.assign(datetime=pd.to_datetime(df['datetime']))
+    consumption = consumption[consumption['datetime'] >= consumption['datetime'].max() - pd.Timedelta(days=45)]
+    hourly = (consumption.set_index('datetime')['value'] * 0.25).resample('h').sum()
+    prices = raw_prices.set_index('ds')['price_eur_per_mwh'] / 1000
+    prices = prices[(prices.index >= pd.Timestamp('2025-06-18 23:45') - pd.Timedelta(days=45))
+                    & (prices.index <= pd.Timestamp('2025-06-18 23:45'))]
+    cost = hourly * prices.reindex(hourly.index)
+
+    for binning, row_key, n_rows in (('hour', lambda idx: np.zeros(len(idx), dtype=int), 1),
+                                     ('hour_of_week', lambda idx: idx.dayofweek, 7),
+                                     ('month_hour', lambda idx: idx.month - 1, 12)):
+        heatmap = heatmaps[binning]
+        assert heatmap['columns'] == list(range(24)) and len(heatmap['rows']) == n_rows
+
+        def expected(series: pd.Series, how: str) -> np.ndarray:
+            grouped = series.groupby([row_key(series.index), series.index.hour]).agg(how)
+            cells = np.zeros((n_rows, 24))
+            for (row, hour), value in grouped.items():
+                cells[row, hour] = value
+            return cells
+
+        assert np.asarray(heatmap['consumption_kwh']['count']).shape == (n_rows, 24)
+        assert np.array_equal(heatmap['consumption_kwh']['count'], expected(hourly, 'count'))
+        assert np.allclose(heatmap['consumption_kwh']['sum'], expected(hourly, 'sum'), atol=0.0005)
+        assert np.allclose(heatmap['consumption_kwh']['mean'], expected(hourly, 'mean'), atol=0.0005)
+        assert np.array_equal(heatmap['price_eur_per_kwh']['count'], expected(prices, 'count'))
+        assert np.allclose(heatmap['price_eur_per_kwh']['mean'], expected(prices, 'mean'), atol=0.00005)
+        assert np.allclose(heatmap['cost_eur']['sum'], expected(cost.dropna(), 'sum'), atol=0.005)
+
+    # Months outside the data are empty cells
+    month_hour = np.asarray(heatmaps['month_hour']['consumption_kwh']['count'])
+    assert month_hour[0].sum() == 0 and month_hour[4].sum() > 0
+    # The hour binning is the load profile
+    profile = [row['avg_consumption_kwh'] for row in context.load_profile()['hourly_data']]
+    assert heatmaps['hour']['consumption_kwh']['mean'][0] == profile
+    print("✅ Heatmaps match a groupby for hour, hour-of-week and month x hour")
+
+
+def test_invalid_binning():
+    """Unknown binnings are rejected before loading anything"""
+    try:
+        get_consumption_heatmap(_consumption(), binning='minute', app_data_dir='/nonexistent')
+        assert False, "unknown binning accepted"
+    except ValueError:
+        pass
+    print("✅ Unknown binnings are rejected")
+
+
+if __name__ == "__main__":
+    test_heatmap_matches_groupby()
+    test_invalid_binning()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the issue-time indexed forecast store (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.forecast_store import ForecastStore, latest_forecast_path
+
+
+def _forecast(value: float) -> pd.DataFrame:
+    return pd.DataFrame({'ds': pd.date_range('2025-06-01', periods=3, freq='h'), 'yhat': [value] * 3})
+
+
+def test_publish_latest_and_as_of():
+    """Snapshots are indexed by issue time and looked up by bisection"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ForecastStore(tmp)
+        assert store.latest() is None
+        for day in (3, 1, 2):  # published out of order
+            store.publish(_forecast(day), issued_at=datetime(2025, 6, day, 6), horizon_hours=720)
+
+        assert [e['key'] for e in store.index()] == ['20250601T060000Z_720h', '20250602T060000Z_720h',
+                                                     '20250603T060000Z_720h']
+        assert store.load()['yhat'].iloc[0] == 3
+        assert store.as_of(datetime(2025, 6, 2, 12))['key'] == '20250602T060000Z_720h'
+        assert store.as_of(datetime(2025, 6, 2, 6))['key'] == '20250602T060000Z_720h'
+        assert store.as_of(pd.Timestamp('2025-06-02 07:59', tz='Europe/Berlin'))['key'] == '20250601T060000Z_720h'
+        assert store.as_of(datetime(2025, 5, 31)) is None
+        assert not [f for f in os.listdir(store.path) if f.endswith('.tmp')]
+
+        print("✅ Latest and as-of lookups return the right snapshot")
+
+
+def test_compaction_and_reader_fallback():
+    """Old snapshots are thinned out and readers fall back to the legacy file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, 'germany_price_forecast_720h.csv')
+        _forecast(0).to_csv(legacy, index=False)
+        assert latest_forecast_path(tmp) == legacy
+
+        store = ForecastStore(os.path.join(tmp, 'forecasts'))
+        for day in range(1, 31):
+            for hour in (6, 18):
+                store.publish(_forecast(day), issued_at=datetime(2025, 6, day, hour))
+
+        removed = store.compact(keep_all_days=3, keep_daily_days=10, now=datetime(2025, 6, 30, 20))
+        keys = [e['key'] for e in store.index()]
+        # Both snapshots of the last 3 days, the last one of each of the 7 days before
+        assert len(keys) == 6 + 7
+        assert len(removed) == 60 - len(keys)
+        assert len([f for f in os.listdir(store.path) if f.endswith('.csv')]) == len(keys)
+        assert latest_forecast_path(tmp) == store.snapshot_path(store.latest())
+
+        print("✅ Compaction keeps recent snapshots and daily ones within retention")
+
+
+if __name__ == "__main__":
+    test_publish_latest_and_as_of()
+    test_compaction_and_reader_fallback()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test script for the forward-looking coincidence against the price forecast and its scenario paths (runs offline)
+"""
+
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.forecast_store import ForecastStore
+from src.backend.forecasting.scenario_paths import paths_meta
+from src.backend.forward_risk import calculate_forward_coincidence, standard_profile_load
+
+HISTORY = pd.date_range('2025-05-25', periods=24 * 7, freq='h')
+FUTURE = pd.date_range('2025-06-01', periods=24 * 10, freq='h')
+
+
+def _price(ds: pd.DatetimeIndex) -> np.ndarray:
+    return 100 + 50 * np.sin(2 * np.pi * (ds.hour.to_numpy() - 6) / 24)
+
+
+def _write_standard_profile(app_data_dir: str):
+    """Two years of quarter-hour values in W, higher in the evening"""
+    ds = pd.date_range('2025-01-01', '2026-12-31 23:45', freq='15min')
+    watts = 200 + 300 * ((ds.hour >= 17) & (ds.hour < 21))
+    os.makedirs(os.path.join(app_data_dir, 'standard_profile'))
+    pd.DataFrame({'datetime': ds, 'value': watts}).to_csv(
+        os.path.join(app_data_dir, 'standard_profile', 'Standard_Load_Profile_2025_2026.csv'), index=False)
+
+
+def _publish(app_data_dir: str, with_paths: bool = True) -> np.ndarray:
+    """Publish a forecast with history, and optionally sample paths for its future part"""
+    ds = HISTORY.append(FUTURE)
+    forecast = pd.DataFrame({'ds': ds, 'yhat': _price(ds), 'yhat_lower': _price(ds) - 20,
+                             'yhat_upper': _price(ds) + 20})
+    store = ForecastStore(os.path.join(app_data_dir, 'forecasts'))
+    entry = store.publish(forecast, issued_at=datetime(2025, 5, 31, 23), horizon_hours=240,
+                          meta={'history_end': HISTORY[-1].isoformat()})
+    rng = np.random.default_rng(3)
+    paths = (_price(FUTURE) + rng.normal(0, 25, size=(300, len(FUTURE)))).astype(np.float32)
+    if with_paths:
+        store.publish_paths(entry, paths, paths_meta(FUTURE, paths, 'h'))
+    return paths
+
+
+def _coincidence(prices: np.ndarray, load: np.ndarray, pct: float = 20.0) -> float:
+    expensive = prices >= np.quantile(prices, 1 - pct / 100)
+    return load[expensive].sum() / load.sum() * 100
+
+
+def test_scenarios_match_per_path_loop():
+    """The batched scenario coincidence equals a loop over the paths"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_standard_profile(tmp)
+        paths = _publish(tmp)
+        result = calculate_forward_coincidence(annual_kwh=3500, app_data_dir=tmp)
+        load = standard_profile_load(FUTURE, 3500, tmp)
+
+    assert result['load_source'] == 'standard_profile'
+    assert result['horizon']['num_steps'] == len(FUTURE)
+    assert result['horizon']['start'] == FUTURE[0].isoformat()
+
+    per_path = np.array([_coincidence(path.astype(np.float64), load) for path in paths])
+    scenarios = result['scenarios']
+    assert scenarios['n_paths'] == 300
+    assert abs(scenarios['expected_consumption_coincidence_pct'] - per_path.mean()) <= 0.01
+    assert abs(scenarios['std_dev'] - per_path.std(ddof=1)) <= 0.01
+    assert abs(scenarios['distribution']['p50'] - np.percentile(per_path, 50)) <= 0.01
+    assert scenarios['distribution']['p05'] <= scenarios['distribution']['p50'] <= scenarios['distribution']['p95']
+    assert scenarios['prob_above_expensive_share'] == round(float((per_path > 20).mean()), 4)
+    weighted = np.array([path.astype(np.float64) @ load / load.sum() / 1000 for path in paths])
+    assert abs(scenarios['expected_weighted_avg_price'] - weighted.mean()) <= 0.0001
+    correlation = np.array([np.corrcoef(path, load)[0, 1] for path in paths])
+    assert abs(scenarios['expected_correlation'] - correlation.mean()) <= 0.0001
+    print("✅ Batched scenario coincidence matches a per-path loop")
+
+
+def test_point_forecast_with_customer_load():
+    """The point forecast uses only the future rows; a customer forecast is summed onto the steps"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _publish(tmp, with_paths=False)
+        # Quarter-hour customer forecast, peaking at the evening price peak
+        quarter_hours = pd.date_range(FUTURE[0], FUTURE[-1] + pd.Timedelta(minutes=45), freq='15min')
+        load = pd.DataFrame({'datetime': quarter_hours,
+                             'value': 0.1 + 0.2 * ((quarter_hours.hour >= 17) & (quarter_hours.hour < 21))})
+        result = calculate_forward_coincidence(load, app_data_dir=tmp)
+
+    assert result['load_source'] == 'forecast'
+    assert result['scenarios'] is None
+    assert result['horizon']['num_steps'] == len(FUTURE)
+    hourly = load.set_index('datetime')['value'].resample('h').sum().to_numpy()
+    prices = _price(FUTURE)
+    point = result['point_forecast']
+    assert abs(point['consumption_coincidence_pct'] - _coincidence(prices, hourly)) <= 0.01
+    assert abs(point['weighted_avg_price'] - prices @ hourly / hourly.sum() / 1000) <= 0.0001
+    assert abs(point['market_avg_price'] - prices.mean() / 1000) <= 0.0001
+    assert abs(point['correlation'] - np.corrcoef(prices, hourly)[0, 1]) <= 0.0001
+    assert result['total_consumption'] == round(hourly.sum(), 2)
+    print("✅ Point forecast coincidence of a customer forecast is correct")
+
+
+def _smart_meter_csv() -> str:
+    """15-minute kW readings with ISO timestamps, ending three weeks before the forecast horizon"""
+    ds = pd.date_range('2025-03-20', '2025-05-10 23:45', freq='15min')
+    kw = 0.4 + 1.6 * ((ds.hour >= 17) & (ds.hour < 21)) + 0.2 * (ds.dayofweek >= 5)
+    return pd.DataFrame({'datetime': ds.strftime('%Y-%m-%d %H:%M:%S'), 'value': kw}).to_csv(index=False)
+
+
+def _expected_projection(steps: pd.DatetimeIndex) -> np.ndarray:
+    # One hour of constant kW is that many kWh
+    return 0.4 + 1.6 * ((steps.hour >= 17) & (steps.hour < 21)) + 0.2 * (steps.dayofweek >= 5)
+
+
+def test_history_projected_onto_horizon():
+    """An ISO-timestamped upload that ends before the forecast is projected by hour of week"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _publish(tmp)
+        # Parsed like the endpoint does
+        df = pd.read_csv(io.StringIO(_smart_meter_csv()))
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        result = calculate_forward_coincidence(app_data_dir=tmp, consumption_history=df)
+
+    load = _expected_projection(FUTURE)
+    assert result['load_source'] == 'history_profile'
+    assert abs(result['total_consumption'] - load.sum()) <= 0.01
+    assert abs(result['point_forecast']['consumption_coincidence_pct'] - _coincidence(_price(FUTURE), load)) <= 0.01
+    assert result['scenarios']['n_paths'] == 300
+    print("✅ Consumption history is projected onto the forecast horizon")
+
+
+def test_endpoint_with_iso_csv():
+    """POST /api/forward-coincidence with a smart meter CSV (needs the API dependencies)"""
+    try:
+        from fastapi.testclient import TestClient
+        import app as api
+    except ImportError as e:
+        print(f"⚠️  Skipping endpoint test, API dependencies missing: {e}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'app_data'))
+        _publish(os.path.join(tmp, 'app_data'))
+        original_file = api.__file__
+        # The endpoint reads app_data next to app.py
+        api.__file__ = os.path.join(tmp, 'app.py')
+        try:
+            response = TestClient(api.app).post(
+                '/api/forward-coincidence',
+                files={'file': ('smart_meter.csv', _smart_meter_csv().encode('utf-8'), 'text/csv')},
+                data={'expensive_hours_pct': '20'})
+        finally:
+            api.__file__ = original_file
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result['load_source'] == 'history_profile'
+    assert abs(result['total_consumption'] - _expected_projection(FUTURE).sum()) <= 0.01
+    print("✅ Endpoint accepts an ISO-timestamped smart meter CSV")
+
+
+def test_validation():
+    """Invalid shares and loads outside the horizon raise ValueError; missing files FileNotFoundError"""
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            calculate_forward_coincidence(app_data_dir=tmp)
+            assert False, "missing forecast accepted"
+        except FileNotFoundError:
+            pass
+        _publish(tmp)
+        try:
+            calculate_forward_coincidence(app_data_dir=tmp)
+            assert False, "missing standard profile accepted"
+        except FileNotFoundError:
+            pass
+        for pct in (0, 120):
+            try:
+                calculate_forward_coincidence(app_data_dir=tmp, expensive_hours_pct=pct)
+                assert False, f"expensive_hours_pct={pct} accepted"
+            except ValueError:
+                pass
+        old_load = pd.DataFrame({'datetime': pd.date_range('2024-01-01', periods=48, freq='h'), 'value': 1.0})
+        try:
+            calculate_forward_coincidence(old_load, app_data_dir=tmp)
+            assert False, "load outside the horizon accepted"
+        except ValueError:
+            pass
+    print("✅ Invalid inputs are rejected")
+
+
+if __name__ == "__main__":
+    test_scenarios_match_per_path_loop()
+    test_point_forecast_with_customer_load()
+    test_history_projected_onto_horizon()
+    test_endpoint_with_iso_csv()
+    test_validation()
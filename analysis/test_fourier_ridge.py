@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the NumPy Fourier-ridge price engine (runs offline)
+"""
+
+import os
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.fourier_ridge import easter_sunday, german_holidays, train_fourier_ridge
+from src.backend.forecasting.scenario_paths import draw_sample_paths
+
+
+def _synthetic_prices(days: int = 120, seed: int = 0) -> pd.DataFrame:
+    ds = pd.date_range('2024-03-01', periods=days * 24, freq='h')
+    rng = np.random.default_rng(seed)
+    daily = 25 * np.sin(2 * np.pi * (ds.hour - 6) / 24)
+    weekend = np.where(ds.dayofweek >= 5, -15.0, 0.0)
+    price = 90 + daily + weekend + rng.normal(0, 5, len(ds))
+    return pd.DataFrame({'ds': ds, 'price_eur_per_mwh': price})
+
+
+def test_holiday_calendar():
+    """Easter-based and fixed holidays are computed without external packages"""
+    assert easter_sunday(2024) == date(2024, 3, 31)
+    assert easter_sunday(2025) == date(2025, 4, 20)
+    holidays = german_holidays([2025])
+    assert {date(2025, 4, 18), date(2025, 4, 21), date(2025, 5, 29), date(2025, 6, 9), date(2025, 10, 3)} <= holidays
+
+    print("✅ German holiday calendar is correct")
+
+
+def test_fit_and_prophet_compatible_forecast():
+    """The engine learns the pattern and yields the frame apply_retail_pricing consumes"""
+    from src.backend.forecasting.energy_price_forecast import apply_retail_pricing, make_future_and_predict
+
+    df = _synthetic_prices()
+    train, test = df.iloc[:-7 * 24], df.iloc[-7 * 24:]
+    model = train_fourier_ridge(train)
+    assert model.fit_seconds < 5
+
+    forecast = make_future_and_predict(model, 7 * 24, return_components=True)
+    assert {'ds', 'yhat', 'yhat_lower', 'yhat_upper'} <= set(forecast.columns)
+    future = forecast[forecast['ds'] > train['ds'].max()].reset_index(drop=True)
+    assert len(future) == len(test)
+
+    errors = future['yhat'].to_numpy() - test['price_eur_per_mwh'].to_numpy()
+    assert np.mean(np.abs(errors)) < 8
+    coverage = ((test['price_eur_per_mwh'].to_numpy() >= future['yhat_lower']) &
+                (test['price_eur_per_mwh'].to_numpy() <= future['yhat_upper'])).mean()
+    assert coverage > 0.8
+
+    retail = apply_retail_pricing(forecast)
+    assert 'yhat_retail' in retail.columns
+
+    paths, _ = draw_sample_paths(model, horizon_hours=24, n_paths=100)
+    assert paths.shape == (100, 24)
+
+    print(f"✅ Fourier-ridge MAE {np.mean(np.abs(errors)):.2f} EUR/MWh, coverage {coverage:.0%}, "
+          f"fit {model.fit_seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    test_holiday_calendar()
+    test_fit_and_prophet_compatible_forecast()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the price engine leaderboard (runs offline on synthetic prices)
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.model_leaderboard import (ENGINES, fit_engine, leaderboard_path, load_champion,
+                                                       promote_champion, run_leaderboard)
+from src.backend.forecasting.tune_price_model import rolling_folds
+
+
+def _prices(days: int = 60) -> pd.DataFrame:
+    ds = pd.date_range('2025-01-01', periods=days * 24, freq='h')
+    rng = np.random.default_rng(1)
+    price = 80 + 30 * np.sin(2 * np.pi * ds.hour / 24) + 10 * (ds.dayofweek >= 5) + rng.normal(0, 3, len(ds))
+    return pd.DataFrame({'ds': ds, 'price_eur_per_mwh': price})
+
+
+def test_registry_and_random_forest():
+    """Registered engines share the Prophet-like interface"""
+    assert {'prophet', 'ridge', 'random_forest'} <= set(ENGINES)
+    df = _prices(30)
+    model = fit_engine('random_forest', df, {'n_estimators': 20})
+    future = model.make_future_dataframe(periods=48, freq='h', include_history=False)
+    forecast = model.predict(future)
+    assert len(forecast) == 48
+    assert (forecast['yhat_lower'] <= forecast['yhat']).all() and (forecast['yhat'] <= forecast['yhat_upper']).all()
+    assert model.predictive_samples(future)['yhat'].shape == (48, model.uncertainty_samples)
+    try:
+        fit_engine('unknown', df)
+        assert False, "unknown engine accepted"
+    except ValueError:
+        pass
+    print("✅ Engines fit through the registry")
+
+
+def test_leaderboard_runs_engines_on_identical_splits():
+    """Every engine is scored on every split with CPU seconds reported"""
+    folds = rolling_folds(_prices(), n_folds=2, horizon_hours=72)
+    board = run_leaderboard(['ridge', 'random_forest'], folds, max_workers=2,
+                            params={'random_forest': {'n_estimators': 20}})
+    assert sorted(r['engine'] for r in board) == ['random_forest', 'ridge']
+    assert board[0]['mae'] <= board[1]['mae']
+    for row in board:
+        assert row['folds'] == 2
+        assert row['mae'] < 10
+        assert row['cpu_seconds'] > 0
+        assert np.isclose(row['cpu_seconds_total'], 2 * row['cpu_seconds'])
+    print("✅ Leaderboard scores all engines on the same splits")
+
+
+def test_champion_promotion():
+    """Challengers need a clear improvement to replace the champion"""
+    board = [{'engine': 'ridge', 'mae': 9.9}, {'engine': 'prophet', 'mae': 10.0}, {'engine': 'x', 'error': 'boom'}]
+    assert promote_champion(board, current=None) == 'ridge'
+    assert promote_champion(board, current='prophet') == 'prophet'
+    assert promote_champion(board, current='prophet', min_improvement=0.005) == 'ridge'
+    assert promote_champion([{'engine': 'x', 'error': 'boom'}], current='prophet') == 'prophet'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = leaderboard_path(tmp)
+        assert load_champion(path) is None
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            json.dump({'champion': 'ridge'}, f)
+        assert load_champion(path) == 'ridge'
+        with open(path, 'w') as f:
+            json.dump({'champion': 'removed_engine'}, f)
+        assert load_champion(path) is None
+    print("✅ Champion promotion uses hysteresis")
+
+
+if __name__ == "__main__":
+    test_registry_and_random_forest()
+    test_leaderboard_runs_engines_on_identical_splits()
+    test_champion_promotion()
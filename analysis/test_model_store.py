@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the persisted, warm-started Prophet price model (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.model_store import ModelStore, fit_mode, fit_price_model, training_fingerprint
+
+PARAMS = {'seasonality_mode': 'additive', 'changepoint_prior_scale': 0.2}
+
+
+def _prices(start: str, days: int) -> pd.DataFrame:
+    ds = pd.date_range(start, periods=days * 24, freq='h')
+    rng = np.random.default_rng(0)
+    price = 80 + 30 * np.sin(2 * np.pi * ds.hour / 24) + rng.normal(0, 5, len(ds))
+    return pd.DataFrame({'ds': ds, 'price_eur_per_mwh': price})
+
+
+def test_fit_mode_from_fingerprints():
+    """Identical windows are reused, one-day shifts warm-started, anything else cold"""
+    df = _prices('2025-01-01', 21)
+    base = training_fingerprint(df, PARAMS)
+    shifted = training_fingerprint(df.iloc[24:].assign(ds=df['ds'].iloc[24:] + pd.Timedelta(days=1)), PARAMS)
+    other_config = training_fingerprint(df, {**PARAMS, 'changepoint_prior_scale': 0.05})
+
+    assert fit_mode(None, base) == 'cold'
+    assert fit_mode(base, dict(base)) == 'reuse'
+    assert fit_mode(base, shifted) == 'warm'
+    assert fit_mode(base, other_config) == 'cold'
+    assert fit_mode(shifted, base) == 'cold'  # window moved backwards
+
+    print("✅ Fit mode follows the training window fingerprint")
+
+
+def test_warm_start_roundtrip():
+    """A stored model is reloaded, reused and used to warm-start the next day"""
+    df = _prices('2025-01-01', 21)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ModelStore(tmp)
+        model, record = fit_price_model(df.iloc[:-24], store, params=PARAMS)
+        assert record['mode'] == 'cold'
+        assert record['iterations'] is None or record['iterations'] > 0
+
+        _, record = fit_price_model(df.iloc[:-24], store, params=PARAMS)
+        assert record['mode'] == 'reuse'
+
+        model, record = fit_price_model(df.iloc[24:], store, params=PARAMS)
+        assert record['mode'] == 'warm'
+        assert len(model.predict(model.make_future_dataframe(periods=24, freq='h'))) == len(df) - 24 + 24
+
+        log = store.fit_log()
+        assert [r['mode'] for r in log] == ['cold', 'warm']
+        assert all(r['fit_seconds'] > 0 for r in log)
+
+        print(f"✅ Warm start fitted in {log[1]['fit_seconds']}s "
+              f"({log[1]['iterations']} iterations) vs cold {log[0]['fit_seconds']}s ({log[0]['iterations']})")
+
+
+if __name__ == "__main__":
+    test_fit_mode_from_fingerprints()
+    test_warm_start_roundtrip()
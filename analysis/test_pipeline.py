@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the staged, fingerprint-cached forecasting pipeline runner (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.pipeline import Pipeline, Stage
+
+
+def _pipeline(root: str, calls: list, source: dict, fail_plot: bool = False) -> Pipeline:
+    def fetch(n):
+        calls.append('fetch')
+        return {'df': pd.DataFrame({'x': range(source['rows'])})}
+
+    def train(df, scale):
+        calls.append('train')
+        return {'model': df['x'].sum() * scale}
+
+    def predict(model):
+        calls.append('predict')
+        return {'forecast': model + 1}
+
+    def plot(forecast):
+        calls.append(('plot', threading.current_thread().name))
+        if fail_plot:
+            raise RuntimeError("no display")
+
+    return Pipeline('test', [
+        Stage('fetch', fetch, inputs=('n',), outputs=('df',), always_run=True),
+        Stage('train', train, inputs=('df', 'scale'), outputs=('model',)),
+        Stage('predict', predict, inputs=('model',), outputs=('forecast',)),
+        Stage('plot', plot, inputs=('forecast',), optional=True, asynchronous=True),
+    ], root=root)
+
+
+def test_unchanged_inputs_skip_downstream_stages():
+    """A no-op rerun only runs the always-run source stage"""
+    with tempfile.TemporaryDirectory() as tmp:
+        calls, source = [], {'rows': 10}
+        values = _pipeline(tmp, calls, source).run(n=1, scale=2)
+        assert values['forecast'] == 91
+        assert calls[:3] == ['fetch', 'train', 'predict']
+        assert calls[3][1] != threading.current_thread().name  # plot ran in a background thread
+
+        calls.clear()
+        pipeline = _pipeline(tmp, calls, source)
+        values = pipeline.run(n=1, scale=2)
+        assert calls == ['fetch']
+        assert 'forecast' not in values  # skipped outputs are not even loaded
+        assert [t['status'].split()[0] for t in pipeline.timings] == ['done', 'skipped', 'skipped', 'skipped']
+        assert pipeline.timings[0]['wall_seconds'] is not None
+
+        print("✅ No-op rerun skips every cached stage")
+
+
+def test_changed_inputs_rerun_downstream_stages():
+    """New source data reruns everything downstream; forced reruns ignore fingerprints"""
+    with tempfile.TemporaryDirectory() as tmp:
+        calls, source = [], {'rows': 10}
+        _pipeline(tmp, calls, source).run(n=1, scale=2)
+
+        # New source data: everything downstream reruns
+        calls.clear()
+        source['rows'] = 11
+        values = _pipeline(tmp, calls, source).run(n=1, scale=2)
+        assert calls[:3] == ['fetch', 'train', 'predict']
+        assert values['forecast'] == 111
+
+        # Forced rerun runs everything, an optional async failure does not abort
+        calls.clear()
+        values = _pipeline(tmp, calls, source, fail_plot=True).run(force=True, n=1, scale=2)
+        assert calls[:3] == ['fetch', 'train', 'predict']
+        assert values['forecast'] == 111
+
+        # A changed run flag on unchanged data (like --cold-start) reruns the stages that take it
+        calls.clear()
+        values = _pipeline(tmp, calls, source).run(n=1, scale=3)
+        assert calls[:3] == ['fetch', 'train', 'predict']
+        assert values['forecast'] == 166
+
+        print("✅ Changed inputs rerun downstream stages")
+
+
+def test_skipped_outputs_load_on_demand():
+    """A rerun stage reads the persisted outputs of a skipped upstream stage"""
+    with tempfile.TemporaryDirectory() as tmp:
+        def build(offset):
+            return Pipeline('lazy', [
+                Stage('base', lambda n: {'value': n * 10}, inputs=('n',), outputs=('value',)),
+                Stage('shift', lambda value: {'result': value + offset}, inputs=('value',),
+                      outputs=('result',), params={'offset': offset}),
+            ], root=tmp)
+
+        build(1).run(n=3)
+        pipeline = build(5)
+        values = pipeline.run(n=3)
+        assert values['result'] == 35
+        assert [t['status'].split()[0] for t in pipeline.timings] == ['skipped', 'done']
+
+        print("✅ Skipped outputs are loaded when a later stage needs them")
+
+
+def test_peak_memory_is_recorded():
+    """Synchronous stages record their peak traced memory"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = Pipeline('mem', [
+            Stage('alloc', lambda: {'data': bytearray(8 * 2**20)}, outputs=('data',)),
+        ], root=tmp)
+        pipeline.run()
+        assert pipeline.timings[0]['peak_mib'] >= 8
+
+        print("✅ Peak memory is recorded per stage")
+
+
+if __name__ == "__main__":
+    test_unchanged_inputs_skip_downstream_stages()
+    test_changed_inputs_rerun_downstream_stages()
+    test_skipped_outputs_load_on_demand()
+    test_peak_memory_is_recorded()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for portfolio risk over many households in memory-bounded blocks (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.portfolio_risk import calculate_portfolio_risk, iter_households
+from src.backend.risk_analysis import RiskAnalysisContext
+
+from _fixtures import write_price_export
+
+
+def _portfolio(households: int) -> pd.DataFrame:
+    """Long-format portfolio, half of the households with 15-minute kW readings"""
+    rng = np.random.default_rng(6)
+    frames = []
+    for h in range(households):
+        freq = '15min' if h % 2 else 'h'
+        ds = pd.date_range('2025-05-25 23:00', '2025-06-08 23:00', freq=freq)
+        peak = h % 24
+        value = rng.gamma(2.0, 0.4, len(ds)) * (1 + 2 * (ds.hour == peak))
+        frames.append(pd.DataFrame({'household_id': f'hh{h:03d}', 'datetime': ds, 'value': value}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_households_match_single_analysis():
+    """Per-household metrics equal the single-household analysis at hourly resolution"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, noise=8, seed=5)
+        portfolio = _portfolio(12)
+        result = calculate_portfolio_risk(portfolio, days=14, app_data_dir=tmp, block_size=5)
+        assert result['num_households'] == 12
+        assert result['num_intervals'] == 14 * 24 + 1
+
+        for row, (household_id, series) in zip(result['households'], iter_households(portfolio)):
+            context = RiskAnalysisContext(series, days=14, app_data_dir=tmp, resolution='hour')
+            historic = context.historic_risk()
+            coincidence = context.coincidence_factor(20.0)
+            assert row['household_id'] == household_id
+            assert np.isclose(row['total_consumption'], historic['total_consumption'], atol=0.01)
+            assert np.isclose(row['weighted_avg_price'], historic['user_weighted_price'], atol=1e-4)
+            assert np.isclose(row['price_differential_pct'], historic['price_differential_pct'], atol=0.01)
+            assert np.isclose(row['consumption_coincidence_pct'], coincidence['consumption_coincidence_pct'],
+                              atol=0.01)
+            assert np.isclose(row['correlation'], coincidence['correlation'], atol=1e-4)
+        print("✅ Household rows match the single-household analysis")
+
+
+def test_blocking_and_aggregate():
+    """Results do not depend on the block size; the aggregate is the portfolio load"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, noise=8, seed=5)
+        portfolio = _portfolio(30)
+        one_block = calculate_portfolio_risk(portfolio, days=14, app_data_dir=tmp)
+        blocked = calculate_portfolio_risk(iter_households(portfolio), days=14, app_data_dir=tmp, block_size=4,
+                                           end_date=pd.Timestamp('2025-06-08 23:00'))
+        assert one_block['aggregate'] == blocked['aggregate']
+        assert one_block['households'] == blocked['households']
+
+        rows = one_block['households']
+        total_cost = sum(r['total_cost'] for r in rows)
+        total_consumption = sum(r['total_consumption'] for r in rows)
+        assert np.isclose(one_block['aggregate']['weighted_avg_price'], total_cost / total_consumption, atol=1e-3)
+        assert one_block['distribution']['consumption_coincidence_pct']['p10'] <= \
+            one_block['distribution']['consumption_coincidence_pct']['p90']
+
+        wide = portfolio.pivot(index='datetime', columns='household_id', values='value').reset_index()
+        wide_result = calculate_portfolio_risk(wide[wide['datetime'].dt.minute == 0], days=14, app_data_dir=tmp,
+                                               include_households=False)
+        assert wide_result['num_households'] == 30 and 'households' not in wide_result
+        print("✅ Blocked portfolio equals the single-block result")
+
+
+def test_validation():
+    """Invalid parameters and empty portfolios are rejected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, noise=8, seed=5)
+        for kwargs in ({'expensive_hours_pct': 0}, {'block_size': 0}):
+            try:
+                calculate_portfolio_risk(_portfolio(2), app_data_dir=tmp, **kwargs)
+                assert False, f"{kwargs} accepted"
+            except ValueError:
+                pass
+        try:
+            calculate_portfolio_risk(iter([]), app_data_dir=tmp)
+            assert False, "empty portfolio accepted"
+        except ValueError:
+            pass
+        print("✅ Portfolio parameters are validated")
+
+
+if __name__ == "__main__":
+    test_households_match_single_analysis()
+    test_blocking_and_aggregate()
+    test_validation()
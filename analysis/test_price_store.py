@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the month-partitioned SMARD price store (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import src.backend.forecasting.energy_price_forecast as epf
+from src.backend.forecasting.price_store import PriceStore, chunks_to_sync, sync_price_store
+
+HOUR_MS = 3600 * 1000
+
+
+def _hourly_frame(start: str, hours: int, offset: float = 0.0) -> pd.DataFrame:
+    start_ms = int(pd.Timestamp(start).value // 1_000_000)
+    utc_ms = [start_ms + i * HOUR_MS for i in range(hours)]
+    return pd.DataFrame({'utc_ms': utc_ms, 'price_eur_per_mwh': [float(i) + offset for i in range(hours)]})
+
+
+def test_upsert_partitions_and_deduplicates():
+    """Rows are split per month and re-synced rows replace older values"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(tmp, region='DE', resolution='hour')
+
+        # 48h crossing a month boundary -> two partitions
+        store.upsert(_hourly_frame('2025-01-31 00:00', 48))
+        assert store.partitions() == ['2025-01', '2025-02']
+
+        # Re-sync the last 24h with corrected values: no duplicates, new values win
+        store.upsert(_hourly_frame('2025-02-01 00:00', 24, offset=1000.0))
+        data = store.load()
+        assert len(data) == 48
+        assert data['utc_ms'].is_unique
+        assert data['price_eur_per_mwh'].iloc[-1] == 1023.0
+        assert data['price_eur_per_mwh'].iloc[0] == 0.0
+
+        # Range reads only touch overlapping partitions
+        february = store.load(start=pd.Timestamp('2025-02-01'))
+        assert len(february) == 24
+
+        print("✅ Upsert and partitioning work as expected")
+
+
+def test_load_prices_matches_forecast_input():
+    """load_prices returns the [ds, price_eur_per_mwh] frame used for training"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(tmp)
+        frame = _hourly_frame('2025-03-01 00:00', 24 * 10)
+        store.upsert(frame)
+        store.write_meta({'last_synced_utc_ms': int(frame['utc_ms'].max())})
+
+        prices = store.load_prices(days=2)
+        assert list(prices.columns) == ['ds', 'price_eur_per_mwh']
+        assert prices['ds'].dt.tz is None
+        assert len(prices) == 49
+
+        print("✅ load_prices returns Berlin-local training frame")
+
+
+def test_chunks_to_sync():
+    """Only the chunk holding the last synced value and newer ones are fetched"""
+    week_ms = 7 * 24 * HOUR_MS
+    timestamps = [i * week_ms for i in range(10)]
+
+    assert chunks_to_sync(timestamps, None, limit_chunks=3) == timestamps[-3:]
+    assert chunks_to_sync(timestamps, 8 * week_ms + 5 * HOUR_MS) == timestamps[8:]
+    assert chunks_to_sync(timestamps, 9 * week_ms) == timestamps[9:]
+
+    print("✅ Incremental chunk selection is correct")
+
+
+def test_failed_chunk_is_retried():
+    """A failed chunk keeps the watermark before it, so the next sync fills the hole"""
+    week_ms = 7 * 24 * HOUR_MS
+    start = int(pd.Timestamp('2025-06-02', tz='UTC').value // 10**6)
+    timestamps = [start + i * week_ms for i in range(3)]
+    failing = {timestamps[1]}
+    requested = []
+
+    def fake_index(cache=None, filter_id=None, resolution=None, region=None):
+        return timestamps
+
+    def fake_chunk(ts_ms, cache=None, closed=False, filter_id=None, column=None, resolution=None, region=None):
+        requested.append(ts_ms)
+        if ts_ms in failing:
+            raise epf.SMARDAPIError(f"chunk {ts_ms} unavailable")
+        return pd.DataFrame({'utc_ms': ts_ms + HOUR_MS * pd.RangeIndex(168), column: 1.0})
+
+    original = epf.fetch_available_timestamps, epf.fetch_timeseries_for_timestamp
+    epf.fetch_available_timestamps, epf.fetch_timeseries_for_timestamp = fake_index, fake_chunk
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PriceStore(tmp)
+            summary = sync_price_store(store)
+            # The last chunk arrived, but the watermark stays in the first one
+            assert summary['failed_chunks'] == {'price_eur_per_mwh': 1}
+            assert summary['last_synced_utc_ms'] == timestamps[0] + 167 * HOUR_MS
+            assert len(store.load_frame(['price_eur_per_mwh'])) == 2 * 168
+
+            failing.clear()
+            requested.clear()
+            summary = sync_price_store(store)
+            assert sorted(requested) == timestamps
+            assert summary['last_synced_utc_ms'] == timestamps[2] + 167 * HOUR_MS
+            assert summary['failed_chunks'] == {}
+            assert len(store.load_frame(['price_eur_per_mwh'])) == 3 * 168
+    finally:
+        epf.fetch_available_timestamps, epf.fetch_timeseries_for_timestamp = original
+    print("✅ Failed chunks are retried on the next sync")
+
+
+def test_series_share_partitions_and_load_lazily():
+    """Regressor series become extra columns of the same partitions"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceStore(tmp)
+        prices = _hourly_frame('2025-04-01 00:00', 24)
+        store.upsert(prices)
+        store.write_meta({'last_synced_utc_ms': int(prices['utc_ms'].max())})
+
+        # Residual load arrives later and only for part of the period
+        residual = prices.rename(columns={'price_eur_per_mwh': 'residual_load_mwh'}).head(12)
+        store.upsert(residual)
+        assert 'residual_load_mwh' in store.available_columns()
+
+        frame = store.load_frame(['price_eur_per_mwh', 'residual_load_mwh'])
+        assert len(frame) == 24
+        assert frame['price_eur_per_mwh'].notna().all()
+        assert frame['residual_load_mwh'].notna().sum() == 12
+
+        # Unknown columns load as NaN instead of failing
+        assert store.load_frame(['solar_mwh'])['solar_mwh'].isna().all()
+
+        print("✅ Multiple series share the time-aligned store")
+
+
+if __name__ == "__main__":
+    test_upsert_partitions_and_deduplicates()
+    test_series_share_partitions_and_load_lazily()
+    test_load_prices_matches_forecast_input()
+    test_chunks_to_sync()
+    test_failed_chunk_is_retried()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-region price ingestion and forecast lookup (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import src.backend.forecasting.energy_price_forecast as epf
+from src.backend.forecasting.forecast_store import (ForecastStore, latest_forecast_path, legacy_file_prefix,
+                                                    read_forecast)
+from src.backend.forecasting.price_store import PriceStore, sync_price_store
+
+
+def test_region_series():
+    """German market regions ingest all series, other zones only their price"""
+    assert epf.region_series('DE') == epf.SMARD_SERIES
+    assert epf.region_series('DE-LU')['price_eur_per_mwh'] == epf.FILTER_ID
+    assert epf.region_series('AT') == {'price_eur_per_mwh': '4170'}
+    try:
+        epf.region_series('XX')
+        assert False, "unknown region accepted"
+    except ValueError:
+        pass
+    assert legacy_file_prefix('DE') == 'germany'
+    assert legacy_file_prefix('DE-LU') == 'de_lu'
+    print("✅ Region series resolved")
+
+
+def test_sync_uses_store_region():
+    """SMARD requests go to the store's region and its price filter"""
+    requests = []
+    start = int(pd.Timestamp('2025-06-02', tz='UTC').value // 10**6)
+
+    def fake_index(cache=None, filter_id=None, resolution=None, region=None):
+        requests.append(('index', filter_id, region))
+        return [start]
+
+    def fake_chunk(ts_ms, cache=None, closed=False, filter_id=None, column=None, resolution=None, region=None):
+        requests.append(('chunk', filter_id, region))
+        return pd.DataFrame({'utc_ms': start + 3600000 * pd.RangeIndex(3), column: [1.0, 2.0, 3.0]})
+
+    original = epf.fetch_available_timestamps, epf.fetch_timeseries_for_timestamp
+    epf.fetch_available_timestamps, epf.fetch_timeseries_for_timestamp = fake_index, fake_chunk
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PriceStore(tmp, region='AT')
+            summary = sync_price_store(store)
+            assert summary['rows_received'] == 3
+            assert requests == [('index', '4170', 'AT'), ('chunk', '4170', 'AT')]
+            assert os.path.isdir(os.path.join(tmp, 'AT', 'hour'))
+            assert store.read_meta()['region'] == 'AT'
+    finally:
+        epf.fetch_available_timestamps, epf.fetch_timeseries_for_timestamp = original
+    print("✅ Sync requests the store's region")
+
+
+def test_forecast_lookup_per_region():
+    """Each region resolves its own snapshot; parsed forecasts are cached per file version"""
+    with tempfile.TemporaryDirectory() as tmp:
+        forecast = pd.DataFrame({'ds': pd.date_range('2025-06-01', periods=3, freq='h'), 'yhat': [1.0, 2.0, 3.0]})
+        ForecastStore(os.path.join(tmp, 'forecasts'), region='AT').publish(forecast, issued_at=datetime(2025, 6, 1))
+        forecast.to_csv(os.path.join(tmp, 'germany_price_forecast_720h.csv'), index=False)
+
+        at_path = latest_forecast_path(tmp, region='AT', legacy_file=None)
+        assert os.sep + 'AT' + os.sep in at_path
+        assert latest_forecast_path(tmp, region='DE').endswith('germany_price_forecast_720h.csv')
+        try:
+            latest_forecast_path(tmp, region='DE-LU', legacy_file=None)
+            assert False, "missing region forecast found"
+        except FileNotFoundError:
+            pass
+
+        first = read_forecast(at_path)
+        first.loc[0, 'yhat'] = -1  # callers get copies
+        assert read_forecast(at_path)['yhat'].tolist() == [1.0, 2.0, 3.0]
+    print("✅ Forecasts are looked up per region")
+
+
+if __name__ == "__main__":
+    test_region_series()
+    test_sync_uses_store_region()
+    test_forecast_lookup_per_region()
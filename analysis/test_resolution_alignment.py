@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for aligning consumption and prices at hourly and quarter-hour resolution (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.risk_analysis import RiskAnalysisContext, _align_consumption_to_prices
+
+from _fixtures import write_price_export
+
+
+def _frames(price_freq: str):
+    consumption = pd.DataFrame({
+        'datetime': pd.date_range('2025-05-01', periods=96, freq='15min'),
+        'value': np.tile([4.0, 0.0, 0.0, 0.0], 24),  # 1 kWh in the first quarter of each hour
+    })
+    price_index = pd.date_range('2025-05-01', periods=96 if price_freq == '15min' else 24, freq=price_freq)
+    # Expensive first quarter-hour, cheap rest of the hour
+    quarter_prices = np.tile([0.40, 0.20, 0.20, 0.20], 24)
+    prices = pd.DataFrame({
+        'ds': price_index,
+        'price_eur_per_kwh': quarter_prices if price_freq == '15min' else np.full(24, 0.25),
+    })
+    return consumption, prices
+
+
+def test_quarter_hour_prices_keep_native_grid():
+    """15-minute prices and consumption stay at 15 minutes"""
+    consumption, prices = _frames('15min')
+    aligned_consumption, aligned_prices = _align_consumption_to_prices(consumption, prices)
+    assert len(aligned_consumption) == 96
+    assert len(aligned_prices) == 96
+    assert np.isclose(aligned_consumption['value'].sum(), 24.0)
+
+    print("✅ Quarter-hour data is aligned at quarter-hour resolution")
+
+
+def _context(price_freq: str, resolution: str = None) -> RiskAnalysisContext:
+    """Risk context over a raw price export (€/MWh) of the _frames prices"""
+    consumption, prices = _frames(price_freq)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, prices.assign(price_eur_per_mwh=prices['price_eur_per_kwh'] * 1000))
+        return RiskAnalysisContext(consumption, days=1, app_data_dir=tmp, resolution=resolution)
+
+
+def test_context_prices_at_native_resolution():
+    """The endpoints' weighted price uses quarter-hour prices unless a coarser resolution is asked for"""
+    context = _context('15min')
+    totals = context.totals()
+    # All consumption falls into the expensive quarter-hours
+    assert np.isclose(totals['weighted_avg_price'], 0.40)
+    assert totals['num_hours'] == 96 and np.isclose(totals['total_consumption'], 24.0)
+    assert context.historic_risk()['user_weighted_price'] == 0.40
+
+    # Hourly averages hide the quarter-hour timing
+    hourly = _context('15min', resolution='hour')
+    assert np.isclose(hourly.totals('hour')['weighted_avg_price'], 0.25)
+    assert hourly.historic_risk()['user_weighted_price'] == 0.25 and hourly.historic_risk()['num_hours'] == 24
+    assert _context('h').totals()['num_hours'] == 24
+
+    print("✅ Quarter-hour data is priced at quarter-hour resolution")
+
+
+def test_hourly_prices_and_explicit_resolution():
+    """Consumption is summed to hours for hourly prices or when requested"""
+    consumption, prices = _frames('h')
+    aligned_consumption, aligned_prices = _align_consumption_to_prices(consumption, prices)
+    assert len(aligned_consumption) == 24
+    assert np.isclose(aligned_consumption['value'].iloc[0], 1.0)
+
+    consumption, prices = _frames('15min')
+    aligned_consumption, aligned_prices = _align_consumption_to_prices(consumption, prices, resolution='hour')
+    assert len(aligned_consumption) == 24
+    assert np.isclose(aligned_prices['price_eur_per_kwh'].iloc[0], 0.25)
+
+    print("✅ Hourly alignment sums consumption and averages prices")
+
+
+if __name__ == "__main__":
+    test_quarter_hour_prices_keep_native_grid()
+    test_context_prices_at_native_resolution()
+    test_hourly_prices_and_explicit_resolution()
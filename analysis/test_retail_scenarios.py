@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the broadcasted retail pricing scenario grid (runs offline)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.retail_scenarios import (
+    RetailScenarioEngine, apply_retail_pricing_grid, expected_censored, scenario_grid,
+)
+
+
+def _forecast(hours: int = 720) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    yhat = 80 + 60 * np.sin(np.arange(hours) * 2 * np.pi / 24) + rng.normal(0, 10, hours)
+    width = rng.uniform(20, 80, hours)
+    return pd.DataFrame({'ds': pd.date_range('2025-07-01', periods=hours, freq='h'),
+                         'yhat': yhat, 'yhat_lower': yhat - width, 'yhat_upper': yhat + width})
+
+
+def test_kernel_matches_scipy_stats():
+    """The ndtr/pdf kernel equals the scipy.stats formulation"""
+    mu = np.linspace(-100, 100, 101)
+    sigma = np.full_like(mu, 30.0)
+    z = mu / sigma
+    reference = mu * stats.norm.cdf(z) + sigma * stats.norm.pdf(z)
+    assert np.allclose(expected_censored(mu, sigma, 0.0), reference)
+    assert np.allclose(expected_censored(mu.astype(np.float32), sigma.astype(np.float32), np.float32(0)),
+                       reference, rtol=1e-4, atol=1e-3)
+
+    print("✅ Censored-normal kernel matches scipy.stats")
+
+
+def test_grid_matches_single_scenario_pricing():
+    """Each row of the grid equals apply_retail_pricing for that scenario"""
+    from src.backend.forecasting.energy_price_forecast import apply_retail_pricing
+
+    forecast = _forecast()
+    grid = scenario_grid(margin=[40, 55, 70], risk_premium=[0, 5], floor_eur_per_mwh=[0, 20])
+    assert len(grid) == 12
+
+    matrix = apply_retail_pricing_grid(forecast, grid)
+    assert matrix.shape == (12, len(forecast)) and matrix.dtype == np.float32
+    for i, scenario in grid.iterrows():
+        single = apply_retail_pricing(forecast, **scenario.to_dict())
+        assert np.allclose(matrix[i], single['yhat_retail'], rtol=1e-4, atol=1e-2)
+
+    print("✅ Scenario grid reproduces apply_retail_pricing row by row")
+
+
+def test_moments_are_cached_per_snapshot():
+    """Repeated requests against the same snapshot reuse μ/σ"""
+    engine = RetailScenarioEngine(max_snapshots=1)
+    forecast = _forecast(48)
+    engine.retail_matrix(forecast, scenario_grid(margin=[50, 60]))
+    engine.retail_matrix(forecast, scenario_grid(margin=[70]))
+    assert (engine.hits, engine.misses) == (1, 1)
+
+    engine.retail_matrix(_forecast(24), scenario_grid(), key='other')
+    engine.retail_matrix(forecast, scenario_grid())
+    assert engine.misses == 3  # evicted by the other snapshot
+
+    # Censoring at the floor raises prices compared to max(E[max(0, Y)], floor)
+    floors = scenario_grid(floor_eur_per_mwh=[30])
+    assert (engine.retail_matrix(forecast, floors, censor_at_floor=True)
+            >= engine.retail_matrix(forecast, floors) - 1e-3).all()
+    summary = engine.summarize(forecast, scenario_grid(margin=[40, 70]))
+    assert np.isclose(summary['avg_retail'].iloc[1] - summary['avg_retail'].iloc[0], 30, atol=1e-3)
+
+    print("✅ Per-snapshot moments are cached")
+
+
+if __name__ == "__main__":
+    test_kernel_matches_scipy_stats()
+    test_grid_matches_single_scenario_pricing()
+    test_moments_are_cached_per_snapshot()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared RiskAnalysisContext behind the risk metrics (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import src.backend.risk_analysis as risk
+from src.backend.risk_analysis import (RiskAnalysisContext, calculate_coincidence_factor,
+                                       create_historic_risk_analysis, get_user_load_profile)
+
+from _fixtures import write_price_export
+
+
+def _consumption() -> pd.DataFrame:
+    ds = pd.date_range('2025-05-10', '2025-06-08 23:45', freq='15min')
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({'datetime': ds.astype(str), 'value': rng.gamma(2.0, 0.5, len(ds))})
+
+
+def test_context_matches_functions():
+    """The context's metrics equal the standalone risk functions"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp)
+        df = _consumption()
+        context = RiskAnalysisContext(df, days=14, app_data_dir=tmp)
+        assert context.historic_risk() == create_historic_risk_analysis(df, days=14, app_data_dir=tmp)
+        assert context.coincidence_factor(25.0) == calculate_coincidence_factor(df, days=14, expensive_hours_pct=25.0,
+                                                                                app_data_dir=tmp)
+        assert context.load_profile() == get_user_load_profile(df, days=14, app_data_dir=tmp)
+        assert context.historic_risk()['num_hours'] == context.coincidence_factor()['total_hours']
+        # The caller's frame is left untouched
+        assert df['datetime'].dtype == object
+        print("✅ Context metrics match the risk functions")
+
+
+def test_loads_and_aligns_once():
+    """Prices are read once and each resolution is aligned once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp)
+        calls = {'load': 0, 'align': 0}
+        original_load, original_align = risk._load_historic_prices, risk._align_consumption_to_prices
+
+        def counting_load(*args, **kwargs):
+            calls['load'] += 1
+            return original_load(*args, **kwargs)
+
+        def counting_align(*args, **kwargs):
+            calls['align'] += 1
+            return original_align(*args, **kwargs)
+
+        risk._load_historic_prices, risk._align_consumption_to_prices = counting_load, counting_align
+        try:
+            context = RiskAnalysisContext(_consumption(), days=14, app_data_dir=tmp)
+            context.historic_risk()
+            context.coincidence_factor(10.0)
+            context.coincidence_factor(30.0)
+            assert calls == {'load': 1, 'align': 1}
+            assert context.totals('hour')['num_hours'] == 24 * 14
+            assert calls['align'] == 2
+        finally:
+            risk._load_historic_prices, risk._align_consumption_to_prices = original_load, original_align
+        print("✅ Prices loaded once, one alignment per resolution")
+
+
+def test_errors():
+    """Missing price files and non-overlapping consumption are reported"""
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            RiskAnalysisContext(_consumption(), app_data_dir=tmp)
+            assert False, "missing price file accepted"
+        except FileNotFoundError:
+            pass
+
+        write_price_export(tmp)
+        early = pd.DataFrame({'datetime': pd.date_range('2024-01-01', periods=48, freq='h'), 'value': 1.0})
+        context = RiskAnalysisContext(early, app_data_dir=tmp)
+        try:
+            context.historic_risk()
+            assert False, "non-overlapping consumption accepted"
+        except ValueError:
+            pass
+        try:
+            context.coincidence_factor(0)
+            assert False, "invalid percentage accepted"
+        except ValueError:
+            pass
+        print("✅ Errors are raised as before")
+
+
+if __name__ == "__main__":
+    test_context_matches_functions()
+    test_loads_and_aligns_once()
+    test_errors()
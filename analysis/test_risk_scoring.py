@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the declarative, vectorized risk-scoring rules (runs offline)
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.risk_analysis import (get_aggregated_risk_score, get_aggregated_risk_scores,
+                                       get_simplified_risk_score_for_yearly_usage, get_simplified_risk_scores)
+from src.backend.risk_scoring import _buckets, _compile_edges, score_risk_batch
+
+
+def test_bucket_edges():
+    """'<' and '<=' edges put values on the boundary into the right bucket"""
+    compiled = _compile_edges(((-10, '<'), (-5, '<'), (5, '<='), (10, '<=')))
+    values = np.array([-11, -10, -5.1, -5, 0, 5, 5.1, 10, 10.1])
+    assert _buckets(values, compiled).tolist() == [0, 1, 1, 2, 2, 2, 3, 3, 4]
+    try:
+        _compile_edges(((5, '<'), (1, '<')))
+        assert False, "descending edges accepted"
+    except ValueError:
+        pass
+    print("✅ Bucket edges follow the rule conditions")
+
+
+def test_aggregated_scores():
+    """Scores, factors and messages of the aggregated scorecard"""
+    historic = {'price_differential_pct': -10, 'price_volatility': 0.045}
+    coincidence = {'consumption_coincidence_pct': 25, 'expensive_hours_pct': 20.0}
+    volatility = {'forecast_std_dev': 0.05, 'avg_confidence_interval_width': 0.15}
+
+    # 35 - 8 (differential) + 0 (timing) + 2 (volatility) - 4 (forecast error) + 5 (σ) + 6 (CI width)
+    dynamic = get_aggregated_risk_score(historic, coincidence, volatility, True,
+                                        {'forecast_error_percentage': 10, 'relative_confidence_interval_width': 200})
+    assert dynamic['risk_score'] == 36 and dynamic['risk_level'] == 'moderate'
+    assert [f['factor'] for f in dynamic['risk_factors']] == [
+        'Historischer Verbrauch', 'Verbrauchstiming', 'Preisvolatilität', 'Prognosequalität',
+        'Preisvolatilität (Prognose)', 'Preisprognose-Unsicherheit']
+    assert dynamic['risk_factors'][0]['detail'] == '10.0% unter Marktdurchschnitt'
+    assert dynamic['risk_factors'][3]['detail'] == 'Gute Vorhersagegenauigkeit (Fehler: 10.0%)'
+    assert dynamic['forecast_quality_included']
+    assert dynamic['risk_message'].startswith('Moderates Risiko: Dynamische Tarife können vorteilhaft sein')
+
+    # Without a forecast error the relative CI width is used; fixed tariffs skip market factors
+    fixed = get_aggregated_risk_score(historic, coincidence, volatility, False,
+                                      {'relative_confidence_interval_width': 200})
+    assert fixed['risk_score'] == 35 + 10 - 20 and fixed['risk_level'] == 'low'
+    assert [f['factor'] for f in fixed['risk_factors']] == ['Prognosequalität', 'Tariftyp']
+
+    # Narrow price intervals rename the factor
+    narrow = get_aggregated_risk_score(historic, coincidence, {'avg_confidence_interval_width': 0.08}, True)
+    assert narrow['risk_factors'][-1]['factor'] == 'Preisprognose-Qualität'
+    assert not narrow['forecast_quality_included']
+    print("✅ Aggregated scorecard reproduces the risk rules")
+
+
+def test_batches_match_single_calls():
+    """One call for many tariffs and households equals the per-row results"""
+    rng = np.random.default_rng(4)
+    n = 200
+    historic = [{'price_differential_pct': float(d), 'price_volatility': float(v)}
+                for d, v in zip(rng.uniform(-20, 20, n), rng.uniform(0.01, 0.08, n))]
+    coincidence = [{'consumption_coincidence_pct': float(c), 'expensive_hours_pct': 20.0} for c in rng.uniform(0, 50, n)]
+    quality = [None if i % 3 == 0 else {'forecast_error_percentage': float(e)} for i, e in enumerate(rng.uniform(0, 50, n))]
+    is_dynamic = (rng.random(n) < 0.7).tolist()
+    volatility = {'forecast_std_dev': 0.04, 'avg_confidence_interval_width': 0.1}
+
+    batch = get_aggregated_risk_scores(historic, coincidence, volatility, is_dynamic, quality)
+    single = [get_aggregated_risk_score(h, c, volatility, d, q)
+              for h, c, d, q in zip(historic, coincidence, is_dynamic, quality)]
+    assert batch == single
+
+    # Shared metrics, one row per tariff: rows are independent objects
+    per_tariff = get_aggregated_risk_scores(historic[0], coincidence[0], volatility, [True, False, True])
+    assert per_tariff[0] == per_tariff[2] and per_tariff[0] is not per_tariff[2]
+    per_tariff[0]['risk_factors'][0]['detail'] = 'changed'
+    assert per_tariff[2]['risk_factors'][0]['detail'] != 'changed'
+
+    yearly = get_simplified_risk_scores({'forecast_std_dev': 0.03}, [True, False], [0.07, None])
+    assert yearly == [get_simplified_risk_score_for_yearly_usage({'forecast_std_dev': 0.03}, True, 0.07),
+                      get_simplified_risk_score_for_yearly_usage({'forecast_std_dev': 0.03}, False)]
+    assert yearly[0]['risk_score'] == 40 + 3 + 10 and yearly[1]['risk_score'] == 20
+
+    try:
+        get_aggregated_risk_scores(historic[:2], coincidence[:3], volatility, True)
+        assert False, "mismatched row counts accepted"
+    except ValueError:
+        pass
+    assert get_aggregated_risk_scores(historic[0], coincidence[0], volatility, []) == []
+    print("✅ Batch scoring equals single calls")
+
+
+def test_score_clipping():
+    """Scores are clipped to 0-100 before the level is chosen"""
+    scorecard = {'baseline': 90, 'rules': [
+        {'input': 'x', 'factor': 'X', 'applies_to': 'all', 'edges': ((0, '<'),),
+         'outcomes': ((-200, 'positive', 'low'), (50, 'negative', 'high'))}],
+        'levels': {'edges': ((30, '<='), (50, '<=')), 'names': ('low', 'moderate', 'high')}}
+    scored = score_risk_batch(scorecard, {'x': np.array([-1.0, 1.0, np.nan])}, np.ones(3, dtype=bool))
+    assert scored['risk_score'].tolist() == [0, 100, 90]
+    assert scored['risk_level'].tolist() == ['low', 'high', 'high']
+    assert scored['buckets'].tolist() == [[0, 1, -1]]
+    print("✅ Scores are clipped and missing inputs skipped")
+
+
+if __name__ == "__main__":
+    test_bucket_edges()
+    test_aggregated_scores()
+    test_batches_match_single_calls()
+    test_score_clipping()
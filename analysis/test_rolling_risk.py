@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for rolling-window risk metrics over the consumption history (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.risk_analysis import RiskAnalysisContext, calculate_rolling_risk
+
+from _fixtures import write_price_export
+
+
+def _setup(tmp: str) -> pd.DataFrame:
+    write_price_export(tmp, start='2025-01-01', days=120, noise=10, seed=4)
+    rng = np.random.default_rng(4)
+    consumption = pd.date_range('2025-01-20', '2025-04-20 23:45', freq='15min')
+    # Load shifting into the expensive midday hours over time
+    hour = consumption.hour + consumption.minute / 60
+    midday = (hour >= 10) & (hour < 15)
+    value = rng.gamma(2.0, 0.3, len(consumption)) * (1 + midday * np.linspace(0, 2, len(consumption)))
+    df = pd.DataFrame({'datetime': consumption, 'value': value})
+    # A gap of a few days in the readings
+    return df[(df['datetime'] < '2025-02-10') | (df['datetime'] >= '2025-02-14')]
+
+
+def _expected(merged: pd.DataFrame, prices: pd.DataFrame, start: str, end: str, pct: float) -> dict:
+    stop = pd.Timestamp(end) + pd.Timedelta(days=1)
+    window = merged[(merged['datetime'] >= start) & (merged['datetime'] < stop)]
+    market = prices[(prices['datetime'] >= start) & (prices['datetime'] < stop)]['price_eur_per_kwh'].mean()
+    day = window['datetime'].dt.normalize()
+    threshold = window['price_eur_per_kwh'].groupby(day).transform('quantile', 1 - pct / 100)
+    expensive = window['price_eur_per_kwh'] >= threshold
+    weighted = window['cost'].sum() / window['value'].sum()
+    return {
+        'num_hours': len(window),
+        'market_avg_price': market,
+        'user_weighted_price': weighted,
+        'price_differential_pct': (weighted - market) / market * 100,
+        'correlation': window['value'].corr(window['price_eur_per_kwh']),
+        'daily_peak_coincidence_pct': window.loc[expensive, 'value'].sum() / window['value'].sum() * 100,
+    }
+
+
+def test_windows_match_direct_computation():
+    """Every rolling window equals the metrics computed on its slice"""
+    with tempfile.TemporaryDirectory() as tmp:
+        df = _setup(tmp)
+        result = calculate_rolling_risk(df, window_days=30, expensive_hours_pct=25.0, app_data_dir=tmp)
+        windows = result['windows']
+        assert len(windows) == 91 - 30 + 1
+        assert windows[0]['start'] == '2025-01-20' and windows[-1]['end'] == '2025-04-20'
+
+        context = RiskAnalysisContext(df, days=91, app_data_dir=tmp)
+        merged = context.merged()
+        for window in windows[::7] + [windows[-1]]:
+            expected = _expected(merged, context.prices, window['start'], window['end'], 25.0)
+            assert window['num_hours'] == expected['num_hours']
+            for key, places in (('market_avg_price', 4), ('user_weighted_price', 4), ('correlation', 4),
+                                ('price_differential_pct', 2), ('daily_peak_coincidence_pct', 2)):
+                assert abs(window[key] - expected[key]) <= 10 ** -places, (key, window[key], expected[key])
+        # The shift into midday shows up as rising coincidence
+        assert windows[-1]['daily_peak_coincidence_pct'] > windows[0]['daily_peak_coincidence_pct']
+        print("✅ Rolling windows match the per-window computation")
+
+
+def test_validation():
+    """Windows longer than the history and invalid parameters are rejected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        df = _setup(tmp)
+        for kwargs in ({'window_days': 200}, {'window_days': 0}, {'expensive_hours_pct': 0}):
+            try:
+                calculate_rolling_risk(df, app_data_dir=tmp, **kwargs)
+                assert False, f"{kwargs} accepted"
+            except ValueError:
+                pass
+        print("✅ Rolling risk parameters are validated")
+
+
+if __name__ == "__main__":
+    test_windows_match_direct_computation()
+    test_validation()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the SARIMAX price engine and its state updates (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.sarimax_engine import (SarimaxPriceModel, SarimaxStore, exog_features,
+                                                    fit_sarimax_model, load_weather)
+
+PARAMS = {'order': (1, 0, 0), 'seasonal_order': (0, 1, 1, 24)}
+
+
+def _weather_file(tmp: str) -> str:
+    ds = pd.date_range('2025-01-01', periods=24 * 10 * 4, freq='15min')
+    path = os.path.join(tmp, 'weather.csv')
+    pd.DataFrame({'datetime': ds, 'market_price': 0.0, 'temperature': 5 + ds.hour / 4,
+                  'relative_humidity': 80.0}).to_csv(path, index=False)
+    return path
+
+
+def _prices(days: int) -> pd.DataFrame:
+    ds = pd.date_range('2025-01-01', periods=days * 24, freq='h')
+    rng = np.random.default_rng(3)
+    price = 80 + 30 * np.sin(2 * np.pi * ds.hour / 24) + rng.normal(0, 3, len(ds))
+    return pd.DataFrame({'ds': ds, 'price_eur_per_mwh': price})
+
+
+def test_weather_loader():
+    """Weather is read once per file version and falls back to the climatology"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _weather_file(tmp)
+        assert load_weather(path) is load_weather(path)
+        hourly, _ = load_weather(path)
+        assert len(hourly) == 240
+
+        index = pd.DatetimeIndex(['2025-01-03 06:00', '2026-01-20 06:00', '2026-01-20 07:00'])
+        exog = exog_features(index, path)
+        assert list(exog.columns) == ['temperature', 'relative_humidity', 'weekday', 'is_weekend']
+        assert exog['temperature'].tolist() == [6.5, 6.5, 6.75]
+        assert not exog.isna().any().any()
+        print("✅ Weather loader is cached and covers unseen timestamps")
+
+
+def test_update_matches_extend():
+    """A state update gives the same forecast as statsmodels' extend"""
+    with tempfile.TemporaryDirectory() as tmp:
+        weather = _weather_file(tmp)
+        df = _prices(16)
+        model = SarimaxPriceModel(weather_path=weather, **PARAMS).fit(df.iloc[:-48])
+        full = model._results
+        new_index = pd.DatetimeIndex(df['ds'].iloc[-48:], freq='h')
+        extended = full.extend(df['price_eur_per_mwh'].iloc[-48:].set_axis(new_index),
+                               exog=exog_features(new_index, weather))
+
+        assert model.update(df) == 48
+        assert model.update(df) == 0
+        future_index = pd.date_range(df['ds'].max() + pd.Timedelta(hours=1), periods=24, freq='h')
+        expected = extended.get_forecast(24, exog=exog_features(future_index, weather)).predicted_mean
+        forecast = model.predict(pd.DataFrame({'ds': future_index}))
+        assert np.allclose(forecast['yhat'].to_numpy(), expected.to_numpy())
+        assert (forecast['yhat_lower'] < forecast['yhat']).all() and (forecast['yhat'] < forecast['yhat_upper']).all()
+        print("✅ State update matches SARIMAXResults.extend")
+
+
+def test_prophet_like_interface():
+    """History and horizon rows, quarter-hour timestamps and sample paths"""
+    with tempfile.TemporaryDirectory() as tmp:
+        model = SarimaxPriceModel(weather_path=_weather_file(tmp), uncertainty_samples=20, **PARAMS)
+        model.fit(_prices(10))
+        future = model.make_future_dataframe(periods=48, freq='15min')
+        forecast = model.predict(future)
+        assert len(forecast) == 240 + 48
+        assert forecast['yhat'].notna().all()
+        # Quarter hours of the same hour share its forecast
+        last_hour = forecast.iloc[-5:-1]
+        assert (last_hour['ds'].dt.hour == last_hour['ds'].dt.hour.iloc[0]).all()
+        assert np.allclose(last_hour['yhat'], last_hour['yhat'].iloc[0])
+
+        samples = model.predictive_samples(model.make_future_dataframe(periods=12, include_history=False))
+        assert samples['yhat'].shape == (12, 20)
+        print("✅ SARIMAX engine offers the Prophet-like interface")
+
+
+def test_fit_modes_and_persistence():
+    """Cold fit, reuse, state update and a small persisted model"""
+    with tempfile.TemporaryDirectory() as tmp:
+        params = {'weather_path': _weather_file(tmp), **PARAMS}
+        store = SarimaxStore(os.path.join(tmp, 'models'))
+        df = _prices(16)
+
+        _, record = fit_sarimax_model(df.iloc[:-24], store, params)
+        assert record['mode'] == 'cold'
+        assert os.path.getsize(store.model_path) < 2 * 2**20
+        _, record = fit_sarimax_model(df.iloc[:-24], store, params)
+        assert record['mode'] == 'reuse'
+        model, record = fit_sarimax_model(df.iloc[24:], store, params)
+        assert record['mode'] == 'update' and record['new_steps'] == 24
+        assert model.fitted.index.min() == df['ds'].iloc[24]
+        _, record = fit_sarimax_model(df.iloc[24:], store, params, force_cold=True)
+        assert record['mode'] == 'cold'
+        assert [r['mode'] for r in store.fit_log()] == ['cold', 'update', 'cold']
+        print("✅ Stored SARIMAX model is reused and updated")
+
+
+if __name__ == "__main__":
+    test_weather_loader()
+    test_update_matches_extend()
+    test_prophet_like_interface()
+    test_fit_modes_and_persistence()
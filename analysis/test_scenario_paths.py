@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the predictive price scenario paths stored per forecast snapshot (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.forecast_store import ForecastStore
+from src.backend.forecasting.scenario_paths import (
+    draw_sample_paths, path_mean_price, path_quantiles, path_std, paths_index, paths_meta, step_slice,
+)
+from src.backend.risk_analysis import get_price_forecast_volatility
+
+
+def test_paths_roundtrip_and_queries():
+    """Paths are stored as float32, memory-mapped on load and queried by slicing"""
+    rng = np.random.default_rng(0)
+    ds = pd.date_range('2025-06-01', periods=48, freq='h')
+    paths = (80 + rng.normal(0, 10, size=(200, 48))).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ForecastStore(os.path.join(tmp, 'forecasts'))
+        entry = store.publish(pd.DataFrame({'ds': ds, 'yhat': 80.0, 'yhat_lower': 60.0, 'yhat_upper': 100.0}),
+                              issued_at=datetime(2025, 5, 31, 12), horizon_hours=48)
+        store.publish_paths(entry, paths, paths_meta(ds, paths, 'h'))
+
+        loaded, meta = store.load_paths()
+        assert isinstance(loaded, np.memmap) and loaded.dtype == np.float32
+        assert loaded.shape == (200, 48)
+        assert paths_index(meta).equals(ds)
+
+        day_two = step_slice(meta, '2025-06-02 00:00', '2025-06-02 23:00')
+        assert (day_two.start, day_two.stop) == (24, 48)
+        q = path_quantiles(loaded, (0.05, 0.95), steps=day_two)
+        assert q.shape == (2, 24) and (q[0] < q[1]).all()
+        assert abs(float(path_std(loaded).mean()) - 10) < 1
+        assert path_mean_price(loaded, day_two).shape == (200,)
+
+        # Risk volatility picks up the stored paths, in €/kWh
+        volatility = get_price_forecast_volatility(app_data_dir=tmp)
+        assert volatility['scenario_paths'] == 200
+        assert abs(volatility['scenario_std_dev'] - 0.01) < 0.001
+
+        # Compaction removes the paths with their snapshot
+        store.publish(pd.DataFrame({'ds': ds, 'yhat': 1.0}), issued_at=datetime(2025, 7, 30), horizon_hours=48)
+        store.compact(keep_all_days=1, keep_daily_days=2, now=datetime(2025, 7, 30))
+        assert not [f for f in os.listdir(store.path) if '.paths.' in f]
+
+        print("✅ Scenario paths are stored compactly and queried as array slices")
+
+
+def test_draw_sample_paths_from_prophet():
+    """Prophet predictive samples become an (n_paths, n_steps) float32 matrix"""
+    from prophet import Prophet
+    ds = pd.date_range('2025-01-01', periods=24 * 14, freq='h')
+    model = Prophet(daily_seasonality=True, weekly_seasonality=False, yearly_seasonality=False)
+    model.fit(pd.DataFrame({'ds': ds, 'y': 80 + 20 * np.sin(np.arange(len(ds)) * 2 * np.pi / 24)}))
+
+    paths, index = draw_sample_paths(model, horizon_hours=24, n_paths=50, seed=1)
+    assert paths.shape == (50, 24) and paths.dtype == np.float32
+    assert index[0] == ds[-1] + pd.Timedelta(hours=1)
+    assert model.uncertainty_samples == 1000
+    again, _ = draw_sample_paths(model, horizon_hours=24, n_paths=50, seed=1)
+    assert np.array_equal(paths, again)
+
+    print("✅ Predictive sample paths are drawn reproducibly")
+
+
+if __name__ == "__main__":
+    test_paths_roundtrip_and_queries()
+    test_draw_sample_paths_from_prophet()
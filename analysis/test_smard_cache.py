@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk SMARD chunk cache (runs offline with a fake session)
+"""
+
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.smard_cache import SMARDChunkCache
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, content=b'{"series": [[0, 1.0]]}', etag='"v1"'):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {'ETag': etag} if etag else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        import json
+        return json.loads(self.content)
+
+
+class FakeSession:
+    """Returns 304 whenever the client sends the current ETag"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append(headers or {})
+        if headers and headers.get('If-None-Match') == '"v1"':
+            return FakeResponse(url, status_code=304, content=b'')
+        return FakeResponse(url)
+
+
+def test_closed_chunks_are_served_from_disk():
+    """A closed chunk is downloaded once and never requested again"""
+    with tempfile.TemporaryDirectory() as tmp:
+        session = FakeSession()
+        cache = SMARDChunkCache(tmp, ttl_seconds=3600, session=session)
+        key = ('4169', 'DE', 'hour', 1700000000000)
+
+        for _ in range(3):
+            payload = cache.get_json('https://example.test/chunk.json', key, immutable=True)
+            assert payload['series'] == [[0, 1.0]]
+
+        stats = cache.stats()
+        assert stats['misses'] == 1 and stats['hits'] == 2
+        assert len(session.calls) == 1
+
+        # A fresh cache instance (next run) does no network I/O at all
+        cache2 = SMARDChunkCache(tmp, ttl_seconds=0, session=session)
+        cache2.get_json('https://example.test/chunk.json', key, immutable=True)
+        assert cache2.stats()['network_requests'] == 0
+
+        print("✅ Closed chunks are immutable cache entries")
+
+
+def test_open_chunks_are_revalidated():
+    """An expired open chunk is revalidated with a conditional request"""
+    with tempfile.TemporaryDirectory() as tmp:
+        session = FakeSession()
+        cache = SMARDChunkCache(tmp, ttl_seconds=0, session=session)
+        key = ('4169', 'DE', 'hour', 'index')
+
+        cache.get_json('https://example.test/index.json', key)
+        cache.get_json('https://example.test/index.json', key)
+
+        assert session.calls[1].get('If-None-Match') == '"v1"'
+        stats = cache.stats()
+        assert stats['revalidations'] == 1
+        assert stats['bytes_downloaded'] == len(b'{"series": [[0, 1.0]]}')
+
+        print("✅ Open chunks are revalidated after their TTL")
+
+
+if __name__ == "__main__":
+    test_closed_chunks_are_served_from_disk()
+    test_open_chunks_are_revalidated()
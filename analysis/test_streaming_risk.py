@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming risk accumulator of live meter readings (runs offline)
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.risk_analysis import RiskAnalysisContext
+import src.backend.streaming_risk as streaming
+from src.backend.streaming_risk import OnlineRiskAccumulator
+
+from _fixtures import hourly_prices, write_price_export
+
+
+def _prices() -> pd.DataFrame:
+    prices = hourly_prices(noise=10, seed=7)
+    return prices.assign(price_eur_per_kwh=prices['price_eur_per_mwh'] / 1000)
+
+
+def _readings(prices: pd.DataFrame) -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    readings = prices[(prices['ds'] >= '2025-05-03') & (prices['ds'] < '2025-06-05')]
+    return pd.DataFrame({'datetime': readings['ds'], 'value': rng.gamma(2.0, 0.4, len(readings)),
+                         'price_eur_per_kwh': readings['price_eur_per_kwh']})
+
+
+def test_matches_historic_analysis():
+    """After streaming a long history the window metrics equal the batch analysis"""
+    prices = _prices()
+    readings = _readings(prices)
+    accumulator = OnlineRiskAccumulator(window_days=14)
+    accumulator.add_prices(prices)
+    accumulator.update_many(readings)
+    metrics = accumulator.metrics()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_price_export(tmp, prices)
+        context = RiskAnalysisContext(readings[['datetime', 'value']], days=14, app_data_dir=tmp)
+        historic = context.historic_risk()
+        coincidence = context.coincidence_factor()
+
+    assert metrics['num_hours'] == historic['num_hours'] == 14 * 24 + 1
+    for key in ('market_avg_price', 'user_weighted_price', 'price_differential', 'price_volatility'):
+        assert abs(metrics[key] - historic[key]) <= 0.0001 + 1e-9, key
+    for key in ('total_cost', 'total_consumption'):
+        assert abs(metrics[key] - historic[key]) <= 0.01 + 1e-9, key
+    assert abs(metrics['correlation'] - coincidence['correlation']) <= 0.0001 + 1e-9
+
+    # Coincidence counts the top 20% of each day
+    window = readings[readings['datetime'] >= readings['datetime'].max() - pd.Timedelta(days=14)]
+    day = window['datetime'].dt.normalize()
+    all_prices = prices.set_index('ds')['price_eur_per_kwh']
+    thresholds = all_prices.groupby(all_prices.index.normalize()).quantile(0.8)
+    expensive = window['price_eur_per_kwh'].to_numpy() >= thresholds.reindex(day).to_numpy()
+    expected = window['value'][expensive].sum() / window['value'].sum() * 100
+    assert abs(metrics['consumption_coincidence_pct'] - expected) <= 0.01
+    assert metrics['unranked_intervals'] == 0
+    print("✅ Streaming metrics match the batch analysis")
+
+
+def test_state_round_trip():
+    """A saved and reloaded state continues exactly like an uninterrupted stream"""
+    prices = _prices()
+    readings = _readings(prices)
+    first, rest = readings.iloc[:500], readings.iloc[500:]
+
+    uninterrupted = OnlineRiskAccumulator(window_days=7, customer_id='meter-1')
+    uninterrupted.add_prices(prices)
+    uninterrupted.update_many(readings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        accumulator = OnlineRiskAccumulator.load('meter-1', tmp, window_days=7)
+        accumulator.add_prices(prices)
+        accumulator.update_many(first)
+        accumulator.save(tmp)
+        assert os.path.exists(os.path.join(tmp, 'meter-1.json'))
+        resumed = OnlineRiskAccumulator.load('meter-1', tmp)
+        resumed.update_many(rest)
+        assert resumed.window_days == 7
+        assert resumed.metrics() == uninterrupted.metrics()
+        assert len(resumed) == 7 * 24 + 1
+        # Only the thresholds from the window start on are kept
+        assert min(resumed.day_thresholds) == '2025-05-28'
+
+        try:
+            OnlineRiskAccumulator.load('../escape', tmp)
+            assert False, "path-like customer id accepted"
+        except ValueError:
+            pass
+    print("✅ Accumulator state survives a save/load round trip")
+
+
+def test_saved_sums_and_readings_log():
+    """Saves append only new readings, loads restore the sums, and the log is compacted"""
+    prices = _prices()
+    readings = _readings(prices)
+    uninterrupted = OnlineRiskAccumulator(window_days=3)
+    uninterrupted.add_prices(prices)
+    uninterrupted.update_many(readings)
+
+    original = streaming.COMPACT_BYTES
+    streaming.COMPACT_BYTES = 4096
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, 'meter-2.readings.jsonl')
+            accumulator = OnlineRiskAccumulator.load('meter-2', tmp, window_days=3)
+            accumulator.add_prices(prices)
+            for start in range(0, len(readings), 50):
+                accumulator.update_many(readings.iloc[start:start + 50])
+                accumulator.save(tmp)
+                if start == 400:
+                    # A save that died after appending to the log leaves lines beyond the state
+                    with open(log_path, 'ab') as f:
+                        f.write(b'["2030-01-01T00:00:00", 9.0, 9.0, true, true]\n')
+                accumulator = OnlineRiskAccumulator.load('meter-2', tmp)
+
+            with open(os.path.join(tmp, 'meter-2.json'), encoding='utf-8') as f:
+                state = json.load(f)
+            assert 'readings' not in state and state['sums']['n'] == 3 * 24 + 1
+            assert state['log']['count'] == 3 * 24 + 1
+            # Evicted readings were compacted away
+            assert os.path.getsize(log_path) < 2 * 4096 + state['log']['end'] - state['log']['offset']
+
+            metrics, expected = accumulator.metrics(), uninterrupted.metrics()
+            for key, value in expected.items():
+                if isinstance(value, float):
+                    assert abs(metrics[key] - value) <= 1e-4, key
+                else:
+                    assert metrics[key] == value, key
+    finally:
+        streaming.COMPACT_BYTES = original
+    print("✅ Saved sums and the append-only readings log round-trip")
+
+
+def test_settings_and_pricing():
+    """A saved state keeps its settings; readings are priced from the cached export"""
+    prices = _prices()
+    with tempfile.TemporaryDirectory() as tmp:
+        price_file = write_price_export(tmp, prices)
+        accumulator = OnlineRiskAccumulator.load('meter-3', tmp, window_days=7, expensive_hours_pct=10.0)
+        readings = pd.DataFrame({'datetime': pd.date_range('2025-05-02 00:30', periods=30, freq='h'), 'value': 1.0})
+        priced = accumulator.price_readings(readings, price_file)
+        expected = prices.set_index('ds')['price_eur_per_kwh'].reindex(readings['datetime'].dt.floor('h'))
+        assert np.allclose(priced['price_eur_per_kwh'], expected.to_numpy())
+        assert sorted(accumulator.day_thresholds) == ['2025-05-02', '2025-05-03']
+        day = prices[prices['ds'].dt.date.astype(str) == '2025-05-02']['price_eur_per_kwh']
+        assert accumulator.day_thresholds['2025-05-02'] == float(np.quantile(day, 0.9))
+
+        hits = streaming._price_series.cache_info().hits
+        accumulator.update_many(priced)
+        accumulator.price_readings(readings.assign(datetime=readings['datetime'] + pd.Timedelta(days=1)),
+                                   price_file)
+        assert streaming._price_series.cache_info().hits == hits + 1
+        accumulator.save(tmp)
+
+        assert OnlineRiskAccumulator.load('meter-3', tmp).window_days == 7
+        assert OnlineRiskAccumulator.load('meter-3', tmp, window_days=7).expensive_hours_pct == 10.0
+        for settings in ({'window_days': 30}, {'expensive_hours_pct': 20.0}):
+            try:
+                OnlineRiskAccumulator.load('meter-3', tmp, **settings)
+                assert False, f"changed settings {settings} accepted"
+            except ValueError:
+                pass
+    print("✅ Saved settings are enforced and prices come from the cached export")
+
+
+def test_unranked_and_ordering():
+    """Days without prices are unranked; readings must arrive in order"""
+    accumulator = OnlineRiskAccumulator(window_days=1)
+    accumulator.update('2025-05-01 00:00', 1.0, 0.1)
+    accumulator.update('2025-05-01 01:00', 2.0, 0.3)
+    metrics = accumulator.metrics()
+    assert metrics['unranked_intervals'] == 2 and metrics['consumption_coincidence_pct'] == 0.0
+    assert np.isclose(metrics['user_weighted_price'], (0.1 + 0.6) / 3, atol=1e-4)
+    try:
+        accumulator.update('2025-05-01 01:00', 1.0, 0.1)
+        assert False, "duplicate reading accepted"
+    except ValueError:
+        pass
+    # A reading two days later evicts everything before it
+    accumulator.update('2025-05-03 01:00', 1.0, 0.2)
+    assert accumulator.metrics()['num_hours'] == 1 and accumulator.metrics()['correlation'] == 0.0
+    print("✅ Unranked days and reading order are handled")
+
+
+if __name__ == "__main__":
+    test_matches_historic_analysis()
+    test_state_round_trip()
+    test_saved_sums_and_readings_log()
+    test_settings_and_pricing()
+    test_unranked_and_ordering()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached, parallel price model hyperparameter search (runs offline)
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.tune_price_model import (
+    FoldCache, candidate_grid, candidate_sample, cross_validate, load_tuned_params,
+    pareto_front, rolling_folds, select_config,
+)
+
+
+def fake_evaluate(params, train, test):
+    """Cheap stand-in for a Prophet fit: higher flexibility is slower but more accurate"""
+    return {'mae': 10.0 / (1 + params['changepoint_prior_scale'] * 10), 'rmse': 1.0,
+            'fit_seconds': params['changepoint_prior_scale'] * 100}
+
+
+def _prices(days: int = 30) -> pd.DataFrame:
+    ds = pd.date_range('2025-01-01', periods=days * 24, freq='h')
+    return pd.DataFrame({'ds': ds, 'price_eur_per_mwh': np.sin(np.arange(len(ds)) / 24.0)})
+
+
+def test_rolling_folds_and_candidates():
+    """Folds end at the data end and random search samples the grid"""
+    df = _prices()
+    folds = rolling_folds(df, n_folds=3, horizon_hours=48)
+    assert len(folds) == 3
+    assert folds[-1][1]['ds'].max() == df['ds'].max()
+    assert all(len(test) == 48 and train['ds'].max() < test['ds'].min() for train, test in folds)
+
+    grid = candidate_grid()
+    sample = candidate_sample(5, seed=1)
+    assert len(sample) == 5 and all(p in grid for p in sample)
+    assert sample == candidate_sample(5, seed=1)
+
+    print("✅ Rolling folds and candidate generation work")
+
+
+def test_cross_validation_cache_and_pareto_front():
+    """Reruns only evaluate new points and the front trades accuracy for time"""
+    df = _prices()
+    folds = rolling_folds(df, n_folds=2, horizon_hours=48)
+    candidates = [{'changepoint_prior_scale': s} for s in (0.01, 0.1, 0.5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FoldCache(tmp)
+        summary = cross_validate(candidates, folds, cache, max_workers=2, evaluate=fake_evaluate)
+        assert all(row['cached_folds'] == 0 for row in summary)
+
+        summary = cross_validate(candidates + [{'changepoint_prior_scale': 0.2}], folds, cache,
+                                 max_workers=2, evaluate=fake_evaluate)
+        cached = {row['params']['changepoint_prior_scale']: row['cached_folds'] for row in summary}
+        assert cached == {0.01: 2, 0.1: 2, 0.5: 2, 0.2: 0}
+
+        front = pareto_front(summary + [{'params': {'slow': True}, 'mae': 9.0, 'rmse': 1.0, 'fit_seconds': 99.0}])
+        assert [r['fit_seconds'] for r in front] == sorted(r['fit_seconds'] for r in front)
+        assert all({'slow': True} != r['params'] for r in front)
+        assert select_config(front) == {'changepoint_prior_scale': 0.5}
+        assert select_config(front, max_fit_seconds=15) == {'changepoint_prior_scale': 0.1}
+
+        path = os.path.join(tmp, 'pareto.json')
+        with open(path, 'w') as f:
+            json.dump({'resolution': 'hour', 'selected': select_config(front)}, f)
+        assert load_tuned_params(path, resolution='hour') == {'changepoint_prior_scale': 0.5}
+        assert load_tuned_params(path, resolution='quarterhour') is None
+
+        print("✅ Fold results are cached and the Pareto front is selected correctly")
+
+
+if __name__ == "__main__":
+    test_rolling_folds_and_candidates()
+    test_cross_validation_cache_and_pareto_front()
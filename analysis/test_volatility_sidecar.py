@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed volatility sidecars of price files (runs offline)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backend.forecasting.energy_price_forecast import prune_raw_exports
+from src.backend.forecasting.forecast_store import ForecastStore
+from src.backend.forecasting.volatility_sidecar import historic_volatility, read_sidecar, sidecar_path, write_sidecar
+from src.backend.risk_analysis import (_load_historic_prices, get_historic_price_volatility,
+                                       get_price_forecast_volatility)
+
+from _fixtures import write_price_export
+
+
+def _write_prices(tmp: str, **kwargs) -> str:
+    return write_price_export(tmp, start='2025-03-01', days=100, noise=15, seed=11, **kwargs)
+
+
+def _forecast() -> pd.DataFrame:
+    ds = pd.date_range('2025-06-11', periods=48, freq='h')
+    yhat = 120 + 40 * np.sin(np.arange(48) / 4)
+    return pd.DataFrame({'ds': ds, 'yhat': yhat, 'yhat_lower': yhat - 30, 'yhat_upper': yhat + 25})
+
+
+def test_historic_sidecar_matches_csv():
+    """Historic volatility from the sidecar equals the CSV computation, and is reused"""
+    with tempfile.TemporaryDirectory() as tmp:
+        price_file = _write_prices(tmp)
+        for days in (7, 30, 90):
+            expected = _load_historic_prices(price_file, days=days)['price_eur_per_kwh'].std()
+            assert np.isclose(get_historic_price_volatility(tmp, days=days), expected)
+        assert read_sidecar(price_file)['windows']['30']['rows'] == 30 * 24 + 1
+
+        # Once the sidecar exists no CSV is parsed
+        original_read_csv = pd.read_csv
+        pd.read_csv = lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("CSV parsed"))
+        try:
+            get_historic_price_volatility(tmp, days=30)
+        finally:
+            pd.read_csv = original_read_csv
+
+        # A rewritten CSV makes the sidecar stale
+        stat = os.stat(price_file)
+        os.utime(price_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert read_sidecar(price_file) is None
+        assert get_historic_price_volatility(tmp, days=14) > 0
+    print("✅ Historic volatility is read from the sidecar")
+
+
+def test_forecast_sidecar_published_with_snapshot():
+    """Publishing a snapshot writes its sidecar; the volatility endpoint only reads it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ForecastStore(os.path.join(tmp, 'forecasts'), region='DE')
+        forecast = _forecast()
+        entry = store.publish(forecast, issued_at=datetime(2025, 6, 10, 12), horizon_hours=48)
+        paths = np.random.default_rng(3).normal(120, 20, (50, 48)).astype(np.float32)
+        store.publish_paths(entry, paths, {'n_paths': 50})
+        snapshot = store.snapshot_path(entry)
+        assert os.path.exists(sidecar_path(snapshot))
+
+        original_read_csv = pd.read_csv
+        pd.read_csv = lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("CSV parsed"))
+        try:
+            result = get_price_forecast_volatility(tmp)
+        finally:
+            pd.read_csv = original_read_csv
+
+        assert result['forecast_std_dev'] == round(float((forecast['yhat'] / 1000).std()), 4)
+        assert result['avg_confidence_interval_width'] == round(55 / 1000, 4)
+        assert result['scenario_paths'] == 50
+        assert result['scenario_std_dev'] == round(float(paths.std(axis=0, dtype=np.float64).mean() / 1000), 4)
+
+        # Compaction removes the sidecar with its snapshot
+        store.publish(forecast, issued_at=datetime(2025, 6, 20, 12), horizon_hours=48)
+        store.compact(keep_all_days=1, keep_daily_days=1, now=datetime(2025, 6, 20, 13))
+        assert not os.path.exists(snapshot) and not os.path.exists(sidecar_path(snapshot))
+    print("✅ Forecast sidecars follow their snapshots")
+
+
+def test_prune_removes_sidecars():
+    """Pruned raw exports take their sidecars with them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        old = _write_prices(tmp, name='germany_dayahead_prices_raw_20250609_120000.csv')
+        write_sidecar(old, historic_volatility(pd.read_csv(old)))
+        new = _write_prices(tmp)
+        get_historic_price_volatility(tmp, days=7)
+
+        assert prune_raw_exports(tmp, keep=1) == [old]
+        assert not os.path.exists(sidecar_path(old))
+        assert os.path.exists(sidecar_path(new))
+    print("✅ Pruning removes outdated sidecars")
+
+
+if __name__ == "__main__":
+    test_historic_sidecar_matches_csv()
+    test_forecast_sidecar_published_with_snapshot()
+    test_prune_removes_sidecars()
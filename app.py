@@ -1004,12 +1004,27 @@ async def get_price_breakdown():
         print(f"Error generating price breakdown: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating price breakdown: {str(e)}")
 
+@app.get("/api/forecast-accuracy")
+async def get_forecast_accuracy(region: str = "DE", resolution: str = "hour"):
+    """Get running MAE/RMSE/coverage of the published price forecasts by horizon bucket"""
+    try:
+        from src.backend.forecasting.accuracy_tracker import AccuracyTracker
+
+        app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
+        tracker = AccuracyTracker(os.path.join(app_data_dir, "accuracy"), region=region, resolution=resolution)
+        return tracker.metrics()
+
+    except Exception as e:
+        print(f"Error loading forecast accuracy: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error loading forecast accuracy: {str(e)}")
+
 @app.get("/api/forecast")
-async def get_price_forecast():
+async def get_price_forecast(region: str = "DE"):
     """Get price forecast for the next 7 days from day-ahead market prices"""
     import os
     import pandas as pd
     from datetime import datetime, timedelta
+    from src.backend.forecasting.forecast_store import legacy_file_prefix
     
     try:
         # Load the most recent day-ahead prices data
@@ -1017,9 +1032,10 @@ async def get_price_forecast():
         app_data_path = os.path.join(project_root, "app_data")
         
         # Find the most recent day-ahead prices file
-        dayahead_files = [f for f in os.listdir(app_data_path) if f.startswith('germany_dayahead_prices_raw_') and f.endswith('.csv')]
+        raw_prefix = f"{legacy_file_prefix(region)}_dayahead_prices_raw_"
+        dayahead_files = [f for f in os.listdir(app_data_path) if f.startswith(raw_prefix) and f.endswith('.csv')]
         if not dayahead_files:
-            raise FileNotFoundError("No day-ahead prices files found")
+            raise FileNotFoundError(f"No day-ahead prices files found for region {region}")
         
         # Sort by filename (which contains timestamp) and get the latest
         latest_dayahead_file = sorted(dayahead_files)[-1]
@@ -1146,17 +1162,15 @@ async def get_usage_tips():
     }
 
 @app.post("/api/risk-analysis")
-async def get_risk_analysis(file: UploadFile = File(...), days: int = Form(30)):
+async def get_risk_analysis(file: UploadFile = File(...), days: int = Form(30),
+                            bootstrap_resamples: int = Form(1000)):
     """
     Perform comprehensive risk analysis on user consumption data.
-    Returns historic risk analysis, coincidence factor, and load profile data.
+    Returns historic risk analysis (with day-block bootstrap confidence intervals unless
+    bootstrap_resamples is 0), coincidence factor, and load profile data.
     """
     import traceback
-    from src.backend.risk_analysis import (
-        create_historic_risk_analysis,
-        calculate_coincidence_factor,
-        get_user_load_profile
-    )
+    from src.backend.risk_analysis import RiskAnalysisContext
     
     # Validate file type
     if not file.filename.endswith('.csv'):
@@ -1180,10 +1194,13 @@ async def get_risk_analysis(file: UploadFile = File(...), days: int = Form(30)):
         # Determine app_data directory
         app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
         
-        # Calculate all risk metrics
-        historic_risk = create_historic_risk_analysis(df, days=days, app_data_dir=app_data_dir)
-        coincidence = calculate_coincidence_factor(df, days=days, expensive_hours_pct=20.0, app_data_dir=app_data_dir)
-        load_profile = get_user_load_profile(df, days=days, app_data_dir=app_data_dir)
+        # Calculate all risk metrics from one load of prices and consumption
+        context = RiskAnalysisContext(df, days=days, app_data_dir=app_data_dir)
+        historic_risk = context.historic_risk()
+        if bootstrap_resamples > 0:
+            historic_risk['confidence_intervals'] = context.bootstrap_risk(n_resamples=bootstrap_resamples)
+        coincidence = context.coincidence_factor(expensive_hours_pct=20.0)
+        load_profile = context.load_profile()
         
         return {
             "historic_risk": historic_risk,
@@ -1209,6 +1226,273 @@ async def get_risk_analysis(file: UploadFile = File(...), days: int = Form(30)):
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=error_msg)
 
+@app.post("/api/coincidence-curve")
+async def get_coincidence_curve(file: UploadFile = File(...), days: int = Form(30), step_pct: float = Form(1.0)):
+    """
+    Share of consumption and cost in the top x% most expensive hours, for x on a grid of step_pct.
+    """
+    import traceback
+    from src.backend.risk_analysis import calculate_coincidence_curve
+    
+    # Validate file type
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    
+    try:
+        contents = await file.read()
+        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        
+        if 'datetime' not in df.columns or 'value' not in df.columns:
+            raise HTTPException(
+                status_code=400, 
+                detail="CSV must have 'datetime' and 'value' columns"
+            )
+        
+        app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
+        return calculate_coincidence_curve(df, days=days, step_pct=step_pct, app_data_dir=app_data_dir)
+        
+    except FileNotFoundError as e:
+        print(f"FileNotFoundError in coincidence curve: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        print(f"ValueError in coincidence curve: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = f"Error calculating coincidence curve: {str(e)}"
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.post("/api/consumption-heatmap")
+async def get_calendar_heatmap(file: UploadFile = File(...), days: int = Form(30),
+                               binning: str = Form("hour_of_week")):
+    """
+    Consumption, price and cost sums, counts and means per calendar cell as 2-D arrays.
+    binning is 'hour' (1x24), 'hour_of_week' (7x24) or 'month_hour' (12x24).
+    """
+    import traceback
+    from src.backend.risk_analysis import get_consumption_heatmap
+    
+    # Validate file type
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    
+    try:
+        contents = await file.read()
+        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        
+        if 'datetime' not in df.columns or 'value' not in df.columns:
+            raise HTTPException(
+                status_code=400, 
+                detail="CSV must have 'datetime' and 'value' columns"
+            )
+        
+        app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
+        return get_consumption_heatmap(df, days=days, binning=binning, app_data_dir=app_data_dir)
+        
+    except FileNotFoundError as e:
+        print(f"FileNotFoundError in consumption heatmap: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        print(f"ValueError in consumption heatmap: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = f"Error calculating consumption heatmap: {str(e)}"
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.post("/api/rolling-risk")
+async def get_rolling_risk(file: UploadFile = File(...), window_days: int = Form(30),
+                           expensive_hours_pct: float = Form(20.0)):
+    """
+    Weighted price, market average, differential, correlation and daily-peak coincidence for
+    every window_days window, stepped daily over the uploaded consumption history.
+    """
+    import traceback
+    from src.backend.risk_analysis import calculate_rolling_risk
+    
+    # Validate file type
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    
+    try:
+        contents = await file.read()
+        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        
+        if 'datetime' not in df.columns or 'value' not in df.columns:
+            raise HTTPException(
+                status_code=400, 
+                detail="CSV must have 'datetime' and 'value' columns"
+            )
+        
+        app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
+        return calculate_rolling_risk(df, window_days=window_days, expensive_hours_pct=expensive_hours_pct,
+                                      app_data_dir=app_data_dir)
+        
+    except FileNotFoundError as e:
+        print(f"FileNotFoundError in rolling risk: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        print(f"ValueError in rolling risk: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = f"Error calculating rolling risk: {str(e)}"
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.post("/api/forward-coincidence")
+async def get_forward_coincidence(file: UploadFile = File(None), annual_kwh: float = Form(3500),
+                                  expensive_hours_pct: float = Form(20.0)):
+    """
+    Coincidence of the expected consumption with the 720h price forecast and its scenario paths.
+    With an uploaded CSV its weekly consumption pattern is projected onto the forecast
+    horizon, otherwise the standard load profile scaled to annual_kwh is used.
+    """
+    import traceback
+    from src.backend.forward_risk import calculate_forward_coincidence
+    
+    try:
+        history = None
+        if file is not None:
+            # Validate file type
+            if not file.filename.endswith('.csv'):
+                raise HTTPException(status_code=400, detail="File must be a CSV")
+            contents = await file.read()
+            df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+            
+            if 'datetime' not in df.columns or 'value' not in df.columns:
+                raise HTTPException(
+                    status_code=400, 
+                    detail="CSV must have 'datetime' and 'value' columns"
+                )
+            
+            # Convert datetime column
+            df['datetime'] = pd.to_datetime(df['datetime'])
+            history = df
+        
+        app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
+        return calculate_forward_coincidence(annual_kwh=annual_kwh, expensive_hours_pct=expensive_hours_pct,
+                                             app_data_dir=app_data_dir, consumption_history=history)
+        
+    except FileNotFoundError as e:
+        print(f"FileNotFoundError in forward coincidence: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        print(f"ValueError in forward coincidence: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = f"Error calculating forward coincidence: {str(e)}"
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@app.post("/api/portfolio-risk")
+async def get_portfolio_risk(file: UploadFile = File(...), days: int = Form(30),
+                             expensive_hours_pct: float = Form(20.0), include_households: bool = Form(True)):
+    """
+    Aggregate and per-household price exposure of a customer portfolio.
+    
+    The CSV is either long format (household_id, datetime, value) or wide format
+    (datetime plus one value column per household).
+    """
+    import traceback
+    from src.backend.portfolio_risk import calculate_portfolio_risk
+    
+    # Validate file type
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    
+    try:
+        contents = await file.read()
+        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        
+        if 'datetime' not in df.columns or len(df.columns) < 2:
+            raise HTTPException(
+                status_code=400, 
+                detail="CSV must have a 'datetime' column and either household_id/value or one column per household"
+            )
+        if 'household_id' in df.columns and 'value' not in df.columns:
+            raise HTTPException(status_code=400, detail="Long-format CSV must have a 'value' column")
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        
+        app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
+        return calculate_portfolio_risk(df, days=days, app_data_dir=app_data_dir,
+                                        expensive_hours_pct=expensive_hours_pct,
+                                        include_households=include_households)
+        
+    except FileNotFoundError as e:
+        print(f"FileNotFoundError in portfolio risk: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        print(f"ValueError in portfolio risk: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = f"Error calculating portfolio risk: {str(e)}"
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=error_msg)
+
+class LiveReading(BaseModel):
+    datetime: str  # Start of the metering interval
+    value: float  # kWh in the interval
+
+class LiveRiskRequest(BaseModel):
+    readings: List[LiveReading]
+    # Settings of a new customer state (30 days, 20%); an existing state keeps its own
+    window_days: Optional[int] = None
+    expensive_hours_pct: Optional[float] = None
+
+@app.post("/api/live-risk/{customer_id}")
+async def update_live_risk(customer_id: str, request: LiveRiskRequest):
+    """
+    Add new meter readings to a customer's streaming risk state and return the updated metrics.
+    
+    Each reading is priced with the most recent day-ahead price file; readings without a price
+    are skipped. The state is kept per customer under app_data/streaming_risk; window_days and
+    expensive_hours_pct are fixed when it is created.
+    """
+    import traceback
+    from src.backend.risk_analysis import _get_most_recent_price_file
+    from src.backend.streaming_risk import OnlineRiskAccumulator
+    
+    try:
+        app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
+        state_dir = os.path.join(app_data_dir, "streaming_risk")
+        accumulator = OnlineRiskAccumulator.load(customer_id, state_dir, window_days=request.window_days,
+                                                 expensive_hours_pct=request.expensive_hours_pct)
+        
+        readings = pd.DataFrame([r.model_dump() for r in request.readings], columns=['datetime', 'value'])
+        readings['datetime'] = pd.to_datetime(readings['datetime'])
+        
+        readings = accumulator.price_readings(readings, _get_most_recent_price_file(app_data_dir))
+        priced = readings.dropna(subset=['price_eur_per_kwh'])
+        
+        accumulator.update_many(priced)
+        accumulator.save(state_dir)
+        
+        result = accumulator.metrics()
+        result['readings_added'] = int(len(priced))
+        result['readings_without_price'] = int(len(readings) - len(priced))
+        return result
+        
+    except FileNotFoundError as e:
+        print(f"FileNotFoundError in live risk: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        print(f"ValueError in live risk: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        error_msg = f"Error updating live risk: {str(e)}"
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=error_msg)
+
 @app.post("/api/risk-score")
 async def get_risk_score(file: UploadFile = File(...), days: int = Form(30)):
     """
@@ -1224,11 +1508,7 @@ async def get_risk_score(file: UploadFile = File(...), days: int = Form(30)):
     - risk_fixed: Risk assessment for fixed tariffs
     """
     import traceback
-    from src.backend.risk_analysis import (
-        create_historic_risk_analysis,
-        calculate_coincidence_factor,
-        get_aggregated_risk_score
-    )
+    from src.backend.risk_analysis import RiskAnalysisContext, get_aggregated_risk_scores
     
     # Validate file type
     if not file.filename.endswith('.csv'):
@@ -1253,8 +1533,9 @@ async def get_risk_score(file: UploadFile = File(...), days: int = Form(30)):
         app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
         
         # Calculate risk metrics (shared for both tariff types)
-        historic_risk = create_historic_risk_analysis(df, days=days, app_data_dir=app_data_dir)
-        coincidence = calculate_coincidence_factor(df, days=days, expensive_hours_pct=20.0, app_data_dir=app_data_dir)
+        context = RiskAnalysisContext(df, days=days, app_data_dir=app_data_dir)
+        historic_risk = context.historic_risk()
+        coincidence = context.coincidence_factor(expensive_hours_pct=20.0)
         
         # Calculate backtest metrics for forecast quality assessment
         usage_forecast_quality = None
@@ -1273,23 +1554,15 @@ async def get_risk_score(file: UploadFile = File(...), days: int = Form(30)):
         except Exception as e:
             print(f"Warning: Could not calculate price forecast volatility: {str(e)}")
         
-        # Get aggregated risk scores for BOTH tariff types
-        risk_dynamic = get_aggregated_risk_score(
+        # Get aggregated risk scores for BOTH tariff types in one call
+        risk_dynamic, risk_fixed = get_aggregated_risk_scores(
             historic_risk, 
             coincidence, 
             forecast_price_volatility,
-            is_dynamic=True,
+            is_dynamic=[True, False],
             usage_forecast_quality=usage_forecast_quality
         )
         risk_dynamic['tariff_type'] = 'dynamic'
-        
-        risk_fixed = get_aggregated_risk_score(
-            historic_risk, 
-            coincidence, 
-            forecast_price_volatility,
-            is_dynamic=False,
-            usage_forecast_quality=usage_forecast_quality
-        )
         risk_fixed['tariff_type'] = 'fixed'
         
         return {
@@ -1333,11 +1606,7 @@ async def get_risk_score_per_tariff(
     - is_dynamic: Whether to calculate risk for a dynamic (True) or fixed (False) tariff
     """
     import traceback
-    from src.backend.risk_analysis import (
-        create_historic_risk_analysis,
-        calculate_coincidence_factor,
-        get_aggregated_risk_score
-    )
+    from src.backend.risk_analysis import RiskAnalysisContext, get_aggregated_risk_score
     
     # Validate file type
     if not file.filename.endswith('.csv'):
@@ -1362,8 +1631,9 @@ async def get_risk_score_per_tariff(
         app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
         
         # Calculate risk metrics
-        historic_risk = create_historic_risk_analysis(df, days=days, app_data_dir=app_data_dir)
-        coincidence = calculate_coincidence_factor(df, days=days, expensive_hours_pct=20.0, app_data_dir=app_data_dir)
+        context = RiskAnalysisContext(df, days=days, app_data_dir=app_data_dir)
+        historic_risk = context.historic_risk()
+        coincidence = context.coincidence_factor(expensive_hours_pct=20.0)
         
         # Calculate backtest metrics for forecast quality assessment
         usage_forecast_quality = None
@@ -1440,8 +1710,7 @@ async def get_risk_score_yearly_usage(
     from src.backend.risk_analysis import (
         get_simplified_risk_score_for_yearly_usage,
         get_price_forecast_volatility,
-        _load_historic_prices,
-        _get_most_recent_price_file
+        get_historic_price_volatility
     )
     
     try:
@@ -1455,12 +1724,10 @@ async def get_risk_score_yearly_usage(
         except Exception as e:
             print(f"Warning: Could not calculate price forecast volatility: {str(e)}")
         
-        # Calculate historic price volatility (optional but helpful)
+        # Calculate historic price volatility (optional but helpful, read from the price file's sidecar)
         historic_price_volatility = None
         try:
-            price_file = _get_most_recent_price_file(app_data_dir)
-            historic_prices = _load_historic_prices(price_file, days=30)
-            historic_price_volatility = historic_prices['price_eur_per_kwh'].std()
+            historic_price_volatility = get_historic_price_volatility(app_data_dir=app_data_dir, days=30)
         except Exception as e:
             print(f"Warning: Could not calculate historic price volatility: {str(e)}")
         
@@ -2139,27 +2406,15 @@ async def scrape_all_tariffs(
     if consumption_df is not None:
         logger.info(f"🛡️ Calculating risk scores for {len(tariffs)} tariffs...")
         try:
-            from src.backend.risk_analysis import (
-                create_historic_risk_analysis,
-                calculate_coincidence_factor,
-                get_aggregated_risk_score
-            )
+            from src.backend.risk_analysis import RiskAnalysisContext, get_aggregated_risk_scores
             
             # Determine app_data directory
             app_data_dir = os.path.join(os.path.dirname(__file__), "app_data")
             
             # Calculate base risk metrics ONCE (same for all tariffs)
-            historic_risk = create_historic_risk_analysis(
-                consumption_df, 
-                days=days, 
-                app_data_dir=app_data_dir
-            )
-            coincidence = calculate_coincidence_factor(
-                consumption_df, 
-                days=days, 
-                expensive_hours_pct=20.0, 
-                app_data_dir=app_data_dir
-            )
+            context = RiskAnalysisContext(consumption_df, days=days, app_data_dir=app_data_dir)
+            historic_risk = context.historic_risk()
+            coincidence = context.coincidence_factor(expensive_hours_pct=20.0)
             
             # Calculate backtest metrics for forecast quality assessment
             usage_forecast_quality = None
@@ -2180,32 +2435,18 @@ async def scrape_all_tariffs(
             except Exception as e:
                 logger.warning(f"⚠️  Could not calculate price forecast volatility: {str(e)}")
             
-            # Calculate risk score TWICE: once for dynamic tariffs, once for fixed tariffs
-            # This avoids redundant calculations since metrics are the same for all dynamic/fixed tariffs
-            risk_assessment_dynamic = get_aggregated_risk_score(
+            # Score every tariff in one vectorized call (the metrics are the same for all tariffs)
+            risk_assessments = get_aggregated_risk_scores(
                 historic_risk,
                 coincidence,
                 forecast_price_volatility,
-                is_dynamic=True,
+                is_dynamic=[tariff.get('is_dynamic', True) for tariff in tariffs],
                 usage_forecast_quality=usage_forecast_quality
             )
-            logger.info(f"  📊 Dynamic tariff risk: {risk_assessment_dynamic['risk_level']} (score: {risk_assessment_dynamic['risk_score']})")
             
-            risk_assessment_fixed = get_aggregated_risk_score(
-                historic_risk,
-                coincidence,
-                forecast_price_volatility,
-                is_dynamic=False,
-                usage_forecast_quality=usage_forecast_quality
-            )
-            logger.info(f"  📊 Fixed tariff risk: {risk_assessment_fixed['risk_level']} (score: {risk_assessment_fixed['risk_score']})")
-            
-            # Apply the appropriate risk assessment to each tariff based on its type
-            for tariff in tariffs:
+            # Apply each tariff's risk assessment
+            for tariff, risk_assessment in zip(tariffs, risk_assessments):
                 try:
-                    is_dynamic = tariff.get('is_dynamic', True)
-                    risk_assessment = risk_assessment_dynamic if is_dynamic else risk_assessment_fixed
-                    
                     # Add risk data to tariff
                     tariff['risk_level'] = risk_assessment['risk_level']
                     tariff['risk_score'] = risk_assessment['risk_score']
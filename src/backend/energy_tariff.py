@@ -3,6 +3,8 @@ from datetime import datetime, time, timedelta
 from typing import Optional
 import pandas as pd
 from .forecasting.energy_usage_forecast import forecast_prophet
+from .forecasting.forecast_store import latest_forecast_path, legacy_file_prefix, read_forecast
+from .forecasting.resolution import common_interval, infer_interval
 from calendar import monthrange
 import os
 
@@ -236,7 +238,8 @@ class DynamicTariff(EnergyTariff):
 
     def __init__(self, name: str, base_price: float, start_date: datetime, provider: Optional[str] = None, 
                  is_dynamic: bool = True, network_fee: float = 0.0, features: Optional[list] = None,
-                 postal_code: Optional[str] = None, additional_price_ct_kwh: Optional[float] = None):
+                 postal_code: Optional[str] = None, additional_price_ct_kwh: Optional[float] = None,
+                 region: str = "DE"):
         """
         Initialize the dynamic tariff with base price and one-time network fee.
         
@@ -251,11 +254,13 @@ class DynamicTariff(EnergyTariff):
             postal_code: German postal code (Postleitzahl) for location-specific pricing or availability
             additional_price_ct_kwh: Fixed price components in ct/kWh (network fees, taxes, levies)
                                      from scraped provider data (e.g., Tibber's 18.4 ct/kWh)
+            region: Day-ahead bidding zone the tariff is priced off (e.g. "DE", "DE-LU", "AT")
         """
         super().__init__(name, base_price=base_price, start_date=start_date, provider=provider, is_dynamic=True, 
                          features=features, postal_code=postal_code)
         self.network_fee = network_fee  # One-time fee for network usage
         self.additional_price_ct_kwh = additional_price_ct_kwh  # Fixed components from scraper (ct/kWh)
+        self.region = region
 
     def _get_average_forecast_price(self) -> float:
         """
@@ -277,16 +282,9 @@ class DynamicTariff(EnergyTariff):
             project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             app_data_path = os.path.join(project_root, "app_data")
             
-            # Find the most recent price forecast file
-            forecast_files = [f for f in os.listdir(app_data_path) if f.startswith('germany_price_forecast_') and f.endswith('.csv')]
-            if not forecast_files:
-                return 0.25  # Default fallback price in €/kWh
-            
-            # Sort by filename to get the most recent
-            latest_forecast_file = sorted(forecast_files)[-1]
-            price_data_path = os.path.join(app_data_path, latest_forecast_file)
-            
-            forecast_data = pd.read_csv(price_data_path)
+            # Find the most recent price forecast of the tariff's region
+            price_data_path = self._price_forecast_path(app_data_path)
+            forecast_data = read_forecast(price_data_path)
             
             # Use retail price (includes business logic: zero-censoring + markup)
             if 'yhat_retail' in forecast_data.columns:
@@ -335,24 +333,129 @@ class DynamicTariff(EnergyTariff):
             "note": "Dynamic tariff cost breakdown requires actual consumption timeline for accurate pricing"
         }
     
-    def calculate_cost_with_breakdown(self, data):
+    def _price_forecast_path(self, app_data_path: str) -> str:
+        """
+        Path of the newest published forecast of the tariff's region.
+        
+        Falls back to the most recent fixed-name <region>_price_forecast_*.csv file.
+        
+        Raises:
+            FileNotFoundError: If the region has no forecast
+        """
+        prefix = f"{legacy_file_prefix(self.region)}_price_forecast_"
+        forecast_files = [f for f in os.listdir(app_data_path) if f.startswith(prefix) and f.endswith('.csv')]
+        legacy_file = sorted(forecast_files)[-1] if forecast_files else None
+        return latest_forecast_path(app_data_path, region=self.region, legacy_file=legacy_file)
+
+    def _load_price_forecast(self, app_data_path: str) -> pd.DataFrame:
+        """
+        Load the latest price forecast as end-customer prices.
+        
+        Args:
+            app_data_path: Path to the app_data directory
+            
+        Returns:
+            pd.DataFrame: Columns 'datetime' and 'predicted_mean' (€/kWh) at the forecast's native resolution
+        """
+        # Newest published forecast snapshot of the region, read lazily and parsed once per snapshot
+        future_prices = read_forecast(self._price_forecast_path(app_data_path))
+        
+        # Use 'yhat_energy' column (zero-censored wholesale) + add fixed components
+        # This gives us: Börsenpreis + Arbeitspreis (vom Scraper)
+        if 'yhat_energy' in future_prices.columns:
+            # New format: Start with zero-censored energy price (in EUR/MWh)
+            # yhat_energy already contains E[max(0,Y)] - the probabilistic zero-censored wholesale price
+            
+            # Convert to ct/kWh for easier understanding
+            wholesale_ct_kwh = future_prices['yhat_energy'] / 10  # EUR/MWh → ct/kWh
+            
+            # Add Arbeitspreis (work price) from scraper
+            # This already includes ALL fixed components:
+            #    - Anbieterkosten (supplier costs): ~7 ct/kWh
+            #    - Netzentgelte (network fees): ~7-8 ct/kWh
+            #    - Stromsteuer (electricity tax): 2.05 ct/kWh
+            #    - Konzessionsabgabe (concession fee): ~1.5 ct/kWh
+            #    - MwSt (VAT 19%): ~4-5 ct/kWh
+            #    - Herkunftsnachweise (certificates): ~0.1-0.5 ct/kWh
+            if hasattr(self, 'additional_price_ct_kwh') and self.additional_price_ct_kwh is not None:
+                # Use scraped Arbeitspreis (already contains ALL markups)
+                arbeitspreis_ct = self.additional_price_ct_kwh
+            else:
+                # Default fallback for non-dynamic tariffs: ~25.4 ct/kWh
+                #    - Supplier costs: 7.0 ct/kWh
+                #    - Network/taxes/levies: 18.4 ct/kWh
+                arbeitspreis_ct = 25.4
+            
+            # Total price = wholesale (Börsenpreis) + Arbeitspreis (all other components)
+            # For dynamic tariffs: ~11 ct (wholesale) + ~15 ct (markup) = ~26 ct/kWh
+            total_price_ct = wholesale_ct_kwh + arbeitspreis_ct
+            future_prices['predicted_mean'] = total_price_ct / 100  # ct/kWh → €/kWh
+            
+        elif 'yhat_retail' in future_prices.columns:
+            # Fallback: Use retail price (already has supplier markup included)
+            # yhat_retail = yhat_energy + 7.0 ct/kWh (supplier costs)
+            # We still need to add the Arbeitspreis from scraper (taxes/network fees)
+            retail_ct_kwh = future_prices['yhat_retail'] / 10  # EUR/MWh → ct/kWh
+            
+            if hasattr(self, 'additional_price_ct_kwh') and self.additional_price_ct_kwh is not None:
+                # Arbeitspreis from scraper
+                arbeitspreis_ct = self.additional_price_ct_kwh
+            else:
+                # Default: Only add taxes/network (no supplier costs, already in yhat_retail)
+                arbeitspreis_ct = 18.4
+                
+            future_prices['predicted_mean'] = (retail_ct_kwh + arbeitspreis_ct) / 100  # → €/kWh
+            
+        elif 'yhat' in future_prices.columns:
+            # Old format: Raw wholesale (can be negative) + add all markups
+            wholesale_eur_mwh = future_prices['yhat'].clip(lower=0)  # Simple zero-floor
+            wholesale_ct_kwh = wholesale_eur_mwh / 10
+            
+            if hasattr(self, 'additional_price_ct_kwh') and self.additional_price_ct_kwh is not None:
+                # Use scraped Arbeitspreis (contains all markups)
+                arbeitspreis_ct = self.additional_price_ct_kwh
+            else:
+                # Default: supplier + taxes/network
+                arbeitspreis_ct = 25.4
+                
+            future_prices['predicted_mean'] = (wholesale_ct_kwh + arbeitspreis_ct) / 100
+        else:
+            raise ValueError(f"Expected 'yhat_energy', 'yhat_retail' or 'yhat' column in forecast data, found columns: {list(future_prices.columns)}")
+        
+        future_prices = future_prices.rename(columns={'ds': 'datetime'})  # Prophet uses 'ds' for datetime
+        future_prices['datetime'] = pd.to_datetime(future_prices['datetime'])
+        return future_prices[['datetime', 'predicted_mean']]
+
+    def calculate_cost_with_breakdown(self, data, resolution: Optional[str] = None):
         """
         Calculate the total cost and return both cost and average kWh price.
         
+        Consumption and prices are combined at their native resolution (e.g. 15 minutes
+        for quarter-hourly price forecasts and smart meter data); finer data is only
+        summed up to the coarser of the two grids.
+        
         Args:
             data: pandas DataFrame with 'datetime' and 'value' columns (hourly kWh consumption)
                   or a numeric value representing annual consumption in kWh.
+            resolution: Optional coarser resolution to calculate at ('hour', 'quarterhour'
+                        or a pandas frequency string)
                   
         Returns: dict with 'total_cost' and 'avg_kwh_price'
         """
-        import os
-        
         # Calculate actual billing period based on German monthly billing practices
         billing_period_days = self.calculate_billing_period_days()
         
         # Get the project root directory
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         
+        # load price forecast data from app_data first: its resolution sets the calculation grid
+        try:
+            future_prices_clean = self._load_price_forecast(os.path.join(project_root, "app_data"))
+        except Exception as e:
+            # Return just base price and network fee if price data loading fails
+            return {'total_cost': self.base_price + self.network_fee, 'avg_kwh_price': 0.0}
+        price_interval = infer_interval(future_prices_clean['datetime'])
+        
         # load consumption data if provided, else use default synthetic data
         if isinstance(data, pd.DataFrame):
             # Process uploaded consumption data
@@ -374,8 +477,9 @@ class DynamicTariff(EnergyTariff):
             cutoff_date = consumption_data['datetime'].max() - pd.Timedelta(days=90)
             consumption_data = consumption_data[consumption_data['datetime'] >= cutoff_date]
             
-            consumption_data = consumption_data.resample('h', on='datetime').sum().reset_index()
-            future_consumption = forecast_prophet(consumption_data)
+            freq = common_interval(time_diff, price_interval, resolution)
+            consumption_data = consumption_data.resample(freq, on='datetime').sum().reset_index()
+            future_consumption = forecast_prophet(consumption_data, freq=freq)
             
             # Prophet returns columns 'ds' and 'yhat', but we need 'datetime' and 'value'
             future_consumption = future_consumption.rename(columns={'ds': 'datetime', 'yhat': 'value'})
@@ -392,13 +496,14 @@ class DynamicTariff(EnergyTariff):
                 
             consumption_data['datetime'] = pd.to_datetime(consumption_data['datetime'])
             
-            # Convert from 15-minute Watt values to hourly kWh BEFORE scaling
+            # Convert from 15-minute Watt values to kWh BEFORE scaling
             time_diff = consumption_data['datetime'].diff().mode()[0]
             if time_diff == pd.Timedelta(minutes=15):
                 # Values are in W for 15-minute intervals
                 # Convert to kWh: multiply by 0.25 hours and divide by 1000
                 consumption_data['value'] = consumption_data['value'] * 0.25 / 1000
-                consumption_data = consumption_data.set_index('datetime').resample('h').sum().reset_index()
+                freq = common_interval(time_diff, price_interval, resolution)
+                consumption_data = consumption_data.set_index('datetime').resample(freq).sum().reset_index()
             
             # NOW calculate the adjustment factor with properly converted kWh values
             current_yearly_usage = consumption_data['value'].sum()
@@ -409,89 +514,11 @@ class DynamicTariff(EnergyTariff):
         else:
             raise ValueError("Input data must be a pandas DataFrame or a numeric yearly usage value.")
         
-        # load price forecast data from app_data
-        try:
-            app_data_path = os.path.join(project_root, "app_data")
-            
-            # Find the most recent price forecast file
-            forecast_files = [f for f in os.listdir(app_data_path) if f.startswith('germany_price_forecast_') and f.endswith('.csv')]
-            if not forecast_files:
-                raise FileNotFoundError("No price forecast files found in app_data")
-            
-            # Sort by filename to get the most recent (assumes timestamp in filename)
-            latest_forecast_file = sorted(forecast_files)[-1]
-            price_data_path = os.path.join(app_data_path, latest_forecast_file)
-            
-            future_prices = pd.read_csv(price_data_path)
-            
-            # Use 'yhat_energy' column (zero-censored wholesale) + add fixed components
-            # This gives us: Börsenpreis + Arbeitspreis (vom Scraper)
-            if 'yhat_energy' in future_prices.columns:
-                # New format: Start with zero-censored energy price (in EUR/MWh)
-                # yhat_energy already contains E[max(0,Y)] - the probabilistic zero-censored wholesale price
-                
-                # Convert to ct/kWh for easier understanding
-                wholesale_ct_kwh = future_prices['yhat_energy'] / 10  # EUR/MWh → ct/kWh
-                
-                # Add Arbeitspreis (work price) from scraper
-                # This already includes ALL fixed components:
-                #    - Anbieterkosten (supplier costs): ~7 ct/kWh
-                #    - Netzentgelte (network fees): ~7-8 ct/kWh
-                #    - Stromsteuer (electricity tax): 2.05 ct/kWh
-                #    - Konzessionsabgabe (concession fee): ~1.5 ct/kWh
-                #    - MwSt (VAT 19%): ~4-5 ct/kWh
-                #    - Herkunftsnachweise (certificates): ~0.1-0.5 ct/kWh
-                if hasattr(self, 'additional_price_ct_kwh') and self.additional_price_ct_kwh is not None:
-                    # Use scraped Arbeitspreis (already contains ALL markups)
-                    arbeitspreis_ct = self.additional_price_ct_kwh
-                else:
-                    # Default fallback for non-dynamic tariffs: ~25.4 ct/kWh
-                    #    - Supplier costs: 7.0 ct/kWh
-                    #    - Network/taxes/levies: 18.4 ct/kWh
-                    arbeitspreis_ct = 25.4
-                
-                # Total price = wholesale (Börsenpreis) + Arbeitspreis (all other components)
-                # For dynamic tariffs: ~11 ct (wholesale) + ~15 ct (markup) = ~26 ct/kWh
-                total_price_ct = wholesale_ct_kwh + arbeitspreis_ct
-                future_prices['predicted_mean'] = total_price_ct / 100  # ct/kWh → €/kWh
-                
-            elif 'yhat_retail' in future_prices.columns:
-                # Fallback: Use retail price (already has supplier markup included)
-                # yhat_retail = yhat_energy + 7.0 ct/kWh (supplier costs)
-                # We still need to add the Arbeitspreis from scraper (taxes/network fees)
-                retail_ct_kwh = future_prices['yhat_retail'] / 10  # EUR/MWh → ct/kWh
-                
-                if hasattr(self, 'additional_price_ct_kwh') and self.additional_price_ct_kwh is not None:
-                    # Arbeitspreis from scraper
-                    arbeitspreis_ct = self.additional_price_ct_kwh
-                else:
-                    # Default: Only add taxes/network (no supplier costs, already in yhat_retail)
-                    arbeitspreis_ct = 18.4
-                    
-                future_prices['predicted_mean'] = (retail_ct_kwh + arbeitspreis_ct) / 100  # → €/kWh
-                
-            elif 'yhat' in future_prices.columns:
-                # Old format: Raw wholesale (can be negative) + add all markups
-                wholesale_eur_mwh = future_prices['yhat'].clip(lower=0)  # Simple zero-floor
-                wholesale_ct_kwh = wholesale_eur_mwh / 10
-                
-                if hasattr(self, 'additional_price_ct_kwh') and self.additional_price_ct_kwh is not None:
-                    # Use scraped Arbeitspreis (contains all markups)
-                    arbeitspreis_ct = self.additional_price_ct_kwh
-                else:
-                    # Default: supplier + taxes/network
-                    arbeitspreis_ct = 25.4
-                    
-                future_prices['predicted_mean'] = (wholesale_ct_kwh + arbeitspreis_ct) / 100
-            else:
-                raise ValueError(f"Expected 'yhat_energy', 'yhat_retail' or 'yhat' column in forecast data, found columns: {list(future_prices.columns)}")
-            
-            future_prices = future_prices.rename(columns={'ds': 'datetime'})  # Prophet uses 'ds' for datetime
-        except Exception as e:
-            # Return just base price and network fee if price data loading fails
-            return {'total_cost': self.base_price + self.network_fee, 'avg_kwh_price': 0.0}
-            
-        future_prices['datetime'] = pd.to_datetime(future_prices['datetime'])
+        # Prices finer than the consumption grid are averaged onto it
+        consumption_interval = infer_interval(pd.to_datetime(future_consumption['datetime']))
+        if price_interval < consumption_interval:
+            future_prices_clean = (future_prices_clean.set_index('datetime')
+                                   .resample(consumption_interval).mean().reset_index())
         
         # Determine consumption column BEFORE merging to avoid confusion with price data columns
         if 'yhat' in future_consumption.columns:
@@ -501,15 +528,11 @@ class DynamicTariff(EnergyTariff):
         else:
             raise ValueError("Expected 'yhat' or 'value' column in consumption data")
         
-        # Only keep necessary columns from price data to avoid column conflicts
-        price_columns_to_keep = ['datetime', 'predicted_mean']
-        future_prices_clean = future_prices[price_columns_to_keep].copy()
-        
         # merge consumption and price data
         future_data = future_consumption.merge(future_prices_clean, on='datetime', how='left')
             
         # Calculate consumption costs
-        consumption_costs = future_data.apply(lambda row: row[consumption_column] * row['predicted_mean'], axis=1)
+        consumption_costs = future_data[consumption_column] * future_data['predicted_mean']
         total_consumption_cost = consumption_costs.sum()
         total_cost = total_consumption_cost + self.base_price + self.network_fee  # Add one-time network fee
         
@@ -529,11 +552,12 @@ class DynamicTariff(EnergyTariff):
             'avg_kwh_price': avg_kwh_price
         }
 
+
 def slice_seasonal_data(df: pd.DataFrame, start_date: datetime, days: int = 30) -> pd.DataFrame:
     """
     Slice data based on day/month only (ignoring year) for seasonal patterns.
     Cycles through the year if needed.
-    Note: This function expects data to already be in hourly kWh format.
+    Note: This function expects data to already be in kWh per interval (hourly or quarter-hourly).
     """
     df_copy = df.copy()
     df_copy['datetime'] = pd.to_datetime(df_copy['datetime'])
@@ -541,7 +565,8 @@ def slice_seasonal_data(df: pd.DataFrame, start_date: datetime, days: int = 30)
     # Add day/month columns for matching
     df_copy['month'] = df_copy['datetime'].dt.month
     df_copy['day'] = df_copy['datetime'].dt.day
-    df_copy['hour'] = df_copy['datetime'].dt.hour
+    # Offset within the day keeps both the hour and the quarter-hour of each value
+    time_of_day = df_copy['datetime'] - df_copy['datetime'].dt.normalize()
     
     result_data = []
     current_date = start_date
@@ -552,10 +577,9 @@ def slice_seasonal_data(df: pd.DataFrame, start_date: datetime, days: int = 30)
         day_data = df_copy[mask].copy()
         
         if not day_data.empty:
-            # Update datetime to match the target date while keeping hourly pattern
-            day_data['datetime'] = day_data.apply(
-                lambda row: current_date.replace(hour=row['hour']), axis=1
-            )
+            # Update datetime to match the target date while keeping the intraday pattern
+            day_start = pd.Timestamp(current_date).normalize()
+            day_data['datetime'] = day_start + time_of_day[mask]
             result_data.append(day_data[['datetime', 'value']])
         
         # Move to next day
@@ -0,0 +1,218 @@
+"""
+Incremental forecast-vs-realized accuracy ledger.
+
+Whenever new actual prices are synced, only the newly realized steps are
+scored against every stored forecast snapshot that covered them. Running sums
+per horizon bucket are kept in::
+
+    app_data/accuracy/<region>/<resolution>/ledger.json
+
+so MAE, RMSE and interval coverage are updated in O(new steps) instead of
+being recomputed from all past forecasts.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ACCURACY_DIR = os.path.join("app_data", "accuracy")
+LEDGER_FILE = "ledger.json"
+TIMEZONE = "Europe/Berlin"
+# (label, upper bound of the lead time in hours)
+HORIZON_BUCKETS = (
+    ("0-24h", 24),
+    ("24-72h", 72),
+    ("3-7d", 168),
+    ("7-14d", 336),
+    ("14-30d", 720),
+    ("30d+", np.inf),
+)
+
+
+def horizon_bucket_labels(lead_hours: np.ndarray) -> np.ndarray:
+    """Horizon bucket label of each lead time"""
+    bounds = np.array([upper for _, upper in HORIZON_BUCKETS])
+    labels = np.array([label for label, _ in HORIZON_BUCKETS])
+    return labels[np.searchsorted(bounds, lead_hours, side="left")]
+
+
+def _empty_stats() -> dict:
+    return {"n": 0, "sum_abs": 0.0, "sum_sq": 0.0, "inside": 0, "sum_error": 0.0}
+
+
+def _metrics(stats: dict) -> dict:
+    n = stats["n"]
+    if not n:
+        return {"n": 0, "mae": None, "rmse": None, "bias": None, "coverage": None}
+    return {
+        "n": n,
+        "mae": round(stats["sum_abs"] / n, 3),
+        "rmse": round(float(np.sqrt(stats["sum_sq"] / n)), 3),
+        "bias": round(stats["sum_error"] / n, 3),
+        "coverage": round(stats["inside"] / n, 4),
+    }
+
+
+def _to_utc(ds: pd.Series) -> pd.Series:
+    """Naive Europe/Berlin forecast timestamps as UTC"""
+    ds = pd.to_datetime(ds)
+    if ds.dt.tz is None:
+        ds = ds.dt.tz_localize(TIMEZONE, ambiguous="NaT", nonexistent="shift_forward")
+    return ds.dt.tz_convert("UTC")
+
+
+class AccuracyTracker:
+    """
+    Running accuracy statistics of published forecasts by horizon bucket.
+    """
+
+    def __init__(self, root: str = DEFAULT_ACCURACY_DIR, region: str = "DE", resolution: str = "hour"):
+        """
+        Initialize the tracker.
+
+        Args:
+            root: Base directory of the ledger
+            region: SMARD region code (e.g. "DE")
+            resolution: Price resolution ("hour" or "quarterhour")
+        """
+        self.path = os.path.join(root, region, resolution)
+        self.region = region
+        self.resolution = resolution
+        # snapshot key -> future part of the forecast (snapshots are immutable)
+        self._forecast_cache = {}
+
+    @property
+    def ledger_path(self) -> str:
+        return os.path.join(self.path, LEDGER_FILE)
+
+    def read_ledger(self) -> dict:
+        """Return the ledger (an empty one if nothing was scored yet)"""
+        if not os.path.exists(self.ledger_path):
+            return {"realized_through": None, "buckets": {}, "overall": _empty_stats(), "snapshots": {}}
+        with open(self.ledger_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_ledger(self, ledger: dict) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.ledger_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(ledger, f, indent=2)
+        os.replace(tmp_path, self.ledger_path)
+
+    @staticmethod
+    def _forecast_span(entry: dict) -> tuple:
+        """
+        Bounds of a snapshot's out-of-sample steps from its index entry alone.
+
+        Returns:
+            tuple: (cutoff, end) in UTC; steps after cutoff are forecast, end is None
+                   without horizon_hours
+        """
+        issued = pd.Timestamp(entry["issued_at"])
+        cutoff = issued
+        if entry.get("history_end"):
+            cutoff = max(issued, _to_utc(pd.Series([entry["history_end"]])).iloc[0])
+        end = None
+        if entry.get("horizon_hours") is not None:
+            # One hour of slack for a DST change inside the naive local horizon
+            end = cutoff + pd.Timedelta(hours=entry["horizon_hours"] + 1)
+        return cutoff, end
+
+    def _future_part(self, forecasts, entry: dict) -> pd.DataFrame:
+        """Steps of a snapshot that were genuinely forecast (after its training data ended)"""
+        key = entry["key"]
+        if key not in self._forecast_cache:
+            columns = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+            frame = pd.read_csv(forecasts.snapshot_path(entry), usecols=lambda c: c in columns)
+            frame["ds_utc"] = _to_utc(frame["ds"])
+            issued = pd.Timestamp(entry["issued_at"])
+            cutoff, _ = self._forecast_span(entry)
+            frame = frame[frame["ds_utc"] > cutoff].dropna(subset=["ds_utc"])
+            frame["lead_hours"] = (frame["ds_utc"] - issued) / pd.Timedelta(hours=1)
+            self._forecast_cache[key] = frame.set_index("ds_utc")
+        return self._forecast_cache[key]
+
+    def update(self, actuals: pd.DataFrame, forecasts) -> dict:
+        """
+        Score newly realized prices against every snapshot that covered them.
+
+        Args:
+            actuals: Realized prices with ds (naive Europe/Berlin) and price_eur_per_mwh columns;
+                     rows at or before the ledger watermark are ignored
+            forecasts: ForecastStore holding the published snapshots
+        Returns:
+            dict: Number of new steps and forecast/actual pairs scored
+        """
+        ledger = self.read_ledger()
+        actuals = actuals.dropna(subset=["price_eur_per_mwh"]).copy()
+        actuals["ds_utc"] = _to_utc(actuals["ds"])
+        actuals = actuals.dropna(subset=["ds_utc"])
+        if ledger["realized_through"] is not None:
+            actuals = actuals[actuals["ds_utc"] > pd.Timestamp(ledger["realized_through"])]
+        if actuals.empty:
+            return {"new_steps": 0, "pairs": 0}
+        actual = actuals.set_index("ds_utc")["price_eur_per_mwh"]
+        first_new, last_new = actual.index.min(), actual.index.max()
+
+        pairs = 0
+        for entry in forecasts.index():
+            # Skip snapshots whose forecast steps cannot overlap the new hours before opening them
+            cutoff, end = self._forecast_span(entry)
+            if cutoff >= last_new or (end is not None and end < first_new):
+                continue
+            future = self._future_part(forecasts, entry)
+            if future.empty or future.index.max() < first_new:
+                continue
+            matched = future.join(actual, how="inner")
+            if matched.empty:
+                continue
+            error = (matched["yhat"] - matched["price_eur_per_mwh"]).to_numpy()
+            inside = ((matched["price_eur_per_mwh"] >= matched["yhat_lower"]) &
+                      (matched["price_eur_per_mwh"] <= matched["yhat_upper"])).to_numpy()
+            labels = horizon_bucket_labels(matched["lead_hours"].to_numpy())
+            for label in np.unique(labels):
+                mask = labels == label
+                self._accumulate(ledger["buckets"].setdefault(label, _empty_stats()), error[mask], inside[mask])
+            self._accumulate(ledger["overall"], error, inside)
+            self._accumulate(ledger["snapshots"].setdefault(entry["key"], _empty_stats()), error, inside)
+            pairs += len(matched)
+
+        ledger["realized_through"] = last_new.isoformat()
+        ledger["updated_at"] = datetime.now().isoformat()
+        # Snapshots that were compacted away no longer need per-issue stats
+        known = {entry["key"] for entry in forecasts.index()}
+        ledger["snapshots"] = {k: v for k, v in ledger["snapshots"].items() if k in known}
+        self._write_ledger(ledger)
+        logging.info(f"Accuracy ledger: scored {pairs} forecast/actual pairs for {len(actual)} new steps")
+        return {"new_steps": int(len(actual)), "pairs": pairs}
+
+    @staticmethod
+    def _accumulate(stats: dict, error: np.ndarray, inside: np.ndarray) -> None:
+        stats["n"] += int(len(error))
+        stats["sum_abs"] += float(np.abs(error).sum())
+        stats["sum_sq"] += float((error ** 2).sum())
+        stats["sum_error"] += float(error.sum())
+        stats["inside"] += int(inside.sum())
+
+    def metrics(self) -> dict:
+        """
+        Current accuracy metrics.
+
+        Returns:
+            dict: overall and per-horizon-bucket MAE/RMSE/bias (EUR/MWh) and interval coverage
+        """
+        ledger = self.read_ledger()
+        order = [label for label, _ in HORIZON_BUCKETS]
+        return {
+            "region": self.region,
+            "resolution": self.resolution,
+            "realized_through": ledger["realized_through"],
+            "updated_at": ledger.get("updated_at"),
+            "overall": _metrics(ledger["overall"]),
+            "by_horizon": {label: _metrics(ledger["buckets"][label]) for label in order if label in ledger["buckets"]},
+            "snapshots_scored": len(ledger["snapshots"]),
+        }
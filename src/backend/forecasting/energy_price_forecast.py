@@ -4,6 +4,9 @@
 """
 Energy Price Forecasting using Prophet
 Predicts day-ahead electricity prices for Germany using SMARD data
+
+Run from the project root as a module so the sibling modules resolve:
+    python -m src.backend.forecasting.energy_price_forecast
 """
 
 import argparse
@@ -12,6 +15,7 @@ import logging
 import os
 import subprocess
 import sys
+import threading
 from datetime import datetime, timedelta
 
 def check_and_install_requirements():
@@ -51,6 +55,8 @@ from zoneinfo import ZoneInfo
 import matplotlib.pyplot as plt
 from prophet import Prophet
 
+from .resolution import RESOLUTION_FREQ
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -61,27 +67,70 @@ logging.basicConfig(
 SMARD_BASE = "https://www.smard.de/app/chart_data"
 FILTER_ID = "4169"  # Day-Ahead Wholesale Price (€/MWh)
 REGION = "DE"      # Germany
-RESOLUTION = "hour" # Hourly resolution
+RESOLUTION = "hour" # Hourly resolution ("quarterhour" for 15-minute data)
+
+# Bidding zones with a SMARD day-ahead price series (region code -> price filter ID)
+PRICE_REGIONS = {
+    "DE": FILTER_ID,     # Germany/Luxembourg (historic default region code)
+    "DE-LU": FILTER_ID,  # Germany/Luxembourg bidding zone
+    "AT": "4170",        # Austria
+}
+
+# Serializes pyplot use of concurrently refreshed regions
+_PLOT_LOCK = threading.Lock()
+
+# SMARD series ingested into the price store (store column -> filter ID)
+SMARD_SERIES = {
+    "price_eur_per_mwh": FILTER_ID,  # Day-Ahead Wholesale Price (€/MWh)
+    "residual_load_mwh": "4359",     # Residual load
+    "consumption_mwh": "410",        # Total grid load
+    "wind_onshore_mwh": "4067",      # Wind onshore generation
+    "wind_offshore_mwh": "1225",     # Wind offshore generation
+    "solar_mwh": "4068",             # Photovoltaic generation
+}
+
+def region_series(region: str) -> dict:
+    """
+    SMARD series ingested for a region (store column -> filter ID)
+    Args:
+        region: Key of PRICE_REGIONS
+    Returns:
+        dict: All SMARD_SERIES for the German market, only the price series elsewhere
+    """
+    if region not in PRICE_REGIONS:
+        raise ValueError(f"Unknown region '{region}', available: {sorted(PRICE_REGIONS)}")
+    if PRICE_REGIONS[region] == FILTER_ID:
+        return dict(SMARD_SERIES)
+    return {"price_eur_per_mwh": PRICE_REGIONS[region]}
 
 class SMARDAPIError(Exception):
     """Custom exception for SMARD API errors"""
     pass
 
-def fetch_available_timestamps():
+def fetch_available_timestamps(cache=None, filter_id: str = FILTER_ID, resolution: str = RESOLUTION,
+                               region: str = REGION):
     """
     Fetch available timestamps from SMARD API
+    Args:
+        cache: Optional SMARDChunkCache (the index is revalidated after its TTL)
+        filter_id: SMARD filter ID of the series
+        resolution: SMARD resolution ("hour" or "quarterhour")
+        region: SMARD region code
     Returns:
         list: Sorted list of timestamps in milliseconds
     Raises:
         SMARDAPIError: If API request fails or no data received
     """
     try:
-        url = f"{SMARD_BASE}/{FILTER_ID}/{REGION}/index_{RESOLUTION}.json"
+        url = f"{SMARD_BASE}/{filter_id}/{region}/index_{resolution}.json"
         logging.info(f"Fetching timestamps from {url}")
         
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+        if cache is not None:
+            data = cache.get_json(url, (filter_id, region, resolution, "index"), timeout=30)
+        else:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            data = response.json()
         
         timestamps = sorted(data.get("timestamps", []))
         if not timestamps:
@@ -95,30 +144,43 @@ def fetch_available_timestamps():
     except json.JSONDecodeError as e:
         raise SMARDAPIError(f"Failed to parse API response: {str(e)}")
 
-def fetch_timeseries_for_timestamp(ts_ms: int) -> pd.DataFrame:
+def fetch_timeseries_for_timestamp(ts_ms: int, cache=None, closed: bool = False,
+                                   filter_id: str = FILTER_ID,
+                                   column: str = "price_eur_per_mwh",
+                                   resolution: str = RESOLUTION,
+                                   region: str = REGION) -> pd.DataFrame:
     """
     Fetch timeseries data for a specific timestamp
     Args:
         ts_ms: Timestamp in milliseconds
+        cache: Optional SMARDChunkCache
+        closed: Whether the chunk is closed (not the newest one) and thus immutable
+        filter_id: SMARD filter ID of the series
+        column: Name of the value column in the returned frame
+        resolution: SMARD resolution ("hour" or "quarterhour")
+        region: SMARD region code
     Returns:
-        pd.DataFrame: DataFrame with columns [utc_ms, price_eur_per_mwh]
+        pd.DataFrame: DataFrame with columns [utc_ms, <column>]
     Raises:
         SMARDAPIError: If API request fails or data is invalid
     """
     try:
-        path = f"{FILTER_ID}_{REGION}_{RESOLUTION}_{ts_ms}.json"
-        url = f"{SMARD_BASE}/{FILTER_ID}/{REGION}/{path}"
+        path = f"{filter_id}_{region}_{resolution}_{ts_ms}.json"
+        url = f"{SMARD_BASE}/{filter_id}/{region}/{path}"
         logging.debug(f"Fetching data from {url}")
         
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        payload = response.json()
+        if cache is not None:
+            payload = cache.get_json(url, (filter_id, region, resolution, ts_ms), immutable=closed)
+        else:
+            response = requests.get(url, timeout=60)
+            response.raise_for_status()
+            payload = response.json()
         
         series = payload.get("series", [])
         if not series:
             raise SMARDAPIError(f"No data received for timestamp {ts_ms}")
         
-        df = pd.DataFrame(series, columns=["utc_ms", "price_eur_per_mwh"])
+        df = pd.DataFrame(series, columns=["utc_ms", column])
         return df
         
     except requests.exceptions.RequestException as e:
@@ -126,17 +188,21 @@ def fetch_timeseries_for_timestamp(ts_ms: int) -> pd.DataFrame:
     except (json.JSONDecodeError, KeyError) as e:
         raise SMARDAPIError(f"Failed to parse data: {str(e)}")
 
-def load_smard_dayahead(limit_chunks: int | None = None) -> pd.DataFrame:
+def load_smard_dayahead(limit_chunks: int | None = None, cache=None, region: str = REGION) -> pd.DataFrame:
     """
-    Load all available (or last N chunks) hourly day-ahead prices for Germany
+    Load all available (or last N chunks) hourly day-ahead prices of a bidding zone
     Args:
         limit_chunks: Optional limit on number of chunks to load
+        cache: Optional SMARDChunkCache for closed/open chunks
+        region: Key of PRICE_REGIONS (default: Germany)
     Returns:
         pd.DataFrame: Clean DataFrame with datetime index and prices
     """
     try:
         # Fetch available timestamps
-        timestamps = fetch_available_timestamps()
+        filter_id = PRICE_REGIONS[region]
+        timestamps = fetch_available_timestamps(cache=cache, filter_id=filter_id, region=region)
+        latest_ts = timestamps[-1]
         if limit_chunks:
             timestamps = timestamps[-limit_chunks:]
             logging.info(f"Using last {limit_chunks} chunks")
@@ -145,7 +211,8 @@ def load_smard_dayahead(limit_chunks: int | None = None) -> pd.DataFrame:
         frames = []
         for i, ts in enumerate(timestamps, 1):
             try:
-                df = fetch_timeseries_for_timestamp(ts)
+                df = fetch_timeseries_for_timestamp(ts, cache=cache, closed=ts != latest_ts,
+                                                    filter_id=filter_id, region=region)
                 frames.append(df)
                 logging.info(f"Loaded chunk {i}/{len(timestamps)} ({ts})")
             except SMARDAPIError as e:
@@ -235,7 +302,7 @@ def apply_retail_pricing(forecast: pd.DataFrame,
         - Costs/premium/margin always >= 0
         - Total: 70 EUR/MWh ≈ 7 ct/kWh markup (typical for dynamic tariffs)
     """
-    from scipy import stats
+    from .retail_scenarios import expected_censored
     
     retail = forecast.copy()
     
@@ -246,15 +313,9 @@ def apply_retail_pricing(forecast: pd.DataFrame,
         sigma = (retail['yhat_upper'].values - retail['yhat_lower'].values) / (2 * 1.96)
         sigma = np.maximum(sigma, 1e-6)  # Avoid division by zero
         
-        # Standardized value
-        z = mu / sigma
-        
-        # E[max(0, Y)] = μ * Φ(z) + σ * φ(z)
+        # E[max(0, Y)] = μ * Φ(z) + σ * φ(z) with z = μ/σ
         # Where Φ is CDF and φ is PDF of standard normal
-        phi_z = stats.norm.cdf(z)  # CDF
-        pdf_z = stats.norm.pdf(z)  # PDF
-        
-        expected_positive = mu * phi_z + sigma * pdf_z
+        expected_positive = expected_censored(mu.astype(float), sigma.astype(float), 0.0)
         retail['yhat_energy'] = np.maximum(expected_positive, floor_eur_per_mwh)
         
         # For confidence intervals, use simpler clipping approach
@@ -288,7 +349,8 @@ def train_prophet(df_hourly: pd.DataFrame,
                  changepoint_prior_scale: float = 0.05,  # Reduced for more stable long-term trends
                  changepoint_range: float = 0.95,  # Allow changepoints throughout most of the training data
                  season_weekly: bool = True,
-                 season_daily: bool = True) -> Prophet:
+                 season_daily: bool = True,
+                 init: dict | None = None) -> Prophet:
     """
     Train a Prophet model on hourly price data optimized for long-term forecasting
     Args:
@@ -298,6 +360,7 @@ def train_prophet(df_hourly: pd.DataFrame,
         changepoint_range: Proportion of history in which trend changepoints will be estimated
         season_weekly: Whether to model weekly seasonality
         season_daily: Whether to model daily seasonality
+        init: Optional initial parameter values (warm start from a previous fit)
     Returns:
         Prophet: Trained Prophet model
     """
@@ -327,8 +390,11 @@ def train_prophet(df_hourly: pd.DataFrame,
         train["y"] = train["y"].astype(float)
         
         # Fit the model
-        logging.info("Training Prophet model...")
-        model.fit(train)
+        logging.info("Training Prophet model..." if init is None else "Training Prophet model (warm start)...")
+        fit_kwargs = {"save_iterations": True}  # Lets callers read the iteration count
+        if init is not None:
+            fit_kwargs["init"] = init
+        model.fit(train, **fit_kwargs)
         logging.info("Model training completed")
         
         return model
@@ -340,7 +406,8 @@ def train_prophet(df_hourly: pd.DataFrame,
 def make_future_and_predict(model: Prophet, 
                           horizon_hours: int, 
                           tz: str = "Europe/Berlin",
-                          return_components: bool = False) -> pd.DataFrame:
+                          return_components: bool = False,
+                          freq: str = "h") -> pd.DataFrame:
     """
     Generate and make predictions for future dates
     Args:
@@ -348,16 +415,18 @@ def make_future_and_predict(model: Prophet,
         horizon_hours: Number of hours to forecast
         tz: Timezone for the predictions
         return_components: Whether to return trend and seasonality components
+        freq: Forecast frequency, matching the training data ("h" or "15min")
     Returns:
         pd.DataFrame: Forecast results
     """
     try:
         logging.info(f"Generating {horizon_hours}h forecast...")
         
-        # Create future dates
+        # Create future dates at the native resolution of the training data
+        periods = int(pd.Timedelta(hours=horizon_hours) / pd.Timedelta(pd.tseries.frequencies.to_offset(freq)))
         future = model.make_future_dataframe(
-            periods=horizon_hours,
-            freq="H",
+            periods=periods,
+            freq=freq,
             include_history=True
         )
         
@@ -379,7 +448,8 @@ def make_future_and_predict(model: Prophet,
         logging.error(f"Error generating forecast: {str(e)}")
         raise
 
-def plot_forecast_analysis(model: Prophet, forecast: pd.DataFrame, actual_data: pd.DataFrame):
+def plot_forecast_analysis(model: Prophet, forecast: pd.DataFrame, actual_data: pd.DataFrame,
+                           save_name: str = 'forecast_analysis.png'):
     """Create detailed forecast analysis plots with long-term trend analysis"""
     try:
         logging.info("Creating forecast analysis plots...")
@@ -437,7 +507,7 @@ def plot_forecast_analysis(model: Prophet, forecast: pd.DataFrame, actual_data:
         ax3.set_ylabel('Frequency')
         
         plt.tight_layout()
-        save_path = os.path.join(figures_dir, 'forecast_analysis.png')
+        save_path = os.path.join(figures_dir, save_name)
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
         plt.close()
         
@@ -455,85 +525,159 @@ def calculate_required_chunks(target_days):
     days_per_chunk = 7
     return int(target_days / days_per_chunk) + 1  # Add 1 for safety
 
-def main():
-    try:
-        # Parse command line arguments
-        parser = argparse.ArgumentParser(
-            description="SMARD Day-Ahead Price Forecasting using Prophet"
-        )
-        parser.add_argument(
-            "--horizon-hours",
-            type=int,
-            default=720,  # 30 days
-            help="Forecast horizon in hours (default: 720=30 days)"
-        )
-        parser.add_argument(
-            "--training-days",
-            type=int,
-            default=730,  # 2 years
-            help="Number of days of training data to use (default: 730=2 years)"
-        )
-        parser.add_argument(
-            "--save-eur-kwh",
-            action="store_true",
-            help="Also save prices in EUR/kWh"
-        )
-        args = parser.parse_args()
+def prune_raw_exports(output_dir: str, keep: int = 1, prefix: str = "germany") -> list:
+    """
+    Delete all but the newest `keep` <prefix>_dayahead_prices_raw_*.csv exports
+    and their volatility sidecars
+    Returns:
+        list: Paths of the removed files
+    """
+    import glob
+    from .volatility_sidecar import sidecar_path
 
-        # Use app_data directory for output
-        output_dir = 'app_data'
-        os.makedirs(output_dir, exist_ok=True)
+    exports = sorted(glob.glob(os.path.join(output_dir, f'{prefix}_dayahead_prices_raw_*.csv')))
+    removed = exports[:-keep] if keep > 0 else exports
+    for path in removed:
+        os.remove(path)
+        if os.path.exists(sidecar_path(path)):
+            os.remove(sidecar_path(path))
+        logging.info(f"Removed outdated raw export {path}")
+    return removed
+
+def log_forecast_summary(df: pd.DataFrame, forecast: pd.DataFrame, forecast_retail: pd.DataFrame) -> None:
+    """
+    Log wholesale and retail statistics of the future part of a forecast
+    Args:
+        df: Training data (its last timestamp separates history from forecast)
+        forecast: Wholesale forecast from make_future_and_predict
+        forecast_retail: Forecast after apply_retail_pricing
+    """
+    # Print forecast statistics for BOTH wholesale and retail
+    future_forecast = forecast[forecast['ds'] > df['ds'].max()]
+    future_retail = forecast_retail[forecast_retail['ds'] > df['ds'].max()]
+    
+    logging.info("\n" + "="*70)
+    logging.info("WHOLESALE FORECAST (Day-Ahead Market - uncensored):")
+    logging.info("="*70)
+    logging.info(f"Average Price: {future_forecast['yhat'].mean():7.2f} EUR/MWh ({future_forecast['yhat'].mean()/10:5.2f} ct/kWh)")
+    logging.info(f"Max Price:     {future_forecast['yhat'].max():7.2f} EUR/MWh")
+    logging.info(f"Min Price:     {future_forecast['yhat'].min():7.2f} EUR/MWh")
+    negative_wholesale = (future_forecast['yhat'] < 0).sum()
+    logging.info(f"Negative:      {negative_wholesale:3d} hours ({negative_wholesale/len(future_forecast)*100:.1f}%)")
+    
+    logging.info("\n" + "="*70)
+    logging.info("RETAIL FORECAST (End Customer - with business logic):")
+    logging.info("="*70)
+    logging.info(f"Average Energy: {future_retail['yhat_energy'].mean():7.2f} EUR/MWh ({future_retail['yhat_energy'].mean()/10:5.2f} ct/kWh)")
+    logging.info(f"Average Retail: {future_retail['yhat_retail'].mean():7.2f} EUR/MWh ({future_retail['yhat_retail'].mean()/10:5.2f} ct/kWh)")
+    logging.info(f"Max Price:      {future_retail['yhat_retail'].max():7.2f} EUR/MWh ({future_retail['yhat_retail'].max()/10:5.2f} ct/kWh)")
+    logging.info(f"Min Price:      {future_retail['yhat_retail'].min():7.2f} EUR/MWh ({future_retail['yhat_retail'].min()/10:5.2f} ct/kWh)")
+    
+    zero_price = (future_retail['yhat_energy'] == 0).sum()
+    if zero_price > 0:
+        logging.info(f"\nFree energy hours (negative wholesale → 0): {zero_price} hours ({zero_price/len(future_retail)*100:.1f}%)")
+        logging.info(f"Customer price in those hours: {70:.2f} EUR/MWh (7.0 ct/kWh) - markup only")
+    
+    logging.info("\n" + "="*70)
+    logging.info("Note: This uses probabilistic E[max(0,Y)] calculation")
+    logging.info("      instead of naive max(0, E[Y]) for unbiased estimates.")
+
+
+def refresh_region(region: str, args, params: dict, cache, output_dir: str = 'app_data',
+                   track_memory: bool = True) -> dict:
+    """
+    Sync, forecast and publish the prices of one bidding zone
+    Args:
+        region: Key of PRICE_REGIONS
+        args: Parsed command line arguments of main()
+        params: train_prophet keyword arguments
+        cache: SMARDChunkCache shared by all regions
+        output_dir: The app_data directory
+        track_memory: Record peak memory per pipeline stage
+    Returns:
+        dict: Values produced by the region's pipeline run
+    """
+    from .forecast_store import legacy_file_prefix
+    from .model_leaderboard import DEFAULT_ENGINE, leaderboard_path, load_champion
+
+    prefix = legacy_file_prefix(region)
+    # Calculate required chunks for 2 years of data (only used to seed an empty store)
+    required_chunks = calculate_required_chunks(args.training_days)
+
+    from .pipeline import Pipeline, Stage
+    from .price_store import PriceStore, sync_price_store
+    store = PriceStore(os.path.join(output_dir, 'price_store'), region=region, resolution=args.resolution)
+
+    def sync(series, training_days):
+        # Sync the local price store: only the newest chunks are downloaded
+        if store.last_synced_utc_ms is None:
+            logging.info(f"Empty price store, requesting {required_chunks} chunks to cover {training_days} days of training data")
+        logging.info(f"Syncing SMARD Day-Ahead prices ({region}, {args.resolution})...")
+        sync_price_store(store, limit_chunks=required_chunks, cache=cache, series=series)
+        cache.log_stats()
+        df = store.load_prices(days=training_days)
 
-        # Calculate required chunks for 2 years of data
-        required_chunks = calculate_required_chunks(args.training_days)
-        logging.info(f"Requesting {required_chunks} chunks to cover {args.training_days} days of training data")
-        
-        # Load data
-        logging.info("Loading SMARD Day-Ahead prices (Germany, hourly)...")
-        df = load_smard_dayahead(limit_chunks=required_chunks)
-        
         # Calculate and log the training data range
         date_range = df['ds'].max() - df['ds'].min()
         logging.info(f"\nTraining Data Range:")
         logging.info(f"Start date: {df['ds'].min().strftime('%Y-%m-%d %H:%M')}")
         logging.info(f"End date: {df['ds'].max().strftime('%Y-%m-%d %H:%M')}")
         logging.info(f"Total period: {date_range.days} days and {date_range.seconds//3600} hours")
-        logging.info(f"Total data points: {len(df)} hourly prices")
-        
+        logging.info(f"Total data points: {len(df)} {args.resolution} prices")
+
         # Verify we have enough data
-        if date_range.days < args.training_days * 0.9:  # Allow for 10% missing data
+        if date_range.days < training_days * 0.9:  # Allow for 10% missing data
             logging.warning(f"Warning: Only got {date_range.days} days of data, "
-                          f"less than the requested {args.training_days} days")
-        
-        # Save raw data with descriptive filename
+                          f"less than the requested {training_days} days")
+        return {'df': df}
+
+    def export_raw(df, training_days, save_eur_kwh):
+        # Export raw data for readers of the CSV files, replacing older exports
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        raw_data_path = os.path.join(output_dir, f'germany_dayahead_prices_raw_{timestamp}.csv')
-        df.to_csv(raw_data_path, index=False)
-        logging.info(f"\nRaw data saved to {raw_data_path}")
+        raw_data_path = os.path.join(output_dir, f'{prefix}_dayahead_prices_raw_{timestamp}.csv')
+        store.export_csv(raw_data_path, days=training_days)
+        # Price volatility for the risk endpoints, so they never parse the export
+        from .volatility_sidecar import historic_volatility, write_sidecar
+        write_sidecar(raw_data_path, historic_volatility(df))
+        logging.info(f"\nRaw data exported to {raw_data_path}")
+        prune_raw_exports(output_dir, keep=args.keep_raw_exports, prefix=prefix)
 
         # Calculate EUR/kWh if requested
-        if args.save_eur_kwh:
+        if save_eur_kwh:
             kwh_df = to_eur_per_kwh(df)
-            kwh_path = os.path.join(output_dir, f'germany_dayahead_prices_kwh_{timestamp}.csv')
+            kwh_path = os.path.join(output_dir, f'{prefix}_dayahead_prices_kwh_{timestamp}.csv')
             kwh_df.to_csv(kwh_path, index=False)
             logging.info(f"EUR/kWh prices saved to {kwh_path}")
+        return {}
 
-        # Train Prophet model
-        logging.info("Training Prophet model...")
-        model = train_prophet(
-            df_hourly=df,
-            seasonality_mode='multiplicative',
-            changepoint_prior_scale=0.2
+    def train(df, params, engine, cold_start):
+        if engine == 'sarimax':
+            # Daily runs only filter the new hours through the stored SARIMAX state
+            from .sarimax_engine import SarimaxStore, fit_sarimax_model
+            model, _ = fit_sarimax_model(
+                df,
+                SarimaxStore(os.path.join(output_dir, 'models', region, args.resolution, 'sarimax')),
+                force_cold=cold_start
+            )
+            return {'model': model}
+        if engine != 'prophet':
+            from .model_leaderboard import fit_engine
+            return {'model': fit_engine(engine, df)}
+        # Train Prophet model, warm-started from the stored model when the window only moved by a day
+        from .model_store import ModelStore, fit_price_model
+        model, _ = fit_price_model(
+            df,
+            ModelStore(os.path.join(output_dir, 'models', region, args.resolution)),
+            params=params,
+            force_cold=cold_start
         )
+        return {'model': model}
 
-        # Generate forecast
-        logging.info(f"Generating {args.horizon_hours}h forecast...")
-        forecast = make_future_and_predict(
-            model,
-            args.horizon_hours,
-            return_components=True
-        )
+    def predict(model, horizon_hours, freq):
+        logging.info(f"Generating {horizon_hours}h forecast...")
+        return {'forecast': make_future_and_predict(model, horizon_hours, return_components=True, freq=freq)}
 
+    def retail(forecast):
         # Apply retail pricing (converts wholesale to realistic end-customer prices)
         logging.info("Applying retail pricing logic (probabilistic zero-censoring + markup)...")
         forecast_retail = apply_retail_pricing(
@@ -544,47 +688,217 @@ def main():
             floor_eur_per_mwh=0.0, # No negative prices to customers
             use_probabilistic=True # Use E[max(0,Y)] instead of max(0,E[Y])
         )
+        return {'forecast_retail': forecast_retail}
+
+    def scenarios(model, horizon_hours, freq, scenario_samples):
+        # Sample paths are drawn once here so risk queries become array slices
+        if scenario_samples <= 0:
+            return {'paths': None}
+        from .scenario_paths import draw_sample_paths, paths_meta
+        paths, ds = draw_sample_paths(model, horizon_hours, freq=freq, n_paths=scenario_samples)
+        return {'paths': (paths, paths_meta(ds, paths, freq))}
 
-        # Save wholesale forecast results with descriptive filename
-        forecast_path = os.path.join(output_dir, f'germany_price_forecast_{args.horizon_hours}h.csv')
-        forecast_retail.to_csv(forecast_path, index=False)
+    def score_accuracy(df):
+        # Score the newly realized prices against every stored forecast that covered them
+        from .accuracy_tracker import AccuracyTracker
+        from .forecast_store import ForecastStore
+        forecasts = ForecastStore(os.path.join(output_dir, 'forecasts'), region=region, resolution=args.resolution)
+        tracker = AccuracyTracker(os.path.join(output_dir, 'accuracy'), region=region, resolution=args.resolution)
+        tracker.update(df, forecasts)
+
+    def save(df, forecast_retail, horizon_hours):
+        # Publish an issue-time snapshot, then refresh the fixed-name file for existing readers
+        from .forecast_store import ForecastStore, atomic_write_csv
+        from .volatility_sidecar import forecast_volatility, write_sidecar
+        forecasts = ForecastStore(os.path.join(output_dir, 'forecasts'), region=region, resolution=args.resolution)
+        snapshot = forecasts.publish(forecast_retail, horizon_hours=horizon_hours,
+                                     meta={'history_end': df['ds'].max().isoformat()})
+        forecasts.compact(keep_all_days=args.keep_forecasts_days)
+        forecast_path = atomic_write_csv(
+            forecast_retail, os.path.join(output_dir, f'{prefix}_price_forecast_{horizon_hours}h.csv'))
+        write_sidecar(forecast_path, forecast_volatility(forecast_retail))
         logging.info(f"Forecast saved to {forecast_path}")
+        return {'forecast_path': forecast_path, 'snapshot': snapshot}
+
+    def save_scenarios(snapshot, paths):
+        if paths is not None:
+            from .forecast_store import ForecastStore
+            forecasts = ForecastStore(os.path.join(output_dir, 'forecasts'), region=region, resolution=args.resolution)
+            forecasts.publish_paths(snapshot, *paths)
+
+    def plot(model, forecast, df):
+        # Off the critical path: runs in a background thread once the forecast is saved
+        save_name = 'forecast_analysis.png' if region == REGION else f'forecast_analysis_{prefix}.png'
+        with _PLOT_LOCK:  # pyplot is not thread-safe across concurrent regions
+            plot_forecast_analysis(model, forecast, df, save_name=save_name)
+
+    def summarize(df, forecast, forecast_retail):
+        log_forecast_summary(df, forecast, forecast_retail)
+
+    engine = args.engine
+    if engine == 'auto':
+        engine = load_champion(leaderboard_path(os.path.join(output_dir, 'leaderboard'), region, args.resolution))
+        if engine is None:
+            engine = DEFAULT_ENGINE
+            logging.info(f"No leaderboard champion yet, using {engine}")
+        else:
+            logging.info(f"Using leaderboard champion engine '{engine}'")
+    available = region_series(region)
+    series = {name: available[name] for name in args.series if name in available}
+    series.setdefault("price_eur_per_mwh", PRICE_REGIONS[region])
+
+    pipeline = Pipeline(f"price_forecast_{region}_{args.resolution}", [
+        Stage('sync', sync, inputs=('series', 'training_days'), outputs=('df',), always_run=True),
+        Stage('export_raw', export_raw, inputs=('df', 'training_days', 'save_eur_kwh')),
+        Stage('accuracy', score_accuracy, inputs=('df',), optional=True),
+        # cold_start is an input so that --cold-start retrains on an unchanged window
+        Stage('train', train, inputs=('df', 'params', 'engine', 'cold_start'), outputs=('model',)),
+        Stage('predict', predict, inputs=('model', 'horizon_hours', 'freq'), outputs=('forecast',)),
+        Stage('retail', retail, inputs=('forecast',), outputs=('forecast_retail',)),
+        Stage('scenarios', scenarios, inputs=('model', 'horizon_hours', 'freq', 'scenario_samples'),
+              outputs=('paths',), optional=True),
+        Stage('save', save, inputs=('df', 'forecast_retail', 'horizon_hours'), outputs=('forecast_path', 'snapshot')),
+        Stage('save_scenarios', save_scenarios, inputs=('snapshot', 'paths'), optional=True),
+        Stage('plot', plot, inputs=('model', 'forecast', 'df'), optional=True, asynchronous=True),
+        Stage('summary', summarize, inputs=('df', 'forecast', 'forecast_retail'), optional=True),
+    ], root=os.path.join(output_dir, 'pipeline'), track_memory=track_memory)
+    return pipeline.run(
+        force=args.force,
+        series=series,
+        training_days=args.training_days,
+        save_eur_kwh=args.save_eur_kwh,
+        params=params,
+        horizon_hours=args.horizon_hours,
+        freq=RESOLUTION_FREQ[args.resolution],
+        scenario_samples=args.scenario_samples,
+        engine=engine,
+        cold_start=args.cold_start,
+    )
+
+
+def main():
+    try:
+        # Parse command line arguments
+        parser = argparse.ArgumentParser(
+            description="SMARD Day-Ahead Price Forecasting using Prophet"
+        )
+        parser.add_argument(
+            "--horizon-hours",
+            type=int,
+            default=720,  # 30 days
+            help="Forecast horizon in hours (default: 720=30 days)"
+        )
+        parser.add_argument(
+            "--training-days",
+            type=int,
+            default=730,  # 2 years
+            help="Number of days of training data to use (default: 730=2 years)"
+        )
+        parser.add_argument(
+            "--save-eur-kwh",
+            action="store_true",
+            help="Also save prices in EUR/kWh"
+        )
+        parser.add_argument(
+            "--keep-raw-exports",
+            type=int,
+            default=1,
+            help="Number of <region>_dayahead_prices_raw_*.csv exports to keep per region (default: 1)"
+        )
+        parser.add_argument(
+            "--cache-ttl",
+            type=int,
+            default=3600,
+            help="Seconds before open SMARD chunks are revalidated (default: 3600)"
+        )
+        parser.add_argument(
+            "--series",
+            nargs="+",
+            choices=sorted(SMARD_SERIES),
+            default=sorted(SMARD_SERIES),
+            help="SMARD series to ingest into the price store (default: all)"
+        )
+        parser.add_argument(
+            "--resolution",
+            choices=sorted(RESOLUTION_FREQ),
+            default=RESOLUTION,
+            help="SMARD resolution to ingest and forecast at (default: hour)"
+        )
+        parser.add_argument(
+            "--cold-start",
+            action="store_true",
+            help="Fit the price model from scratch instead of reusing/warm-starting the stored one"
+        )
+        parser.add_argument(
+            "--model-config",
+            default=os.path.join("app_data", "tuning", "price_model_pareto.json"),
+            help="Tuning result to read the model configuration from (see tune_price_model)"
+        )
+        parser.add_argument(
+            "--keep-forecasts-days",
+            type=int,
+            default=7,
+            help="Keep every published forecast for this many days, then one per day (default: 7)"
+        )
+        parser.add_argument(
+            "--scenario-samples",
+            type=int,
+            default=500,
+            help="Predictive sample paths stored with each forecast snapshot, 0 to disable (default: 500)"
+        )
+        from .model_leaderboard import DEFAULT_ENGINE, ENGINES
+        parser.add_argument(
+            "--engine",
+            choices=["auto"] + sorted(ENGINES),
+            default=DEFAULT_ENGINE,
+            help=f"Price model, or 'auto' for the leaderboard champion (default: {DEFAULT_ENGINE})"
+        )
+        parser.add_argument(
+            "--region",
+            nargs="+",
+            choices=sorted(PRICE_REGIONS),
+            default=[REGION],
+            help="Bidding zones to refresh, concurrently if more than one (default: DE)"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-run every pipeline stage even if its inputs are unchanged"
+        )
+        args = parser.parse_args()
+
+        # Use app_data directory for output
+        output_dir = 'app_data'
+        os.makedirs(output_dir, exist_ok=True)
+
+        from .smard_cache import SMARDChunkCache
+        from .tune_price_model import load_tuned_params
+        cache = SMARDChunkCache(os.path.join(output_dir, 'smard_cache'), ttl_seconds=args.cache_ttl)
+        params = load_tuned_params(args.model_config, resolution=args.resolution)
+        if params is None:
+            params = {'seasonality_mode': 'multiplicative', 'changepoint_prior_scale': 0.2}
+        else:
+            logging.info(f"Using tuned model configuration {params}")
+
+        regions = list(dict.fromkeys(args.region))
+        if len(regions) == 1:
+            refresh_region(regions[0], args, params, cache, output_dir)
+        else:
+            # Regions share nothing but the HTTP cache, so they refresh concurrently
+            from concurrent.futures import ThreadPoolExecutor
+            failed = []
+            with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+                futures = {region: pool.submit(refresh_region, region, args, params, cache, output_dir,
+                                               track_memory=False) for region in regions}
+                for region, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.error(f"Forecast refresh failed for region {region}: {e}", exc_info=True)
+                        failed.append(region)
+            if failed:
+                raise RuntimeError(f"Forecast refresh failed for regions {failed}")
 
-        # Create visualization
-        logging.info("Generating forecast analysis plots...")
-        plot_forecast_analysis(model, forecast, df)
-        logging.info("Analysis plots saved to forecast_analysis.png")
-
-        # Print forecast statistics for BOTH wholesale and retail
-        future_forecast = forecast[forecast['ds'] > df['ds'].max()]
-        future_retail = forecast_retail[forecast_retail['ds'] > df['ds'].max()]
-        
-        logging.info("\n" + "="*70)
-        logging.info("WHOLESALE FORECAST (Day-Ahead Market - uncensored):")
-        logging.info("="*70)
-        logging.info(f"Average Price: {future_forecast['yhat'].mean():7.2f} EUR/MWh ({future_forecast['yhat'].mean()/10:5.2f} ct/kWh)")
-        logging.info(f"Max Price:     {future_forecast['yhat'].max():7.2f} EUR/MWh")
-        logging.info(f"Min Price:     {future_forecast['yhat'].min():7.2f} EUR/MWh")
-        negative_wholesale = (future_forecast['yhat'] < 0).sum()
-        logging.info(f"Negative:      {negative_wholesale:3d} hours ({negative_wholesale/len(future_forecast)*100:.1f}%)")
-        
-        logging.info("\n" + "="*70)
-        logging.info("RETAIL FORECAST (End Customer - with business logic):")
-        logging.info("="*70)
-        logging.info(f"Average Energy: {future_retail['yhat_energy'].mean():7.2f} EUR/MWh ({future_retail['yhat_energy'].mean()/10:5.2f} ct/kWh)")
-        logging.info(f"Average Retail: {future_retail['yhat_retail'].mean():7.2f} EUR/MWh ({future_retail['yhat_retail'].mean()/10:5.2f} ct/kWh)")
-        logging.info(f"Max Price:      {future_retail['yhat_retail'].max():7.2f} EUR/MWh ({future_retail['yhat_retail'].max()/10:5.2f} ct/kWh)")
-        logging.info(f"Min Price:      {future_retail['yhat_retail'].min():7.2f} EUR/MWh ({future_retail['yhat_retail'].min()/10:5.2f} ct/kWh)")
-        
-        zero_price = (future_retail['yhat_energy'] == 0).sum()
-        if zero_price > 0:
-            logging.info(f"\nFree energy hours (negative wholesale → 0): {zero_price} hours ({zero_price/len(future_retail)*100:.1f}%)")
-            logging.info(f"Customer price in those hours: {70:.2f} EUR/MWh (7.0 ct/kWh) - markup only")
-        
-        logging.info("\n" + "="*70)
-        logging.info("Note: This uses probabilistic E[max(0,Y)] calculation")
-        logging.info("      instead of naive max(0, E[Y]) for unbiased estimates.")
-        
         logging.info("Forecasting completed successfully!")
 
     except Exception as e:
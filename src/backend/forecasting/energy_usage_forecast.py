@@ -14,16 +14,17 @@ def calculate_total_weekly_usage(forecast_df):
     weekly_usage = forecast_df.set_index("datetime").resample("W").sum()
     return weekly_usage
 
-def forecast_prophet(df, days=30):
+def forecast_prophet(df, days=30, freq="h"):
     # Explicitly create a copy to avoid SettingWithCopyWarning
     df = df.copy()
     df["datetime"] = pd.to_datetime(df["datetime"], format='%m/%d/%y %H:%M')
 
-    # Resample to hourly frequency for consistent modeling (sum for energy consumption)
+    # Resample to the modeling frequency (hourly by default, "15min" for quarter-hour
+    # tariffs) for consistent modeling (sum for energy consumption)
     # Only drop status column if it exists
     if 'status' in df.columns:
         df.drop(columns=['status'], inplace=True)
-    df = df.set_index("datetime").resample("h").sum().reset_index()
+    df = df.set_index("datetime").resample(freq).sum().reset_index()
 
     prophet_df = df.copy()
     prophet_df.rename(columns={'datetime': 'ds', 'value': 'y'}, inplace=True)
@@ -41,7 +42,8 @@ def forecast_prophet(df, days=30):
 
     prophet_model.fit(prophet_df)
 
-    future = prophet_model.make_future_dataframe(periods=24*days, freq='h')
+    steps_per_day = int(pd.Timedelta(days=1) / pd.Timedelta(pd.tseries.frequencies.to_offset(freq)))
+    future = prophet_model.make_future_dataframe(periods=steps_per_day*days, freq=freq)
 
     forecast = prophet_model.predict(future)
     
@@ -52,7 +54,7 @@ def forecast_prophet(df, days=30):
     # Filter to only future dates (after the last training date)
     future_forecast = forecast[forecast['ds'] > last_train_date].copy()
     
-    print(f"Prophet forecast: {len(future_forecast)} hours ({len(future_forecast)/24:.1f} days) of future data")
+    print(f"Prophet forecast: {len(future_forecast)} steps of {freq} ({len(future_forecast)/steps_per_day:.1f} days) of future data")
     print(f"Forecast range: {future_forecast['ds'].min()} to {future_forecast['ds'].max()}")
     print(f"Forecast total consumption: {future_forecast['yhat'].sum():.2f} kWh")
 
@@ -0,0 +1,309 @@
+"""
+Versioned store for published price forecasts.
+
+Every forecast run is published as an immutable snapshot keyed by its issue
+time (UTC)::
+
+    app_data/forecasts/<region>/<resolution>/<YYYYmmddTHHMMSSZ>_<horizon>h.csv
+    app_data/forecasts/<region>/<resolution>/<YYYYmmddTHHMMSSZ>_<horizon>h.paths.npy  (optional)
+    app_data/forecasts/<region>/<resolution>/<YYYYmmddTHHMMSSZ>_<horizon>h.volatility.json
+    app_data/forecasts/<region>/<resolution>/index.json
+
+Snapshots are written to a temporary file and moved into place with
+``os.replace``, and only then added to the index, so readers never see a
+half-written forecast. The index is sorted by issue time, which makes
+"latest" and "as of T" lookups a binary search.
+"""
+
+import bisect
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .volatility_sidecar import forecast_volatility, paths_volatility, sidecar_path, update_sidecar, write_sidecar
+
+DEFAULT_FORECAST_DIR = os.path.join("app_data", "forecasts")
+INDEX_FILE = "index.json"
+KEY_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+def atomic_write_csv(df: pd.DataFrame, path: str) -> str:
+    """Write a CSV next to its destination and atomically move it into place"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _as_utc(value) -> datetime:
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.to_pydatetime()
+
+
+class ForecastStore:
+    """
+    Issue-time indexed forecast snapshots for one region and resolution.
+    """
+
+    def __init__(self, root: str = DEFAULT_FORECAST_DIR, region: str = "DE", resolution: str = "hour"):
+        """
+        Initialize the store.
+
+        Args:
+            root: Base directory of the store
+            region: SMARD region code (e.g. "DE")
+            resolution: Forecast resolution ("hour" or "quarterhour")
+        """
+        self.root = root
+        self.region = region
+        self.resolution = resolution
+        self.path = os.path.join(root, region, resolution)
+        # (mtime, entries, issue times) of the last index read
+        self._index_cache = None
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, INDEX_FILE)
+
+    def index(self) -> list:
+        """Return the snapshot entries sorted by issue time (oldest first)"""
+        return self._load_index()[0]
+
+    def _load_index(self) -> tuple:
+        if not os.path.exists(self.index_path):
+            return [], []
+        mtime = os.stat(self.index_path).st_mtime_ns
+        if self._index_cache is None or self._index_cache[0] != mtime:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)["snapshots"]
+            self._index_cache = (mtime, entries, [e["issued_at"] for e in entries])
+        return self._index_cache[1], self._index_cache[2]
+
+    def _write_index(self, entries: list) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"region": self.region, "resolution": self.resolution, "snapshots": entries}, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+        self._index_cache = None
+
+    # ------------------------------------------------------------------
+    # Publish / lookup
+    # ------------------------------------------------------------------
+    def publish(self, forecast: pd.DataFrame, issued_at: datetime | None = None,
+                horizon_hours: int | None = None, meta: dict | None = None) -> dict:
+        """
+        Atomically publish a forecast snapshot.
+
+        Args:
+            forecast: Forecast DataFrame (ds, yhat, ... columns)
+            issued_at: Issue time (defaults to now, naive values are taken as UTC)
+            horizon_hours: Forecast horizon, part of the snapshot name
+            meta: Extra fields stored in the index entry
+        Returns:
+            dict: The index entry of the new snapshot
+        """
+        issued = _as_utc(issued_at or datetime.now(timezone.utc)).replace(microsecond=0)
+        suffix = f"_{horizon_hours}h" if horizon_hours is not None else ""
+        key = issued.strftime(KEY_FORMAT) + suffix
+        os.makedirs(self.path, exist_ok=True)
+        csv_path = atomic_write_csv(forecast, os.path.join(self.path, f"{key}.csv"))
+        try:
+            # Volatility statistics are stored before the snapshot becomes visible
+            write_sidecar(csv_path, forecast_volatility(forecast))
+        except ValueError as e:
+            logging.warning(f"No volatility sidecar for snapshot {key}: {e}")
+
+        entry = {
+            "key": key,
+            "issued_at": issued.isoformat(),
+            "file": f"{key}.csv",
+            "horizon_hours": horizon_hours,
+            "rows": int(len(forecast)),
+            **(meta or {}),
+        }
+        entries = [e for e in self.index() if e["key"] != key]
+        position = bisect.bisect_right([e["issued_at"] for e in entries], entry["issued_at"])
+        entries.insert(position, entry)
+        self._write_index(entries)
+        logging.info(f"Published forecast snapshot {key}")
+        return entry
+
+    def latest(self) -> dict | None:
+        """Return the index entry of the newest snapshot"""
+        entries = self.index()
+        return entries[-1] if entries else None
+
+    def as_of(self, when) -> dict | None:
+        """
+        Return the newest snapshot issued at or before ``when``.
+
+        Args:
+            when: Point in time (naive values are taken as UTC)
+        Returns:
+            dict | None: Index entry, or None if nothing was issued by then
+        """
+        entries, issued = self._load_index()
+        position = bisect.bisect_right(issued, _as_utc(when).isoformat())
+        return entries[position - 1] if position else None
+
+    def snapshot_path(self, entry: dict) -> str:
+        return os.path.join(self.path, entry["file"])
+
+    def load(self, entry: dict | None = None) -> pd.DataFrame:
+        """
+        Load a snapshot (the latest one by default).
+
+        Raises:
+            FileNotFoundError: If the store holds no snapshot
+        """
+        entry = entry or self.latest()
+        if entry is None:
+            raise FileNotFoundError(f"No forecast snapshots in {self.path}")
+        return pd.read_csv(self.snapshot_path(entry))
+
+    # ------------------------------------------------------------------
+    # Scenario paths
+    # ------------------------------------------------------------------
+    def _paths_files(self, entry: dict) -> tuple:
+        base = os.path.join(self.path, entry["key"])
+        return base + ".paths.npy", base + ".paths.json"
+
+    def publish_paths(self, entry: dict, paths: np.ndarray, meta: dict) -> None:
+        """
+        Atomically store the sample path matrix of a published snapshot.
+
+        Args:
+            entry: Index entry returned by publish()
+            paths: (n_paths, n_steps) float32 matrix
+            meta: Description of the time axis (see scenario_paths.paths_meta)
+        """
+        npy_path, meta_path = self._paths_files(entry)
+        for path, write in ((npy_path, lambda f: np.save(f, paths)),
+                            (meta_path, lambda f: f.write(json.dumps(meta, indent=2).encode()))):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        update_sidecar(self.snapshot_path(entry), paths_volatility(paths))
+
+    def load_paths(self, entry: dict | None = None, mmap: bool = True) -> tuple | None:
+        """
+        Load the sample paths of a snapshot (the latest one by default).
+
+        Args:
+            entry: Index entry
+            mmap: Memory-map the matrix instead of reading it into memory
+        Returns:
+            tuple | None: (paths array, meta dict), or None if the snapshot has no paths
+        """
+        entry = entry or self.latest()
+        if entry is None:
+            return None
+        npy_path, meta_path = self._paths_files(entry)
+        if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return np.load(npy_path, mmap_mode="r" if mmap else None), meta
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+    def compact(self, keep_all_days: int = 7, keep_daily_days: int = 90, now: datetime | None = None) -> list:
+        """
+        Thin out old snapshots.
+
+        Snapshots issued within ``keep_all_days`` are all kept, up to
+        ``keep_daily_days`` the last snapshot of each day is kept, and older
+        ones are removed. The newest snapshot is never removed.
+
+        Returns:
+            list: Keys of the removed snapshots
+        """
+        entries = self.index()
+        if not entries:
+            return []
+        now = _as_utc(now or datetime.now(timezone.utc))
+        keep, last_of_day = [], {}
+        for entry in entries:
+            issued = datetime.fromisoformat(entry["issued_at"])
+            age = now - issued
+            if age <= timedelta(days=keep_all_days):
+                keep.append(entry)
+            elif age <= timedelta(days=keep_daily_days):
+                last_of_day[issued.date()] = entry
+        keep_keys = {e["key"] for e in keep} | {e["key"] for e in last_of_day.values()} | {entries[-1]["key"]}
+        kept = [e for e in entries if e["key"] in keep_keys]
+        removed = [e for e in entries if e["key"] not in keep_keys]
+        if not removed:
+            return []
+
+        # Drop from the index first so no reader is pointed at a deleted file
+        self._write_index(kept)
+        for entry in removed:
+            snapshot_path = self.snapshot_path(entry)
+            for path in (snapshot_path, sidecar_path(snapshot_path), *self._paths_files(entry)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        logging.info(f"Compacted forecast store: removed {len(removed)} snapshots, kept {len(kept)}")
+        return [e["key"] for e in removed]
+
+
+def legacy_file_prefix(region: str) -> str:
+    """Prefix of a region's fixed-name CSV files (``germany_price_forecast_720h.csv`` for DE)"""
+    return "germany" if region == "DE" else region.lower().replace("-", "_")
+
+
+def latest_forecast_path(app_data_dir: str, region: str = "DE", resolution: str = "hour",
+                         legacy_file: str | None = "germany_price_forecast_720h.csv") -> str:
+    """
+    Path of the newest published forecast, falling back to the legacy fixed-name file.
+
+    Args:
+        app_data_dir: The app_data directory
+        region: Bidding zone of the forecast
+        resolution: Forecast resolution
+        legacy_file: Fixed-name file to fall back to (None: store only)
+    Raises:
+        FileNotFoundError: If neither exists
+    """
+    store = ForecastStore(os.path.join(app_data_dir, "forecasts"), region=region, resolution=resolution)
+    entry = store.latest()
+    if entry is not None and os.path.exists(store.snapshot_path(entry)):
+        return store.snapshot_path(entry)
+    if legacy_file is not None:
+        legacy_path = os.path.join(app_data_dir, legacy_file)
+        if os.path.exists(legacy_path):
+            return legacy_path
+    raise FileNotFoundError(f"No price forecast for region {region} in {app_data_dir}")
+
+
+@lru_cache(maxsize=8)
+def _read_forecast(path: str, mtime_ns: int) -> pd.DataFrame:
+    return pd.read_csv(path)
+
+
+def read_forecast(path: str) -> pd.DataFrame:
+    """
+    Read a forecast CSV, parsing each file version only once.
+
+    Only forecasts that are actually requested are held in memory (the
+    cache is bounded), so memory grows with the regions queried rather than
+    the regions published.
+
+    Returns:
+        pd.DataFrame: A copy of the cached frame
+    """
+    return _read_forecast(os.path.abspath(path), os.stat(path).st_mtime_ns).copy()
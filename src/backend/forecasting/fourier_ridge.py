@@ -0,0 +1,225 @@
+"""
+NumPy-only Fourier-ridge price forecaster.
+
+A fast alternative to the Prophet price model: the design matrix holds daily,
+weekly and yearly Fourier terms plus German public holiday flags, the
+coefficients come from a closed-form ridge regression and prediction
+intervals are empirical residual quantiles per hour of day. A fit on two years
+of hourly prices takes well under a second.
+
+``FourierRidgeModel`` mimics the parts of the Prophet API that the forecasting
+pipeline uses (``make_future_dataframe``, ``predict``, ``predictive_samples``),
+so ``make_future_and_predict``, ``apply_retail_pricing`` and the scenario path
+code work unchanged with either engine.
+"""
+
+import logging
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_DAY = 24.0
+HOURS_PER_WEEK = 24.0 * 7
+HOURS_PER_YEAR = 24.0 * 365.25
+
+# Nationwide German public holidays (plus the Christmas/New Year's Eve days the market treats alike)
+FIXED_HOLIDAYS = ((1, 1), (5, 1), (10, 3), (12, 24), (12, 25), (12, 26), (12, 31))
+# Offsets from Easter Sunday: Good Friday, Easter Monday, Ascension Day, Whit Monday
+EASTER_OFFSETS = (-2, 1, 39, 50)
+
+
+def easter_sunday(year: int) -> date:
+    """Easter Sunday of a year (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def german_holidays(years) -> set:
+    """Dates of the nationwide German public holidays in the given years"""
+    holidays = set()
+    for year in years:
+        holidays.update(date(year, month, day) for month, day in FIXED_HOLIDAYS)
+        easter = easter_sunday(year)
+        holidays.update(easter + timedelta(days=offset) for offset in EASTER_OFFSETS)
+    return holidays
+
+
+def holiday_flags(ds: pd.DatetimeIndex) -> np.ndarray:
+    """1.0 for timestamps on a German public holiday, else 0.0"""
+    days = ds.normalize()
+    holidays = german_holidays(range(ds.year.min(), ds.year.max() + 1)) if len(ds) else set()
+    return days.isin(pd.DatetimeIndex(sorted(holidays))).astype(np.float64)
+
+
+def _fourier(t_hours: np.ndarray, period: float, order: int) -> np.ndarray:
+    if order <= 0:
+        return np.empty((len(t_hours), 0))
+    k = np.arange(1, order + 1)
+    angles = 2 * np.pi * np.outer(t_hours / period, k)
+    return np.hstack([np.sin(angles), np.cos(angles)])
+
+
+class FourierRidgeModel:
+    """
+    Ridge regression on Fourier and holiday features with residual-quantile intervals.
+    """
+
+    def __init__(self, daily_order: int = 12, weekly_order: int = 10, yearly_order: int = 20,
+                 holiday_daily_order: int = 4, alpha: float = 1.0, interval_width: float = 0.95,
+                 uncertainty_samples: int = 1000):
+        """
+        Initialize the model.
+
+        Args:
+            daily_order: Fourier order of the 24-hour pattern
+            weekly_order: Fourier order of the weekly pattern
+            yearly_order: Fourier order of the yearly pattern
+            holiday_daily_order: Fourier order of the separate daily shape on holidays
+            alpha: Ridge penalty (the intercept is not penalized)
+            interval_width: Coverage of yhat_lower/yhat_upper
+            uncertainty_samples: Default number of paths drawn by predictive_samples
+        """
+        self.daily_order = daily_order
+        self.weekly_order = weekly_order
+        self.yearly_order = yearly_order
+        self.holiday_daily_order = holiday_daily_order
+        self.alpha = alpha
+        self.interval_width = interval_width
+        self.uncertainty_samples = uncertainty_samples
+        self.coef = None
+        self.history = None
+        self.residuals = None
+        self.fit_seconds = None
+
+    def _blocks(self, ds: pd.DatetimeIndex) -> dict:
+        t = (ds - pd.Timestamp("2000-01-01")) / pd.Timedelta(hours=1)
+        t = np.asarray(t, dtype=np.float64)
+        holiday = holiday_flags(ds)
+        return {
+            "trend": np.ones((len(ds), 1)),
+            "daily": _fourier(t, HOURS_PER_DAY, self.daily_order),
+            "weekly": _fourier(t, HOURS_PER_WEEK, self.weekly_order),
+            "yearly": _fourier(t, HOURS_PER_YEAR, self.yearly_order),
+            "holidays": np.hstack([holiday[:, None],
+                                   holiday[:, None] * _fourier(t, HOURS_PER_DAY, self.holiday_daily_order)]),
+        }
+
+    def design_matrix(self, ds) -> tuple:
+        """Return the feature matrix and the column slice of each component"""
+        blocks = self._blocks(pd.DatetimeIndex(ds))
+        slices, start = {}, 0
+        for name, block in blocks.items():
+            slices[name] = slice(start, start + block.shape[1])
+            start += block.shape[1]
+        return np.hstack(list(blocks.values())), slices
+
+    def fit(self, df: pd.DataFrame, value_column: str = "price_eur_per_mwh") -> "FourierRidgeModel":
+        """
+        Fit the model.
+
+        Args:
+            df: Training data with ds and value columns (Prophet's ds/y also works)
+            value_column: Target column (falls back to 'y')
+        Returns:
+            FourierRidgeModel: self
+        """
+        start = time.perf_counter()
+        column = value_column if value_column in df.columns else "y"
+        data = df[["ds", column]].dropna()
+        ds = pd.DatetimeIndex(pd.to_datetime(data["ds"]))
+        y = data[column].to_numpy(dtype=np.float64)
+
+        X, self._slices = self.design_matrix(ds)
+        penalty = np.full(X.shape[1], self.alpha)
+        penalty[self._slices["trend"]] = 0.0
+        self.coef = np.linalg.solve(X.T @ X + np.diag(penalty), X.T @ y)
+
+        self.residuals = y - X @ self.coef
+        hours = ds.hour.to_numpy()
+        lo, hi = (1 - self.interval_width) / 2, 1 - (1 - self.interval_width) / 2
+        overall = np.quantile(self.residuals, [lo, hi])
+        # Price uncertainty differs strongly between night and evening peak hours
+        self.residual_quantiles = np.array([
+            np.quantile(self.residuals[hours == h], [lo, hi]) if (hours == h).sum() >= 10 else overall
+            for h in range(24)
+        ])
+        self._residual_hours = hours
+        self.history = pd.DataFrame({"ds": ds, "y": y})
+        self.fit_seconds = time.perf_counter() - start
+        logging.info(f"Fourier-ridge model fitted on {len(y)} rows with {X.shape[1]} features "
+                     f"in {self.fit_seconds:.3f}s")
+        return self
+
+    def make_future_dataframe(self, periods: int, freq: str = "h", include_history: bool = True) -> pd.DataFrame:
+        """Prophet-compatible future frame"""
+        last = self.history["ds"].max()
+        future = pd.date_range(last, periods=periods + 1, freq=freq)[1:]
+        ds = pd.concat([self.history["ds"], pd.Series(future)]) if include_history else pd.Series(future)
+        return pd.DataFrame({"ds": ds.reset_index(drop=True)})
+
+    def predict(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predict prices with intervals and additive components.
+
+        Args:
+            df: Frame with a ds column
+        Returns:
+            pd.DataFrame: ds, yhat, yhat_lower, yhat_upper, trend, daily, weekly, yearly, holidays
+        """
+        if self.coef is None:
+            raise ValueError("Model has not been fitted")
+        ds = pd.DatetimeIndex(pd.to_datetime(df["ds"]))
+        X, slices = self.design_matrix(ds)
+        yhat = X @ self.coef
+        quantiles = self.residual_quantiles[ds.hour.to_numpy()]
+        forecast = pd.DataFrame({
+            "ds": ds,
+            "yhat": yhat,
+            "yhat_lower": yhat + quantiles[:, 0],
+            "yhat_upper": yhat + quantiles[:, 1],
+        })
+        for name, cols in slices.items():
+            forecast[name] = X[:, cols] @ self.coef[cols]
+        return forecast
+
+    def predictive_samples(self, df: pd.DataFrame) -> dict:
+        """
+        Sample paths by adding residuals of the same hour of day to the point forecast.
+
+        Returns:
+            dict: {"yhat": array of shape (n_steps, uncertainty_samples)}
+        """
+        forecast = self.predict(df)
+        hours = pd.DatetimeIndex(forecast["ds"]).hour.to_numpy()
+        samples = np.empty((len(forecast), self.uncertainty_samples))
+        for h in np.unique(hours):
+            steps = np.flatnonzero(hours == h)
+            pool = self.residuals[self._residual_hours == h]
+            if len(pool) == 0:
+                pool = self.residuals
+            draws = np.random.randint(0, len(pool), size=(len(steps), self.uncertainty_samples))
+            samples[steps] = forecast["yhat"].to_numpy()[steps, None] + pool[draws]
+        return {"yhat": samples}
+
+
+def train_fourier_ridge(df_hourly: pd.DataFrame, **params) -> FourierRidgeModel:
+    """
+    Fit the Fourier-ridge engine (counterpart of train_prophet)
+    Args:
+        df_hourly: DataFrame with ds (datetime) and price_eur_per_mwh columns
+        **params: FourierRidgeModel keyword arguments
+    Returns:
+        FourierRidgeModel: Fitted model
+    """
+    return FourierRidgeModel(**params).fit(df_hourly)
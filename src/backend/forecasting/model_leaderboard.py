@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Leaderboard of competing price forecasting engines.
+
+Every registered engine is trained on the same walk-forward splits of the
+local price store. All (engine, split) fits run concurrently in a process pool
+and report MAE, RMSE, interval coverage, wall time and CPU seconds (including
+child processes such as CmdStan). The result and the current champion are kept
+in::
+
+    app_data/leaderboard/<region>/<resolution>/leaderboard.json
+
+``energy_price_forecast --engine auto`` trains whichever engine is champion.
+A challenger only replaces the champion when it beats it by ``min_improvement``.
+
+Run from the project root:
+    python -m src.backend.forecasting.model_leaderboard --folds 4 --horizon-hours 168
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LEADERBOARD_DIR = os.path.join("app_data", "leaderboard")
+LEADERBOARD_FILE = "leaderboard.json"
+DEFAULT_ENGINE = "prophet"
+DEFAULT_PROPHET_PARAMS = {"seasonality_mode": "multiplicative", "changepoint_prior_scale": 0.2}
+
+# engine name -> (fit function(df, **params) -> model with predict(), default params)
+ENGINES = {}
+
+
+def register_engine(name: str, defaults: dict | None = None):
+    """Decorator adding a fit function to the engine registry"""
+    def decorator(func):
+        ENGINES[name] = (func, dict(defaults or {}))
+        return func
+    return decorator
+
+
+@register_engine("prophet", DEFAULT_PROPHET_PARAMS)
+def fit_prophet(df: pd.DataFrame, **params):
+    from .energy_price_forecast import train_prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    return train_prophet(df, **params)
+
+
+@register_engine("ridge")
+def fit_ridge(df: pd.DataFrame, **params):
+    from .fourier_ridge import train_fourier_ridge
+    return train_fourier_ridge(df, **params)
+
+
+# One thread per forest: the leaderboard already runs engines and folds in parallel
+@register_engine("random_forest", {"n_jobs": 1})
+def fit_random_forest(df: pd.DataFrame, **params):
+    from .random_forest_engine import train_random_forest
+    return train_random_forest(df, **params)
+
+
+@register_engine("sarimax")
+def fit_sarimax(df: pd.DataFrame, **params):
+    from .sarimax_engine import train_sarimax
+    return train_sarimax(df, **params)
+
+
+def fit_engine(name: str, df: pd.DataFrame, params: dict | None = None):
+    """
+    Fit a registered engine.
+
+    Args:
+        name: Registered engine name
+        df: Training data with ds and price_eur_per_mwh columns
+        params: Overrides of the engine's default parameters
+    Returns:
+        Fitted model with a Prophet-like predict()
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', available: {sorted(ENGINES)}")
+    func, defaults = ENGINES[name]
+    return func(df, **{**defaults, **(params or {})})
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process and its finished children"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def evaluate_engine(name: str, params: dict | None, train: pd.DataFrame, test: pd.DataFrame) -> dict:
+    """
+    Fit one engine on one split and score it (runs in a worker process).
+
+    Returns:
+        dict: mae, rmse, coverage, fit_seconds (wall) and cpu_seconds of fit and prediction
+    """
+    cpu_start, wall_start = _cpu_seconds(), time.perf_counter()
+    model = fit_engine(name, train, params)
+    fit_seconds = time.perf_counter() - wall_start
+    forecast = model.predict(test[["ds"]])
+    cpu_seconds = _cpu_seconds() - cpu_start
+
+    actual = test["price_eur_per_mwh"].to_numpy()
+    errors = forecast["yhat"].to_numpy() - actual
+    inside = (actual >= forecast["yhat_lower"].to_numpy()) & (actual <= forecast["yhat_upper"].to_numpy())
+    return {
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "coverage": float(inside.mean()),
+        "fit_seconds": round(fit_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 3),
+    }
+
+
+def run_leaderboard(engines: list, folds: list, max_workers: int | None = None, params: dict | None = None,
+                    evaluate=evaluate_engine) -> list:
+    """
+    Score every engine on every walk-forward split concurrently.
+
+    Args:
+        engines: Registered engine names
+        folds: (train, test) pairs from tune_price_model.rolling_folds
+        max_workers: Worker processes (defaults to the CPU count)
+        params: Optional per-engine parameter overrides {engine: {...}}
+        evaluate: Split evaluation function (must be picklable)
+    Returns:
+        list: One row per engine with mean metrics over the splits, sorted by MAE
+              (engines with a failed split are listed last with their error)
+    """
+    params = params or {}
+    results = {name: {} for name in engines}
+    errors = {}
+    logging.info(f"Leaderboard: {len(engines)} engines x {len(folds)} splits")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(evaluate, name, params.get(name), train, test): (name, i)
+                   for name in engines for i, (train, test) in enumerate(folds)}
+        for future in as_completed(futures):
+            name, i = futures[future]
+            try:
+                results[name][i] = future.result()
+            except Exception as e:
+                logging.warning(f"Engine {name} failed on split {i}: {e}")
+                errors[name] = str(e)
+
+    board = []
+    for name in engines:
+        folds_done = list(results[name].values())
+        if name in errors or len(folds_done) < len(folds):
+            board.append({"engine": name, "error": errors.get(name, "incomplete")})
+            continue
+        row = {"engine": name, "folds": len(folds_done)}
+        for metric in ("mae", "rmse", "coverage", "fit_seconds", "cpu_seconds"):
+            row[metric] = float(np.mean([r[metric] for r in folds_done]))
+        row["cpu_seconds_total"] = float(np.sum([r["cpu_seconds"] for r in folds_done]))
+        board.append(row)
+    return sorted(board, key=lambda r: r.get("mae", np.inf))
+
+
+def promote_champion(board: list, current: str | None = None, min_improvement: float = 0.02) -> str | None:
+    """
+    Pick the champion engine.
+
+    The best-ranked engine replaces the current champion only if its MAE is at
+    least ``min_improvement`` (relative) lower, so near-ties do not flip the
+    production model back and forth.
+
+    Args:
+        board: Rows from run_leaderboard
+        current: Current champion engine
+        min_improvement: Required relative MAE improvement of a challenger
+    Returns:
+        str | None: Champion engine name
+    """
+    scored = [r for r in board if "mae" in r]
+    if not scored:
+        return current
+    best = min(scored, key=lambda r: r["mae"])
+    incumbent = next((r for r in scored if r["engine"] == current), None)
+    if incumbent is None or best["mae"] <= incumbent["mae"] * (1 - min_improvement):
+        return best["engine"]
+    return current
+
+
+def leaderboard_path(root: str = DEFAULT_LEADERBOARD_DIR, region: str = "DE", resolution: str = "hour") -> str:
+    return os.path.join(root, region, resolution, LEADERBOARD_FILE)
+
+
+def load_champion(path: str) -> str | None:
+    """
+    Read the champion engine of the last leaderboard run.
+
+    Returns:
+        str | None: Registered engine name, or None if no leaderboard exists
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            champion = json.load(f).get("champion")
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Could not read leaderboard {path}: {e}")
+        return None
+    return champion if champion in ENGINES else None
+
+
+def main():
+    from .energy_price_forecast import PRICE_REGIONS, REGION
+
+    parser = argparse.ArgumentParser(description="Compare price forecasting engines on walk-forward splits")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES),
+                        help="Engines to compare (default: all registered)")
+    parser.add_argument("--training-days", type=int, default=730,
+                        help="Days of stored prices to use (default: 730)")
+    parser.add_argument("--region", choices=sorted(PRICE_REGIONS), default=REGION,
+                        help=f"Bidding zone (default: {REGION})")
+    parser.add_argument("--resolution", choices=["hour", "quarterhour"], default="hour",
+                        help="Price store resolution (default: hour)")
+    parser.add_argument("--folds", type=int, default=4, help="Number of walk-forward splits (default: 4)")
+    parser.add_argument("--horizon-hours", type=int, default=168,
+                        help="Test window per split in hours (default: 168)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--min-improvement", type=float, default=0.02,
+                        help="Relative MAE gain a challenger needs to become champion (default: 0.02)")
+    parser.add_argument("--output-dir", default=DEFAULT_LEADERBOARD_DIR,
+                        help=f"Leaderboard directory (default: {DEFAULT_LEADERBOARD_DIR})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from .price_store import PriceStore
+    from .tune_price_model import load_tuned_params, rolling_folds
+    store = PriceStore(os.path.join("app_data", "price_store"), region=args.region, resolution=args.resolution)
+    df = store.load_prices(days=args.training_days)
+    if df.empty:
+        raise SystemExit("Price store is empty, run energy_price_forecast first")
+
+    folds = rolling_folds(df, n_folds=args.folds, horizon_hours=args.horizon_hours)
+    tuned = load_tuned_params(resolution=args.resolution)
+    board = run_leaderboard(args.engines, folds, max_workers=args.workers,
+                            params={"prophet": tuned} if tuned else None)
+
+    path = leaderboard_path(args.output_dir, args.region, args.resolution)
+    previous = load_champion(path)
+    champion = promote_champion(board, previous, args.min_improvement)
+    result = {
+        "generated_at": datetime.now().isoformat(),
+        "region": args.region,
+        "resolution": args.resolution,
+        "folds": len(folds),
+        "horizon_hours": args.horizon_hours,
+        "board": board,
+        "champion": champion,
+        "previous_champion": previous,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp_path, path)
+
+    for row in board:
+        if "error" in row:
+            logging.info(f"{row['engine']:14s} failed: {row['error']}")
+            continue
+        logging.info(f"{row['engine']:14s} MAE {row['mae']:7.2f}  RMSE {row['rmse']:7.2f}  "
+                     f"coverage {row['coverage']:6.1%}  CPU {row['cpu_seconds']:8.2f}s/split")
+    logging.info(f"Champion: {champion} (previous: {previous}), written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Persistence for the fitted Prophet price model.
+
+The model is serialized as Prophet JSON next to a metadata file describing
+its training window::
+
+    app_data/models/<region>/<resolution>/price_model.json
+    app_data/models/<region>/<resolution>/price_model.meta.json
+    app_data/models/<region>/<resolution>/fit_log.jsonl
+
+The daily job compares the fingerprint of the current training window with the
+stored one. An identical window reuses the stored model, a window that has only
+moved forward by about a day is warm-started from the stored parameters, and
+anything else is fitted from scratch. Every fit appends its duration and the
+number of optimizer iterations to ``fit_log.jsonl``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_DIR = os.path.join("app_data", "models")
+MODEL_FILE = "price_model.json"
+META_FILE = "price_model.meta.json"
+FIT_LOG_FILE = "fit_log.jsonl"
+# Largest forward shift of the training window that is still warm-started
+MAX_WARM_START_SHIFT = pd.Timedelta(days=2)
+
+
+def training_fingerprint(df: pd.DataFrame, params: dict, value_column: str = "price_eur_per_mwh") -> dict:
+    """
+    Describe a training window and model configuration.
+
+    Args:
+        df: Training data with ds and value columns
+        params: Keyword arguments passed to train_prophet
+        value_column: Name of the target column
+    Returns:
+        dict: window start/end, row count, config hash and data hash
+    """
+    config_hash = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    values = np.ascontiguousarray(df[value_column].to_numpy(dtype="float64"))
+    stamps = np.ascontiguousarray(pd.to_datetime(df["ds"]).to_numpy(dtype="datetime64[ns]").view("int64"))
+    data_hash = hashlib.sha256(stamps.tobytes() + values.tobytes()).hexdigest()[:16]
+    return {
+        "window_start": pd.Timestamp(df["ds"].min()).isoformat(),
+        "window_end": pd.Timestamp(df["ds"].max()).isoformat(),
+        "rows": int(len(df)),
+        "config_hash": config_hash,
+        "data_hash": data_hash,
+    }
+
+
+def stan_init(model) -> dict:
+    """
+    Extract the fitted parameters of a Prophet model as optimizer initial values.
+
+    Args:
+        model: Fitted Prophet model
+    Returns:
+        dict: Initial values for Prophet.fit(init=...)
+    """
+    res = {}
+    for pname in ["k", "m", "sigma_obs"]:
+        res[pname] = float(model.params[pname][0][0])
+    for pname in ["delta", "beta"]:
+        res[pname] = model.params[pname][0]
+    return res
+
+
+class ModelStore:
+    """
+    Directory holding the latest fitted price model and its fit log.
+    """
+
+    def __init__(self, root: str = DEFAULT_MODEL_DIR):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory for the serialized model and logs
+        """
+        self.root = root
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.root, MODEL_FILE)
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.root, META_FILE)
+
+    @property
+    def fit_log_path(self) -> str:
+        return os.path.join(self.root, FIT_LOG_FILE)
+
+    def read_meta(self) -> dict:
+        """Return the metadata of the stored model (empty dict if there is none)"""
+        if not os.path.exists(self.meta_path) or not os.path.exists(self.model_path):
+            return {}
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self):
+        """
+        Load the stored model.
+
+        Returns:
+            Prophet | None: The stored model or None if there is none
+        """
+        if not os.path.exists(self.model_path):
+            return None
+        from prophet.serialize import model_from_json
+        with open(self.model_path, "r", encoding="utf-8") as f:
+            return model_from_json(f.read())
+
+    def save(self, model, fingerprint: dict) -> None:
+        """Atomically replace the stored model and its metadata"""
+        from prophet.serialize import model_to_json
+        os.makedirs(self.root, exist_ok=True)
+        meta = {"fingerprint": fingerprint, "saved_at": datetime.now().isoformat()}
+        # Model first: a metadata file never describes a model that was not written
+        for path, content in ((self.model_path, model_to_json(model)), (self.meta_path, json.dumps(meta, indent=2))):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+    def log_fit(self, record: dict) -> None:
+        """Append one fit record to the fit log"""
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.fit_log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def fit_log(self) -> list:
+        """Return all fit records, oldest first"""
+        if not os.path.exists(self.fit_log_path):
+            return []
+        with open(self.fit_log_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def fit_mode(previous: dict | None, current: dict) -> str:
+    """
+    Decide how to obtain a model for the current training window.
+
+    Args:
+        previous: Fingerprint of the stored model (or None)
+        current: Fingerprint of the current training window
+    Returns:
+        str: "reuse", "warm" or "cold"
+    """
+    if not previous or previous.get("config_hash") != current["config_hash"]:
+        return "cold"
+    if previous == current:
+        return "reuse"
+    shift = pd.Timestamp(current["window_end"]) - pd.Timestamp(previous["window_end"])
+    if pd.Timedelta(0) <= shift <= MAX_WARM_START_SHIFT:
+        return "warm"
+    return "cold"
+
+
+def _iterations(model) -> int | None:
+    """Number of optimizer iterations of the last fit (needs save_iterations=True)"""
+    try:
+        iterations = model.stan_backend.stan_fit.optimized_iterations_np
+        return int(len(iterations)) if iterations is not None else None
+    except Exception:
+        return None
+
+
+def fit_price_model(df: pd.DataFrame, store: ModelStore, params: dict | None = None,
+                    force_cold: bool = False):
+    """
+    Return a fitted price model, reusing or warm-starting the stored one where possible.
+
+    Args:
+        df: Training data with ds and price_eur_per_mwh columns
+        store: Model store holding the previous model
+        params: Keyword arguments for train_prophet
+        force_cold: Always fit from scratch
+    Returns:
+        tuple: (model, fit record)
+    """
+    from .energy_price_forecast import train_prophet
+
+    params = params or {}
+    fingerprint = training_fingerprint(df, params)
+    previous = store.read_meta().get("fingerprint")
+    mode = "cold" if force_cold else fit_mode(previous, fingerprint)
+
+    init = None
+    if mode in ("reuse", "warm"):
+        try:
+            previous_model = store.load()
+        except Exception as e:
+            logging.warning(f"Could not load stored price model ({e}), fitting from scratch")
+            previous_model, mode = None, "cold"
+        if mode == "reuse" and previous_model is not None:
+            logging.info("Training window unchanged, reusing stored price model")
+            return previous_model, {"mode": mode, "fingerprint": fingerprint}
+        if previous_model is not None:
+            init = stan_init(previous_model)
+    if init is None:
+        mode = "cold"
+
+    start = time.perf_counter()
+    try:
+        model = train_prophet(df, init=init, **params)
+    except Exception as e:
+        if init is None:
+            raise
+        # A warm start that fails (e.g. changed changepoint count) falls back to a cold fit
+        logging.warning(f"Warm start failed ({e}), fitting from scratch")
+        mode, init = "cold", None
+        start = time.perf_counter()
+        model = train_prophet(df, **params)
+    fit_seconds = time.perf_counter() - start
+
+    record = {
+        "fitted_at": datetime.now().isoformat(),
+        "mode": mode,
+        "fit_seconds": round(fit_seconds, 3),
+        "iterations": _iterations(model),
+        "fingerprint": fingerprint,
+    }
+    store.save(model, fingerprint)
+    store.log_fit(record)
+    logging.info(f"Price model fitted ({record['mode']} start) in {record['fit_seconds']:.1f}s, "
+                 f"{record['iterations']} iterations")
+    return model, record
@@ -0,0 +1,264 @@
+"""
+Minimal staged pipeline runner with input fingerprinting.
+
+Each stage is a function that receives the values of its declared inputs as
+keyword arguments and returns a dict with its declared outputs. A stage is
+skipped when the fingerprint of its inputs (and parameters) matches the last
+successful run; its outputs are then loaded from disk only if a later stage
+actually needs them::
+
+    app_data/pipeline/<name>/state.json
+    app_data/pipeline/<name>/<stage>.pkl
+
+Stages marked ``always_run`` (e.g. the data sync) run every time and
+fingerprint their outputs by content, which is what lets all downstream stages
+be skipped on a no-op rerun. Stages marked ``asynchronous`` run in a
+background thread (e.g. plots), and failures of ``optional`` stages are logged
+instead of aborting the run. Every executed stage records its wall time and
+peak traced memory.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+DEFAULT_PIPELINE_DIR = os.path.join("app_data", "pipeline")
+
+
+def fingerprint_value(value) -> str:
+    """Content hash of a stage input or output"""
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+        digest.update(json.dumps(list(map(str, value.columns))).encode())
+    else:
+        try:
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+        except (TypeError, ValueError):
+            digest.update(pickle.dumps(value))
+    return digest.hexdigest()[:16]
+
+
+class Stage:
+    """
+    One step of a pipeline.
+    """
+
+    def __init__(self, name: str, func, inputs: tuple = (), outputs: tuple = (), params: dict | None = None,
+                 always_run: bool = False, optional: bool = False, asynchronous: bool = False):
+        """
+        Initialize the stage.
+
+        Args:
+            name: Unique stage name
+            func: Callable taking the inputs as keyword arguments and returning a dict of outputs
+            inputs: Names of values produced by earlier stages or passed to Pipeline.run
+            outputs: Names of the values this stage returns
+            params: Extra configuration that is part of the fingerprint
+            always_run: Run even if the inputs are unchanged (outputs are fingerprinted by content)
+            optional: Log failures instead of aborting the pipeline
+            asynchronous: Run in a background thread; nothing may depend on its outputs
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.params = params or {}
+        self.always_run = always_run
+        self.optional = optional
+        self.asynchronous = asynchronous
+
+
+class Pipeline:
+    """
+    Runs stages in order, skipping those whose input fingerprint is unchanged.
+    """
+
+    def __init__(self, name: str, stages: list, root: str = DEFAULT_PIPELINE_DIR, track_memory: bool = True):
+        """
+        Initialize the pipeline.
+
+        Args:
+            name: Pipeline name (state directory)
+            stages: Stages in execution order
+            root: Base directory for pipeline state
+            track_memory: Record peak memory per stage with tracemalloc
+        """
+        self.name = name
+        self.stages = stages
+        self.path = os.path.join(root, name)
+        self.track_memory = track_memory
+        self.timings = []
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.path, "state.json")
+
+    def _read_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_state(self, state: dict) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _output_path(self, stage: Stage) -> str:
+        return os.path.join(self.path, f"{stage.name}.pkl")
+
+    def _save_outputs(self, stage: Stage, outputs: dict) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self._output_path(stage) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(outputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._output_path(stage))
+
+    def _load_outputs(self, stage: Stage) -> dict:
+        with open(self._output_path(stage), "rb") as f:
+            return pickle.load(f)
+
+    def _stage_fingerprint(self, stage: Stage, fingerprints: dict) -> str:
+        payload = {
+            "stage": stage.name,
+            "params": stage.params,
+            "inputs": {name: fingerprints[name] for name in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def _execute(self, stage: Stage, kwargs: dict) -> tuple:
+        """Run a stage and return (outputs, wall seconds, peak MiB or None)"""
+        trace = self.track_memory and not stage.asynchronous and not tracemalloc.is_tracing()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            outputs = stage.func(**kwargs) or {}
+        finally:
+            wall = time.perf_counter() - start
+            peak = None
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+        missing = set(stage.outputs) - set(outputs)
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' did not return outputs {sorted(missing)}")
+        return outputs, wall, peak
+
+    def _record(self, stage: Stage, status: str, wall: float | None = None, peak: float | None = None) -> dict:
+        record = {"stage": stage.name, "status": status,
+                  "wall_seconds": round(wall, 3) if wall is not None else None,
+                  "peak_mib": round(peak, 1) if peak is not None else None}
+        self.timings.append(record)
+        extra = f" in {wall:.2f}s" if wall is not None else ""
+        extra += f", peak {peak:.1f} MiB" if peak is not None else ""
+        logging.info(f"[{self.name}] {stage.name}: {status}{extra}")
+        return record
+
+    def run(self, force: bool = False, **initial) -> dict:
+        """
+        Run the pipeline.
+
+        Args:
+            force: Run every stage regardless of fingerprints
+            **initial: Initial values available as stage inputs
+        Returns:
+            dict: All values available at the end of the run (skipped outputs are loaded on demand only
+                  if a later stage needed them)
+        """
+        state = self._read_state()
+        stage_state = state.setdefault("stages", {})
+        values = dict(initial)
+        fingerprints = {name: fingerprint_value(value) for name, value in initial.items()}
+        # stage name -> stage, for outputs that were skipped and not loaded yet
+        pending = {}
+        threads = []
+        self.timings = []
+
+        def resolve(name):
+            if name not in values and name in pending:
+                skipped = pending.pop(name)
+                values.update(self._load_outputs(skipped))
+            return values[name]
+
+        # outputs of optional stages that failed in this run
+        unavailable = set()
+
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name in unavailable]
+            if missing and stage.optional:
+                unavailable.update(stage.outputs)
+                self._record(stage, f"skipped (missing {', '.join(missing)})")
+                continue
+            unknown = [name for name in stage.inputs if name not in fingerprints]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' needs unknown inputs {unknown}")
+
+            fingerprint = self._stage_fingerprint(stage, fingerprints)
+            previous = stage_state.get(stage.name, {})
+            can_skip = (not force and not stage.always_run and previous.get("fingerprint") == fingerprint
+                        and (not stage.outputs or os.path.exists(self._output_path(stage))))
+            if can_skip:
+                for name in stage.outputs:
+                    fingerprints[name] = previous["outputs"][name]
+                    pending[name] = stage
+                self._record(stage, "skipped (unchanged inputs)")
+                continue
+
+            kwargs = {name: resolve(name) for name in stage.inputs}
+
+            if stage.asynchronous:
+                def run_async(stage=stage, kwargs=kwargs, fingerprint=fingerprint):
+                    try:
+                        _, wall, peak = self._execute(stage, kwargs)
+                        self._record(stage, "done (async)", wall, peak)
+                        stage_state[stage.name] = {"fingerprint": fingerprint, "outputs": {}}
+                    except Exception as e:
+                        logging.warning(f"[{self.name}] async stage {stage.name} failed: {e}")
+                thread = threading.Thread(target=run_async, name=f"{self.name}-{stage.name}", daemon=True)
+                thread.start()
+                threads.append(thread)
+                continue
+
+            try:
+                outputs, wall, peak = self._execute(stage, kwargs)
+            except Exception as e:
+                if not stage.optional:
+                    raise
+                logging.warning(f"[{self.name}] optional stage {stage.name} failed: {e}")
+                self._record(stage, "failed (optional)")
+                stage_state.pop(stage.name, None)
+                unavailable.update(stage.outputs)
+                continue
+
+            for name in stage.outputs:
+                values[name] = outputs[name]
+                pending.pop(name, None)
+                # Stages fed by the outside world are fingerprinted by content, all others by their inputs
+                fingerprints[name] = (fingerprint_value(outputs[name]) if stage.always_run
+                                      else hashlib.sha256(f"{fingerprint}:{name}".encode()).hexdigest()[:16])
+            if stage.outputs:
+                self._save_outputs(stage, {name: outputs[name] for name in stage.outputs})
+            stage_state[stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs": {name: fingerprints[name] for name in stage.outputs},
+            }
+            self._record(stage, "done", wall, peak)
+
+        for thread in threads:
+            thread.join()
+
+        state["last_run"] = {"finished_at": datetime.now().isoformat(), "timings": self.timings}
+        self._write_state(state)
+        return values
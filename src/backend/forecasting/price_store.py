@@ -0,0 +1,383 @@
+"""
+Local columnar store for SMARD time series.
+
+Rows are keyed by ``utc_ms`` (the SMARD timestamp) and partitioned into one
+Parquet file per UTC month::
+
+    app_data/price_store/<region>/<resolution>/<YYYY-MM>.parquet
+    app_data/price_store/<region>/<resolution>/_meta.json
+
+The metadata file records the last synced timestamp so that a sync only has to
+download the chunk containing it (SMARD keeps appending to the newest chunk)
+plus any newer chunks.
+"""
+
+import bisect
+import json
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.path.join("app_data", "price_store")
+PRICE_COLUMN = "price_eur_per_mwh"
+META_FILE = "_meta.json"
+# Resolutions whose value columns are stored as float32
+FLOAT32_RESOLUTIONS = ("quarterhour",)
+
+
+class PriceStore:
+    """
+    Month-partitioned Parquet store for one SMARD region and resolution.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, region: str = "DE", resolution: str = "hour"):
+        """
+        Initialize the store.
+
+        Args:
+            root: Base directory of the store
+            region: SMARD region code (e.g. "DE")
+            resolution: SMARD resolution ("hour" or "quarterhour")
+        """
+        self.root = root
+        self.region = region
+        self.resolution = resolution
+        self.path = os.path.join(root, region, resolution)
+        # (partition, column) -> values; columns are only read when first requested
+        self._column_cache = {}
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.path, META_FILE)
+
+    def read_meta(self) -> dict:
+        """Return the store metadata (empty dict for a new store)"""
+        if not os.path.exists(self.meta_path):
+            return {}
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_meta(self, meta: dict) -> None:
+        """Atomically replace the store metadata"""
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+    @property
+    def last_synced_utc_ms(self) -> int | None:
+        return self.read_meta().get("last_synced_utc_ms")
+
+    # ------------------------------------------------------------------
+    # Partitions
+    # ------------------------------------------------------------------
+    @staticmethod
+    def partition_key(utc_ms) -> pd.Index:
+        """Map SMARD millisecond timestamps to their YYYY-MM partition key"""
+        return pd.to_datetime(pd.Index(utc_ms), unit="ms", utc=True).strftime("%Y-%m")
+
+    def _partition_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.parquet")
+
+    def partitions(self) -> list:
+        """Sorted list of partition keys present on disk"""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(f[:-len(".parquet")] for f in os.listdir(self.path) if f.endswith(".parquet"))
+
+    def _read_partition(self, key: str, columns: list | None = None) -> pd.DataFrame:
+        if columns is None:
+            return pd.read_parquet(self._partition_path(key))
+
+        columns = ["utc_ms"] + [c for c in columns if c != "utc_ms"]
+        missing = [c for c in columns if (key, c) not in self._column_cache]
+        if missing:
+            available = set(self.available_columns(key))
+            read = [c for c in missing if c in available]
+            part = pd.read_parquet(self._partition_path(key), columns=read)
+            for c in missing:
+                self._column_cache[(key, c)] = part[c].to_numpy() if c in read else None
+        n_rows = len(self._column_cache[(key, "utc_ms")])
+        return pd.DataFrame({
+            c: self._column_cache[(key, c)] if self._column_cache[(key, c)] is not None
+            else np.full(n_rows, np.nan)
+            for c in columns
+        })
+
+    def available_columns(self, key: str | None = None) -> list:
+        """
+        Return the columns stored in a partition (default: newest partition).
+
+        Only the Parquet schema is read, not the data.
+        """
+        import pyarrow.parquet as pq
+
+        keys = self.partitions()
+        if not keys:
+            return []
+        return pq.read_schema(self._partition_path(key or keys[-1])).names
+
+    def _write_partition(self, key: str, df: pd.DataFrame) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        path = self._partition_path(key)
+        tmp_path = path + ".tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        for cache_key in [k for k in self._column_cache if k[0] == key]:
+            del self._column_cache[cache_key]
+
+    def upsert(self, df: pd.DataFrame) -> int:
+        """
+        Insert or update rows, deduplicating on ``utc_ms``.
+
+        Values in ``df`` win over values already stored for the same timestamp;
+        columns missing from ``df`` are left untouched.
+
+        Args:
+            df: DataFrame with a ``utc_ms`` column and one or more value columns
+        Returns:
+            int: Number of rows written (after deduplication)
+        """
+        if df.empty:
+            return 0
+
+        df = df.drop_duplicates("utc_ms", keep="last").copy()
+        df["utc_ms"] = df["utc_ms"].astype("int64")
+        written = 0
+
+        for key, part in df.groupby(self.partition_key(df["utc_ms"]).values):
+            part = part.set_index("utc_ms")
+            if os.path.exists(self._partition_path(key)):
+                existing = self._read_partition(key).set_index("utc_ms")
+                part = part.combine_first(existing)
+            part = part.sort_index().reset_index()
+            if self.resolution in FLOAT32_RESOLUTIONS:
+                # 4x the rows of hourly data; float32 keeps partitions small
+                value_columns = [c for c in part.columns if c != "utc_ms"]
+                part[value_columns] = part[value_columns].astype("float32")
+            self._write_partition(key, part)
+            written += len(part)
+
+        return written
+
+    def load(self, start: datetime | None = None, end: datetime | None = None,
+             columns: list | None = None) -> pd.DataFrame:
+        """
+        Load stored rows, reading only the partitions that overlap [start, end].
+
+        Args:
+            start: Optional lower bound (UTC, naive or aware)
+            end: Optional upper bound (UTC, naive or aware)
+            columns: Optional subset of value columns to read
+        Returns:
+            pd.DataFrame: Rows sorted by ``utc_ms``
+        """
+        keys = self.partitions()
+        start_ms = _to_utc_ms(start) if start is not None else None
+        end_ms = _to_utc_ms(end) if end is not None else None
+        if start_ms is not None:
+            keys = [k for k in keys if k >= self.partition_key([start_ms])[0]]
+        if end_ms is not None:
+            keys = [k for k in keys if k <= self.partition_key([end_ms])[0]]
+
+        if not keys:
+            return pd.DataFrame(columns=["utc_ms"] + (columns or [PRICE_COLUMN]))
+
+        data = pd.concat([self._read_partition(k, columns) for k in keys], ignore_index=True)
+        if start_ms is not None:
+            data = data[data["utc_ms"] >= start_ms]
+        if end_ms is not None:
+            data = data[data["utc_ms"] <= end_ms]
+        return data.sort_values("utc_ms").reset_index(drop=True)
+
+    def load_prices(self, days: int | None = None, column: str = PRICE_COLUMN) -> pd.DataFrame:
+        """
+        Load prices in the same shape as ``load_smard_dayahead``.
+
+        Args:
+            days: Optional number of trailing days to return
+            column: Value column to load
+        Returns:
+            pd.DataFrame: Columns [ds, <column>] with ``ds`` in naive Europe/Berlin time
+        """
+        data = self.load_frame([column], days=days)
+        data = data[pd.notna(data[column])]
+        data = data[~(data[column].astype(float).abs() > 1e6)]
+        return data.reset_index(drop=True)
+
+    def load_frame(self, columns: list, days: int | None = None) -> pd.DataFrame:
+        """
+        Load several series on their shared time grid.
+
+        Each column is read from disk on first use only, so adding a regressor
+        costs one column read.
+
+        Args:
+            columns: Value columns to load (e.g. ["price_eur_per_mwh", "residual_load_mwh"])
+            days: Optional number of trailing days (relative to the last synced price)
+        Returns:
+            pd.DataFrame: Columns [ds, *columns] with ``ds`` in naive Europe/Berlin time
+        """
+        start = None
+        last_ms = self.last_synced_utc_ms
+        if days is not None and last_ms is not None:
+            start = pd.Timestamp(last_ms, unit="ms") - pd.Timedelta(days=days)
+
+        data = self.load(start=start, columns=columns)
+        data["ds"] = (pd.to_datetime(data["utc_ms"], unit="ms", utc=True)
+                      .dt.tz_convert("Europe/Berlin")
+                      .dt.tz_localize(None))
+        return data[["ds"] + list(columns)]
+
+    def export_csv(self, path: str, days: int | None = None) -> str:
+        """Write the stored prices as a legacy ``germany_dayahead_prices_raw_*.csv`` file"""
+        tmp_path = path + ".tmp"
+        self.load_prices(days=days).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+def _to_utc_ms(value) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value // 1_000_000)
+
+
+def chunks_to_sync(timestamps: list, last_synced_utc_ms: int | None,
+                   limit_chunks: int | None = None) -> list:
+    """
+    Select the SMARD chunks a sync has to download.
+
+    Args:
+        timestamps: Sorted chunk start timestamps from the SMARD index
+        last_synced_utc_ms: Last timestamp already in the store (None for an empty store)
+        limit_chunks: Number of trailing chunks to fetch for an empty store
+    Returns:
+        list: The chunk containing ``last_synced_utc_ms`` and every newer chunk
+    """
+    if last_synced_utc_ms is None:
+        return timestamps[-limit_chunks:] if limit_chunks else list(timestamps)
+
+    # The chunk holding the last synced value may still receive new rows
+    idx = max(bisect.bisect_right(timestamps, last_synced_utc_ms) - 1, 0)
+    return list(timestamps[idx:])
+
+
+def _series_state(meta: dict, column: str) -> dict:
+    state = meta.get("series", {}).get(column, {})
+    if column == PRICE_COLUMN and "last_synced_utc_ms" not in state and "last_synced_utc_ms" in meta:
+        # Stores created before multi-series support only tracked prices
+        state = {"last_synced_utc_ms": meta["last_synced_utc_ms"]}
+    return state
+
+
+def sync_price_store(store: PriceStore, limit_chunks: int | None = None, cache=None,
+                     series: dict | None = None, max_workers: int = 8) -> dict:
+    """
+    Incrementally sync SMARD series from SMARD into the store.
+
+    All chunk downloads of all series run as one concurrent batch; the results
+    are merged on ``utc_ms`` into shared columns of the same partitions.
+
+    Args:
+        store: Target store
+        limit_chunks: Number of trailing chunks to fetch for series not yet in the store
+        cache: Optional SMARDChunkCache for the HTTP requests
+        series: Mapping of store column -> SMARD filter ID (default: prices only)
+        max_workers: Number of concurrent downloads
+    Returns:
+        dict: Sync summary (chunks_fetched, rows_received, last_synced_utc_ms, series, failed_chunks)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .energy_price_forecast import (
+        FILTER_ID,
+        PRICE_REGIONS,
+        SMARDAPIError,
+        fetch_available_timestamps,
+        fetch_timeseries_for_timestamp,
+    )
+
+    series = series or {PRICE_COLUMN: PRICE_REGIONS.get(store.region, FILTER_ID)}
+    meta = store.read_meta()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        indexes = dict(zip(series, pool.map(
+            lambda col: fetch_available_timestamps(cache=cache, filter_id=series[col],
+                                                   resolution=store.resolution, region=store.region), series)))
+
+        jobs = []
+        for col, filter_id in series.items():
+            timestamps = indexes[col]
+            pending = chunks_to_sync(timestamps, _series_state(meta, col).get("last_synced_utc_ms"),
+                                     limit_chunks)
+            jobs.extend((col, filter_id, ts, ts != timestamps[-1]) for ts in pending)
+        logging.info(f"Syncing {len(jobs)} chunk(s) of {len(series)} series into {store.path}")
+
+        def fetch(job):
+            col, filter_id, ts, closed = job
+            try:
+                return col, ts, fetch_timeseries_for_timestamp(ts, cache=cache, closed=closed,
+                                                               filter_id=filter_id, column=col,
+                                                               resolution=store.resolution, region=store.region)
+            except SMARDAPIError as e:
+                logging.warning(f"Failed to load chunk {ts} of {col}: {str(e)}")
+                return col, ts, None
+
+        results = list(pool.map(fetch, jobs))
+
+    frames, failed = {}, {}
+    for col, ts, df in results:
+        if df is not None:
+            frames.setdefault(col, []).append(df)
+        else:
+            failed.setdefault(col, []).append(ts)
+
+    summary = {}
+    wide = None
+    for col, parts in frames.items():
+        data = pd.concat(parts, ignore_index=True)
+        data = data[pd.notna(data[col])].drop_duplicates("utc_ms", keep="last")
+        if data.empty:
+            continue
+        state = _series_state(meta, col)
+        state["filter_id"] = series[col]
+        # The watermark only advances through the chunks before the first failed one,
+        # so the next sync fetches the failed chunk again instead of leaving a hole
+        synced = data if col not in failed else data[data["utc_ms"] < min(failed[col])]
+        if not synced.empty:
+            state["last_synced_utc_ms"] = max(int(synced["utc_ms"].max()), state.get("last_synced_utc_ms") or 0)
+        meta.setdefault("series", {})[col] = state
+        summary[col] = len(data)
+        wide = data if wide is None else wide.merge(data, on="utc_ms", how="outer")
+
+    if wide is not None:
+        store.upsert(wide)
+
+    if "last_synced_utc_ms" in meta.get("series", {}).get(PRICE_COLUMN, {}):
+        meta["last_synced_utc_ms"] = meta["series"][PRICE_COLUMN]["last_synced_utc_ms"]
+    meta.update({
+        "region": store.region,
+        "resolution": store.resolution,
+        "synced_at": datetime.now().isoformat(),
+    })
+    store.write_meta(meta)
+
+    chunks_fetched = sum(len(parts) for parts in frames.values())
+    logging.info(f"Sync complete: {chunks_fetched} chunk(s), {sum(summary.values())} rows, "
+                 f"last synced {meta.get('last_synced_utc_ms')}")
+    return {
+        "chunks_fetched": chunks_fetched,
+        "rows_received": sum(summary.values()),
+        "last_synced_utc_ms": meta.get("last_synced_utc_ms"),
+        "series": summary,
+        "failed_chunks": {col: len(chunks) for col, chunks in failed.items()},
+    }
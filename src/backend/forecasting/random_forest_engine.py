@@ -0,0 +1,144 @@
+"""
+Random-forest price forecaster.
+
+Production counterpart of the RandomForestRegressor experiment in
+``experiments/forecasting_models/energy_price_forecast.py``. The experiment
+predicted one step ahead from 1h/24h/168h price lags; over a 30-day horizon
+those lags are not known, so this engine forecasts directly from calendar and
+holiday features. Prediction intervals are quantiles over the individual
+trees.
+
+``RandomForestPriceModel`` offers the same Prophet-like interface as
+``FourierRidgeModel`` so it can be used by the forecasting pipeline.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from .fourier_ridge import holiday_flags
+
+FEATURES = ("hour", "minute", "day_of_week", "month", "day_of_year", "is_weekend", "is_holiday")
+
+
+def calendar_features(ds) -> np.ndarray:
+    """Feature matrix of FEATURES for the given timestamps"""
+    ds = pd.DatetimeIndex(pd.to_datetime(ds))
+    return np.column_stack([
+        ds.hour,
+        ds.minute,
+        ds.dayofweek,
+        ds.month,
+        ds.dayofyear,
+        ds.dayofweek >= 5,
+        holiday_flags(ds),
+    ]).astype(np.float64)
+
+
+class RandomForestPriceModel:
+    """
+    RandomForestRegressor on calendar features with tree-quantile intervals.
+    """
+
+    def __init__(self, n_estimators: int = 100, max_depth: int = 20, min_samples_split: int = 10,
+                 random_state: int = 42, n_jobs: int = -1, interval_width: float = 0.95,
+                 uncertainty_samples: int = 1000):
+        """
+        Initialize the model (tree settings as in the experiment).
+
+        Args:
+            n_estimators: Number of trees
+            max_depth: Maximum tree depth
+            min_samples_split: Minimum samples to split a node
+            random_state: Seed of the forest
+            n_jobs: Threads used by scikit-learn
+            interval_width: Coverage of yhat_lower/yhat_upper
+            uncertainty_samples: Default number of paths drawn by predictive_samples
+        """
+        self.params = {
+            "n_estimators": n_estimators,
+            "max_depth": max_depth,
+            "min_samples_split": min_samples_split,
+            "random_state": random_state,
+            "n_jobs": n_jobs,
+        }
+        self.interval_width = interval_width
+        self.uncertainty_samples = uncertainty_samples
+        self.forest = None
+        self.history = None
+        self.fit_seconds = None
+
+    def fit(self, df: pd.DataFrame, value_column: str = "price_eur_per_mwh") -> "RandomForestPriceModel":
+        """
+        Fit the forest.
+
+        Args:
+            df: Training data with ds and value columns (Prophet's ds/y also works)
+            value_column: Target column (falls back to 'y')
+        Returns:
+            RandomForestPriceModel: self
+        """
+        from sklearn.ensemble import RandomForestRegressor
+
+        start = time.perf_counter()
+        column = value_column if value_column in df.columns else "y"
+        data = df[["ds", column]].dropna()
+        y = data[column].to_numpy(dtype=np.float64)
+        self.forest = RandomForestRegressor(**self.params).fit(calendar_features(data["ds"]), y)
+        self.history = pd.DataFrame({"ds": pd.to_datetime(data["ds"]).reset_index(drop=True), "y": y})
+        self.fit_seconds = time.perf_counter() - start
+        logging.info(f"Random forest fitted on {len(y)} rows in {self.fit_seconds:.2f}s")
+        return self
+
+    def make_future_dataframe(self, periods: int, freq: str = "h", include_history: bool = True) -> pd.DataFrame:
+        """Prophet-compatible future frame"""
+        last = self.history["ds"].max()
+        future = pd.date_range(last, periods=periods + 1, freq=freq)[1:]
+        ds = pd.concat([self.history["ds"], pd.Series(future)]) if include_history else pd.Series(future)
+        return pd.DataFrame({"ds": ds.reset_index(drop=True)})
+
+    def _tree_predictions(self, ds) -> np.ndarray:
+        X = calendar_features(ds)
+        return np.stack([tree.predict(X) for tree in self.forest.estimators_], axis=1)
+
+    def predict(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predict prices with intervals.
+
+        Args:
+            df: Frame with a ds column
+        Returns:
+            pd.DataFrame: ds, yhat, yhat_lower, yhat_upper
+        """
+        if self.forest is None:
+            raise ValueError("Model has not been fitted")
+        ds = pd.DatetimeIndex(pd.to_datetime(df["ds"]))
+        trees = self._tree_predictions(ds)
+        tail = (1 - self.interval_width) / 2
+        lower, upper = np.quantile(trees, [tail, 1 - tail], axis=1)
+        return pd.DataFrame({"ds": ds, "yhat": trees.mean(axis=1), "yhat_lower": lower, "yhat_upper": upper})
+
+    def predictive_samples(self, df: pd.DataFrame) -> dict:
+        """
+        Sample paths by drawing one tree per step.
+
+        Returns:
+            dict: {"yhat": array of shape (n_steps, uncertainty_samples)}
+        """
+        trees = self._tree_predictions(df["ds"])
+        draws = np.random.randint(0, trees.shape[1], size=(len(trees), self.uncertainty_samples))
+        return {"yhat": np.take_along_axis(trees, draws, axis=1)}
+
+
+def train_random_forest(df_hourly: pd.DataFrame, **params) -> RandomForestPriceModel:
+    """
+    Fit the random-forest engine (counterpart of train_prophet)
+    Args:
+        df_hourly: DataFrame with ds (datetime) and price_eur_per_mwh columns
+        **params: RandomForestPriceModel keyword arguments
+    Returns:
+        RandomForestPriceModel: Fitted model
+    """
+    return RandomForestPriceModel(**params).fit(df_hourly)
@@ -0,0 +1,44 @@
+"""
+Time resolutions shared by the price forecast, the tariff and the risk analysis.
+
+Prices are published per hour or per quarter hour, and uploaded consumption can use
+either spacing. Every module that combines the two uses the same map and the same
+rule for the grid they are compared on.
+"""
+
+import pandas as pd
+
+# pandas frequency of each supported resolution
+RESOLUTION_FREQ = {"hour": "h", "quarterhour": "15min"}
+
+
+def resolution_step(resolution: str) -> pd.Timedelta:
+    """Length of one step of a resolution name ('hour', 'quarterhour') or a pandas frequency"""
+    return pd.Timedelta(pd.tseries.frequencies.to_offset(RESOLUTION_FREQ.get(resolution, resolution)))
+
+
+def infer_interval(datetimes: pd.Series) -> pd.Timedelta:
+    """Most common spacing of a datetime series (1 hour for a single row)"""
+    return datetimes.diff().mode()[0] if len(datetimes) > 1 else pd.Timedelta(hours=1)
+
+
+def common_interval(consumption_interval: pd.Timedelta, price_interval: pd.Timedelta,
+                    resolution: str = None) -> pd.Timedelta:
+    """
+    Grid on which consumption and prices are compared.
+
+    The coarser of the two native intervals, so neither series is interpolated, or the
+    explicitly requested resolution if that is coarser still.
+
+    Args:
+        consumption_interval: Spacing of the consumption readings
+        price_interval: Spacing of the prices
+        resolution: Optional coarser resolution ('hour', 'quarterhour' or a pandas frequency)
+
+    Returns:
+        Step of the common grid
+    """
+    target = max(consumption_interval, price_interval)
+    if resolution is not None:
+        target = max(target, resolution_step(resolution))
+    return target
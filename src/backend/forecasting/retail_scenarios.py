@@ -0,0 +1,175 @@
+"""
+Retail price curves for many supplier-markup scenarios at once.
+
+``apply_retail_pricing`` maps a wholesale forecast to one retail curve. This
+module evaluates a whole grid of (profile_costs, risk_premium, margin,
+floor_eur_per_mwh) scenarios in one broadcasted float32 computation and
+returns an ``(S scenarios, T steps)`` matrix. The per-snapshot arrays (μ, σ and
+the zero-censored expectation) are cached, so further scenario requests
+against the same forecast only pay for the broadcast.
+"""
+
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+SCENARIO_COLUMNS = ("profile_costs", "risk_premium", "margin", "floor_eur_per_mwh")
+# Defaults of apply_retail_pricing
+DEFAULT_SCENARIO = {"profile_costs": 10.0, "risk_premium": 5.0, "margin": 55.0, "floor_eur_per_mwh": 0.0}
+INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+# z-value of the 95% interval Prophet reports
+Z_95 = 1.96
+
+
+def expected_censored(mu: np.ndarray, sigma: np.ndarray, threshold=0.0) -> np.ndarray:
+    """
+    E[max(threshold, Y)] for Y ~ N(mu, sigma²), broadcasting over all arguments.
+
+    Uses E[max(c, Y)] = c + (μ - c)·Φ(z) + σ·φ(z) with z = (μ - c) / σ, evaluated with
+    scipy.special.ndtr and an explicit normal pdf in the dtype of the inputs.
+    """
+    shifted = mu - threshold
+    z = shifted / sigma
+    pdf = np.exp(-0.5 * z * z) * z.dtype.type(INV_SQRT_2PI)
+    return threshold + shifted * ndtr(z) + sigma * pdf
+
+
+def scenario_grid(**axes) -> pd.DataFrame:
+    """
+    Cartesian product of markup values, e.g. scenario_grid(margin=[40, 55, 70], risk_premium=[0, 5]).
+
+    Components that are not given keep the apply_retail_pricing default.
+    """
+    unknown = set(axes) - set(SCENARIO_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown scenario components {sorted(unknown)}, expected {SCENARIO_COLUMNS}")
+    values = {name: list(np.atleast_1d(axes.get(name, DEFAULT_SCENARIO[name]))) for name in SCENARIO_COLUMNS}
+    return pd.DataFrame(list(itertools.product(*values.values())), columns=list(SCENARIO_COLUMNS))
+
+
+class RetailScenarioEngine:
+    """
+    Broadcasted retail pricing with a small LRU cache of per-snapshot moments.
+    """
+
+    def __init__(self, max_snapshots: int = 8, dtype=np.float32):
+        """
+        Initialize the engine.
+
+        Args:
+            max_snapshots: Number of forecast snapshots whose moments are kept
+            dtype: Floating point type of the computation
+        """
+        self.max_snapshots = max_snapshots
+        self.dtype = dtype
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def snapshot_key(forecast: pd.DataFrame) -> str:
+        """Content key of a forecast (used when the caller has no snapshot key)"""
+        columns = [c for c in ("ds", "yhat", "yhat_lower", "yhat_upper") if c in forecast.columns]
+        hashed = pd.util.hash_pandas_object(forecast[columns], index=False).values
+        return hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+
+    def moments(self, forecast: pd.DataFrame, key: str | None = None) -> dict:
+        """
+        Return the cached μ, σ and E[max(0, Y)] arrays of a forecast.
+
+        Args:
+            forecast: Forecast with yhat and (optionally) yhat_lower/yhat_upper
+            key: Snapshot key (e.g. the forecast store key), defaults to a content hash
+        Returns:
+            dict: mu, sigma (None without intervals) and expected_positive arrays
+        """
+        key = key or self.snapshot_key(forecast)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+
+        mu = forecast["yhat"].to_numpy(dtype=self.dtype)
+        if "yhat_lower" in forecast.columns and "yhat_upper" in forecast.columns:
+            sigma = (forecast["yhat_upper"].to_numpy(dtype=self.dtype)
+                     - forecast["yhat_lower"].to_numpy(dtype=self.dtype)) / self.dtype(2 * Z_95)
+            sigma = np.maximum(sigma, self.dtype(1e-6))  # Avoid division by zero
+            expected_positive = expected_censored(mu, sigma, self.dtype(0.0))
+        else:
+            sigma = None
+            expected_positive = np.maximum(mu, self.dtype(0.0))
+        entry = {"mu": mu, "sigma": sigma, "expected_positive": expected_positive}
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = entry
+            while len(self._cache) > self.max_snapshots:
+                self._cache.popitem(last=False)
+        return entry
+
+    def retail_matrix(self, forecast: pd.DataFrame, scenarios, key: str | None = None,
+                      censor_at_floor: bool = False) -> np.ndarray:
+        """
+        Retail prices (EUR/MWh) of every scenario at every forecast step.
+
+        Args:
+            forecast: Forecast with yhat and (optionally) yhat_lower/yhat_upper
+            scenarios: DataFrame/list of dicts with SCENARIO_COLUMNS (missing columns use the defaults)
+            key: Snapshot key for the moment cache
+            censor_at_floor: Use E[max(floor, Y)] per scenario instead of max(E[max(0, Y)], floor)
+                             (the latter matches apply_retail_pricing)
+        Returns:
+            np.ndarray: (S, T) matrix in the engine dtype
+        """
+        scenarios = pd.DataFrame(scenarios)
+        for name in SCENARIO_COLUMNS:
+            if name not in scenarios.columns:
+                scenarios[name] = DEFAULT_SCENARIO[name]
+        markup = (scenarios["profile_costs"] + scenarios["risk_premium"] + scenarios["margin"]).to_numpy(self.dtype)
+        floor = scenarios["floor_eur_per_mwh"].to_numpy(self.dtype)[:, None]
+        m = self.moments(forecast, key)
+
+        if censor_at_floor and m["sigma"] is not None:
+            energy = expected_censored(m["mu"][None, :], m["sigma"][None, :], floor)
+        elif censor_at_floor:
+            energy = np.maximum(m["mu"][None, :], floor)
+        else:
+            energy = np.maximum(m["expected_positive"][None, :], floor)
+        return energy + markup[:, None]
+
+    def summarize(self, forecast: pd.DataFrame, scenarios, key: str | None = None,
+                  censor_at_floor: bool = False) -> pd.DataFrame:
+        """Scenario table with average, minimum and maximum retail price (EUR/MWh)"""
+        scenarios = pd.DataFrame(scenarios).reset_index(drop=True)
+        matrix = self.retail_matrix(forecast, scenarios, key, censor_at_floor)
+        summary = scenarios.copy()
+        summary["avg_retail"] = matrix.mean(axis=1, dtype=np.float64)
+        summary["min_retail"] = matrix.min(axis=1)
+        summary["max_retail"] = matrix.max(axis=1)
+        return summary
+
+
+_DEFAULT_ENGINE = RetailScenarioEngine()
+
+
+def apply_retail_pricing_grid(forecast: pd.DataFrame, scenarios, key: str | None = None,
+                              censor_at_floor: bool = False) -> np.ndarray:
+    """
+    Broadcasted counterpart of apply_retail_pricing for a grid of markup scenarios.
+
+    Args:
+        forecast: Forecast with 'yhat', 'yhat_lower', 'yhat_upper' columns
+        scenarios: DataFrame/list of dicts (see scenario_grid)
+        key: Snapshot key for the shared moment cache
+        censor_at_floor: See RetailScenarioEngine.retail_matrix
+    Returns:
+        np.ndarray: (S scenarios, T steps) float32 retail prices in EUR/MWh
+    """
+    return _DEFAULT_ENGINE.retail_matrix(forecast, scenarios, key, censor_at_floor)
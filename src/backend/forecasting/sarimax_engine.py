@@ -0,0 +1,399 @@
+"""
+SARIMAX price engine with weather regressors and state-space updates.
+
+Production version of ``experiments/forecasting_models/SarimaForecaster.py``:
+SARIMAX(1,0,1)(1,1,1,24) on hourly prices with temperature, relative humidity,
+weekday and weekend flags as exogenous variables. Weather comes from
+``app_data/combined_market_temperature_data.csv`` through a cached loader;
+timestamps the file does not cover (including the forecast horizon) use the
+month x hour-of-day climatology, as PricePredictor.py did with monthly means.
+
+A full maximum-likelihood fit takes minutes. Daily updates instead keep the
+fitted parameters and run the Kalman filter over the new observations only,
+which is what ``SARIMAXResults.extend`` does. The persisted model holds the
+parameters, the last 24 observations and the filtered state before them rather
+than the full results object (hundreds of MB), so loading and updating stay
+cheap::
+
+    app_data/models/<region>/<resolution>/sarimax/price_model.pkl
+    app_data/models/<region>/<resolution>/sarimax/price_model.meta.json
+    app_data/models/<region>/<resolution>/sarimax/fit_log.jsonl
+"""
+
+import logging
+import os
+import pickle
+import time
+import warnings
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .model_store import ModelStore, training_fingerprint
+
+DEFAULT_WEATHER_FILE = os.path.join("app_data", "combined_market_temperature_data.csv")
+WEATHER_COLUMNS = ("temperature", "relative_humidity")
+EXOG_COLUMNS = ("temperature", "relative_humidity", "weekday", "is_weekend")
+# Observations kept with the persisted state (the seasonal period)
+TAIL_STEPS = 24
+# Largest forward shift of the training window that is handled by a state update
+MAX_UPDATE_SHIFT = pd.Timedelta(days=7)
+# Re-estimate the parameters after this long of state updates only
+REFIT_AFTER = pd.Timedelta(days=30)
+
+
+@lru_cache(maxsize=4)
+def _read_weather(path: str, mtime: float) -> tuple:
+    raw = pd.read_csv(path, usecols=["datetime", *WEATHER_COLUMNS], parse_dates=["datetime"])
+    hourly = raw.set_index("datetime")[list(WEATHER_COLUMNS)].resample("h").mean().dropna()
+    climatology = hourly.groupby([hourly.index.month, hourly.index.hour]).mean()
+    return hourly, climatology
+
+
+def load_weather(path: str = DEFAULT_WEATHER_FILE) -> tuple:
+    """
+    Hourly weather observations and their month x hour climatology (cached per file version).
+
+    Args:
+        path: CSV with datetime, temperature and relative_humidity columns
+    Returns:
+        tuple: (hourly DataFrame indexed by datetime, climatology indexed by (month, hour))
+    """
+    return _read_weather(os.path.abspath(path), os.path.getmtime(path))
+
+
+def exog_features(index: pd.DatetimeIndex, weather_path: str = DEFAULT_WEATHER_FILE) -> pd.DataFrame:
+    """
+    Exogenous regressors (EXOG_COLUMNS) for hourly timestamps.
+
+    Args:
+        index: Hourly timestamps (naive Europe/Berlin)
+        weather_path: Weather CSV for load_weather
+    Returns:
+        pd.DataFrame: Regressors indexed like ``index``
+    """
+    hourly, climatology = load_weather(weather_path)
+    weather = hourly.reindex(index)
+    fallback = climatology.reindex(pd.MultiIndex.from_arrays([index.month, index.hour])).to_numpy()
+    exog = pd.DataFrame(np.where(weather.isna(), fallback, weather), index=index, columns=list(WEATHER_COLUMNS))
+    exog["weekday"] = index.dayofweek
+    exog["is_weekend"] = (index.dayofweek >= 5).astype(int)
+    return exog
+
+
+def _hourly_prices(df: pd.DataFrame, value_column: str) -> pd.Series:
+    """Regular hourly series (SARIMAX and extend need a gap-free index)"""
+    column = value_column if value_column in df.columns else "y"
+    series = df.set_index(pd.to_datetime(df["ds"]))[column].sort_index()
+    return series.resample("h").mean().interpolate(limit_direction="both").asfreq("h")
+
+
+class SarimaxPriceModel:
+    """
+    SARIMAX price model with Prophet-like predict() and cheap state updates.
+    """
+
+    def __init__(self, order: tuple = (1, 0, 1), seasonal_order: tuple = (1, 1, 1, 24),
+                 weather_path: str = DEFAULT_WEATHER_FILE, interval_width: float = 0.95,
+                 uncertainty_samples: int = 1000, maxiter: int = 50):
+        """
+        Initialize the model.
+
+        Args:
+            order: ARIMA order (p, d, q)
+            seasonal_order: Seasonal order (P, D, Q, s)
+            weather_path: Weather CSV for the exogenous variables
+            interval_width: Coverage of yhat_lower/yhat_upper
+            uncertainty_samples: Default number of simulated paths for predictive_samples
+            maxiter: Optimizer iterations of a full fit
+        """
+        self.order = tuple(order)
+        self.seasonal_order = tuple(seasonal_order)
+        self.weather_path = weather_path
+        self.interval_width = interval_width
+        self.uncertainty_samples = uncertainty_samples
+        self.maxiter = maxiter
+        self.params = None
+        self.history = None
+        self.fitted = None
+        self.full_fit_at = None
+        self.fit_seconds = None
+        # Persisted filter anchor: last TAIL_STEPS observations and the predicted state before them
+        self._tail = None
+        self._state = None
+        self._results = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_results"] = None  # Rebuilt from the tail on demand
+        return state
+
+    def _model(self, endog: pd.Series):
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+        return SARIMAX(endog, exog=exog_features(endog.index, self.weather_path),
+                       order=self.order, seasonal_order=self.seasonal_order)
+
+    def _filter_from_state(self, endog: pd.Series):
+        """Kalman filter over ``endog`` starting from the persisted state"""
+        model = self._model(endog)
+        model.ssm.initialize_known(*self._state)
+        return model.filter(self.params)
+
+    def _set_anchor(self, results, endog: pd.Series) -> None:
+        start = len(endog) - TAIL_STEPS
+        self._tail = endog.iloc[start:]
+        self._state = (results.predicted_state[:, start].copy(), results.predicted_state_cov[:, :, start].copy())
+        self._results = None
+
+    @property
+    def results(self):
+        """Filter results over the persisted tail (enough to forecast and simulate)"""
+        if self._results is None:
+            self._results = self._filter_from_state(self._tail)
+        return self._results
+
+    @property
+    def last_ds(self) -> pd.Timestamp:
+        return self._tail.index[-1]
+
+    def fit(self, df: pd.DataFrame, value_column: str = "price_eur_per_mwh") -> "SarimaxPriceModel":
+        """
+        Estimate the parameters from scratch.
+
+        Args:
+            df: Training data with ds and value columns (Prophet's ds/y also works)
+            value_column: Target column (falls back to 'y')
+        Returns:
+            SarimaxPriceModel: self
+        """
+        start = time.perf_counter()
+        endog = _hourly_prices(df, value_column)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Convergence chatter of the optimizer
+            results = self._model(endog).fit(disp=False, maxiter=self.maxiter)
+        self.params = results.params
+        self.fitted = results.fittedvalues
+        self.history = pd.to_datetime(df["ds"]).reset_index(drop=True)
+        self._set_anchor(results, endog)
+        self._results = results
+        self.full_fit_at = pd.Timestamp(datetime.now()).isoformat()
+        self.fit_seconds = time.perf_counter() - start
+        logging.info(f"SARIMAX fitted on {len(endog)} hourly prices in {self.fit_seconds:.1f}s")
+        return self
+
+    def update(self, df: pd.DataFrame, value_column: str = "price_eur_per_mwh") -> int:
+        """
+        Filter the observations after the last known hour with the current parameters.
+
+        Args:
+            df: Training data with ds and value columns (older rows are ignored)
+            value_column: Target column
+        Returns:
+            int: Number of new hourly observations
+        """
+        if self.params is None:
+            raise ValueError("Model has not been fitted")
+        start = time.perf_counter()
+        endog = _hourly_prices(df, value_column)
+        new = endog[endog.index > self.last_ds]
+        if new.empty:
+            return 0
+        new = new.reindex(pd.date_range(self.last_ds + pd.Timedelta(hours=1), new.index[-1], freq="h"))
+        endog = pd.concat([self._tail, new.interpolate(limit_direction="both")]).asfreq("h")
+        results = self._filter_from_state(endog)
+
+        window_start = pd.to_datetime(df["ds"]).min()
+        self.fitted = pd.concat([self.fitted[self.fitted.index < endog.index[0]], results.fittedvalues])
+        self.fitted = self.fitted[self.fitted.index >= window_start.floor("h")]
+        self.history = pd.to_datetime(df["ds"]).reset_index(drop=True)
+        self._set_anchor(results, endog)
+        self._results = results
+        self.fit_seconds = time.perf_counter() - start
+        logging.info(f"SARIMAX state updated with {len(new)} new hours in {self.fit_seconds:.2f}s")
+        return int(len(new))
+
+    def make_future_dataframe(self, periods: int, freq: str = "h", include_history: bool = True) -> pd.DataFrame:
+        """Prophet-compatible future frame"""
+        last = self.history.max()
+        future = pd.date_range(last, periods=periods + 1, freq=freq)[1:]
+        ds = pd.concat([self.history, pd.Series(future)]) if include_history else pd.Series(future)
+        return pd.DataFrame({"ds": ds.reset_index(drop=True)})
+
+    def _horizon(self, ds: pd.DatetimeIndex) -> int:
+        return max(0, int((ds.floor("h").max() - self.last_ds) / pd.Timedelta(hours=1)))
+
+    def predict(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predict prices with intervals; sub-hourly timestamps use their hour.
+
+        In-sample rows hold the one-step-ahead predictions of the filter.
+
+        Args:
+            df: Frame with a ds column
+        Returns:
+            pd.DataFrame: ds, yhat, yhat_lower, yhat_upper
+        """
+        from scipy.stats import norm
+
+        if self.params is None:
+            raise ValueError("Model has not been fitted")
+        ds = pd.DatetimeIndex(pd.to_datetime(df["ds"]))
+        hours = ds.floor("h")
+        z = norm.ppf(0.5 + self.interval_width / 2)
+        sigma = float(np.sqrt(self.params["sigma2"]))
+        frame = pd.DataFrame({"yhat": self.fitted})
+        frame["yhat_lower"] = frame["yhat"] - z * sigma
+        frame["yhat_upper"] = frame["yhat"] + z * sigma
+
+        steps = self._horizon(ds)
+        if steps:
+            index = pd.date_range(self.last_ds + pd.Timedelta(hours=1), periods=steps, freq="h")
+            forecast = self.results.get_forecast(steps, exog=exog_features(index, self.weather_path))
+            bounds = forecast.conf_int(alpha=1 - self.interval_width).to_numpy()
+            frame = pd.concat([frame, pd.DataFrame({
+                "yhat": forecast.predicted_mean.to_numpy(),
+                "yhat_lower": bounds[:, 0],
+                "yhat_upper": bounds[:, 1],
+            }, index=index)])
+
+        frame = frame[~frame.index.duplicated(keep="last")].reindex(hours)
+        return pd.DataFrame({"ds": ds, **{c: frame[c].to_numpy() for c in ("yhat", "yhat_lower", "yhat_upper")}})
+
+    def predictive_samples(self, df: pd.DataFrame) -> dict:
+        """
+        Simulated sample paths from the end of the data.
+
+        Returns:
+            dict: {"yhat": array of shape (n_steps, uncertainty_samples)}
+        """
+        ds = pd.DatetimeIndex(pd.to_datetime(df["ds"]))
+        steps = self._horizon(ds)
+        index = pd.date_range(self.last_ds + pd.Timedelta(hours=1), periods=steps, freq="h")
+        simulated = self.results.simulate(steps, anchor="end", repetitions=self.uncertainty_samples,
+                                          exog=exog_features(index, self.weather_path))
+        paths = pd.DataFrame(np.asarray(simulated).reshape(steps, -1), index=index)
+        return {"yhat": paths.reindex(ds.floor("h")).to_numpy()}
+
+
+def train_sarimax(df_hourly: pd.DataFrame, **params) -> SarimaxPriceModel:
+    """
+    Fit the SARIMAX engine from scratch (counterpart of train_prophet)
+    Args:
+        df_hourly: DataFrame with ds (datetime) and price_eur_per_mwh columns
+        **params: SarimaxPriceModel keyword arguments
+    Returns:
+        SarimaxPriceModel: Fitted model
+    """
+    return SarimaxPriceModel(**params).fit(df_hourly)
+
+
+class SarimaxStore(ModelStore):
+    """
+    ModelStore for the pickled SARIMAX model.
+    """
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.root, "price_model.pkl")
+
+    def load(self):
+        """
+        Load the stored model.
+
+        Returns:
+            SarimaxPriceModel | None: The stored model or None if there is none
+        """
+        if not os.path.exists(self.model_path):
+            return None
+        with open(self.model_path, "rb") as f:
+            return pickle.load(f)
+
+    def save(self, model, fingerprint: dict) -> None:
+        """Atomically replace the stored model and its metadata"""
+        import json
+
+        os.makedirs(self.root, exist_ok=True)
+        meta = {"fingerprint": fingerprint, "full_fit_at": model.full_fit_at, "saved_at": datetime.now().isoformat()}
+        tmp_path = self.model_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.model_path)
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(meta, indent=2))
+        os.replace(tmp_path, self.meta_path)
+
+
+def update_mode(meta: dict, current: dict, now: datetime | None = None) -> str:
+    """
+    Decide how to obtain a model for the current training window.
+
+    Args:
+        meta: Metadata of the stored model (empty if there is none)
+        current: Fingerprint of the current training window
+        now: Reference time for the refit interval
+    Returns:
+        str: "reuse", "update" or "cold"
+    """
+    previous = meta.get("fingerprint")
+    if not previous or previous.get("config_hash") != current["config_hash"]:
+        return "cold"
+    if previous == current:
+        return "reuse"
+    shift = pd.Timestamp(current["window_end"]) - pd.Timestamp(previous["window_end"])
+    age = pd.Timestamp(now or datetime.now()) - pd.Timestamp(meta.get("full_fit_at") or datetime.min)
+    if pd.Timedelta(0) < shift <= MAX_UPDATE_SHIFT and age <= REFIT_AFTER:
+        return "update"
+    return "cold"
+
+
+def fit_sarimax_model(df: pd.DataFrame, store: SarimaxStore, params: dict | None = None,
+                      force_cold: bool = False):
+    """
+    Return a SARIMAX price model, updating the stored one with new observations where possible.
+
+    Args:
+        df: Training data with ds and price_eur_per_mwh columns
+        store: Store holding the previous model
+        params: SarimaxPriceModel keyword arguments
+        force_cold: Always re-estimate the parameters
+    Returns:
+        tuple: (model, fit record)
+    """
+    params = params or {}
+    fingerprint = training_fingerprint(df, params)
+    meta = store.read_meta()
+    mode = "cold" if force_cold else update_mode(meta, fingerprint)
+
+    model = None
+    if mode in ("reuse", "update"):
+        try:
+            model = store.load()
+        except Exception as e:
+            logging.warning(f"Could not load stored SARIMAX model ({e}), fitting from scratch")
+            mode = "cold"
+        if model is None:
+            mode = "cold"
+        elif mode == "reuse":
+            logging.info("Training window unchanged, reusing stored SARIMAX model")
+            return model, {"mode": mode, "fingerprint": fingerprint}
+
+    start = time.perf_counter()
+    new_steps = None
+    if mode == "update":
+        new_steps = model.update(df)
+    else:
+        model = train_sarimax(df, **params)
+    record = {
+        "fitted_at": datetime.now().isoformat(),
+        "mode": mode,
+        "fit_seconds": round(time.perf_counter() - start, 3),
+        "new_steps": new_steps,
+        "fingerprint": fingerprint,
+    }
+    store.save(model, fingerprint)
+    store.log_fit(record)
+    logging.info(f"SARIMAX price model ready ({mode}) in {record['fit_seconds']:.1f}s")
+    return model, record
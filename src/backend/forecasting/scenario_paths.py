@@ -0,0 +1,96 @@
+"""
+Probabilistic price scenario paths drawn once per forecast snapshot.
+
+Prophet's posterior predictive samples are drawn for the future part of the
+forecast and stored as an ``(n_paths, n_steps)`` float32 matrix next to the
+snapshot in the forecast store::
+
+    app_data/forecasts/<region>/<resolution>/<key>.paths.npy
+    app_data/forecasts/<region>/<resolution>/<key>.paths.json
+
+The matrix is an uncompressed ``.npy`` so it can be memory-mapped: volatility,
+quantile and scenario queries are slices of that array instead of new model
+calls.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+PATHS_DTYPE = np.float32
+
+
+def draw_sample_paths(model, horizon_hours: int, freq: str = "h", n_paths: int = 500,
+                      seed: int | None = 0) -> tuple:
+    """
+    Draw predictive sample paths for the forecast horizon.
+
+    Args:
+        model: Fitted Prophet model
+        horizon_hours: Forecast horizon in hours
+        freq: Forecast frequency ("h" or "15min")
+        n_paths: Number of sample paths
+        seed: Random seed for reproducible paths (None for fresh randomness)
+    Returns:
+        tuple: (float32 array of shape (n_paths, n_steps) in EUR/MWh, DatetimeIndex of the steps)
+    """
+    periods = int(pd.Timedelta(hours=horizon_hours) / pd.Timedelta(pd.tseries.frequencies.to_offset(freq)))
+    future = model.make_future_dataframe(periods=periods, freq=freq, include_history=False)
+    previous_samples = model.uncertainty_samples
+    state = np.random.get_state()
+    try:
+        model.uncertainty_samples = n_paths
+        if seed is not None:
+            np.random.seed(seed)
+        samples = model.predictive_samples(future)["yhat"]  # (n_steps, n_paths)
+    finally:
+        model.uncertainty_samples = previous_samples
+        np.random.set_state(state)
+    paths = np.ascontiguousarray(samples.T, dtype=PATHS_DTYPE)
+    logging.info(f"Drew {paths.shape[0]} price paths over {paths.shape[1]} steps "
+                 f"({paths.nbytes / 2**20:.1f} MiB as float32)")
+    return paths, pd.DatetimeIndex(future["ds"])
+
+
+def paths_meta(ds: pd.DatetimeIndex, paths: np.ndarray, freq: str, **extra) -> dict:
+    """Metadata describing the time axis and layout of a path matrix"""
+    return {
+        "start": pd.Timestamp(ds[0]).isoformat(),
+        "freq": freq,
+        "n_paths": int(paths.shape[0]),
+        "n_steps": int(paths.shape[1]),
+        "dtype": str(np.dtype(PATHS_DTYPE)),
+        "units": "EUR/MWh",
+        **extra,
+    }
+
+
+def paths_index(meta: dict) -> pd.DatetimeIndex:
+    """Rebuild the time axis of a stored path matrix"""
+    return pd.date_range(meta["start"], periods=meta["n_steps"], freq=meta["freq"])
+
+
+def step_slice(meta: dict, start=None, end=None) -> slice:
+    """
+    Column slice of the steps in [start, end] (naive Europe/Berlin times like the forecast).
+    """
+    index = paths_index(meta)
+    lo = index.searchsorted(pd.Timestamp(start), side="left") if start is not None else 0
+    hi = index.searchsorted(pd.Timestamp(end), side="right") if end is not None else len(index)
+    return slice(int(lo), int(hi))
+
+
+def path_quantiles(paths: np.ndarray, quantiles=(0.05, 0.5, 0.95), steps: slice = slice(None)) -> np.ndarray:
+    """Per-step quantiles, shape (len(quantiles), n_steps)"""
+    return np.quantile(paths[:, steps], quantiles, axis=0).astype(PATHS_DTYPE)
+
+
+def path_std(paths: np.ndarray, steps: slice = slice(None)) -> np.ndarray:
+    """Per-step standard deviation across paths"""
+    return paths[:, steps].std(axis=0, dtype=np.float64).astype(PATHS_DTYPE)
+
+
+def path_mean_price(paths: np.ndarray, steps: slice = slice(None)) -> np.ndarray:
+    """Average price of each scenario over the selected steps, shape (n_paths,)"""
+    return paths[:, steps].mean(axis=1, dtype=np.float64)
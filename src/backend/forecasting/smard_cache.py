@@ -0,0 +1,159 @@
+"""
+On-disk HTTP cache for SMARD chart_data responses.
+
+Responses are keyed by (filter, region, resolution, timestamp) and stored as::
+
+    app_data/smard_cache/<filter>/<region>/<resolution>/<timestamp>.json
+    app_data/smard_cache/<filter>/<region>/<resolution>/<timestamp>.meta.json
+
+Closed weekly chunks never change and are served from disk without any
+network access. Open resources (the newest chunk and the timestamp index) are
+served from disk for ``ttl_seconds`` and then revalidated with a conditional
+request (``If-None-Match`` / ``If-Modified-Since``).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+DEFAULT_CACHE_DIR = os.path.join("app_data", "smard_cache")
+
+
+class SMARDChunkCache:
+    """
+    Content cache for SMARD JSON resources with hit/miss counters.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: int = 3600,
+                 session: requests.Session | None = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cached responses
+            ttl_seconds: How long open resources are served without revalidation
+            session: Optional requests session (defaults to a new session)
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.session = session or requests.Session()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.network_requests = 0
+        self.bytes_downloaded = 0
+        # Counters are shared by concurrent downloads
+        self._lock = threading.Lock()
+
+    def _count(self, **deltas) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def stats(self) -> dict:
+        """Return the cache counters"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "network_requests": self.network_requests,
+            "bytes_downloaded": self.bytes_downloaded,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+    def log_stats(self) -> None:
+        s = self.stats()
+        logging.info(f"SMARD cache: {s['hits']} hits, {s['misses']} misses, "
+                     f"{s['revalidations']} revalidated, {s['network_requests']} requests, "
+                     f"{s['bytes_downloaded'] / 1024:.1f} KiB downloaded")
+
+    def _paths(self, key: tuple) -> tuple:
+        filter_id, region, resolution, timestamp = (str(k) for k in key)
+        base = os.path.join(self.cache_dir, filter_id, region, resolution, timestamp)
+        return base + ".json", base + ".meta.json"
+
+    def _store(self, key: tuple, body: bytes, response: requests.Response, immutable: bool) -> None:
+        body_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        meta = {
+            "url": response.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "immutable": immutable,
+        }
+        for path, content, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta), "w")):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, mode) as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+    def _touch(self, key: tuple, meta: dict, immutable: bool) -> None:
+        _, meta_path = self._paths(key)
+        meta.update({"fetched_at": time.time(), "immutable": immutable or meta.get("immutable", False)})
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def get_json(self, url: str, key: tuple, immutable: bool = False, timeout: int = 60) -> dict:
+        """
+        Return the JSON resource at ``url``, using the cache where possible.
+
+        Args:
+            url: Resource URL
+            key: (filter, region, resolution, timestamp) cache key
+            immutable: True for closed chunks that can never change
+            timeout: Request timeout in seconds
+        Returns:
+            dict: Parsed JSON payload
+        Raises:
+            requests.exceptions.RequestException: If the request fails and nothing is cached
+        """
+        body_path, meta_path = self._paths(key)
+        meta = None
+        if os.path.exists(body_path) and os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            fresh = time.time() - meta.get("fetched_at", 0) < self.ttl_seconds
+            # A chunk cached while it was still open must be revalidated once after it closes
+            if meta.get("immutable") or (fresh and not immutable):
+                self._count(hits=1)
+                return self._read(body_path)
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            self._count(network_requests=1)
+            response = self.session.get(url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and meta is not None:
+                self._count(hits=1, revalidations=1)
+                self._touch(key, meta, immutable)
+                return self._read(body_path)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            if meta is None:
+                raise
+            logging.warning(f"Revalidation of {url} failed, serving stale cache entry")
+            self._count(hits=1)
+            return self._read(body_path)
+
+        self._count(misses=1, bytes_downloaded=len(response.content))
+        payload = response.json()
+        self._store(key, response.content, response, immutable)
+        return payload
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
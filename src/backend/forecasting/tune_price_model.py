@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hyperparameter search for the Prophet price model.
+
+Candidate settings are evaluated with rolling-origin cross-validation on the
+local price store. Folds run in a process pool and every fold result is cached
+on disk per (parameters, fold data fingerprint), so a rerun only evaluates
+candidates or folds that have not been seen before::
+
+    app_data/tuning/fold_cache/<fold fingerprint>/<params hash>.json
+    app_data/tuning/price_model_pareto.json
+
+The output file holds the accuracy-vs-training-time Pareto front and the
+selected configuration that ``energy_price_forecast.main()`` trains with.
+
+Run from the project root:
+    python -m src.backend.forecasting.tune_price_model --search random --samples 12
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TUNING_DIR = os.path.join("app_data", "tuning")
+PARETO_FILE = "price_model_pareto.json"
+
+# Settings explored by hand in analysis/ProphetParametersTest.ipynb, as train_prophet arguments
+SEARCH_SPACE = {
+    "seasonality_mode": ["additive", "multiplicative"],
+    "changepoint_prior_scale": [0.01, 0.05, 0.2, 0.5],
+    "changepoint_range": [0.8, 0.95],
+    "season_daily": [True, False],
+}
+
+
+def params_hash(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def candidate_grid(space: dict = SEARCH_SPACE) -> list:
+    """Return all parameter combinations of the search space"""
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def candidate_sample(samples: int, seed: int = 0, space: dict = SEARCH_SPACE) -> list:
+    """Return a reproducible random subset of the grid (without repeats)"""
+    grid = candidate_grid(space)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(grid), size=min(samples, len(grid)), replace=False)
+    return [grid[i] for i in sorted(picks)]
+
+
+def rolling_folds(df: pd.DataFrame, n_folds: int = 3, horizon_hours: int = 168,
+                  step_hours: int | None = None) -> list:
+    """
+    Split the data into rolling-origin folds.
+
+    Each fold trains on everything before its cutoff and is scored on the
+    following ``horizon_hours``. The last fold ends at the end of the data.
+
+    Args:
+        df: Training data with ds and price_eur_per_mwh columns
+        n_folds: Number of folds
+        horizon_hours: Length of each test window
+        step_hours: Distance between cutoffs (defaults to horizon_hours)
+    Returns:
+        list: (train, test) DataFrame pairs, oldest cutoff first
+    """
+    df = df.sort_values("ds").reset_index(drop=True)
+    step = pd.Timedelta(hours=step_hours or horizon_hours)
+    horizon = pd.Timedelta(hours=horizon_hours)
+    end = df["ds"].max()
+    folds = []
+    for i in reversed(range(n_folds)):
+        cutoff = end - horizon - i * step
+        train = df[df["ds"] <= cutoff]
+        test = df[(df["ds"] > cutoff) & (df["ds"] <= cutoff + horizon)]
+        if len(train) and len(test):
+            folds.append((train, test))
+    return folds
+
+
+def fold_fingerprint(train: pd.DataFrame, test: pd.DataFrame) -> str:
+    """Hash of the data a fold is trained and scored on"""
+    from .model_store import training_fingerprint
+    train_fp = training_fingerprint(train, {})
+    test_fp = training_fingerprint(test, {})
+    return f"{train_fp['data_hash']}{test_fp['data_hash']}"[:24]
+
+
+def evaluate_fold(params: dict, train: pd.DataFrame, test: pd.DataFrame) -> dict:
+    """
+    Fit one candidate on one fold and score it (runs in a worker process).
+
+    Returns:
+        dict: mae, rmse and fit_seconds of the fold
+    """
+    from .energy_price_forecast import train_prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    start = time.perf_counter()
+    model = train_prophet(train, **params)
+    fit_seconds = time.perf_counter() - start
+    forecast = model.predict(test[["ds"]])
+    errors = forecast["yhat"].to_numpy() - test["price_eur_per_mwh"].to_numpy()
+    return {
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "fit_seconds": round(fit_seconds, 3),
+    }
+
+
+class FoldCache:
+    """
+    Cache of fold results keyed by fold fingerprint and parameter hash.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, fold_fp: str, params: dict) -> str:
+        return os.path.join(self.root, fold_fp, params_hash(params) + ".json")
+
+    def get(self, fold_fp: str, params: dict) -> dict | None:
+        path = self._path(fold_fp, params)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["result"]
+
+    def put(self, fold_fp: str, params: dict, result: dict) -> None:
+        path = self._path(fold_fp, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "result": result}, f)
+        os.replace(tmp_path, path)
+
+
+def cross_validate(candidates: list, folds: list, cache: FoldCache, max_workers: int | None = None,
+                   evaluate=evaluate_fold) -> list:
+    """
+    Score every candidate on every fold, evaluating only uncached folds.
+
+    Args:
+        candidates: List of train_prophet parameter dicts
+        folds: (train, test) pairs from rolling_folds
+        cache: Fold result cache
+        max_workers: Worker processes (defaults to the CPU count)
+        evaluate: Fold evaluation function (must be picklable)
+    Returns:
+        list: One dict per candidate with params, mean mae/rmse, mean fit_seconds and cached fold count
+    """
+    fold_fps = [fold_fingerprint(train, test) for train, test in folds]
+    results = {params_hash(p): {} for p in candidates}
+    cached = {params_hash(p): 0 for p in candidates}
+    jobs = []
+    for params in candidates:
+        for i, fold_fp in enumerate(fold_fps):
+            hit = cache.get(fold_fp, params)
+            if hit is not None:
+                results[params_hash(params)][i] = hit
+                cached[params_hash(params)] += 1
+            else:
+                jobs.append((params, i))
+
+    logging.info(f"Cross-validating {len(candidates)} candidates on {len(folds)} folds: "
+                 f"{len(jobs)} fold fits, {sum(cached.values())} cached")
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(evaluate, params, *folds[i]): (params, i) for params, i in jobs}
+            for future in as_completed(futures):
+                params, i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.warning(f"Fold {i} failed for {params}: {e}")
+                    continue
+                cache.put(fold_fps[i], params, result)
+                results[params_hash(params)][i] = result
+
+    summary = []
+    for params in candidates:
+        fold_results = list(results[params_hash(params)].values())
+        if len(fold_results) < len(folds):
+            continue
+        summary.append({
+            "params": params,
+            "mae": float(np.mean([r["mae"] for r in fold_results])),
+            "rmse": float(np.mean([r["rmse"] for r in fold_results])),
+            "fit_seconds": float(np.mean([r["fit_seconds"] for r in fold_results])),
+            "cached_folds": cached[params_hash(params)],
+        })
+    return summary
+
+
+def pareto_front(summary: list) -> list:
+    """
+    Candidates not dominated in (mae, fit_seconds), sorted by training time.
+    """
+    ordered = sorted(summary, key=lambda r: (r["fit_seconds"], r["mae"]))
+    front, best_mae = [], np.inf
+    for row in ordered:
+        if row["mae"] < best_mae:
+            front.append(row)
+            best_mae = row["mae"]
+    return front
+
+
+def select_config(front: list, max_fit_seconds: float | None = None) -> dict | None:
+    """Most accurate front member within the training time budget"""
+    within = [r for r in front if max_fit_seconds is None or r["fit_seconds"] <= max_fit_seconds]
+    if not within:
+        within = front[:1]
+    return min(within, key=lambda r: r["mae"])["params"] if within else None
+
+
+def load_tuned_params(path: str = os.path.join(DEFAULT_TUNING_DIR, PARETO_FILE),
+                      resolution: str | None = None) -> dict | None:
+    """
+    Read the configuration selected by the last tuning run.
+
+    Args:
+        path: Tuning result written by this module
+        resolution: Only accept results tuned at this resolution
+    Returns:
+        dict | None: train_prophet keyword arguments, or None if no tuning result exists
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Could not read tuned price model config {path}: {e}")
+        return None
+    if resolution is not None and result.get("resolution", resolution) != resolution:
+        logging.info(f"Ignoring {path}: tuned for {result.get('resolution')} resolution")
+        return None
+    return result.get("selected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the Prophet price model with rolling cross-validation")
+    parser.add_argument("--training-days", type=int, default=365,
+                        help="Days of stored prices to tune on (default: 365)")
+    parser.add_argument("--resolution", choices=["hour", "quarterhour"], default="hour",
+                        help="Price store resolution (default: hour)")
+    parser.add_argument("--folds", type=int, default=3, help="Number of rolling folds (default: 3)")
+    parser.add_argument("--horizon-hours", type=int, default=168,
+                        help="Test window per fold in hours (default: 168)")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid",
+                        help="Evaluate the full grid or a random sample of it (default: grid)")
+    parser.add_argument("--samples", type=int, default=10, help="Candidates for --search random (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --search random (default: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-fit-seconds", type=float, default=None,
+                        help="Training time budget when selecting from the Pareto front")
+    parser.add_argument("--output-dir", default=DEFAULT_TUNING_DIR,
+                        help=f"Directory for the fold cache and Pareto front (default: {DEFAULT_TUNING_DIR})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from .energy_price_forecast import REGION
+    from .price_store import PriceStore
+    store = PriceStore(os.path.join("app_data", "price_store"), region=REGION, resolution=args.resolution)
+    df = store.load_prices(days=args.training_days)
+    if df.empty:
+        raise SystemExit("Price store is empty, run energy_price_forecast first")
+
+    folds = rolling_folds(df, n_folds=args.folds, horizon_hours=args.horizon_hours)
+    candidates = candidate_grid() if args.search == "grid" else candidate_sample(args.samples, args.seed)
+    summary = cross_validate(candidates, folds, FoldCache(os.path.join(args.output_dir, "fold_cache")),
+                             max_workers=args.workers)
+    front = pareto_front(summary)
+    selected = select_config(front, args.max_fit_seconds)
+
+    from .model_store import training_fingerprint
+    result = {
+        "generated_at": datetime.now().isoformat(),
+        "data_fingerprint": training_fingerprint(df, {}),
+        "resolution": args.resolution,
+        "folds": len(folds),
+        "horizon_hours": args.horizon_hours,
+        "candidates": sorted(summary, key=lambda r: r["mae"]),
+        "front": front,
+        "selected": selected,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, PARETO_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp_path, path)
+
+    for row in front:
+        logging.info(f"MAE {row['mae']:7.2f} EUR/MWh  fit {row['fit_seconds']:6.1f}s  {row['params']}")
+    logging.info(f"Selected {selected}, written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Precomputed price statistics stored next to each price snapshot.
+
+Risk metrics that depend only on a published forecast or a raw price export
+(volatility, interval width, quantiles) are computed once when the file is
+written and stored in a small JSON sidecar::
+
+    app_data/forecasts/<region>/<resolution>/<key>.csv
+    app_data/forecasts/<region>/<resolution>/<key>.volatility.json
+    app_data/germany_dayahead_prices_raw_<timestamp>.csv
+    app_data/germany_dayahead_prices_raw_<timestamp>.volatility.json
+
+The sidecar records the modification time of its CSV, so a CSV rewritten
+without a new sidecar is detected and the statistics are recomputed instead.
+All prices in a sidecar are in EUR/kWh.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+SIDECAR_SUFFIX = ".volatility.json"
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+HISTORIC_WINDOWS_DAYS = (7, 30, 90)
+FORECAST_PRICE_COLUMNS = ('price_eur_per_mwh', 'yhat', 'forecast', 'price')
+
+
+def sidecar_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + SIDECAR_SUFFIX
+
+
+def _distribution(prices_eur_per_kwh: np.ndarray) -> dict:
+    """Mean, standard deviation (ddof=1), extremes and quantiles of a price series"""
+    values = prices_eur_per_kwh[~np.isnan(prices_eur_per_kwh)]
+    if len(values) == 0:
+        return {'rows': 0}
+    return {
+        'rows': int(len(values)),
+        'mean': float(values.mean()),
+        'std_dev': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'quantiles': {f"p{round(q * 100):02d}": float(v) for q, v in zip(QUANTILES, np.quantile(values, QUANTILES))},
+    }
+
+
+def forecast_volatility(forecast: pd.DataFrame) -> dict:
+    """
+    Volatility statistics of a forecast file.
+
+    The price column and its unit are resolved the way the risk analysis always
+    did: the first of price_eur_per_mwh, yhat, forecast, price, taken as EUR/MWh
+    if its name says so or its mean is above 10.
+
+    Args:
+        forecast: Forecast DataFrame as written to the CSV
+    Returns:
+        dict: kind, units, std_dev and the price distribution (EUR/kWh), and
+              avg_confidence_interval_width (None without interval columns)
+    Raises:
+        ValueError: If the forecast has no ds or no price column
+    """
+    if 'ds' not in forecast.columns:
+        raise ValueError(f"Forecast file must have 'ds' (datetime) column. Found columns: {forecast.columns.tolist()}")
+    price_col = next((col for col in FORECAST_PRICE_COLUMNS if col in forecast.columns), None)
+    if price_col is None:
+        raise ValueError(f"No price column found in forecast file. Available columns: {forecast.columns.tolist()}")
+
+    prices = forecast[price_col].to_numpy(dtype=float)
+    # Prices in EUR/MWh are typically > 10, while EUR/kWh are typically < 1
+    in_mwh = 'mwh' in price_col.lower() or np.nanmean(prices) > 10
+    prices_kwh = prices / 1000 if in_mwh else prices
+
+    # Last matching interval columns, converted from EUR/MWh
+    lower_col = upper_col = None
+    for col in forecast.columns:
+        if 'lower' in col.lower():
+            lower_col = col
+        if 'upper' in col.lower():
+            upper_col = col
+    ci_width = None
+    if lower_col and upper_col:
+        ci_width = float(np.nanmean((forecast[upper_col].to_numpy(dtype=float)
+                                     - forecast[lower_col].to_numpy(dtype=float)) / 1000))
+
+    return {
+        'kind': 'forecast',
+        'units': {'price': 'EUR/kWh', 'source_column': price_col,
+                  'source_unit': 'EUR/MWh' if in_mwh else 'EUR/kWh',
+                  'interval_columns': [lower_col, upper_col] if ci_width is not None else None},
+        **_distribution(prices_kwh),
+        'start': str(pd.Timestamp(forecast['ds'].iloc[0])) if len(forecast) else None,
+        'end': str(pd.Timestamp(forecast['ds'].iloc[-1])) if len(forecast) else None,
+        'avg_confidence_interval_width': ci_width,
+    }
+
+
+def paths_volatility(paths: np.ndarray) -> dict:
+    """Mean per-step spread across predictive sample paths (paths in EUR/MWh)"""
+    return {
+        'scenario_std_dev': float(paths.std(axis=0, dtype=np.float64).mean() / 1000),
+        'scenario_paths': int(paths.shape[0]),
+    }
+
+
+def historic_volatility(prices: pd.DataFrame, windows_days: tuple = HISTORIC_WINDOWS_DAYS) -> dict:
+    """
+    Volatility of realized prices over trailing windows.
+
+    Each window covers [last timestamp - days, last timestamp], like the
+    historic risk analysis.
+
+    Args:
+        prices: Realized prices with ds and price_eur_per_mwh columns
+        windows_days: Trailing window lengths in days
+    Returns:
+        dict: kind, units, end and {days: price distribution (EUR/kWh)} per window
+    """
+    ds = pd.to_datetime(prices['ds'])
+    end = ds.max()
+    prices_kwh = prices['price_eur_per_mwh'].to_numpy(dtype=float) / 1000
+    return {
+        'kind': 'historic',
+        'units': {'price': 'EUR/kWh', 'source_column': 'price_eur_per_mwh', 'source_unit': 'EUR/MWh'},
+        'end': str(end),
+        'windows': {str(days): _distribution(prices_kwh[(ds >= end - pd.Timedelta(days=days)).to_numpy()])
+                    for days in windows_days},
+    }
+
+
+def write_sidecar(csv_path: str, meta: dict) -> str:
+    """
+    Atomically write the statistics of a CSV next to it.
+
+    Args:
+        csv_path: The CSV the statistics describe (must exist)
+        meta: Statistics from forecast_volatility / historic_volatility
+    Returns:
+        str: Path of the sidecar
+    """
+    path = sidecar_path(csv_path)
+    meta = {**meta, 'source_file': os.path.basename(csv_path), 'source_mtime_ns': os.stat(csv_path).st_mtime_ns}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def update_sidecar(csv_path: str, fields: dict) -> str | None:
+    """Add fields to an existing, current sidecar (no-op if there is none)"""
+    meta = read_sidecar(csv_path)
+    if meta is None:
+        return None
+    return write_sidecar(csv_path, {**meta, **fields})
+
+
+def read_sidecar(csv_path: str) -> dict | None:
+    """
+    Read the statistics of a CSV.
+
+    Returns:
+        dict | None: The sidecar, or None if it is missing, unreadable or older than the CSV
+    """
+    path = sidecar_path(csv_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get('source_mtime_ns') != os.stat(csv_path).st_mtime_ns:
+            return None
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable sidecar {path}: {e}")
+        return None
+    return meta
+
+
+def ensure_sidecar(csv_path: str, compute) -> dict:
+    """
+    Read a CSV's sidecar, computing and storing it first if it is missing or stale.
+
+    Args:
+        csv_path: The CSV
+        compute: Function (DataFrame) -> statistics, applied to the parsed CSV
+    Returns:
+        dict: The statistics
+    """
+    meta = read_sidecar(csv_path)
+    if meta is None:
+        meta = compute(pd.read_csv(csv_path))
+        try:
+            write_sidecar(csv_path, meta)
+        except OSError as e:
+            logging.warning(f"Could not write sidecar for {csv_path}: {e}")
+    return meta
@@ -0,0 +1,317 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .forecasting.forecast_store import ForecastStore, read_forecast
+from .forecasting.resolution import infer_interval, resolution_step
+from .forecasting.scenario_paths import paths_index
+from .risk_analysis import _default_app_data_dir, _get_price_forecast_file
+
+STANDARD_PROFILE_FILE = os.path.join("standard_profile", "Standard_Load_Profile_2025_2026.csv")
+# Default annual consumption of the app when none is given
+DEFAULT_ANNUAL_KWH = 3500
+DEFAULT_HORIZON_HOURS = 720
+# Days of consumption history whose weekly pattern is projected onto the forecast horizon
+PROFILE_HISTORY_DAYS = 28
+# Price columns of a forecast file in order of preference (all EUR/MWh)
+FORECAST_PRICE_COLUMNS = ('yhat', 'price_eur_per_mwh', 'forecast', 'price')
+
+
+def _profile_key(datetimes: pd.DatetimeIndex) -> np.ndarray:
+    """Calendar day and quarter-hour of the day as one integer (29 February maps to 28 February)"""
+    day = np.where((datetimes.month == 2) & (datetimes.day == 29), 28, datetimes.day)
+    quarter_hour = datetimes.hour * 4 + datetimes.minute // 15
+    return (datetimes.month * 32 + day) * 96 + quarter_hour
+
+
+@lru_cache(maxsize=2)
+def _standard_profile(path: str, mtime_ns: int) -> pd.Series:
+    """
+    The standard load profile as kWh per quarter-hour for a consumption of 1 kWh per year,
+    keyed by calendar day and quarter-hour of its first year.
+    """
+    profile = pd.read_csv(path)
+    datetimes = pd.DatetimeIndex(pd.to_datetime(profile['datetime']))
+    # Values are in W for 15-minute intervals
+    kwh = profile['value'].to_numpy(dtype=float) * 0.25 / 1000
+    years = ((datetimes.max() - datetimes.min()) + pd.Timedelta(minutes=15)) / pd.Timedelta(days=365)
+    kwh = kwh / (kwh.sum() / years)
+    first_year = datetimes.year == datetimes.year.min()
+    return pd.Series(kwh[first_year], index=_profile_key(datetimes[first_year]))
+
+
+def standard_profile_load(steps: pd.DatetimeIndex, annual_kwh: float = DEFAULT_ANNUAL_KWH,
+                          app_data_dir: str = None) -> np.ndarray:
+    """
+    Standard-profile consumption on a forecast grid.
+
+    Each step takes the profile values of the same calendar day and time of day, like the
+    seasonal slicing of the tariff calculation, scaled to the annual consumption.
+
+    Parameters:
+    steps (pd.DatetimeIndex): Regular forecast steps (hourly or quarter-hourly)
+    annual_kwh (float): Annual consumption (kWh)
+    app_data_dir (str): Path to app_data directory. If None, uses default path
+
+    Returns:
+    np.ndarray: kWh per step
+    """
+    if app_data_dir is None:
+        app_data_dir = _default_app_data_dir()
+    path = os.path.join(app_data_dir, STANDARD_PROFILE_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Standard load profile not found at {path}")
+    profile = _standard_profile(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+    step = pd.Timedelta(steps.freq) if steps.freq is not None else steps[1] - steps[0]
+    per_step = max(int(step / pd.Timedelta(minutes=15)), 1)
+    quarter_hours = pd.date_range(steps[0], periods=len(steps) * per_step, freq='15min')
+    kwh = profile.reindex(_profile_key(quarter_hours)).fillna(0.0).to_numpy()
+    return kwh.reshape(len(steps), per_step).sum(axis=1) * annual_kwh
+
+
+def _load_on_grid(load: pd.DataFrame, steps: pd.DatetimeIndex) -> np.ndarray:
+    """Sum a consumption forecast (datetime, value in kWh per interval) onto the forecast steps"""
+    load = load[['datetime', 'value']].copy()
+    load['datetime'] = pd.to_datetime(load['datetime'])
+    step = steps[1] - steps[0] if len(steps) > 1 else pd.Timedelta(hours=1)
+    slot = (load['datetime'] - steps[0]) // step
+    inside = (slot >= 0) & (slot < len(steps))
+    return np.bincount(slot[inside].to_numpy(dtype=np.int64), weights=load['value'][inside].to_numpy(dtype=float),
+                       minlength=len(steps))
+
+
+def project_consumption(consumption_history: pd.DataFrame, steps: pd.DatetimeIndex,
+                        history_days: int = PROFILE_HISTORY_DAYS) -> np.ndarray:
+    """
+    Expected consumption on a forecast grid from a consumption history.
+
+    The last history_days of the history are reduced to the mean kWh of every hour of the
+    week (one bincount for the sums, one for the counts), and each forecast step takes the
+    mean of its hour of the week. The history therefore does not need to overlap the forecast
+    horizon. Hours of the week without readings fall back to the mean of their hour of day.
+
+    Parameters:
+    consumption_history (pd.DataFrame): Consumption with 'datetime' and 'value' columns
+                                        (15-minute values in kW, hourly values in kWh)
+    steps (pd.DatetimeIndex): Regular forecast steps (hourly or quarter-hourly)
+    history_days (int): Length of the history used (default: 28)
+
+    Returns:
+    np.ndarray: kWh per step
+    """
+    history = consumption_history[['datetime', 'value']].copy()
+    history['datetime'] = pd.to_datetime(history['datetime'])
+    history = history.dropna()
+    if len(history) == 0:
+        raise ValueError("The consumption history has no readings")
+    interval = infer_interval(history['datetime'])
+    if interval == pd.Timedelta(minutes=15):
+        # Convert 15-minute kW readings to kWh (multiply by 0.25 hours)
+        history['value'] = history['value'] * 0.25
+    history = history[history['datetime'] >= history['datetime'].max() - pd.Timedelta(days=history_days)]
+
+    # kWh per hour; hours with missing readings (e.g. at the window start) are scaled to a full hour
+    readings = history['value'].groupby(history['datetime'].dt.floor('h')).agg(['sum', 'count'])
+    hourly = readings['sum'] / (readings['count'] * min(interval / pd.Timedelta(hours=1), 1.0))
+    cells = hourly.index.dayofweek * 24 + hourly.index.hour
+    sums = np.bincount(cells, weights=hourly.to_numpy(dtype=float), minlength=7 * 24)
+    counts = np.bincount(cells, minlength=7 * 24)
+    hour_sums = sums.reshape(7, 24).sum(axis=0)
+    hour_counts = counts.reshape(7, 24).sum(axis=0)
+    hour_mean = np.divide(hour_sums, hour_counts, out=np.zeros(24), where=hour_counts > 0)
+    week_mean = np.divide(sums, counts, out=np.tile(hour_mean, 7), where=counts > 0)
+
+    step = steps[1] - steps[0] if len(steps) > 1 else pd.Timedelta(hours=1)
+    return week_mean[steps.dayofweek * 24 + steps.hour] * (step / pd.Timedelta(hours=1))
+
+
+def _forecast_horizon(app_data_dir: str, region: str, resolution: str) -> dict:
+    """
+    Future steps of the latest price forecast, its point forecast and its sample paths.
+
+    Returns:
+    dict: steps (DatetimeIndex), point (EUR/MWh per step), paths ((n_paths, steps) EUR/MWh or None)
+          and forecast_file
+    """
+    forecast_file = _get_price_forecast_file(app_data_dir, region)
+    forecast = read_forecast(forecast_file)
+    price_col = next((col for col in FORECAST_PRICE_COLUMNS if col in forecast.columns), None)
+    if 'ds' not in forecast.columns or price_col is None:
+        raise ValueError(f"Forecast file needs 'ds' and a price column. Found columns: {forecast.columns.tolist()}")
+    point = pd.Series(forecast[price_col].to_numpy(dtype=float), index=pd.DatetimeIndex(pd.to_datetime(forecast['ds'])))
+
+    # Sample paths belong to the published snapshot, not to the legacy fixed-name file
+    store = ForecastStore(os.path.join(app_data_dir, "forecasts"), region=region, resolution=resolution)
+    entry = store.latest()
+    if entry is not None and os.path.abspath(store.snapshot_path(entry)) != os.path.abspath(forecast_file):
+        entry = None
+    stored = store.load_paths(entry) if entry is not None else None
+
+    if stored is not None:
+        paths, meta = stored
+        steps = paths_index(meta)
+    else:
+        paths = None
+        # The forecast file also holds the fitted history
+        history_end = entry.get('history_end') if entry is not None else None
+        if history_end is not None:
+            future = point.index[point.index > pd.Timestamp(history_end)]
+        else:
+            step = resolution_step(resolution)
+            future = point.index[-int(pd.Timedelta(hours=DEFAULT_HORIZON_HOURS) / step):]
+        steps = pd.date_range(future[0], future[-1], freq=future[1] - future[0]) if len(future) > 1 else future
+    if len(steps) == 0:
+        raise ValueError(f"The price forecast in {os.path.basename(forecast_file)} has no future steps")
+
+    return {
+        'steps': steps,
+        'point': point.groupby(level=0).mean().reindex(steps).interpolate(limit_direction='both').to_numpy(),
+        'paths': paths,
+        'forecast_file': forecast_file,
+    }
+
+
+def _scenario_metrics(prices: np.ndarray, load: np.ndarray, expensive_hours_pct: float) -> dict:
+    """
+    Coincidence, weighted price and correlation of one load against many price scenarios.
+
+    Every scenario has its own top expensive_hours_pct threshold. The expensive-step masks of all
+    scenarios form one (scenarios x steps) matrix, so consumption in the expensive steps, cost and
+    the covariance with the load are each a single matrix-vector product.
+
+    Parameters:
+    prices (np.ndarray): (scenarios x steps) prices in EUR/MWh
+    load (np.ndarray): kWh per step
+
+    Returns:
+    dict: Arrays with one value per scenario: price_threshold, consumption_coincidence_pct,
+          weighted_avg_price, market_avg_price (EUR/kWh) and correlation
+    """
+    total = load.sum()
+    load32 = load.astype(np.float32)
+    threshold = np.quantile(prices, 1 - expensive_hours_pct / 100, axis=1)
+    expensive = (prices >= threshold[:, None].astype(prices.dtype)).astype(np.float32)
+    consumption_expensive = (expensive @ load32).astype(np.float64)
+    cost = (prices @ load32).astype(np.float64)
+    market_avg = prices.mean(axis=1, dtype=np.float64)
+
+    centered_load = load - load.mean()
+    load_ssq = float(centered_load @ centered_load)
+    centered_prices = prices - market_avg[:, None]
+    price_ssq = np.einsum('ij,ij->i', centered_prices, centered_prices)
+    covariance = centered_prices @ centered_load
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = np.where((price_ssq > 1e-12) & (load_ssq > 1e-12),
+                               covariance / np.sqrt(np.maximum(price_ssq, 0) * load_ssq), 0.0)
+    return {
+        'price_threshold': threshold / 1000,
+        'consumption_coincidence_pct': consumption_expensive / total * 100,
+        'weighted_avg_price': cost / total / 1000,
+        'market_avg_price': market_avg / 1000,
+        'correlation': np.clip(correlation, -1, 1),
+    }
+
+
+def calculate_forward_coincidence(load: pd.DataFrame = None, annual_kwh: float = None,
+                                  expensive_hours_pct: float = 20.0, app_data_dir: str = None,
+                                  region: str = "DE", resolution: str = "hour",
+                                  consumption_history: pd.DataFrame = None) -> dict:
+    """
+    Forward-looking coincidence of a load with the price forecast and its scenario paths.
+
+    The load is the customer's consumption forecast, the weekly pattern of their consumption
+    history (see project_consumption), or the standard load profile scaled to annual_kwh.
+    It is applied to the future steps of the latest price forecast and to every
+    stored sample path; each scenario ranks its own most expensive steps.
+
+    Parameters:
+    load (pd.DataFrame): Consumption forecast with 'datetime' and 'value' (kWh per interval) columns.
+                         If None, consumption_history or the standard load profile is used
+    annual_kwh (float): Annual consumption for the standard load profile (default: 3500)
+    expensive_hours_pct (float): Percentage of most expensive forecast steps (default: 20.0)
+    app_data_dir (str): Path to app_data directory. If None, uses default path
+    region (str): Bidding zone of the forecast (default: DE)
+    resolution (str): Forecast resolution (default: 'hour')
+    consumption_history (pd.DataFrame): Metered consumption with 'datetime' and 'value' columns,
+                                        projected onto the forecast horizon
+
+    Returns:
+    dict: A dictionary containing:
+        - load_source: 'forecast', 'history_profile' or 'standard_profile'
+        - point_forecast: consumption_coincidence_pct, price_threshold, weighted_avg_price,
+                          market_avg_price, price_differential_pct and correlation against the point forecast
+        - scenarios: Number of paths, expected (mean) coincidence, its std_dev, percentiles and the
+                     share of paths with a coincidence above expensive_hours_pct; None without stored paths
+        - total_consumption, horizon, expensive_hours_pct
+    """
+    if not 0 < expensive_hours_pct <= 100:
+        raise ValueError(f"expensive_hours_pct must be between 0 and 100, got {expensive_hours_pct}")
+    if app_data_dir is None:
+        app_data_dir = _default_app_data_dir()
+
+    try:
+        horizon = _forecast_horizon(app_data_dir, region, resolution)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Cannot calculate forward coincidence: {str(e)}")
+    steps = horizon['steps']
+
+    if load is not None:
+        load_source = 'forecast'
+        load_kwh = _load_on_grid(load, steps)
+    elif consumption_history is not None:
+        load_source = 'history_profile'
+        load_kwh = project_consumption(consumption_history, steps)
+    else:
+        load_source = 'standard_profile'
+        load_kwh = standard_profile_load(steps, annual_kwh if annual_kwh is not None else DEFAULT_ANNUAL_KWH,
+                                         app_data_dir)
+    total_consumption = float(load_kwh.sum())
+    if total_consumption <= 0:
+        raise ValueError(f"The load has no consumption in the forecast horizon "
+                         f"({steps[0]} to {steps[-1]})")
+
+    point = {key: float(value[0]) for key, value in
+             _scenario_metrics(horizon['point'][None, :], load_kwh, expensive_hours_pct).items()}
+    market_avg = point['market_avg_price']
+    result = {
+        'load_source': load_source,
+        'expensive_hours_pct': float(expensive_hours_pct),
+        'total_consumption': round(total_consumption, 2),
+        'horizon': {
+            'start': steps[0].isoformat(),
+            'end': steps[-1].isoformat(),
+            'num_steps': int(len(steps)),
+        },
+        'forecast_file_used': os.path.basename(horizon['forecast_file']),
+        'point_forecast': {
+            'consumption_coincidence_pct': round(point['consumption_coincidence_pct'], 2),
+            'price_threshold': round(point['price_threshold'], 4),
+            'weighted_avg_price': round(point['weighted_avg_price'], 4),
+            'market_avg_price': round(market_avg, 4),
+            'price_differential_pct': round((point['weighted_avg_price'] - market_avg) / market_avg * 100, 2)
+            if market_avg > 0 else 0.0,
+            'correlation': round(point['correlation'], 4),
+        },
+        'scenarios': None,
+    }
+
+    paths = horizon['paths']
+    if paths is not None:
+        scenarios = _scenario_metrics(np.asarray(paths), load_kwh, expensive_hours_pct)
+        coincidence = scenarios['consumption_coincidence_pct']
+        weighted = scenarios['weighted_avg_price']
+        quantiles = np.percentile(coincidence, [5, 25, 50, 75, 95])
+        result['scenarios'] = {
+            'n_paths': int(paths.shape[0]),
+            'expected_consumption_coincidence_pct': round(float(coincidence.mean()), 2),
+            'std_dev': round(float(coincidence.std(ddof=1)) if len(coincidence) > 1 else 0.0, 2),
+            'distribution': {f"p{p:02d}": round(float(q), 2) for p, q in zip((5, 25, 50, 75, 95), quantiles)},
+            # Paths on which the load is over-represented in the expensive steps
+            'prob_above_expensive_share': round(float((coincidence > expensive_hours_pct).mean()), 4),
+            'expected_weighted_avg_price': round(float(weighted.mean()), 4),
+            'expected_correlation': round(float(scenarios['correlation'].mean()), 4),
+        }
+    return result
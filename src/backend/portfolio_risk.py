@@ -0,0 +1,250 @@
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .forecasting.resolution import resolution_step
+from .risk_analysis import _default_app_data_dir, _get_most_recent_price_file, _load_historic_prices
+
+# Households per consumption block: 1000 x 8760 hours in float32 is about 35 MB
+DEFAULT_BLOCK_SIZE = 1000
+
+
+def iter_households(consumption: pd.DataFrame) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Split a portfolio table into per-household series.
+
+    Parameters:
+    consumption (pd.DataFrame): Either long format with columns ['household_id', 'datetime', 'value'],
+                                or wide format with a 'datetime' column and one value column per household
+
+    Returns:
+    Iterator of (household_id, DataFrame with columns ['datetime', 'value'])
+    """
+    if 'household_id' in consumption.columns:
+        for household_id, series in consumption.groupby('household_id', sort=False):
+            yield str(household_id), series[['datetime', 'value']]
+    else:
+        for column in consumption.columns.drop('datetime'):
+            yield str(column), pd.DataFrame({'datetime': consumption['datetime'], 'value': consumption[column]})
+
+
+def _price_grid(app_data_dir: str, days: int, end_date: datetime, resolution: str) -> dict:
+    """
+    Historic prices on a regular grid shared by all households.
+
+    Returns:
+    dict: start, step (pd.Timedelta), slots (number of grid slots), columns (grid slot -> matrix column,
+          -1 for slots without a price), prices (€/kWh per matrix column), datetimes, raw_prices
+          (the ungridded €/kWh prices of the period) and price_file
+    """
+    price_file = _get_most_recent_price_file(app_data_dir)
+    prices = _load_historic_prices(price_file, days, end_date=end_date)
+    if len(prices) == 0:
+        raise ValueError(f"No price data in the {days} days up to {end_date}")
+
+    step = resolution_step(resolution)
+    gridded = prices.set_index('ds')['price_eur_per_kwh'].resample(step).mean()
+    has_price = gridded.notna().to_numpy()
+    columns = np.full(len(gridded), -1, dtype=np.int64)
+    columns[has_price] = np.arange(has_price.sum())
+    return {
+        'start': gridded.index[0],
+        'step': step,
+        'slots': len(gridded),
+        'columns': columns,
+        'prices': gridded.to_numpy()[has_price],
+        'datetimes': gridded.index[has_price],
+        'raw_prices': prices['price_eur_per_kwh'],
+        'price_file': price_file,
+    }
+
+
+def _consumption_block(households: list, grid: dict) -> np.ndarray:
+    """
+    Place the readings of a block of households on the price grid.
+
+    Readings are converted to kWh per interval like the single-household analysis
+    (15-minute values are kW), then summed into the grid slot they fall in. Readings
+    outside the grid or in slots without a price are dropped; missing readings count as 0.
+
+    Returns:
+    np.ndarray: (households x grid columns) float32 matrix of kWh
+    """
+    width = int(grid['columns'].max()) + 1
+    start, step = grid['start'].value, grid['step'].value
+    quarter_hour = pd.Timedelta(minutes=15).value
+    block = np.zeros((len(households), width), dtype=np.float32)
+    for row, (_, series) in enumerate(households):
+        datetimes = series['datetime']
+        if not pd.api.types.is_datetime64_dtype(datetimes):
+            datetimes = pd.to_datetime(datetimes)
+        nanoseconds = datetimes.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        value = series['value'].to_numpy(dtype=np.float64)
+        if len(nanoseconds) > 1 and np.median(np.diff(np.sort(nanoseconds))) == quarter_hour:
+            # Convert 15-minute kW readings to kWh (multiply by 0.25 hours)
+            value = value * 0.25
+        slot = (nanoseconds - start) // step
+        inside = (slot >= 0) & (slot < grid['slots'])
+        column = grid['columns'][slot[inside]]
+        priced = column >= 0
+        block[row] = np.bincount(column[priced], weights=value[inside][priced], minlength=width)
+    return block
+
+
+def _blocks(households: Iterable, block_size: int) -> Iterator[list]:
+    block = []
+    for household in households:
+        block.append(household)
+        if len(block) == block_size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def calculate_portfolio_risk(households: Union[pd.DataFrame, Iterable[Tuple[str, pd.DataFrame]]], days: int = 30,
+                             app_data_dir: str = None, resolution: str = 'hour',
+                             expensive_hours_pct: float = 20.0, end_date: datetime = None,
+                             block_size: int = DEFAULT_BLOCK_SIZE, include_households: bool = True) -> dict:
+    """
+    Calculate price exposure across a portfolio of households.
+
+    Households are placed on the common price grid in blocks of block_size rows, so at most one
+    (block_size x T) float32 matrix is held at a time: 10,000 households over a year of hours
+    need about 35 MB per block instead of 350 MB for the full matrix. Per block, consumption,
+    cost, consumption in the expensive hours and the cross products for the correlation are
+    all column-wise reductions (matrix-vector products) over the block. The portfolio load
+    is accumulated across blocks for the aggregate metrics.
+
+    Parameters:
+    households: Portfolio table (see iter_households) or an iterable of (household_id, DataFrame) pairs,
+                each DataFrame with 'datetime' and 'value' columns; an iterable is consumed lazily
+    days (int): Number of days to analyze (default: 30)
+    app_data_dir (str): Path to app_data directory. If None, uses default path
+    resolution (str): Grid resolution (default: 'hour')
+    expensive_hours_pct (float): Percentage of most expensive grid intervals (default: 20.0)
+    end_date (datetime): End of the analysis period. Defaults to the latest reading of a portfolio
+                         table, or the latest price for an iterable
+    block_size (int): Households per block (default: 1000)
+    include_households (bool): Whether to list the metrics of every household (default: True)
+
+    Returns:
+    dict: A dictionary containing:
+        - num_households, num_intervals: Matrix dimensions
+        - market_avg_price, price_volatility, price_threshold: Price statistics of the period (€/kWh)
+        - aggregate: weighted_avg_price, price_differential_pct, consumption_coincidence_pct,
+                     correlation, total_consumption and total_cost of the whole portfolio
+        - distribution: Percentiles (p10, p50, p90) of the household metrics
+        - households: Per-household metrics (if include_households)
+    """
+    if not 0 < expensive_hours_pct <= 100:
+        raise ValueError(f"expensive_hours_pct must be between 0 and 100, got {expensive_hours_pct}")
+    if block_size < 1:
+        raise ValueError(f"block_size must be at least 1, got {block_size}")
+
+    # Determine app_data directory
+    if app_data_dir is None:
+        app_data_dir = _default_app_data_dir()
+
+    if isinstance(households, pd.DataFrame):
+        if end_date is None:
+            end_date = pd.to_datetime(households['datetime']).max()
+        households = iter_households(households)
+
+    grid = _price_grid(app_data_dir, days, end_date, resolution)
+    prices = grid['prices']
+    market_avg_price = float(grid['raw_prices'].mean())
+    threshold = np.quantile(prices, 1 - expensive_hours_pct / 100)
+    expensive = (prices >= threshold).astype(np.float32)
+    centered = prices - prices.mean()
+    centered_ssq = float(centered @ centered)
+    prices32 = prices.astype(np.float32)
+    centered32 = centered.astype(np.float32)
+    n = len(prices)
+
+    ids, metrics = [], []
+    portfolio_load = np.zeros(n)
+    for block in _blocks(households, block_size):
+        matrix = _consumption_block(block, grid)
+        consumption = matrix.sum(axis=1, dtype=np.float64)
+        cost = (matrix @ prices32).astype(np.float64)
+        consumption_expensive = (matrix @ expensive).astype(np.float64)
+        covariance = (matrix @ centered32).astype(np.float64)
+        sum_squares = np.einsum('ij,ij->i', matrix, matrix, dtype=np.float64)
+        portfolio_load += matrix.sum(axis=0, dtype=np.float64)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weighted = np.where(consumption > 0, cost / consumption, np.nan)
+            coincidence = np.where(consumption > 0, consumption_expensive / consumption * 100, np.nan)
+            variance = sum_squares - consumption ** 2 / n
+            correlation = np.where(variance > 1e-12, covariance / np.sqrt(variance * centered_ssq), 0.0)
+        ids.extend(household_id for household_id, _ in block)
+        metrics.append(np.column_stack([consumption, cost, weighted, coincidence, correlation]))
+
+    if not ids:
+        raise ValueError("No households in the portfolio")
+    metrics = np.vstack(metrics)
+    consumption, cost, weighted, coincidence, correlation = metrics.T
+    differential_pct = (weighted - market_avg_price) / market_avg_price * 100 if market_avg_price > 0 else weighted * 0
+
+    total_consumption = float(portfolio_load.sum())
+    if total_consumption <= 0:
+        raise ValueError("No portfolio consumption overlaps with the price data period")
+    aggregate_weighted = float(portfolio_load @ prices) / total_consumption
+    load_centered = portfolio_load - portfolio_load.mean()
+    load_ssq = float(load_centered @ load_centered)
+    aggregate_correlation = float(load_centered @ centered) / np.sqrt(load_ssq * centered_ssq) if load_ssq > 0 else 0.0
+
+    def percentiles(values: np.ndarray, digits: int) -> dict:
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return {'p10': None, 'p50': None, 'p90': None}
+        p10, p50, p90 = np.percentile(values, [10, 50, 90])
+        return {'p10': round(float(p10), digits), 'p50': round(float(p50), digits), 'p90': round(float(p90), digits)}
+
+    result = {
+        'num_households': len(ids),
+        'num_intervals': int(n),
+        'resolution': resolution,
+        'market_avg_price': round(market_avg_price, 4),
+        'price_volatility': round(float(grid['raw_prices'].std()), 4),
+        'price_threshold': round(float(threshold), 4),
+        'expensive_hours_pct': float(expensive_hours_pct),
+        'aggregate': {
+            'total_consumption': round(total_consumption, 2),
+            'total_cost': round(float(portfolio_load @ prices), 2),
+            'weighted_avg_price': round(aggregate_weighted, 4),
+            'price_differential_pct': round((aggregate_weighted - market_avg_price) / market_avg_price * 100, 2)
+            if market_avg_price > 0 else 0.0,
+            'consumption_coincidence_pct': round(float(portfolio_load @ expensive) / total_consumption * 100, 2),
+            'correlation': round(aggregate_correlation, 4),
+        },
+        'distribution': {
+            'weighted_avg_price': percentiles(weighted, 4),
+            'price_differential_pct': percentiles(differential_pct, 2),
+            'consumption_coincidence_pct': percentiles(coincidence, 2),
+            'correlation': percentiles(correlation, 4),
+        },
+        'price_file_used': os.path.basename(grid['price_file']),
+        'analysis_period': {
+            'start': grid['datetimes'][0].strftime('%Y-%m-%d'),
+            'end': grid['datetimes'][-1].strftime('%Y-%m-%d')
+        }
+    }
+    if include_households:
+        result['households'] = [
+            {
+                'household_id': household_id,
+                'total_consumption': round(float(consumption[i]), 2),
+                'total_cost': round(float(cost[i]), 2),
+                'weighted_avg_price': None if np.isnan(weighted[i]) else round(float(weighted[i]), 4),
+                'price_differential_pct': None if np.isnan(weighted[i]) else round(float(differential_pct[i]), 2),
+                'consumption_coincidence_pct': None if np.isnan(coincidence[i]) else round(float(coincidence[i]), 2),
+                'correlation': round(float(correlation[i]), 4),
+            }
+            for i, household_id in enumerate(ids)
+        ]
+    return result
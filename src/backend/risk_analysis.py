@@ -3,6 +3,17 @@ from datetime import datetime, time, timedelta
 import os
 import glob
 import numpy as np
+from .forecasting.forecast_store import ForecastStore, latest_forecast_path
+from .forecasting.resolution import common_interval, infer_interval
+from .forecasting.volatility_sidecar import (HISTORIC_WINDOWS_DAYS, ensure_sidecar, forecast_volatility,
+                                             historic_volatility, paths_volatility)
+
+# Row labels of the calendar heatmaps; every heatmap has one column per hour of day
+HEATMAP_ROWS = {
+    'hour': ['all'],
+    'hour_of_week': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+    'month_hour': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+}
 
 
 def _get_most_recent_price_file(app_data_dir: str) -> str:
@@ -30,12 +41,13 @@ def _get_most_recent_price_file(app_data_dir: str) -> str:
     return most_recent_file
 
 
-def _get_price_forecast_file(app_data_dir: str) -> str:
+def _get_price_forecast_file(app_data_dir: str, region: str = "DE") -> str:
     """
     Find the price forecast file in the app_data directory.
     
     Parameters:
     app_data_dir (str): Path to the app_data directory
+    region (str): Bidding zone of the forecast
     
     Returns:
     str: Path to the price forecast file
@@ -43,13 +55,9 @@ def _get_price_forecast_file(app_data_dir: str) -> str:
     Raises:
     FileNotFoundError: If no forecast file is found
     """
-    # Look for the forecast file (static name for now)
-    forecast_file = os.path.join(app_data_dir, "germany_price_forecast_720h.csv")
-    
-    if not os.path.exists(forecast_file):
-        raise FileNotFoundError(f"Price forecast file not found: {forecast_file}")
-    
-    return forecast_file
+    # Newest published snapshot, or the fixed-name file written by older forecast runs (Germany only)
+    legacy_file = "germany_price_forecast_720h.csv" if region == "DE" else None
+    return latest_forecast_path(app_data_dir, region=region, legacy_file=legacy_file)
 
 
 def _load_historic_prices(price_file_path: str, days: int, end_date: datetime = None) -> pd.DataFrame:
@@ -84,56 +92,689 @@ def _load_historic_prices(price_file_path: str, days: int, end_date: datetime =
     return df
 
 
-def _calculate_weighted_average_price(prices: pd.DataFrame, consumption: pd.DataFrame) -> dict:
+def _align_consumption_to_prices(consumption: pd.DataFrame, prices: pd.DataFrame,
+                                 resolution: str = None) -> tuple:
     """
-    Calculate the weighted average price based on consumption profile.
+    Bring consumption and prices onto a common time grid.
+    
+    Both series are kept at their native resolution. 15-minute readings are only
+    summed to hours if the prices are hourly or if the caller explicitly asks for
+    a coarser resolution.
     
     Parameters:
-    prices (pd.DataFrame): Price data with columns ['ds', 'price_eur_per_kwh']
-    consumption (pd.DataFrame): Consumption data with columns ['datetime', 'value']
+    consumption (pd.DataFrame): Consumption data with columns ['datetime', 'value'] (15-minute values in kW)
+    prices (pd.DataFrame): Price data with columns ['ds' or 'datetime', 'price_eur_per_kwh']
+    resolution (str): Optional coarser target resolution ('hour', 'quarterhour' or a pandas frequency)
     
     Returns:
-    dict: Contains weighted_avg_price, total_consumption, total_cost
+    tuple: (consumption with kWh per interval, prices) on the same grid
     """
-    # Ensure datetime columns are properly formatted
-    prices = prices.copy()
     consumption = consumption.copy()
-    
-    if 'ds' in prices.columns:
-        prices['datetime'] = pd.to_datetime(prices['ds'])
-    
     consumption['datetime'] = pd.to_datetime(consumption['datetime'])
+    prices = prices.copy()
+    if 'datetime' not in prices.columns:
+        prices['datetime'] = pd.to_datetime(prices['ds'])
     
-    # Resample consumption to hourly if it's not already
-    time_diff = consumption['datetime'].diff().mode()[0] if len(consumption) > 1 else pd.Timedelta(hours=1)
+    consumption_interval = infer_interval(consumption['datetime'])
+    price_interval = infer_interval(prices['datetime'])
     
-    if time_diff == pd.Timedelta(minutes=15):
+    if consumption_interval == pd.Timedelta(minutes=15):
         # Convert 15-minute kW readings to kWh (multiply by 0.25 hours)
         consumption['value'] = consumption['value'] * 0.25
-        consumption = consumption.set_index('datetime').resample('h').sum().reset_index()
     
-    # Merge consumption with prices on datetime
-    merged = consumption.merge(prices[['datetime', 'price_eur_per_kwh']], on='datetime', how='inner')
+    target = common_interval(consumption_interval, price_interval, resolution)
     
-    if len(merged) == 0:
-        raise ValueError("No matching timestamps between consumption and price data")
+    if consumption_interval < target:
+        consumption = consumption.set_index('datetime')[['value']].resample(target).sum().reset_index()
+    if price_interval < target:
+        prices = (prices.set_index('datetime')[['price_eur_per_kwh']]
+                  .resample(target).mean().dropna().reset_index())
     
-    # Calculate weighted average price
-    merged['cost'] = merged['value'] * merged['price_eur_per_kwh']
-    total_cost = merged['cost'].sum()
-    total_consumption = merged['value'].sum()
+    return consumption, prices
+
+
+def _calendar_cells(datetimes: pd.Series, binning: str) -> np.ndarray:
+    """Flat heatmap cell (row * 24 + hour of day) of every timestamp"""
+    hour = datetimes.dt.hour.to_numpy()
+    if binning == 'hour':
+        return hour
+    if binning == 'hour_of_week':
+        return datetimes.dt.dayofweek.to_numpy() * 24 + hour
+    if binning == 'month_hour':
+        return (datetimes.dt.month.to_numpy() - 1) * 24 + hour
+    raise ValueError(f"Unknown binning '{binning}'. Supported: {', '.join(HEATMAP_ROWS)}")
+
+
+def _default_app_data_dir() -> str:
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(project_root, "app_data")
+
+
+class RiskAnalysisContext:
+    """
+    Consumption and historic prices of one risk analysis, loaded and aligned once.
     
-    weighted_avg_price = total_cost / total_consumption if total_consumption > 0 else 0
+    The most recent price file is located and parsed once, the consumption frame is
+    parsed once, and the merged consumption/price grid is built at most once per
+    resolution. Weighted price, volatility, correlation, coincidence, the load
+    profile and the calendar heatmaps are all derived from these shared arrays. The
+    module-level risk functions are thin views over a context; callers needing
+    several metrics should build one context and call its methods.
     
-    return {
-        'weighted_avg_price': float(weighted_avg_price),
-        'total_consumption': float(total_consumption),
-        'total_cost': float(total_cost),
-        'num_hours': int(len(merged))
-    }
+    Parameters:
+    consumption_data (pd.DataFrame): DataFrame with user consumption data, must have 'datetime' and 'value' columns
+    days (int): Number of days to analyze (default: 30)
+    app_data_dir (str): Path to app_data directory. If None, uses default path
+    resolution (str): Optional coarser resolution (e.g. 'hour'); by default the data's native resolution is used
+    
+    Raises:
+    FileNotFoundError: If no price files are found
+    """
+    
+    def __init__(self, consumption_data: pd.DataFrame, days: int = 30, app_data_dir: str = None,
+                 resolution: str = None):
+        if app_data_dir is None:
+            app_data_dir = _default_app_data_dir()
+        try:
+            self.price_file = _get_most_recent_price_file(app_data_dir)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Cannot perform risk analysis: {str(e)}")
+        
+        self.days = days
+        self.resolution = resolution
+        
+        consumption = consumption_data[['datetime', 'value']].copy()
+        consumption['datetime'] = pd.to_datetime(consumption['datetime'])
+        self.consumption = consumption
+        
+        # Prices of the n days up to the end of the consumption data
+        self.prices = _load_historic_prices(self.price_file, days, end_date=consumption['datetime'].max())
+        self.prices['datetime'] = self.prices['ds']
+        self.price_start = self.prices['datetime'].min()
+        self.price_end = self.prices['datetime'].max()
+        
+        self._merged = {}
+        self._totals = {}
+        self._ranked = {}
+        self._profile = None
+    
+    def merged(self, resolution: str = None) -> pd.DataFrame:
+        """
+        Consumption (kWh per interval) joined with prices on a common grid, built once per resolution.
+        
+        Returns:
+        pd.DataFrame: Columns ['datetime', 'value', 'price_eur_per_kwh', 'cost']
+        """
+        if resolution not in self._merged:
+            consumption = self.consumption
+            in_window = consumption[(consumption['datetime'] >= self.price_start) &
+                                    (consumption['datetime'] <= self.price_end)]
+            if len(in_window) == 0:
+                raise ValueError(
+                    f"No consumption data overlaps with price data period "
+                    f"({self.price_start.date()} to {self.price_end.date()}). "
+                    f"Consumption data range: {consumption['datetime'].min().date()} to "
+                    f"{consumption['datetime'].max().date()}"
+                )
+            
+            aligned_consumption, aligned_prices = _align_consumption_to_prices(in_window, self.prices, resolution)
+            merged = aligned_consumption.merge(aligned_prices[['datetime', 'price_eur_per_kwh']],
+                                               on='datetime', how='inner')
+            if len(merged) == 0:
+                raise ValueError("No matching timestamps between consumption and price data")
+            merged['cost'] = merged['value'] * merged['price_eur_per_kwh']
+            self._merged[resolution] = merged
+        return self._merged[resolution]
+    
+    def totals(self, resolution: str = None) -> dict:
+        """
+        Consumption, cost, weighted price and consumption/price correlation on the merged grid.
+        
+        Returns:
+        dict: Contains weighted_avg_price, total_consumption, total_cost, num_hours, correlation
+        """
+        if resolution not in self._totals:
+            merged = self.merged(resolution)
+            total_consumption = merged['value'].sum()
+            total_cost = merged['cost'].sum()
+            correlation = merged['value'].corr(merged['price_eur_per_kwh'])
+            self._totals[resolution] = {
+                'weighted_avg_price': float(total_cost / total_consumption) if total_consumption > 0 else 0.0,
+                'total_consumption': float(total_consumption),
+                'total_cost': float(total_cost),
+                'num_hours': int(len(merged)),
+                # NaN can occur with insufficient variance
+                'correlation': 0.0 if pd.isna(correlation) else float(correlation),
+            }
+        return self._totals[resolution]
+    
+    @property
+    def market_avg_price(self) -> float:
+        return float(self.prices['price_eur_per_kwh'].mean())
+    
+    @property
+    def price_volatility(self) -> float:
+        return float(self.prices['price_eur_per_kwh'].std())
+    
+    def historic_risk(self) -> dict:
+        """Market average versus the user's weighted price (see create_historic_risk_analysis)"""
+        totals = self.totals(self.resolution)
+        market_avg_price = self.market_avg_price
+        user_weighted_price = totals['weighted_avg_price']
+        
+        # Calculate differential
+        price_differential = user_weighted_price - market_avg_price
+        price_differential_pct = (price_differential / market_avg_price * 100) if market_avg_price > 0 else 0
+        
+        # Determine risk exposure
+        if price_differential < 0:
+            risk_exposure = 'favorable'
+            risk_message = f"User consumed more during low-price periods, saving {abs(price_differential_pct):.2f}%"
+        else:
+            risk_exposure = 'unfavorable'
+            risk_message = f"User consumed more during high-price periods, paying {price_differential_pct:.2f}% more"
+        
+        return {
+            'market_avg_price': round(market_avg_price, 4),
+            'user_weighted_price': round(float(user_weighted_price), 4),
+            'price_differential': round(float(price_differential), 4),
+            'price_differential_pct': round(float(price_differential_pct), 2),
+            'risk_exposure': risk_exposure,
+            'risk_message': risk_message,
+            'total_consumption': round(totals['total_consumption'], 2),
+            'total_cost': round(totals['total_cost'], 2),
+            'price_volatility': round(self.price_volatility, 4),
+            'days_analyzed': int((self.price_end - self.price_start).days),
+            'num_hours': totals['num_hours'],
+            'price_file_used': os.path.basename(self.price_file),
+            'analysis_period': {
+                'start': self.price_start.strftime('%Y-%m-%d'),
+                'end': self.price_end.strftime('%Y-%m-%d')
+            }
+        }
+    
+    def _ranking(self, resolution: str = None) -> dict:
+        """
+        Intervals sorted by price once, with running sums from the most expensive interval down.
+        
+        Returns:
+        dict: ascending_prices, and cumulative consumption, cost and price sums in descending
+              price order (each with a leading 0, so index k is the sum over the k most expensive intervals)
+        """
+        if resolution not in self._ranked:
+            merged = self.merged(resolution)
+            price = merged['price_eur_per_kwh'].to_numpy()
+            order = np.argsort(price, kind='stable')
+            descending = order[::-1]
+            
+            def running_sum(values: np.ndarray) -> np.ndarray:
+                return np.concatenate(([0.0], np.cumsum(values[descending])))
+            
+            self._ranked[resolution] = {
+                'ascending_prices': price[order],
+                'consumption': running_sum(merged['value'].to_numpy()),
+                'cost': running_sum(merged['cost'].to_numpy()),
+                'price': running_sum(price),
+            }
+        return self._ranked[resolution]
+    
+    def _coincidence_at(self, expensive_hours_pct) -> dict:
+        """
+        Coincidence metrics for an array of expensive-hour percentages, read off the price ranking.
+        
+        The price threshold is the same quantile the scalar analysis used, and every interval
+        priced at or above it counts as expensive, so ties at the threshold are included.
+        """
+        pct = np.asarray(expensive_hours_pct, dtype=float)
+        invalid = (pct <= 0) | (pct > 100)
+        if invalid.any():
+            raise ValueError(f"expensive_hours_pct must be between 0 and 100, got {pct[invalid].tolist()}")
+        
+        ranking = self._ranking(self.resolution)
+        ascending = ranking['ascending_prices']
+        n = len(ascending)
+        threshold = np.quantile(ascending, 1 - pct / 100)
+        num_expensive = n - np.searchsorted(ascending, threshold, side='left')
+        
+        totals = self.totals(self.resolution)
+        consumption_expensive = ranking['consumption'][num_expensive]
+        cost_expensive = ranking['cost'][num_expensive]
+        price_expensive = ranking['price'][num_expensive]
+        num_cheap = n - num_expensive
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # 0 if all intervals are in one category
+            avg_price_expensive = np.where(num_expensive > 0, price_expensive / np.maximum(num_expensive, 1), 0.0)
+            avg_price_cheap = np.where(num_cheap > 0, (ranking['price'][n] - price_expensive) / np.maximum(num_cheap, 1),
+                                       0.0)
+        total_consumption, total_cost = totals['total_consumption'], totals['total_cost']
+        return {
+            'expensive_hours_pct': pct,
+            'num_expensive_hours': num_expensive,
+            'price_threshold': threshold,
+            'consumption_expensive': consumption_expensive,
+            'consumption_cheap': total_consumption - consumption_expensive,
+            'consumption_coincidence_pct': (consumption_expensive / total_consumption * 100
+                                            if total_consumption > 0 else np.zeros_like(pct)),
+            'cost_expensive': cost_expensive,
+            'cost_cheap': total_cost - cost_expensive,
+            'cost_coincidence_pct': cost_expensive / total_cost * 100 if total_cost > 0 else np.zeros_like(pct),
+            'avg_price_expensive': avg_price_expensive,
+            'avg_price_cheap': avg_price_cheap,
+        }
+    
+    def coincidence_curve(self, step_pct: float = 1.0) -> dict:
+        """
+        Consumption and cost share in the top x% most expensive intervals for every x on a grid.
+        
+        Parameters:
+        step_pct (float): Spacing of the expensive-hour percentages (default: 1.0, i.e. 1%, 2%, ..., 100%)
+        
+        Returns:
+        dict: Contains total_hours, total_consumption, total_cost and curve, a list of points with
+              expensive_hours_pct, num_expensive_hours, price_threshold, consumption_coincidence_pct
+              and cost_coincidence_pct
+        """
+        if not 0 < step_pct <= 100:
+            raise ValueError(f"step_pct must be between 0 and 100, got {step_pct}")
+        grid = np.arange(1, int(np.floor(100 / step_pct + 1e-9)) + 1) * step_pct
+        if grid[-1] < 100:
+            grid = np.append(grid, 100.0)
+        
+        points = self._coincidence_at(grid)
+        totals = self.totals(self.resolution)
+        curve = [
+            {
+                'expensive_hours_pct': round(float(pct), 4),
+                'num_expensive_hours': int(num),
+                'price_threshold': round(float(threshold), 4),
+                'consumption_coincidence_pct': round(float(consumption), 2),
+                'cost_coincidence_pct': round(float(cost), 2),
+            }
+            for pct, num, threshold, consumption, cost in zip(
+                points['expensive_hours_pct'], points['num_expensive_hours'], points['price_threshold'],
+                points['consumption_coincidence_pct'], points['cost_coincidence_pct'])
+        ]
+        return {
+            'total_hours': totals['num_hours'],
+            'total_consumption': round(totals['total_consumption'], 2),
+            'total_cost': round(totals['total_cost'], 2),
+            'curve': curve,
+            'analysis_period': {
+                'start': self.price_start.strftime('%Y-%m-%d'),
+                'end': self.price_end.strftime('%Y-%m-%d')
+            }
+        }
+    
+    def coincidence_factor(self, expensive_hours_pct: float = 20.0) -> dict:
+        """Share of consumption and cost in the most expensive intervals (see calculate_coincidence_factor)"""
+        # Validate percentage
+        if not 0 < expensive_hours_pct <= 100:
+            raise ValueError(f"expensive_hours_pct must be between 0 and 100, got {expensive_hours_pct}")
+        
+        # A single point of the coincidence curve
+        point = {key: np.asarray(value).item() for key, value in self._coincidence_at([expensive_hours_pct]).items()}
+        totals = self.totals(self.resolution)
+        consumption_coincidence_pct = point['consumption_coincidence_pct']
+        
+        # Determine coincidence rating
+        if consumption_coincidence_pct > expensive_hours_pct + 10:
+            coincidence_rating = 'high'
+            rating_message = f"High coincidence: {consumption_coincidence_pct:.1f}% of consumption during {expensive_hours_pct:.0f}% most expensive hours (unfavorable)"
+        elif consumption_coincidence_pct > expensive_hours_pct - 5:
+            coincidence_rating = 'medium'
+            rating_message = f"Medium coincidence: {consumption_coincidence_pct:.1f}% of consumption during {expensive_hours_pct:.0f}% most expensive hours (neutral)"
+        else:
+            coincidence_rating = 'low'
+            rating_message = f"Low coincidence: {consumption_coincidence_pct:.1f}% of consumption during {expensive_hours_pct:.0f}% most expensive hours (favorable)"
+        
+        return {
+            'expensive_hours_pct': float(expensive_hours_pct),
+            'num_expensive_hours': int(point['num_expensive_hours']),
+            'total_hours': totals['num_hours'],
+            'consumption_during_expensive_hours': round(float(point['consumption_expensive']), 2),
+            'consumption_during_cheap_hours': round(float(point['consumption_cheap']), 2),
+            'total_consumption': round(totals['total_consumption'], 2),
+            'consumption_coincidence_pct': round(float(consumption_coincidence_pct), 2),
+            'cost_during_expensive_hours': round(float(point['cost_expensive']), 2),
+            'cost_during_cheap_hours': round(float(point['cost_cheap']), 2),
+            'total_cost': round(totals['total_cost'], 2),
+            'cost_coincidence_pct': round(float(point['cost_coincidence_pct']), 2),
+            'avg_price_expensive_hours': round(float(point['avg_price_expensive']), 4),
+            'avg_price_cheap_hours': round(float(point['avg_price_cheap']), 4),
+            'price_threshold': round(float(point['price_threshold']), 4),
+            'correlation': round(totals['correlation'], 4),
+            'coincidence_rating': coincidence_rating,
+            'rating_message': rating_message,
+            'days_analyzed': int(self.days),
+            'analysis_period': {
+                'start': self.price_start.strftime('%Y-%m-%d'),
+                'end': self.price_end.strftime('%Y-%m-%d')
+            }
+        }
+    
+    def _daily_sums(self, expensive_hours_pct: float = None) -> pd.DataFrame:
+        """
+        Per-day sums of the merged intervals from which the ratio metrics are rebuilt.
+        
+        Consumption and prices are centered on their overall means before the cross
+        products are summed, which keeps correlations from these sums numerically stable.
+        
+        Returns:
+        pd.DataFrame: Indexed by day, with columns n, value, cost, v, p, vv, pp, vp and, if
+                      expensive_hours_pct is given, value_expensive (consumption in the top
+                      expensive_hours_pct of the day's intervals)
+        """
+        merged = self.merged(self.resolution)
+        day = merged['datetime'].dt.normalize()
+        price = merged['price_eur_per_kwh']
+        value = merged['value']
+        centered_price = price - price.mean()
+        centered_value = value - value.mean()
+        columns = {'n': 1.0, 'value': value, 'cost': merged['cost']}
+        if expensive_hours_pct is not None:
+            expensive = price >= price.groupby(day).transform('quantile', 1 - expensive_hours_pct / 100)
+            columns['value_expensive'] = value.where(expensive, 0.0)
+        return pd.DataFrame({
+            **columns,
+            'v': centered_value,
+            'p': centered_price,
+            'vv': centered_value ** 2,
+            'pp': centered_price ** 2,
+            'vp': centered_value * centered_price,
+        }).groupby(day).sum()
+    
+    def _daily_market(self) -> pd.DataFrame:
+        """Per-day sum and count of all prices, for the market average as in the historic analysis"""
+        return self.prices.groupby(self.prices['datetime'].dt.normalize())['price_eur_per_kwh'].agg(['sum', 'count'])
+    
+    def bootstrap_risk(self, n_resamples: int = 1000, confidence: float = 0.95, block_days: int = 1,
+                       seed: int = 0) -> dict:
+        """
+        Block-bootstrap confidence intervals for the weighted price, differential and correlation.
+        
+        Days are the resampling blocks, so the within-day pattern of consumption and prices is
+        kept. The analyzed period is reduced to per-day sums once; every resample is a row of
+        day counts, all resamples together one (n_resamples x days) count matrix, and the sums
+        of all resamples are one matrix product with the per-day sums. The metrics are then
+        ratios of these sums, evaluated for all resamples at once.
+        
+        Parameters:
+        n_resamples (int): Number of bootstrap resamples (default: 1000)
+        confidence (float): Confidence level of the percentile intervals (default: 0.95)
+        block_days (int): Consecutive days per block, for day-to-day dependence (default: 1)
+        seed (int): Random seed, fixed so repeated analyses of the same data agree (default: 0)
+        
+        Returns:
+        dict: Contains n_resamples, confidence, block_days, num_days and, for user_weighted_price,
+              price_differential, price_differential_pct and correlation, the estimate, lower and
+              upper bound and std_error
+        """
+        if n_resamples < 1:
+            raise ValueError(f"n_resamples must be at least 1, got {n_resamples}")
+        if not 0 < confidence < 1:
+            raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+        
+        # All days of the price window, so the unit resample reproduces the historic analysis
+        market = self._daily_market()
+        days = pd.date_range(market.index.min(), market.index.max(), freq='D')
+        if not 1 <= block_days <= len(days):
+            raise ValueError(f"block_days must be between 1 and the {len(days)} analyzed days, got {block_days}")
+        daily = self._daily_sums().reindex(days, fill_value=0.0)
+        sums = np.column_stack([daily.to_numpy(dtype=float), market.reindex(days, fill_value=0).to_numpy(dtype=float)])
+        
+        # Each resample draws overlapping blocks of block_days days until it covers the period
+        rng = np.random.default_rng(seed)
+        num_days = len(days)
+        num_blocks = -(-num_days // block_days)
+        starts = rng.integers(0, num_days - block_days + 1, size=(n_resamples, num_blocks))
+        day_index = (starts[:, :, None] + np.arange(block_days)).reshape(n_resamples, -1)[:, :num_days]
+        rows = np.repeat(np.arange(n_resamples), num_days)
+        counts = np.bincount(rows * num_days + day_index.ravel(),
+                             minlength=n_resamples * num_days).reshape(n_resamples, num_days)
+        
+        # Row 0 is the original sample (every day once)
+        resampled = np.vstack([np.ones((1, num_days)), counts]) @ sums
+        w = dict(zip(list(daily.columns) + ['market_sum', 'market_count'], resampled.T))
+        n = np.maximum(w['n'], 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weighted = np.where(w['value'] > 0, w['cost'] / w['value'], np.nan)
+            market_avg = np.where(w['market_count'] > 0, w['market_sum'] / np.maximum(w['market_count'], 1), np.nan)
+            differential = weighted - market_avg
+            differential_pct = np.where(market_avg > 0, differential / market_avg * 100, 0.0)
+            var_v = w['vv'] - w['v'] ** 2 / n
+            var_p = w['pp'] - w['p'] ** 2 / n
+            correlation = (w['vp'] - w['v'] * w['p'] / n) / np.sqrt(var_v * var_p)
+            correlation = np.clip(np.where((var_v > 1e-12) & (var_p > 1e-12), correlation, 0.0), -1, 1)
+        
+        tail = (1 - confidence) / 2 * 100
+        
+        def interval(values: np.ndarray, digits: int) -> dict:
+            lower, upper = np.nanpercentile(values[1:], [tail, 100 - tail])
+            return {
+                'estimate': round(float(values[0]), digits),
+                'lower': round(float(lower), digits),
+                'upper': round(float(upper), digits),
+                'std_error': round(float(np.nanstd(values[1:], ddof=1)) if n_resamples > 1 else 0.0, digits),
+            }
+        
+        return {
+            'n_resamples': int(n_resamples),
+            'confidence': float(confidence),
+            'block_days': int(block_days),
+            'num_days': int(num_days),
+            'user_weighted_price': interval(weighted, 4),
+            'price_differential': interval(differential, 4),
+            'price_differential_pct': interval(differential_pct, 2),
+            'correlation': interval(correlation, 4),
+        }
+    
+    def rolling_risk(self, window_days: int = 30, expensive_hours_pct: float = 20.0) -> dict:
+        """
+        Risk metrics for every window of window_days, stepped daily over the analyzed period.
+        
+        Each metric is a ratio of sums, so the merged intervals are reduced to daily sums once
+        and every window is a difference of two cumulative sums (O(n) in total). Consumption
+        and prices are centered before the cross products are summed to keep the rolling
+        correlation numerically stable. Coincidence counts the intervals in the top
+        expensive_hours_pct of their own day, which keeps it additive across days. It is
+        reported as daily_peak_coincidence_pct, since coincidence_factor's
+        consumption_coincidence_pct ranks the whole period instead.
+        
+        Parameters:
+        window_days (int): Window length in days (default: 30)
+        expensive_hours_pct (float): Percentage of most expensive hours per day (default: 20.0)
+        
+        Returns:
+        dict: Contains window_days, expensive_hours_pct and windows, a list with start, end, num_hours,
+              market_avg_price, user_weighted_price, price_differential, price_differential_pct,
+              correlation and daily_peak_coincidence_pct per window
+        """
+        if window_days < 1:
+            raise ValueError(f"window_days must be at least 1, got {window_days}")
+        if not 0 < expensive_hours_pct <= 100:
+            raise ValueError(f"expensive_hours_pct must be between 0 and 100, got {expensive_hours_pct}")
+        
+        daily = self._daily_sums(expensive_hours_pct)
+        market = self._daily_market()
+        
+        days = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+        if len(days) < window_days:
+            raise ValueError(f"Consumption and prices overlap on {len(days)} days, "
+                             f"fewer than the {window_days}-day window")
+        
+        def window_sums(frame: pd.DataFrame) -> dict:
+            values = frame.reindex(days, fill_value=0).to_numpy(dtype=float)
+            cumulative = np.vstack([np.zeros(values.shape[1]), np.cumsum(values, axis=0)])
+            sums = cumulative[window_days:] - cumulative[:-window_days]
+            return dict(zip(frame.columns, sums.T))
+        
+        w = window_sums(daily)
+        m = window_sums(market)
+        n = np.maximum(w['n'], 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weighted = np.where(w['value'] > 0, w['cost'] / w['value'], 0.0)
+            market_avg = np.where(m['count'] > 0, m['sum'] / np.maximum(m['count'], 1), np.nan)
+            differential = weighted - market_avg
+            differential_pct = np.where(market_avg > 0, differential / market_avg * 100, 0.0)
+            var_v = w['vv'] - w['v'] ** 2 / n
+            var_p = w['pp'] - w['p'] ** 2 / n
+            correlation = (w['vp'] - w['v'] * w['p'] / n) / np.sqrt(var_v * var_p)
+            correlation = np.where((var_v > 1e-12) & (var_p > 1e-12), correlation, 0.0)
+            coincidence = np.where(w['value'] > 0, w['value_expensive'] / w['value'] * 100, 0.0)
+        
+        windows = [
+            {
+                'start': days[i].strftime('%Y-%m-%d'),
+                'end': days[i + window_days - 1].strftime('%Y-%m-%d'),
+                'num_hours': int(w['n'][i]),
+                'market_avg_price': round(float(market_avg[i]), 4),
+                'user_weighted_price': round(float(weighted[i]), 4),
+                'price_differential': round(float(differential[i]), 4),
+                'price_differential_pct': round(float(differential_pct[i]), 2),
+                'correlation': round(float(np.clip(correlation[i], -1, 1)), 4),
+                'daily_peak_coincidence_pct': round(float(coincidence[i]), 2),
+            }
+            for i in range(len(days) - window_days + 1)
+            if w['n'][i] > 0 and m['count'][i] > 0
+        ]
+        return {
+            'window_days': int(window_days),
+            'expensive_hours_pct': float(expensive_hours_pct),
+            'windows': windows,
+        }
+    
+    def _profile_frames(self) -> tuple:
+        """Hourly consumption of the last n days and the hourly prices, aligned once"""
+        if self._profile is None:
+            # The profile covers the last n days of consumption, independent of the price window
+            consumption = self.consumption
+            consumption_filtered = consumption[
+                consumption['datetime'] >= consumption['datetime'].max() - timedelta(days=self.days)
+            ]
+            if len(consumption_filtered) == 0:
+                raise ValueError(f"No consumption data available for the last {self.days} days")
+            
+            # Heatmap cells are whole hours, so sum finer readings to hours
+            self._profile = _align_consumption_to_prices(consumption_filtered, self.prices, resolution='hour')
+        return self._profile
+    
+    def _heatmap_sums(self, binning: str) -> dict:
+        """
+        Per-cell sums and counts of consumption, price and cost for a calendar binning.
+        
+        Every measure is one np.bincount over the flat cell index of its timestamps, so any
+        binning costs the same as the hour-of-day profile.
+        
+        Returns:
+        dict: Flat arrays of length rows * 24: consumption_sum, consumption_count, price_sum,
+              price_count, cost_sum and priced_consumption (consumption in hours with a price)
+        """
+        consumption, prices = self._profile_frames()
+        consumption_cells = _calendar_cells(consumption['datetime'], binning)
+        cells = len(HEATMAP_ROWS[binning]) * 24
+        price_cells = _calendar_cells(prices['datetime'], binning)
+        priced = consumption.merge(prices[['datetime', 'price_eur_per_kwh']], on='datetime', how='inner')
+        priced_cells = _calendar_cells(priced['datetime'], binning)
+        value = priced['value'].to_numpy(dtype=float)
+        return {
+            'consumption_sum': np.bincount(consumption_cells, weights=consumption['value'].to_numpy(dtype=float),
+                                           minlength=cells),
+            'consumption_count': np.bincount(consumption_cells, minlength=cells),
+            'price_sum': np.bincount(price_cells, weights=prices['price_eur_per_kwh'].to_numpy(dtype=float),
+                                     minlength=cells),
+            'price_count': np.bincount(price_cells, minlength=cells),
+            'cost_sum': np.bincount(priced_cells, weights=value * priced['price_eur_per_kwh'].to_numpy(dtype=float),
+                                    minlength=cells),
+            'priced_consumption': np.bincount(priced_cells, weights=value, minlength=cells),
+        }
+    
+    def heatmap(self, binning: str = 'hour_of_week') -> dict:
+        """Consumption, price and cost per calendar cell as 2-D arrays (see get_consumption_heatmap)"""
+        sums = self._heatmap_sums(binning)
+        shape = (len(HEATMAP_ROWS[binning]), 24)
+        
+        def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+            # Cells without data are 0, like the hours missing from the load profile
+            return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+        
+        def grid(values: np.ndarray, digits: int = None) -> list:
+            values = values.reshape(shape)
+            return (values.round(digits) if digits is not None else values).tolist()
+        
+        consumption, _ = self._profile_frames()
+        return {
+            'binning': binning,
+            'rows': HEATMAP_ROWS[binning],
+            'columns': list(range(24)),
+            'consumption_kwh': {
+                'sum': grid(sums['consumption_sum'], 3),
+                'count': grid(sums['consumption_count']),
+                'mean': grid(ratio(sums['consumption_sum'], sums['consumption_count']), 3),
+            },
+            'price_eur_per_kwh': {
+                'sum': grid(sums['price_sum'], 4),
+                'count': grid(sums['price_count']),
+                'mean': grid(ratio(sums['price_sum'], sums['price_count']), 4),
+            },
+            'cost_eur': {
+                'sum': grid(sums['cost_sum'], 2),
+                'weighted_price': grid(ratio(sums['cost_sum'], sums['priced_consumption']), 4),
+            },
+            'analysis_period': {
+                'start': consumption['datetime'].min().strftime('%Y-%m-%d'),
+                'end': consumption['datetime'].max().strftime('%Y-%m-%d')
+            }
+        }
+    
+    def load_profile(self) -> dict:
+        """Average consumption and price per hour of day (see get_user_load_profile)"""
+        consumption, _ = self._profile_frames()
+        sums = self._heatmap_sums('hour')
+        count = sums['consumption_count']
+        # Hours without data are 0 (prices should be complete)
+        avg_consumption = np.divide(sums['consumption_sum'], count, out=np.zeros(24), where=count > 0)
+        avg_price = np.divide(sums['price_sum'], sums['price_count'], out=np.zeros(24), where=sums['price_count'] > 0)
+        
+        hourly_data = [
+            {
+                'hour': hour,
+                'avg_consumption_kwh': round(float(avg_consumption[hour]), 3),
+                'avg_price_eur_per_kwh': round(float(avg_price[hour]), 4),
+                'num_data_points': int(count[hour])
+            }
+            for hour in range(24)
+        ]
+        
+        # Correlation between hourly consumption and prices, ignoring hours without consumption
+        with_data = avg_consumption > 0
+        correlation = 0.0
+        if with_data.sum() > 1:
+            correlation = pd.Series(avg_consumption[with_data]).corr(pd.Series(avg_price[with_data]))
+            # Handle NaN correlation (can occur with insufficient variance)
+            if pd.isna(correlation):
+                correlation = 0.0
+        
+        start = consumption['datetime'].min()
+        end = consumption['datetime'].max()
+        return {
+            'hourly_data': hourly_data,
+            'summary': {
+                'total_days_analyzed': int((end - start).days),
+                'peak_consumption_hour': int(np.argmax(avg_consumption)),
+                'lowest_consumption_hour': int(np.argmin(avg_consumption)),
+                'peak_price_hour': int(np.argmax(avg_price)),
+                'lowest_price_hour': int(np.argmin(avg_price)),
+                'correlation': round(float(correlation), 4),
+                'analysis_period': {
+                    'start': start.strftime('%Y-%m-%d'),
+                    'end': end.strftime('%Y-%m-%d')
+                }
+            }
+        }
 
 
-def create_historic_risk_analysis(consumption_data: pd.DataFrame, days: int = 30, app_data_dir: str = None) -> dict:
+def create_historic_risk_analysis(consumption_data: pd.DataFrame, days: int = 30, app_data_dir: str = None,
+                                  resolution: str = None, bootstrap_resamples: int = 0) -> dict:
     """
     Perform historic risk analysis by comparing market average prices with user's weighted average price.
     
@@ -145,6 +786,8 @@ def create_historic_risk_analysis(consumption_data: pd.DataFrame, days: int = 30
     consumption_data (pd.DataFrame): DataFrame with user consumption data, must have 'datetime' and 'value' columns
     days (int): Number of days to analyze (default: 30)
     app_data_dir (str): Path to app_data directory. If None, uses default path
+    resolution (str): Optional coarser resolution (e.g. 'hour'); by default the data's native resolution is used
+    bootstrap_resamples (int): Number of day-block bootstrap resamples for confidence intervals (default: 0, none)
     
     Returns:
     dict: A dictionary containing:
@@ -159,89 +802,18 @@ def create_historic_risk_analysis(consumption_data: pd.DataFrame, days: int = 30
         - days_analyzed: Actual number of days in the analysis
         - num_hours: Number of hours with matching price and consumption data
         - price_file_used: Name of the price data file used
+        - confidence_intervals: 95% intervals of the weighted price, differential and correlation
+                                (see RiskAnalysisContext.bootstrap_risk), if bootstrap_resamples > 0
     """
-    # Determine app_data directory
-    if app_data_dir is None:
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        app_data_dir = os.path.join(project_root, "app_data")
-    
-    # Find and load the most recent price file
-    try:
-        price_file = _get_most_recent_price_file(app_data_dir)
-        price_file_name = os.path.basename(price_file)
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"Cannot perform risk analysis: {str(e)}")
-    
-    # Prepare consumption data
-    consumption_data = consumption_data.copy()
-    consumption_data['datetime'] = pd.to_datetime(consumption_data['datetime'])
-    
-    # Determine the analysis period based on consumption data availability
-    # Use the most recent data available in the consumption dataset
-    consumption_end = consumption_data['datetime'].max()
-    
-    # Load historic prices matching the consumption timeframe
-    prices = _load_historic_prices(price_file, days, end_date=consumption_end)
-    
-    # Filter consumption data to match the price data timeframe
-    price_start = prices['ds'].min()
-    price_end = prices['ds'].max()
-    consumption_filtered = consumption_data[
-        (consumption_data['datetime'] >= price_start) & 
-        (consumption_data['datetime'] <= price_end)
-    ].copy()
-    
-    if len(consumption_filtered) == 0:
-        raise ValueError(
-            f"No consumption data overlaps with price data period "
-            f"({price_start.date()} to {price_end.date()}). "
-            f"Consumption data range: {consumption_data['datetime'].min().date()} to {consumption_data['datetime'].max().date()}"
-        )
-    
-    # Calculate market average price
-    market_avg_price = prices['price_eur_per_kwh'].mean()
-    price_volatility = prices['price_eur_per_kwh'].std()
-    
-    # Calculate user's weighted average price
-    weighted_results = _calculate_weighted_average_price(prices, consumption_filtered)
-    user_weighted_price = weighted_results['weighted_avg_price']
-    
-    # Calculate differential
-    price_differential = user_weighted_price - market_avg_price
-    price_differential_pct = (price_differential / market_avg_price * 100) if market_avg_price > 0 else 0
-    
-    # Determine risk exposure
-    if price_differential < 0:
-        risk_exposure = 'favorable'
-        risk_message = f"User consumed more during low-price periods, saving {abs(price_differential_pct):.2f}%"
-    else:
-        risk_exposure = 'unfavorable'
-        risk_message = f"User consumed more during high-price periods, paying {price_differential_pct:.2f}% more"
-    
-    # Calculate actual days analyzed
-    days_analyzed = (price_end - price_start).days
-    
-    return {
-        'market_avg_price': round(float(market_avg_price), 4),
-        'user_weighted_price': round(float(user_weighted_price), 4),
-        'price_differential': round(float(price_differential), 4),
-        'price_differential_pct': round(float(price_differential_pct), 2),
-        'risk_exposure': risk_exposure,
-        'risk_message': risk_message,
-        'total_consumption': round(float(weighted_results['total_consumption']), 2),
-        'total_cost': round(float(weighted_results['total_cost']), 2),
-        'price_volatility': round(float(price_volatility), 4),
-        'days_analyzed': int(days_analyzed),
-        'num_hours': int(weighted_results['num_hours']),
-        'price_file_used': price_file_name,
-        'analysis_period': {
-            'start': price_start.strftime('%Y-%m-%d'),
-            'end': price_end.strftime('%Y-%m-%d')
-        }
-    }
+    context = RiskAnalysisContext(consumption_data, days, app_data_dir, resolution)
+    result = context.historic_risk()
+    if bootstrap_resamples > 0:
+        result['confidence_intervals'] = context.bootstrap_risk(n_resamples=bootstrap_resamples)
+    return result
 
 def calculate_coincidence_factor(consumption_data: pd.DataFrame, days: int = 30, 
-                                expensive_hours_pct: float = 20.0, app_data_dir: str = None) -> dict:
+                                expensive_hours_pct: float = 20.0, app_data_dir: str = None,
+                                resolution: str = None) -> dict:
     """
     Calculate the coincidence factor by analyzing how much energy usage occurred during 
     the most expensive hours in the last n days.
@@ -256,6 +828,7 @@ def calculate_coincidence_factor(consumption_data: pd.DataFrame, days: int = 30,
     days (int): Number of days to analyze (default: 30)
     expensive_hours_pct (float): Percentage of most expensive hours to analyze (default: 20.0, range: 0-100)
     app_data_dir (str): Path to app_data directory. If None, uses default path
+    resolution (str): Optional coarser resolution (e.g. 'hour'); by default the data's native resolution is used
     
     Returns:
     dict: A dictionary containing:
@@ -274,137 +847,54 @@ def calculate_coincidence_factor(consumption_data: pd.DataFrame, days: int = 30,
         - correlation: Correlation coefficient between consumption and prices
         - coincidence_rating: 'high', 'medium', or 'low' based on consumption_coincidence_pct
     """
-    # Validate percentage
+    # Validate percentage before loading any data
     if not 0 < expensive_hours_pct <= 100:
         raise ValueError(f"expensive_hours_pct must be between 0 and 100, got {expensive_hours_pct}")
     
-    # Determine app_data directory
-    if app_data_dir is None:
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        app_data_dir = os.path.join(project_root, "app_data")
-    
-    # Find and load the most recent price file
-    try:
-        price_file = _get_most_recent_price_file(app_data_dir)
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"Cannot perform coincidence analysis: {str(e)}")
+    context = RiskAnalysisContext(consumption_data, days, app_data_dir, resolution)
+    return context.coincidence_factor(expensive_hours_pct)
+
+def calculate_coincidence_curve(consumption_data: pd.DataFrame, days: int = 30, step_pct: float = 1.0,
+                                app_data_dir: str = None, resolution: str = None) -> dict:
+    """
+    Calculate the coincidence curve: consumption and cost share in the top x% most expensive hours for every x.
     
-    # Prepare consumption data
-    consumption_data = consumption_data.copy()
-    consumption_data['datetime'] = pd.to_datetime(consumption_data['datetime'])
+    The intervals are sorted by price once and running sums give every point of the curve, so the
+    whole curve costs one O(n log n) sort. calculate_coincidence_factor is a single point of it.
     
-    # Determine the analysis period based on consumption data availability
-    consumption_end = consumption_data['datetime'].max()
+    Parameters:
+    consumption_data (pd.DataFrame): DataFrame with user consumption data, must have 'datetime' and 'value' columns
+    days (int): Number of days to analyze (default: 30)
+    step_pct (float): Spacing of the expensive-hour percentages (default: 1.0)
+    app_data_dir (str): Path to app_data directory. If None, uses default path
+    resolution (str): Optional coarser resolution (e.g. 'hour'); by default the data's native resolution is used
     
-    # Load historic prices matching the consumption timeframe
-    prices = _load_historic_prices(price_file, days, end_date=consumption_end)
+    Returns:
+    dict: See RiskAnalysisContext.coincidence_curve
+    """
+    return RiskAnalysisContext(consumption_data, days, app_data_dir, resolution).coincidence_curve(step_pct)
+
+def calculate_rolling_risk(consumption_data: pd.DataFrame, window_days: int = 30, expensive_hours_pct: float = 20.0,
+                           app_data_dir: str = None, resolution: str = None) -> dict:
+    """
+    Calculate the risk metrics for every window_days window, stepped daily over the whole overlap of
+    consumption and price history.
     
-    # Prepare price data
-    prices = prices.copy()
-    prices['datetime'] = pd.to_datetime(prices['ds'])
-    
-    # Filter consumption data to match the price data timeframe
-    price_start = prices['datetime'].min()
-    price_end = prices['datetime'].max()
-    consumption_filtered = consumption_data[
-        (consumption_data['datetime'] >= price_start) & 
-        (consumption_data['datetime'] <= price_end)
-    ].copy()
-    
-    if len(consumption_filtered) == 0:
-        raise ValueError(
-            f"No consumption data overlaps with price data period "
-            f"({price_start.date()} to {price_end.date()})"
-        )
-    
-    # Resample consumption to hourly if it's not already
-    time_diff = consumption_filtered['datetime'].diff().mode()[0] if len(consumption_filtered) > 1 else pd.Timedelta(hours=1)
-    
-    if time_diff == pd.Timedelta(minutes=15):
-        # Convert 15-minute kW readings to kWh (multiply by 0.25 hours)
-        consumption_filtered['value'] = consumption_filtered['value'] * 0.25
-        consumption_filtered = consumption_filtered.set_index('datetime').resample('h').sum().reset_index()
-    
-    # Merge consumption with prices on datetime
-    merged = consumption_filtered.merge(prices[['datetime', 'price_eur_per_kwh']], on='datetime', how='inner')
-    
-    if len(merged) == 0:
-        raise ValueError("No matching timestamps between consumption and price data")
-    
-    # Calculate the price threshold for expensive hours
-    price_threshold = merged['price_eur_per_kwh'].quantile(1 - (expensive_hours_pct / 100))
-    
-    # Identify expensive hours
-    merged['is_expensive'] = merged['price_eur_per_kwh'] >= price_threshold
-    
-    # Calculate metrics
-    total_hours = len(merged)
-    num_expensive_hours = merged['is_expensive'].sum()
-    
-    # Consumption metrics
-    total_consumption = merged['value'].sum()
-    consumption_expensive = merged[merged['is_expensive']]['value'].sum()
-    consumption_cheap = merged[~merged['is_expensive']]['value'].sum()
-    consumption_coincidence_pct = (consumption_expensive / total_consumption * 100) if total_consumption > 0 else 0
-    
-    # Cost metrics
-    merged['cost'] = merged['value'] * merged['price_eur_per_kwh']
-    total_cost = merged['cost'].sum()
-    cost_expensive = merged[merged['is_expensive']]['cost'].sum()
-    cost_cheap = merged[~merged['is_expensive']]['cost'].sum()
-    cost_coincidence_pct = (cost_expensive / total_cost * 100) if total_cost > 0 else 0
-    
-    # Price metrics
-    avg_price_expensive = merged[merged['is_expensive']]['price_eur_per_kwh'].mean()
-    avg_price_cheap = merged[~merged['is_expensive']]['price_eur_per_kwh'].mean()
-    
-    # Handle NaN values (can occur if all hours are in one category)
-    if pd.isna(avg_price_expensive):
-        avg_price_expensive = 0.0
-    if pd.isna(avg_price_cheap):
-        avg_price_cheap = 0.0
-    
-    # Calculate correlation coefficient
-    correlation = merged['value'].corr(merged['price_eur_per_kwh'])
-    # Handle NaN correlation (can occur with insufficient variance)
-    if pd.isna(correlation):
-        correlation = 0.0
+    Parameters:
+    consumption_data (pd.DataFrame): DataFrame with user consumption data, must have 'datetime' and 'value' columns
+    window_days (int): Window length in days (default: 30)
+    expensive_hours_pct (float): Percentage of most expensive hours per day (default: 20.0)
+    app_data_dir (str): Path to app_data directory. If None, uses default path
+    resolution (str): Optional coarser resolution (e.g. 'hour'); by default the data's native resolution is used
     
-    # Determine coincidence rating
-    if consumption_coincidence_pct > expensive_hours_pct + 10:
-        coincidence_rating = 'high'
-        rating_message = f"High coincidence: {consumption_coincidence_pct:.1f}% of consumption during {expensive_hours_pct:.0f}% most expensive hours (unfavorable)"
-    elif consumption_coincidence_pct > expensive_hours_pct - 5:
-        coincidence_rating = 'medium'
-        rating_message = f"Medium coincidence: {consumption_coincidence_pct:.1f}% of consumption during {expensive_hours_pct:.0f}% most expensive hours (neutral)"
-    else:
-        coincidence_rating = 'low'
-        rating_message = f"Low coincidence: {consumption_coincidence_pct:.1f}% of consumption during {expensive_hours_pct:.0f}% most expensive hours (favorable)"
-    
-    return {
-        'expensive_hours_pct': float(expensive_hours_pct),
-        'num_expensive_hours': int(num_expensive_hours),
-        'total_hours': int(total_hours),
-        'consumption_during_expensive_hours': round(float(consumption_expensive), 2),
-        'consumption_during_cheap_hours': round(float(consumption_cheap), 2),
-        'total_consumption': round(float(total_consumption), 2),
-        'consumption_coincidence_pct': round(float(consumption_coincidence_pct), 2),
-        'cost_during_expensive_hours': round(float(cost_expensive), 2),
-        'cost_during_cheap_hours': round(float(cost_cheap), 2),
-        'total_cost': round(float(total_cost), 2),
-        'cost_coincidence_pct': round(float(cost_coincidence_pct), 2),
-        'avg_price_expensive_hours': round(float(avg_price_expensive), 4),
-        'avg_price_cheap_hours': round(float(avg_price_cheap), 4),
-        'price_threshold': round(float(price_threshold), 4),
-        'correlation': round(float(correlation), 4),
-        'coincidence_rating': coincidence_rating,
-        'rating_message': rating_message,
-        'days_analyzed': int(days),
-        'analysis_period': {
-            'start': price_start.strftime('%Y-%m-%d'),
-            'end': price_end.strftime('%Y-%m-%d')
-        }
-    }
+    Returns:
+    dict: See RiskAnalysisContext.rolling_risk
+    """
+    datetimes = pd.to_datetime(consumption_data['datetime'])
+    # Load the prices of the whole consumption period
+    history_days = (datetimes.max() - datetimes.min()).days + 1
+    context = RiskAnalysisContext(consumption_data, history_days, app_data_dir, resolution)
+    return context.rolling_risk(window_days, expensive_hours_pct)
 
 def get_user_load_profile(consumption_data: pd.DataFrame, days: int = 30, app_data_dir: str = None) -> dict:
     """
@@ -434,216 +924,168 @@ def get_user_load_profile(consumption_data: pd.DataFrame, days: int = 30, app_da
             - lowest_price_hour: Hour with lowest average price
             - correlation: Correlation coefficient between hourly consumption and prices
     """
-    # Determine app_data directory
-    if app_data_dir is None:
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        app_data_dir = os.path.join(project_root, "app_data")
-    
-    # Find and load the most recent price file
-    try:
-        price_file = _get_most_recent_price_file(app_data_dir)
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"Cannot analyze load profile: {str(e)}")
-    
-    # Prepare consumption data
-    consumption_data = consumption_data.copy()
-    consumption_data['datetime'] = pd.to_datetime(consumption_data['datetime'])
-    
-    # Determine the analysis period based on consumption data availability
-    consumption_end = consumption_data['datetime'].max()
-    consumption_start = consumption_end - timedelta(days=days)
-    
-    # Filter consumption data to the last n days
-    consumption_filtered = consumption_data[
-        consumption_data['datetime'] >= consumption_start
-    ].copy()
-    
-    if len(consumption_filtered) == 0:
-        raise ValueError(f"No consumption data available for the last {days} days")
-    
-    # Load historic prices matching the consumption timeframe
-    prices = _load_historic_prices(price_file, days, end_date=consumption_end)
-    
-    # Prepare price data
-    prices = prices.copy()
-    prices['datetime'] = pd.to_datetime(prices['ds'])
-    
-    # Resample consumption to hourly if needed
-    time_diff = consumption_filtered['datetime'].diff().mode()[0] if len(consumption_filtered) > 1 else pd.Timedelta(hours=1)
+    return RiskAnalysisContext(consumption_data, days, app_data_dir).load_profile()
+
+def get_consumption_heatmap(consumption_data: pd.DataFrame, days: int = 30, binning: str = 'hour_of_week',
+                            app_data_dir: str = None) -> dict:
+    """
+    Aggregate consumption, prices and cost of the past n days into a calendar heatmap.
     
-    if time_diff == pd.Timedelta(minutes=15):
-        # Convert 15-minute kW readings to kWh (multiply by 0.25 hours)
-        consumption_filtered['value'] = consumption_filtered['value'] * 0.25
-        consumption_filtered = consumption_filtered.set_index('datetime').resample('h').sum().reset_index()
-    
-    # Extract hour of day for consumption data
-    consumption_filtered['hour'] = consumption_filtered['datetime'].dt.hour
-    
-    # Extract hour of day for price data
-    prices['hour'] = prices['datetime'].dt.hour
-    
-    # Calculate average consumption by hour of day
-    avg_consumption_by_hour = consumption_filtered.groupby('hour').agg({
-        'value': ['mean', 'count']
-    }).reset_index()
-    avg_consumption_by_hour.columns = ['hour', 'avg_consumption', 'count']
-    
-    # Calculate average price by hour of day
-    avg_price_by_hour = prices.groupby('hour')['price_eur_per_kwh'].mean().reset_index()
-    avg_price_by_hour.columns = ['hour', 'avg_price']
-    
-    # Merge consumption and price data
-    hourly_combined = avg_consumption_by_hour.merge(avg_price_by_hour, on='hour', how='outer')
-    
-    # Fill missing hours with 0 for consumption (prices should be complete)
-    hourly_combined = hourly_combined.set_index('hour').reindex(range(24), fill_value=0).reset_index()
-    hourly_combined['avg_consumption'] = hourly_combined['avg_consumption'].fillna(0)
-    hourly_combined['avg_price'] = hourly_combined['avg_price'].fillna(0)
-    hourly_combined['count'] = hourly_combined['count'].fillna(0).astype(int)
-    
-    # Build hourly data list for response
-    hourly_data = []
-    for _, row in hourly_combined.iterrows():
-        hourly_data.append({
-            'hour': int(row['hour']),
-            'avg_consumption_kwh': round(float(row['avg_consumption']), 3),
-            'avg_price_eur_per_kwh': round(float(row['avg_price']), 4),
-            'num_data_points': int(row['count'])
-        })
+    Rows are the whole period ('hour'), the days of the week ('hour_of_week') or the months
+    ('month_hour'); columns are the hours of the day. get_user_load_profile is the 'hour' binning.
     
-    # Calculate summary statistics
-    # Find peak and lowest consumption hours
-    max_consumption_idx = hourly_combined['avg_consumption'].idxmax()
-    min_consumption_idx = hourly_combined['avg_consumption'].idxmin()
-    peak_consumption_hour = int(hourly_combined.loc[max_consumption_idx, 'hour'])
-    lowest_consumption_hour = int(hourly_combined.loc[min_consumption_idx, 'hour'])
-    
-    # Find peak and lowest price hours
-    max_price_idx = hourly_combined['avg_price'].idxmax()
-    min_price_idx = hourly_combined['avg_price'].idxmin()
-    peak_price_hour = int(hourly_combined.loc[max_price_idx, 'hour'])
-    lowest_price_hour = int(hourly_combined.loc[min_price_idx, 'hour'])
-    
-    # Calculate correlation between hourly consumption and prices
-    # Filter out hours with no consumption data
-    hourly_with_data = hourly_combined[hourly_combined['avg_consumption'] > 0].copy()
-    if len(hourly_with_data) > 1:
-        correlation = hourly_with_data['avg_consumption'].corr(hourly_with_data['avg_price'])
-        # Handle NaN correlation (can occur with insufficient variance)
-        if pd.isna(correlation):
-            correlation = 0.0
-    else:
-        correlation = 0.0
+    Parameters:
+    consumption_data (pd.DataFrame): DataFrame with user consumption data, must have 'datetime' and 'value' columns
+    days (int): Number of days to analyze (default: 30)
+    binning (str): 'hour', 'hour_of_week' or 'month_hour' (default: 'hour_of_week')
+    app_data_dir (str): Path to app_data directory. If None, uses default path
     
-    # Calculate actual days analyzed
-    actual_days = (consumption_filtered['datetime'].max() - consumption_filtered['datetime'].min()).days
-    
-    return {
-        'hourly_data': hourly_data,
-        'summary': {
-            'total_days_analyzed': int(actual_days),
-            'peak_consumption_hour': int(peak_consumption_hour),
-            'lowest_consumption_hour': int(lowest_consumption_hour),
-            'peak_price_hour': int(peak_price_hour),
-            'lowest_price_hour': int(lowest_price_hour),
-            'correlation': round(float(correlation), 4),
-            'analysis_period': {
-                'start': consumption_filtered['datetime'].min().strftime('%Y-%m-%d'),
-                'end': consumption_filtered['datetime'].max().strftime('%Y-%m-%d')
-            }
-        }
-    }
+    Returns:
+    dict: A dictionary containing:
+        - binning, rows (row labels) and columns (hours 0-23)
+        - consumption_kwh: sum, count and mean per cell (rows x 24 nested lists)
+        - price_eur_per_kwh: sum, count and mean per cell
+        - cost_eur: sum and weighted_price (cost / consumption in priced hours) per cell
+        - analysis_period: start and end of the consumption analyzed
+    """
+    if binning not in HEATMAP_ROWS:
+        raise ValueError(f"Unknown binning '{binning}'. Supported: {', '.join(HEATMAP_ROWS)}")
+    return RiskAnalysisContext(consumption_data, days, app_data_dir).heatmap(binning)
 
-def get_price_forecast_volatility(app_data_dir: str = None) -> dict:
+def get_price_forecast_volatility(app_data_dir: str = None, region: str = "DE") -> dict:
     """
-    Analyze price forecast volatility by reading the most recent forecast data.
+    Analyze price forecast volatility of the most recent forecast.
     
-    This function loads the most recent price forecast file from the app_data directory
-    and calculates two key volatility metrics.
+    The statistics are read from the volatility sidecar written with the forecast, so no
+    forecast CSV is parsed. Forecasts published without a sidecar are analyzed once and
+    the sidecar is stored for the next call.
     
     Parameters:
     app_data_dir (str): Path to app_data directory. If None, uses default path
+    region (str): Bidding zone of the forecast (default: DE)
     
     Returns:
     dict: Contains:
         - forecast_std_dev: Standard deviation of forecasted prices (€/kWh)
         - avg_confidence_interval_width: Average width of confidence intervals if available (€/kWh), None otherwise
+        - scenario_std_dev, scenario_paths: Spread across the stored sample paths, if any
     
     Raises:
     FileNotFoundError: If no forecast files are found
     """
     # Determine app_data directory
     if app_data_dir is None:
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        app_data_dir = os.path.join(project_root, "app_data")
+        app_data_dir = _default_app_data_dir()
     
     # Find the price forecast file
     try:
-        forecast_file = _get_price_forecast_file(app_data_dir)
+        forecast_file = _get_price_forecast_file(app_data_dir, region)
     except FileNotFoundError as e:
         raise FileNotFoundError(f"Cannot analyze price forecast volatility: {str(e)}")
     
-    # Load the forecast data
-    df = pd.read_csv(forecast_file)
+    meta = ensure_sidecar(forecast_file, forecast_volatility)
+    avg_ci_width = meta['avg_confidence_interval_width']
+    result = {
+        'forecast_std_dev': round(float(meta['std_dev']), 4),
+        'avg_confidence_interval_width': round(float(avg_ci_width), 4) if avg_ci_width is not None else None
+    }
     
-    # Check for required columns
-    if 'ds' not in df.columns:
-        raise ValueError(f"Forecast file must have 'ds' (datetime) column. Found columns: {df.columns.tolist()}")
+    # Spread across the stored predictive sample paths (no unit guessing: paths are in €/MWh)
+    if 'scenario_std_dev' not in meta:
+        stored = ForecastStore(os.path.join(app_data_dir, "forecasts"), region=region).load_paths()
+        if stored is not None:
+            meta = {**meta, **paths_volatility(stored[0])}
+    if 'scenario_std_dev' in meta:
+        result['scenario_std_dev'] = round(float(meta['scenario_std_dev']), 4)
+        result['scenario_paths'] = meta['scenario_paths']
     
-    # Convert datetime
-    df['ds'] = pd.to_datetime(df['ds'])
+    return result
+
+
+def get_historic_price_volatility(app_data_dir: str = None, days: int = 30) -> float:
+    """
+    Standard deviation of the realized prices of the last n days in the most recent price file.
     
-    # Determine price column (could be different names)
-    price_col = None
-    for col in ['price_eur_per_mwh', 'yhat', 'forecast', 'price']:
-        if col in df.columns:
-            price_col = col
-            break
-    
-    if price_col is None:
-        raise ValueError(f"No price column found in forecast file. Available columns: {df.columns.tolist()}")
-    
-    # Convert price to €/kWh if it's in €/MWh
-    # Check both column name and value range to determine if conversion is needed
-    # Prices in €/MWh are typically > 10, while €/kWh are typically < 1
-    mean_price = df[price_col].mean()
-    if 'mwh' in price_col.lower() or mean_price > 10:
-        # Prices are in €/MWh, convert to €/kWh
-        df['price_eur_per_kwh'] = df[price_col] / 1000
-    else:
-        # Already in €/kWh
-        df['price_eur_per_kwh'] = df[price_col]
-    
-    # Calculate standard deviation
-    forecast_std = df['price_eur_per_kwh'].std()
-    
-    # Check for confidence interval columns
-    avg_ci_width = None
-    lower_col = None
-    upper_col = None
-    
-    for col in df.columns:
-        col_lower = col.lower()
-        if 'lower' in col_lower or 'yhat_lower' in col_lower:
-            lower_col = col
-        if 'upper' in col_lower or 'yhat_upper' in col_lower:
-            upper_col = col
-    
-    if lower_col and upper_col:
-        # Convert confidence intervals from €/MWh to €/kWh
-        df['lower_kwh'] = df[lower_col] / 1000
-        df['upper_kwh'] = df[upper_col] / 1000
-        
-        # Calculate average confidence interval width
-        df['ci_width'] = df['upper_kwh'] - df['lower_kwh']
-        avg_ci_width = df['ci_width'].mean()
+    Read from the price file's volatility sidecar for the precomputed windows (7, 30 and 90
+    days); other windows, or files without a sidecar, are computed from the CSV.
     
-    return {
-        'forecast_std_dev': round(float(forecast_std), 4),
-        'avg_confidence_interval_width': round(float(avg_ci_width), 4) if avg_ci_width is not None else None
-    }
+    Parameters:
+    app_data_dir (str): Path to app_data directory. If None, uses default path
+    days (int): Number of days to look back (default: 30)
+    
+    Returns:
+    float: Standard deviation of the prices (€/kWh)
+    """
+    if app_data_dir is None:
+        app_data_dir = _default_app_data_dir()
+    price_file = _get_most_recent_price_file(app_data_dir)
+    
+    if days in HISTORIC_WINDOWS_DAYS:
+        meta = ensure_sidecar(price_file, historic_volatility)
+        return meta['windows'][str(days)]['std_dev']
+    return float(_load_historic_prices(price_file, days=days)['price_eur_per_kwh'].std())
+
+
+def _is_per_row(value) -> bool:
+    return isinstance(value, (list, tuple, np.ndarray, pd.Series))
+
+
+def _num_rows(*values) -> int:
+    lengths = {len(v) for v in values if _is_per_row(v)}
+    if len(lengths) > 1:
+        raise ValueError(f"Per-row arguments have different lengths: {sorted(lengths)}")
+    return lengths.pop() if lengths else 1
 
+
+def _column(n: int, value, extract) -> np.ndarray:
+    """
+    One input column of the scorecard.
+    
+    Parameters:
+    n (int): Number of rows
+    value: One value shared by all rows, or a list with one value per row
+    extract: Function value -> number or None (None for a missing input)
     
+    Returns:
+    np.ndarray: float column with NaN for missing inputs
+    """
+    def number(v):
+        v = extract(v)
+        return np.nan if v is None else float(v)
+    if _is_per_row(value):
+        return np.array([number(v) for v in value], dtype=float)
+    return np.full(n, number(value))
+
+
+def get_simplified_risk_scores(forecast_price_volatility, is_dynamic, historic_price_volatility=None) -> list:
+    """
+    Simplified risk scores of many rows (tariffs, households) in one vectorized call.
+    
+    Every argument is either one value shared by all rows or a list with one value per row.
+    
+    Parameters:
+    forecast_price_volatility (dict or list): Output from price volatility analysis
+    is_dynamic (bool or list): Whether the tariff is dynamic
+    historic_price_volatility (float or list): Optional historic price volatility from market data
+    
+    Returns:
+    list: One result of get_simplified_risk_score_for_yearly_usage per row
+    """
+    from .risk_scoring import SIMPLIFIED_SCORECARD, risk_assessments
+    
+    n = _num_rows(forecast_price_volatility, is_dynamic, historic_price_volatility)
+    inputs = {
+        'forecast_std_dev': _column(n, forecast_price_volatility, lambda v: (v or {}).get('forecast_std_dev')),
+        'historic_price_volatility': _column(n, historic_price_volatility, lambda v: v),
+    }
+    assessments = risk_assessments(SIMPLIFIED_SCORECARD, inputs, _column(n, is_dynamic, bool) > 0)
+    for assessment in assessments:
+        assessment.update({
+            'forecast_quality_included': False,
+            'simplified': True,
+            'note': 'Vereinfachte Risikobewertung basierend auf Standardlastprofil. Für genauere Analyse bitte Verbrauchsdaten hochladen.'
+        })
+    return assessments
 
 
 def get_simplified_risk_score_for_yearly_usage(forecast_price_volatility: dict, is_dynamic: bool, 
@@ -655,6 +1097,8 @@ def get_simplified_risk_score_for_yearly_usage(forecast_price_volatility: dict,
     - Price volatility (both historic and forecasted) for dynamic tariffs
     - Fixed tariff advantage (inherently lower risk)
     
+    The thresholds are the SIMPLIFIED_SCORECARD table in risk_scoring.
+    
     Parameters:
     forecast_price_volatility (dict): Output from price volatility analysis
     is_dynamic (bool): Whether the tariff is dynamic
@@ -663,123 +1107,54 @@ def get_simplified_risk_score_for_yearly_usage(forecast_price_volatility: dict,
     Returns:
     dict: Contains risk_level, risk_score, risk_message, risk_factors, simplified flag
     """
-    score = 40  # Start with moderate baseline
-    factors = []
+    return get_simplified_risk_scores(forecast_price_volatility, bool(is_dynamic), historic_price_volatility)[0]
+
+
+def get_aggregated_risk_scores(historic_risk_analysis, coincidence_factor, forecast_price_volatility, is_dynamic,
+                               usage_forecast_quality=None) -> list:
+    """
+    Aggregated risk scores of many rows (tariffs, households) in one vectorized call.
     
-    if is_dynamic:
-        # For dynamic tariffs without consumption data, risk is primarily about price uncertainty
-        price_std_dev = forecast_price_volatility.get('forecast_std_dev', None)
-        
-        if price_std_dev is not None:
-            # Assess based on forecasted price volatility
-            if price_std_dev > 0.05:
-                score += 15
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'negative', 
-                    'detail': f'Sehr hohe erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-            elif price_std_dev > 0.035:
-                score += 8
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'negative', 
-                    'detail': f'Hohe erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-            elif price_std_dev > 0.025:
-                score += 3
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'neutral', 
-                    'detail': f'Moderate erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-            else:
-                score -= 5
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'positive', 
-                    'detail': f'Niedrige erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-        
-        # Add historic price volatility if available
-        if historic_price_volatility is not None:
-            if historic_price_volatility > 0.06:
-                score += 10
-                factors.append({
-                    'factor': 'Historische Preisvolatilität', 
-                    'impact': 'negative', 
-                    'detail': f'Sehr hohe historische Preisschwankungen (σ: {historic_price_volatility:.4f} €/kWh)'
-                })
-            elif historic_price_volatility > 0.045:
-                score += 6
-                factors.append({
-                    'factor': 'Historische Preisvolatilität', 
-                    'impact': 'negative', 
-                    'detail': f'Hohe historische Preisschwankungen (σ: {historic_price_volatility:.4f} €/kWh)'
-                })
-            elif historic_price_volatility > 0.03:
-                score += 2
-                factors.append({
-                    'factor': 'Historische Preisvolatilität', 
-                    'impact': 'neutral', 
-                    'detail': f'Moderate historische Preisschwankungen (σ: {historic_price_volatility:.4f} €/kWh)'
-                })
-            else:
-                score -= 4
-                factors.append({
-                    'factor': 'Historische Preisvolatilität', 
-                    'impact': 'positive', 
-                    'detail': f'Niedrige historische Preisschwankungen (σ: {historic_price_volatility:.4f} €/kWh)'
-                })
-        
-        factors.append({
-            'factor': 'Verbrauchsdaten', 
-            'impact': 'neutral', 
-            'detail': 'Keine individuellen Verbrauchsdaten - Bewertung basiert auf Standardlastprofil'
-        })
-    else:
-        # Fixed tariffs are inherently lower risk
-        score -= 20
-        factors.append({
-            'factor': 'Tariftyp', 
-            'impact': 'positive', 
-            'detail': 'Fester Tarif - Keine Preisschwankungen'
-        })
+    Every argument is either one value shared by all rows or a list with one value per row,
+    e.g. the metrics of one household with is_dynamic of every tariff, or one list entry
+    per household and tariff pair.
     
-    # Ensure score is within bounds
-    overall_risk_score = max(0, min(100, score))
+    Parameters:
+    historic_risk_analysis (dict or list): Output from create_historic_risk_analysis function
+    coincidence_factor (dict or list): Output from calculate_coincidence_factor function
+    forecast_price_volatility (dict or list): Output from price volatility analysis
+    is_dynamic (bool or list): Whether the tariff is dynamic
+    usage_forecast_quality (dict or list): Optional. Quality metrics from backtest
     
-    # Determine risk level and message
-    if overall_risk_score <= 30:
-        risk_level = 'low'
-        if is_dynamic:
-            risk_message = 'Niedriges Risiko: Geringe erwartete Preisvolatilität macht dynamische Tarife attraktiv'
-        else:
-            risk_message = 'Niedriges Risiko: Fester Tarif bietet volle Preissicherheit'
-    elif overall_risk_score <= 50:
-        risk_level = 'moderate'
-        if is_dynamic:
-            risk_message = 'Moderates Risiko: Moderate Preisschwankungen erwartet. Empfehlung: Verbrauchsdaten für genauere Analyse hochladen'
-        else:
-            risk_message = 'Moderates Risiko: Fester Tarif bietet Preissicherheit'
-    else:
-        risk_level = 'high'
-        if is_dynamic:
-            risk_message = 'Höheres Risiko: Hohe Preisvolatilität erwartet. Bitte Verbrauchsdaten hochladen für detaillierte Analyse'
-        else:
-            risk_message = 'Moderates Risiko: Fester Tarif bietet stabile Preise'
-    
-    return {
-        'risk_level': risk_level,
-        'risk_score': int(overall_risk_score),
-        'risk_message': risk_message,
-        'risk_factors': factors,
-        'forecast_quality_included': False,
-        'simplified': True,
-        'note': 'Vereinfachte Risikobewertung basierend auf Standardlastprofil. Für genauere Analyse bitte Verbrauchsdaten hochladen.'
+    Returns:
+    list: One result of get_aggregated_risk_score per row
+    """
+    from .risk_scoring import AGGREGATED_SCORECARD, risk_assessments
+    
+    n = _num_rows(historic_risk_analysis, coincidence_factor, forecast_price_volatility, is_dynamic,
+                  usage_forecast_quality)
+    # Forecast quality and price volatility only count if they were computed
+    inputs = {
+        'price_differential_pct': _column(n, historic_risk_analysis, lambda h: h.get('price_differential_pct', 0)),
+        'coincidence_deviation': _column(n, coincidence_factor, lambda c: c.get('consumption_coincidence_pct', 0)
+                                         - c.get('expensive_hours_pct', 20.0)),
+        'price_volatility': _column(n, historic_risk_analysis, lambda h: h.get('price_volatility', 0)),
+        'forecast_error_percentage': _column(n, usage_forecast_quality,
+                                             lambda q: (q or {}).get('forecast_error_percentage')),
+        'relative_confidence_interval_width': _column(n, usage_forecast_quality,
+                                                      lambda q: (q or {}).get('relative_confidence_interval_width')),
+        'forecast_std_dev': _column(n, forecast_price_volatility, lambda v: (v or {}).get('forecast_std_dev')),
+        'avg_confidence_interval_width': _column(n, forecast_price_volatility,
+                                                 lambda v: (v or {}).get('avg_confidence_interval_width')),
     }
-    
-    
+    forecast_quality_included = _column(n, usage_forecast_quality, bool) > 0
+    assessments = risk_assessments(AGGREGATED_SCORECARD, inputs, _column(n, is_dynamic, bool) > 0,
+                                   flags={'forecast_quality_included': forecast_quality_included})
+    for assessment, included in zip(assessments, forecast_quality_included.tolist()):
+        assessment['forecast_quality_included'] = included
+    return assessments
+
+
 def get_aggregated_risk_score(historic_risk_analysis: dict, coincidence_factor: dict, forecast_price_volatility: dict,
                               is_dynamic: bool, usage_forecast_quality: dict = None) -> dict:
     """
@@ -787,6 +1162,7 @@ def get_aggregated_risk_score(historic_risk_analysis: dict, coincidence_factor:
     
     This function combines the outputs from historic risk analysis, coincidence factor
     calculations, and forecast quality metrics to provide an overall risk assessment for the user.
+    The thresholds are the AGGREGATED_SCORECARD table in risk_scoring.
     
     Parameters:
     historic_risk_analysis (dict): Output from create_historic_risk_analysis function
@@ -804,271 +1180,5 @@ def get_aggregated_risk_score(historic_risk_analysis: dict, coincidence_factor:
         - risk_factors: breakdown of contributing factors
         - forecast_quality_included: boolean indicating if forecast quality was factored in
     """
-    # Initialize score (lower is better/less risky)
-    # Start with a lower baseline to allow for more differentiation
-    score = 35  # Start at lower baseline for better differentiation
-    factors = []
-    
-    # For fixed tariffs, skip consumption-pattern-based risk factors
-    # since prices don't vary with market conditions
-    if is_dynamic:
-        # Adjust score based on historic risk analysis
-        # Using more granular thresholds to better differentiate user patterns
-        price_diff_pct = historic_risk_analysis.get('price_differential_pct', 0)
-        if price_diff_pct < -10:
-            score -= 12  # Very favorable - excellent consumption timing
-            factors.append({'factor': 'Historischer Verbrauch', 'impact': 'positive', 'detail': f'{abs(price_diff_pct):.1f}% unter Marktdurchschnitt'})
-        elif price_diff_pct < -5:
-            score -= 8  # Favorable - good consumption timing
-            factors.append({'factor': 'Historischer Verbrauch', 'impact': 'positive', 'detail': f'{abs(price_diff_pct):.1f}% unter Marktdurchschnitt'})
-        elif -5 <= price_diff_pct <= 5:
-            score += 0  # Neutral - no adjustment
-            factors.append({'factor': 'Historischer Verbrauch', 'impact': 'neutral', 'detail': 'Im Marktdurchschnitt'})
-        elif price_diff_pct <= 10:
-            score += 8  # Slightly unfavorable
-            factors.append({'factor': 'Historischer Verbrauch', 'impact': 'negative', 'detail': f'{price_diff_pct:.1f}% über Marktdurchschnitt'})
-        else:
-            score += 12  # Very unfavorable - poor consumption timing
-            factors.append({'factor': 'Historischer Verbrauch', 'impact': 'negative', 'detail': f'{price_diff_pct:.1f}% über Marktdurchschnitt'})
-        
-        # Adjust score based on coincidence factor
-        # More nuanced thresholds to capture different consumption patterns
-        consumption_coincidence = coincidence_factor.get('consumption_coincidence_pct', 0)
-        expensive_hours_pct = coincidence_factor.get('expensive_hours_pct', 20.0)
-        
-        # Calculate how much the user deviates from the expensive hours percentage
-        coincidence_deviation = consumption_coincidence - expensive_hours_pct
-        
-        if coincidence_deviation < -10:
-            score -= 12  # Excellent - significantly avoids expensive hours
-            factors.append({'factor': 'Verbrauchstiming', 'impact': 'positive', 'detail': 'Vermeidet teure Stunden deutlich'})
-        elif coincidence_deviation < -5:
-            score -= 8  # Good - avoids expensive hours
-            factors.append({'factor': 'Verbrauchstiming', 'impact': 'positive', 'detail': 'Vermeidet teure Stunden'})
-        elif -5 <= coincidence_deviation <= 5:
-            score += 0  # Neutral - typical pattern, no adjustment
-            factors.append({'factor': 'Verbrauchstiming', 'impact': 'neutral', 'detail': 'Typisches Verbrauchsmuster'})
-        elif coincidence_deviation <= 15:
-            score += 8  # Slightly unfavorable
-            factors.append({'factor': 'Verbrauchstiming', 'impact': 'negative', 'detail': 'Erhöhter Verbrauch zu teuren Zeiten'})
-        else:
-            score += 12  # Very unfavorable - high consumption during expensive hours
-            factors.append({'factor': 'Verbrauchstiming', 'impact': 'negative', 'detail': 'Hoher Verbrauch zu teuren Zeiten'})
-        
-        # Check price volatility with adjusted thresholds
-        volatility = historic_risk_analysis.get('price_volatility', 0)
-        if volatility > 0.06:  # Very high volatility (>6 ct/kWh std dev)
-            score += 8
-            factors.append({'factor': 'Preisvolatilität', 'impact': 'negative', 'detail': 'Sehr hohe Preisschwankungen'})
-        elif volatility > 0.045:  # High volatility
-            score += 5
-            factors.append({'factor': 'Preisvolatilität', 'impact': 'negative', 'detail': 'Hohe Preisschwankungen'})
-        elif volatility > 0.03:  # Medium volatility
-            score += 2
-            factors.append({'factor': 'Preisvolatilität', 'impact': 'neutral', 'detail': 'Moderate Preisschwankungen'})
-        else:
-            score -= 3  # Low volatility is favorable
-            factors.append({'factor': 'Preisvolatilität', 'impact': 'positive', 'detail': 'Niedrige Preisschwankungen'})
-    
-    # Adjust score based on forecast quality (if provided)
-    forecast_quality_included = False
-    if usage_forecast_quality:
-        forecast_quality_included = True
-        
-        # Prioritize forecast_error_percentage as it's more reliable than relative CI width
-        # (relative CI width can be misleading for low-consumption households)
-        forecast_error_pct = usage_forecast_quality.get('forecast_error_percentage', None)
-        relative_ci_width = usage_forecast_quality.get('relative_confidence_interval_width', None)
-        
-        if forecast_error_pct is not None:
-            # Use forecast error percentage as primary metric (most reliable)
-            # Lower error = better predictions = lower risk
-            
-            if forecast_error_pct < 10:
-                # Excellent forecast quality - significantly reduces risk
-                score -= 8
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'positive', 
-                    'detail': f'Sehr hohe Vorhersagegenauigkeit (Fehler: {forecast_error_pct:.1f}%)'
-                })
-            elif forecast_error_pct < 20:
-                # Good forecast quality - reduces risk
-                score -= 4
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'positive', 
-                    'detail': f'Gute Vorhersagegenauigkeit (Fehler: {forecast_error_pct:.1f}%)'
-                })
-            elif forecast_error_pct < 30:
-                # Fair forecast quality - slight risk increase
-                score += 3
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'neutral', 
-                    'detail': f'Moderate Vorhersageunsicherheit (Fehler: {forecast_error_pct:.1f}%)'
-                })
-            else:
-                # Poor forecast quality - increases risk
-                score += 10
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'negative', 
-                    'detail': f'Hohe Vorhersageunsicherheit (Fehler: {forecast_error_pct:.1f}%)'
-                })
-        
-        elif relative_ci_width is not None:
-            # Fallback to relative confidence interval width if forecast error not available
-            # Note: This can be misleading for low-consumption households
-            # Adjusted ranges to be more lenient
-            
-            if relative_ci_width < 40:
-                # Excellent forecast quality - reduces risk for dynamic tariffs
-                score -= 8
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'positive', 
-                    'detail': f'Sehr hohe Vorhersagegenauigkeit (CI: {relative_ci_width:.1f}%)'
-                })
-            elif relative_ci_width < 80:
-                # Good forecast quality - slight risk reduction
-                score -= 4
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'positive', 
-                    'detail': f'Gute Vorhersagegenauigkeit (CI: {relative_ci_width:.1f}%)'
-                })
-            elif relative_ci_width < 120:
-                # Fair forecast quality - neutral to slight risk increase
-                score += 3
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'neutral', 
-                    'detail': f'Moderate Vorhersageunsicherheit (CI: {relative_ci_width:.1f}%)'
-                })
-            else:
-                # Poor forecast quality - increases risk
-                score += 10
-                factors.append({
-                    'factor': 'Prognosequalität', 
-                    'impact': 'negative', 
-                    'detail': f'Hohe Vorhersageunsicherheit (CI: {relative_ci_width:.1f}%)'
-                })
-    
-    # Adjust score based on price forecast volatility (ONLY for dynamic tariffs)
-    # Price volatility doesn't matter for fixed tariffs since they have fixed rates
-    if is_dynamic and forecast_price_volatility:
-        price_std_dev = forecast_price_volatility.get('forecast_std_dev', None)
-        price_ci_width = forecast_price_volatility.get('avg_confidence_interval_width', None)
-        
-        if price_std_dev is not None:
-            # Standard deviation thresholds (in €/kWh)
-            # Adjusted thresholds: Low: <0.025, Medium: 0.025-0.045, High: >0.045
-            
-            if price_std_dev > 0.05:
-                # Very high price volatility increases risk significantly
-                score += 8
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'negative', 
-                    'detail': f'Sehr hohe erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-            elif price_std_dev > 0.035:
-                # High price volatility
-                score += 5
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'negative', 
-                    'detail': f'Hohe erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-            elif price_std_dev > 0.025:
-                # Medium price volatility
-                score += 2
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'neutral', 
-                    'detail': f'Moderate erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-            else:
-                # Low price volatility reduces risk
-                score -= 3
-                factors.append({
-                    'factor': 'Preisvolatilität (Prognose)', 
-                    'impact': 'positive', 
-                    'detail': f'Niedrige erwartete Preisschwankungen (σ: {price_std_dev:.4f} €/kWh)'
-                })
-        
-        # Additional check for confidence interval width if available
-        # CI width reflects forecast uncertainty (±half the width from the mean)
-        # E.g., 0.15 €/kWh (150 €/MWh) means ±75 €/MWh uncertainty
-        if price_ci_width is not None:
-            if price_ci_width > 0.20:
-                # Very wide confidence intervals (>200 €/MWh) indicate very high uncertainty
-                score += 10
-                factors.append({
-                    'factor': 'Preisprognose-Unsicherheit', 
-                    'impact': 'negative', 
-                    'detail': f'Sehr hohe Unsicherheit in Preisprognose (Breite Konfidenzintervall: {price_ci_width:.4f} €/kWh)'
-                })
-            elif price_ci_width > 0.12:
-                # Wide confidence intervals (>120 €/MWh) indicate high uncertainty
-                # This includes typical values around 150-180 €/MWh
-                score += 6
-                factors.append({
-                    'factor': 'Preisprognose-Unsicherheit', 
-                    'impact': 'negative', 
-                    'detail': f'Hohe Prognoseunsicherheit (Breite Konfidenzintervall: {price_ci_width:.4f} €/kWh)'
-                })
-            elif price_ci_width > 0.08:
-                # Medium confidence intervals (80-120 €/MWh) - moderate uncertainty
-                score += 3
-                factors.append({
-                    'factor': 'Preisprognose-Unsicherheit', 
-                    'impact': 'neutral', 
-                    'detail': f'Moderate Prognoseunsicherheit (Breite Konfidenzintervall: {price_ci_width:.4f} €/kWh)'
-                })
-            else:
-                # Narrow confidence intervals (<80 €/MWh) indicate good forecast quality
-                score -= 3
-                factors.append({
-                    'factor': 'Preisprognose-Qualität', 
-                    'impact': 'positive', 
-                    'detail': f'Gute Prognosequalität (Breite Konfidenzintervall: {price_ci_width:.4f} €/kWh)'
-                })
-            
-    # Adjust score for fixed tariffs
-    if not is_dynamic:
-        score -= 20  # Fixed tariffs are less risky (reduced from 25)
-        factors.append({'factor': 'Tariftyp', 'impact': 'positive', 'detail': 'Fester Tarif'})
-    
-    # Ensure score is within bounds (0-100, lower is better)
-    overall_risk_score = max(0, min(100, score))
-    
-    # Determine risk level and message with adjusted thresholds
-    # Lower thresholds to account for lower starting baseline
-    if overall_risk_score <= 30:
-        risk_level = 'low'
-        if forecast_quality_included:
-            risk_message = 'Niedriges Risiko: Ihr Verbrauchsprofil und zuverlässige Prognosen eignen sich gut für dynamische Tarife'
-        else:
-            risk_message = 'Niedriges Risiko: Ihr Verbrauchsprofil eignet sich gut für dynamische Tarife'
-    elif overall_risk_score <= 50:
-        risk_level = 'moderate'
-        if forecast_quality_included:
-            risk_message = 'Moderates Risiko: Dynamische Tarife können vorteilhaft sein. Berücksichtigen Sie die Prognosequalität'
-        else:
-            risk_message = 'Moderates Risiko: Dynamische Tarife können für Sie vorteilhaft sein, aber Optimierung empfohlen'
-    else:
-        risk_level = 'high'
-        if forecast_quality_included:
-            risk_message = 'Höheres Risiko: Unsichere Prognosen und ungünstiges Verbrauchsmuster erhöhen das Risiko'
-        else:
-            risk_message = 'Höheres Risiko: Überprüfen Sie, ob Sie Ihren Verbrauch zu günstigeren Zeiten verschieben können'
-    
-    return {
-        'risk_level': risk_level,
-        'risk_score': int(overall_risk_score),
-        'risk_message': risk_message,
-        'risk_factors': factors,
-        'forecast_quality_included': forecast_quality_included
-    }
\ No newline at end of file
+    return get_aggregated_risk_scores(historic_risk_analysis, coincidence_factor, forecast_price_volatility,
+                                      bool(is_dynamic), usage_forecast_quality)[0]
\ No newline at end of file
@@ -0,0 +1,311 @@
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+
+# Scoring rules are declarative tables. Each rule reads one input column and picks the first
+# bucket whose condition holds, e.g. ((-10, '<'), (-5, '<'), (5, '<=')) reads
+# "x < -10, else x < -5, else x <= 5, else the last bucket". Every bucket has an outcome
+# (score delta, impact, detail template[, factor name if it differs from the rule's]).
+# Rules are compiled to np.searchsorted over the bucket edges and applied to whole input
+# columns at once; only the factor texts are built per row.
+#
+# applies_to: 'dynamic', 'fixed' or 'all' tariffs
+# group: only the first rule of a group whose input is present is applied
+# Rules without an input always apply their single outcome.
+
+AGGREGATED_SCORECARD = {
+    'baseline': 35,
+    'rules': [
+        {
+            'input': 'price_differential_pct',
+            'factor': 'Historischer Verbrauch',
+            'applies_to': 'dynamic',
+            'edges': ((-10, '<'), (-5, '<'), (5, '<='), (10, '<=')),
+            'outcomes': (
+                (-12, 'positive', '{abs:.1f}% unter Marktdurchschnitt'),  # Very favorable consumption timing
+                (-8, 'positive', '{abs:.1f}% unter Marktdurchschnitt'),
+                (0, 'neutral', 'Im Marktdurchschnitt'),
+                (8, 'negative', '{value:.1f}% über Marktdurchschnitt'),
+                (12, 'negative', '{value:.1f}% über Marktdurchschnitt'),  # Poor consumption timing
+            ),
+        },
+        {
+            # Consumption share in the expensive hours minus the share of expensive hours
+            'input': 'coincidence_deviation',
+            'factor': 'Verbrauchstiming',
+            'applies_to': 'dynamic',
+            'edges': ((-10, '<'), (-5, '<'), (5, '<='), (15, '<=')),
+            'outcomes': (
+                (-12, 'positive', 'Vermeidet teure Stunden deutlich'),
+                (-8, 'positive', 'Vermeidet teure Stunden'),
+                (0, 'neutral', 'Typisches Verbrauchsmuster'),
+                (8, 'negative', 'Erhöhter Verbrauch zu teuren Zeiten'),
+                (12, 'negative', 'Hoher Verbrauch zu teuren Zeiten'),
+            ),
+        },
+        {
+            'input': 'price_volatility',
+            'factor': 'Preisvolatilität',
+            'applies_to': 'dynamic',
+            'edges': ((0.03, '<='), (0.045, '<='), (0.06, '<=')),
+            'outcomes': (
+                (-3, 'positive', 'Niedrige Preisschwankungen'),
+                (2, 'neutral', 'Moderate Preisschwankungen'),
+                (5, 'negative', 'Hohe Preisschwankungen'),
+                (8, 'negative', 'Sehr hohe Preisschwankungen'),  # > 6 ct/kWh std dev
+            ),
+        },
+        {
+            # The forecast error is more reliable than the relative CI width,
+            # which can be misleading for low-consumption households
+            'input': 'forecast_error_percentage',
+            'factor': 'Prognosequalität',
+            'applies_to': 'all',
+            'group': 'forecast_quality',
+            'edges': ((10, '<'), (20, '<'), (30, '<')),
+            'outcomes': (
+                (-8, 'positive', 'Sehr hohe Vorhersagegenauigkeit (Fehler: {value:.1f}%)'),
+                (-4, 'positive', 'Gute Vorhersagegenauigkeit (Fehler: {value:.1f}%)'),
+                (3, 'neutral', 'Moderate Vorhersageunsicherheit (Fehler: {value:.1f}%)'),
+                (10, 'negative', 'Hohe Vorhersageunsicherheit (Fehler: {value:.1f}%)'),
+            ),
+        },
+        {
+            'input': 'relative_confidence_interval_width',
+            'factor': 'Prognosequalität',
+            'applies_to': 'all',
+            'group': 'forecast_quality',
+            'edges': ((40, '<'), (80, '<'), (120, '<')),
+            'outcomes': (
+                (-8, 'positive', 'Sehr hohe Vorhersagegenauigkeit (CI: {value:.1f}%)'),
+                (-4, 'positive', 'Gute Vorhersagegenauigkeit (CI: {value:.1f}%)'),
+                (3, 'neutral', 'Moderate Vorhersageunsicherheit (CI: {value:.1f}%)'),
+                (10, 'negative', 'Hohe Vorhersageunsicherheit (CI: {value:.1f}%)'),
+            ),
+        },
+        {
+            # Price volatility does not matter for fixed tariffs
+            'input': 'forecast_std_dev',
+            'factor': 'Preisvolatilität (Prognose)',
+            'applies_to': 'dynamic',
+            'edges': ((0.025, '<='), (0.035, '<='), (0.05, '<=')),
+            'outcomes': (
+                (-3, 'positive', 'Niedrige erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (2, 'neutral', 'Moderate erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (5, 'negative', 'Hohe erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (8, 'negative', 'Sehr hohe erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+            ),
+        },
+        {
+            # CI width of the price forecast, e.g. 0.15 €/kWh means ±75 €/MWh uncertainty
+            'input': 'avg_confidence_interval_width',
+            'factor': 'Preisprognose-Unsicherheit',
+            'applies_to': 'dynamic',
+            'edges': ((0.08, '<='), (0.12, '<='), (0.20, '<=')),
+            'outcomes': (
+                (-3, 'positive', 'Gute Prognosequalität (Breite Konfidenzintervall: {value:.4f} €/kWh)',
+                 'Preisprognose-Qualität'),
+                (3, 'neutral', 'Moderate Prognoseunsicherheit (Breite Konfidenzintervall: {value:.4f} €/kWh)'),
+                (6, 'negative', 'Hohe Prognoseunsicherheit (Breite Konfidenzintervall: {value:.4f} €/kWh)'),
+                (10, 'negative',
+                 'Sehr hohe Unsicherheit in Preisprognose (Breite Konfidenzintervall: {value:.4f} €/kWh)'),
+            ),
+        },
+        {
+            'factor': 'Tariftyp',
+            'applies_to': 'fixed',
+            'outcomes': ((-20, 'positive', 'Fester Tarif'),),  # Fixed tariffs are less risky
+        },
+    ],
+    'levels': {'edges': ((30, '<='), (50, '<=')), 'names': ('low', 'moderate', 'high')},
+    # Messages by risk level, with and without forecast quality
+    'message_flag': 'forecast_quality_included',
+    'messages': {
+        ('low', True): 'Niedriges Risiko: Ihr Verbrauchsprofil und zuverlässige Prognosen eignen sich gut für dynamische Tarife',
+        ('low', False): 'Niedriges Risiko: Ihr Verbrauchsprofil eignet sich gut für dynamische Tarife',
+        ('moderate', True): 'Moderates Risiko: Dynamische Tarife können vorteilhaft sein. Berücksichtigen Sie die Prognosequalität',
+        ('moderate', False): 'Moderates Risiko: Dynamische Tarife können für Sie vorteilhaft sein, aber Optimierung empfohlen',
+        ('high', True): 'Höheres Risiko: Unsichere Prognosen und ungünstiges Verbrauchsmuster erhöhen das Risiko',
+        ('high', False): 'Höheres Risiko: Überprüfen Sie, ob Sie Ihren Verbrauch zu günstigeren Zeiten verschieben können',
+    },
+}
+
+SIMPLIFIED_SCORECARD = {
+    'baseline': 40,
+    'rules': [
+        {
+            'input': 'forecast_std_dev',
+            'factor': 'Preisvolatilität (Prognose)',
+            'applies_to': 'dynamic',
+            'edges': ((0.025, '<='), (0.035, '<='), (0.05, '<=')),
+            'outcomes': (
+                (-5, 'positive', 'Niedrige erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (3, 'neutral', 'Moderate erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (8, 'negative', 'Hohe erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (15, 'negative', 'Sehr hohe erwartete Preisschwankungen (σ: {value:.4f} €/kWh)'),
+            ),
+        },
+        {
+            'input': 'historic_price_volatility',
+            'factor': 'Historische Preisvolatilität',
+            'applies_to': 'dynamic',
+            'edges': ((0.03, '<='), (0.045, '<='), (0.06, '<=')),
+            'outcomes': (
+                (-4, 'positive', 'Niedrige historische Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (2, 'neutral', 'Moderate historische Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (6, 'negative', 'Hohe historische Preisschwankungen (σ: {value:.4f} €/kWh)'),
+                (10, 'negative', 'Sehr hohe historische Preisschwankungen (σ: {value:.4f} €/kWh)'),
+            ),
+        },
+        {
+            'factor': 'Verbrauchsdaten',
+            'applies_to': 'dynamic',
+            'outcomes': ((0, 'neutral', 'Keine individuellen Verbrauchsdaten - Bewertung basiert auf Standardlastprofil'),),
+        },
+        {
+            'factor': 'Tariftyp',
+            'applies_to': 'fixed',
+            'outcomes': ((-20, 'positive', 'Fester Tarif - Keine Preisschwankungen'),),
+        },
+    ],
+    'levels': {'edges': ((30, '<='), (50, '<=')), 'names': ('low', 'moderate', 'high')},
+    # Messages by risk level, for dynamic and fixed tariffs
+    'message_flag': 'is_dynamic',
+    'messages': {
+        ('low', True): 'Niedriges Risiko: Geringe erwartete Preisvolatilität macht dynamische Tarife attraktiv',
+        ('low', False): 'Niedriges Risiko: Fester Tarif bietet volle Preissicherheit',
+        ('moderate', True): 'Moderates Risiko: Moderate Preisschwankungen erwartet. Empfehlung: Verbrauchsdaten für genauere Analyse hochladen',
+        ('moderate', False): 'Moderates Risiko: Fester Tarif bietet Preissicherheit',
+        ('high', True): 'Höheres Risiko: Hohe Preisvolatilität erwartet. Bitte Verbrauchsdaten hochladen für detaillierte Analyse',
+        ('high', False): 'Moderates Risiko: Fester Tarif bietet stabile Preise',
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def _compile_edges(edges: tuple) -> tuple:
+    """
+    Split bucket edges into the '<' and '<=' edges for np.searchsorted.
+
+    The bucket of x is the number of conditions it fails. x fails 'x < e' if e <= x
+    (searchsorted side='right') and 'x <= e' if e < x (side='left').
+    """
+    values = [e for e, _ in edges]
+    if values != sorted(values) or any(op not in ('<', '<=') for _, op in edges):
+        raise ValueError(f"Bucket edges must be ascending '<' / '<=' conditions, got {edges}")
+    return (np.array([e for e, op in edges if op == '<'], dtype=float),
+            np.array([e for e, op in edges if op == '<='], dtype=float))
+
+
+def _buckets(values: np.ndarray, compiled: tuple) -> np.ndarray:
+    below, below_or_equal = compiled
+    return np.searchsorted(below, values, side='right') + np.searchsorted(below_or_equal, values, side='left')
+
+
+def score_risk_batch(scorecard: dict, inputs: dict, is_dynamic: np.ndarray) -> dict:
+    """
+    Apply a scorecard to many rows at once.
+
+    Parameters:
+    scorecard (dict): AGGREGATED_SCORECARD, SIMPLIFIED_SCORECARD or a table of the same form
+    inputs (dict): One array per rule input, NaN where the input is not available
+    is_dynamic (np.ndarray): Whether each row is a dynamic tariff
+
+    Returns:
+    dict: Contains:
+        - risk_score: Clipped integer scores (0-100, lower is better)
+        - risk_level: Level names
+        - buckets: (rules x rows) matrix of the chosen buckets (-1 where a rule did not apply)
+    """
+    is_dynamic = np.asarray(is_dynamic, dtype=bool)
+    n = len(is_dynamic)
+    score = np.full(n, float(scorecard['baseline']))
+    buckets = []
+    group_done = {}
+    for rule in scorecard['rules']:
+        applies = {'dynamic': is_dynamic, 'fixed': ~is_dynamic, 'all': np.ones(n, dtype=bool)}[rule['applies_to']]
+        if 'input' in rule:
+            values = np.asarray(inputs[rule['input']], dtype=float) if rule['input'] in inputs else np.full(n, np.nan)
+            present = ~np.isnan(values)
+            bucket = _buckets(np.where(present, values, 0.0), _compile_edges(rule['edges']))
+        else:
+            present = np.ones(n, dtype=bool)
+            bucket = np.zeros(n, dtype=np.int64)
+
+        group = rule.get('group')
+        if group is not None:
+            done = group_done.get(group, np.zeros(n, dtype=bool))
+            applies = applies & ~done
+            group_done[group] = done | (applies & present)
+
+        deltas = np.array([outcome[0] for outcome in rule['outcomes']], dtype=float)
+        bucket = np.where(applies & present, bucket, -1)
+        score += np.select([bucket >= 0], [deltas[np.maximum(bucket, 0)]], 0.0)
+        buckets.append(bucket)
+
+    score = np.clip(score, 0, 100).astype(int)
+    levels = scorecard['levels']
+    names = np.array(levels['names'], dtype=object)
+    return {
+        'risk_score': score,
+        'risk_level': names[_buckets(score, _compile_edges(levels['edges']))],
+        'buckets': np.array(buckets, dtype=np.int64).reshape(len(buckets), n),
+    }
+
+
+def risk_assessments(scorecard: dict, inputs: dict, is_dynamic: Iterable[bool], flags: dict = None) -> list:
+    """
+    Score many rows and build the risk assessment of each.
+
+    Parameters:
+    scorecard (dict): Scorecard table (see score_risk_batch)
+    inputs (dict): One array per rule input, NaN where the input is not available
+    is_dynamic: Whether each row is a dynamic tariff
+    flags (dict): Extra per-row boolean arrays, e.g. forecast_quality_included, used to pick messages
+
+    Returns:
+    list: One dict per row with risk_level, risk_score, risk_message and risk_factors
+    """
+    is_dynamic = np.asarray(is_dynamic if isinstance(is_dynamic, np.ndarray) else list(is_dynamic), dtype=bool)
+    flags = {'is_dynamic': is_dynamic, **(flags or {})}
+    if len(is_dynamic) == 0:
+        return []
+    scored = score_risk_batch(scorecard, inputs, is_dynamic)
+    rules = scorecard['rules']
+    buckets = scored['buckets']
+    message_flag = np.asarray(flags[scorecard['message_flag']], dtype=bool)
+
+    # Rows with the same buckets, detail values and message share one assessment,
+    # e.g. all dynamic tariffs of a household: only the distinct rows are formatted
+    templated = [i for i, rule in enumerate(rules)
+                 if 'input' in rule and rule['input'] in inputs and any('{' in o[2] for o in rule['outcomes'])]
+    key = np.column_stack([buckets.T, message_flag, scored['risk_score']]
+                          + [np.where(buckets[i] >= 0, np.asarray(inputs[rules[i]['input']], dtype=float), 0.0)
+                             for i in templated])
+    _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+
+    distinct = []
+    for row in first.tolist():
+        factors = []
+        for i, rule in enumerate(rules):
+            bucket = int(buckets[i, row])
+            if bucket < 0:
+                continue
+            outcome = rule['outcomes'][bucket]
+            detail = outcome[2]
+            if i in templated and '{' in detail:
+                value = float(inputs[rule['input']][row])
+                detail = detail.format(value=value, abs=abs(value))
+            factors.append({'factor': outcome[3] if len(outcome) > 3 else rule['factor'],
+                            'impact': outcome[1], 'detail': detail})
+        level = scored['risk_level'][row]
+        distinct.append((level, int(scored['risk_score'][row]),
+                         scorecard['messages'][(level, bool(message_flag[row]))], factors))
+
+    assessments = [
+        {'risk_level': level, 'risk_score': score, 'risk_message': message,
+         'risk_factors': [dict(factor) for factor in factors]}
+        for level, score, message, factors in (distinct[i] for i in inverse.reshape(-1).tolist())
+    ]
+    return assessments
@@ -0,0 +1,434 @@
+import json
+import math
+import os
+import re
+from collections import deque
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STATE_DIR = os.path.join("app_data", "streaming_risk")
+# The readings log is rewritten once more than this many bytes of evicted readings precede the window
+COMPACT_BYTES = 1 << 20
+SUM_FIELDS = ('n', 'mean_value', 'mean_price', 'm2_value', 'm2_price', 'comoment', 'total_consumption',
+              'total_cost', 'consumption_expensive', 'cost_expensive', 'unranked')
+
+
+def _state_path(state_dir: str, customer_id: str) -> str:
+    # Customer ids become file names
+    if not customer_id or not re.fullmatch(r"[A-Za-z0-9_-]+", customer_id):
+        raise ValueError(f"Invalid customer_id '{customer_id}' (letters, digits, '_' and '-' only)")
+    return os.path.join(state_dir, f"{customer_id}.json")
+
+
+def _log_path(state_dir: str, customer_id: str) -> str:
+    return os.path.join(state_dir, f"{customer_id}.readings.jsonl")
+
+
+def _encode_reading(reading: tuple) -> bytes:
+    timestamp, value, price, expensive, ranked = reading
+    return (json.dumps([timestamp.isoformat(), value, price, expensive, ranked]) + "\n").encode("utf-8")
+
+
+def _decode_reading(line: bytes) -> tuple:
+    timestamp, value, price, expensive, ranked = json.loads(line)
+    return pd.Timestamp(timestamp), value, price, expensive, ranked
+
+
+class _ReadingsLog:
+    """
+    Saved readings of the window in an append-only JSON-lines file.
+
+    Bytes [offset, end) hold the count readings still in the window, oldest first. Evicting
+    reads only the lines that leave the window, and saving appends only the new readings.
+    """
+
+    def __init__(self, path: str, offset: int, end: int, count: int):
+        self.path = path
+        self.offset = offset
+        self.end = end
+        self.count = count
+        self._handle = None
+        self._next = None
+
+    def peek(self) -> tuple:
+        if self._next is None:
+            if self._handle is None:
+                self._handle = open(self.path, "rb")
+                self._handle.seek(self.offset)
+            line = self._handle.readline()
+            self._next = (_decode_reading(line), len(line))
+        return self._next[0]
+
+    def pop(self) -> tuple:
+        reading = self.peek()
+        self.offset += self._next[1]
+        self.count -= 1
+        self._next = None
+        return reading
+
+    def remaining(self) -> list:
+        """Readings still in the window (read once, when the log is compacted)"""
+        self.close()
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            return [_decode_reading(line) for line in f.read(self.end - self.offset).splitlines()]
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._next = None
+
+
+@lru_cache(maxsize=4)
+def _price_series(path: str, mtime_ns: int) -> tuple:
+    """Prices of a raw export as a sorted €/kWh series and the price interval, parsed once per file version"""
+    prices = pd.read_csv(path, parse_dates=['ds'])
+    series = (prices.set_index('ds')['price_eur_per_mwh'] / 1000).sort_index()
+    series = series[~series.index.duplicated(keep='last')]
+    interval = series.index.to_series().diff().mode()[0] if len(series) > 1 else pd.Timedelta(hours=1)
+    return series, interval
+
+
+class OnlineRiskAccumulator:
+    """
+    Historic-risk metrics over a trailing window, updated in O(1) per meter reading.
+
+    Each reading (timestamp, kWh, €/kWh) is added to running sums of consumption, cost and
+    consumption in expensive intervals, and to Welford-style means, squared deviations and
+    the consumption/price co-moment. The readings of the window are kept in a ring buffer;
+    when a reading falls out of the window its contribution is removed with the inverse
+    updates, so no metric is ever recomputed from the full history.
+
+    An interval counts as expensive if its price is in the top expensive_hours_pct of its day.
+    Day-ahead prices of a whole day are known before its readings arrive, so the daily
+    thresholds are registered with add_prices(); readings of days without registered prices
+    are counted as not expensive and reported as unranked.
+
+    Parameters:
+    window_days (int): Length of the trailing window in days (default: 30)
+    expensive_hours_pct (float): Percentage of most expensive intervals per day (default: 20.0)
+    customer_id (str): Optional identifier stored with the state
+    """
+
+    def __init__(self, window_days: int = 30, expensive_hours_pct: float = 20.0, customer_id: str = None):
+        if window_days < 1:
+            raise ValueError(f"window_days must be at least 1, got {window_days}")
+        if not 0 < expensive_hours_pct <= 100:
+            raise ValueError(f"expensive_hours_pct must be between 0 and 100, got {expensive_hours_pct}")
+        self.window_days = window_days
+        self.expensive_hours_pct = expensive_hours_pct
+        self.customer_id = customer_id
+        # (timestamp, kWh, €/kWh, expensive, ranked) of the window readings not yet saved;
+        # older ones are in the readings log of a loaded state
+        self.readings = deque()
+        self._log = None
+        self._last = None
+        self.day_thresholds = {}
+        self._first_day = None
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self.n = 0
+        self.mean_value = 0.0
+        self.mean_price = 0.0
+        self.m2_value = 0.0
+        self.m2_price = 0.0
+        self.comoment = 0.0
+        self.total_consumption = 0.0
+        self.total_cost = 0.0
+        self.consumption_expensive = 0.0
+        self.cost_expensive = 0.0
+        self.unranked = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def add_prices(self, prices: pd.DataFrame):
+        """
+        Register the expensive-interval threshold of every day in a price table.
+
+        Parameters:
+        prices (pd.DataFrame): Prices with columns ['ds' or 'datetime', 'price_eur_per_kwh']
+        """
+        datetimes = pd.to_datetime(prices['ds'] if 'ds' in prices.columns else prices['datetime'])
+        q = 1 - self.expensive_hours_pct / 100
+        for day, day_prices in prices['price_eur_per_kwh'].groupby(datetimes.dt.date):
+            self.day_thresholds[day.isoformat()] = float(np.quantile(day_prices.to_numpy(), q))
+
+    def price_readings(self, readings: pd.DataFrame, price_file: str) -> pd.DataFrame:
+        """
+        Price readings with a raw day-ahead export and register the thresholds of their days.
+
+        The export is parsed once per file version; each call only slices the days of its readings.
+
+        Parameters:
+        readings (pd.DataFrame): Columns ['datetime', 'value']
+        price_file (str): Raw price export with columns ['ds', 'price_eur_per_mwh']
+
+        Returns:
+        pd.DataFrame: The readings with a 'price_eur_per_kwh' column (NaN where no price is known)
+        """
+        prices, interval = _price_series(os.path.abspath(price_file), os.stat(price_file).st_mtime_ns)
+        readings = readings.copy()
+        if len(readings) == 0:
+            readings['price_eur_per_kwh'] = []
+            return readings
+        lo = prices.index.searchsorted(readings['datetime'].min().normalize())
+        hi = prices.index.searchsorted(readings['datetime'].max().normalize() + timedelta(days=1))
+        days = prices.iloc[lo:hi]
+
+        new_days = ~pd.Index(days.index.strftime('%Y-%m-%d')).isin(list(self.day_thresholds))
+        if new_days.any():
+            self.add_prices(pd.DataFrame({'ds': days.index[new_days], 'price_eur_per_kwh': days.to_numpy()[new_days]}))
+
+        # Price of the price interval each reading falls in
+        readings['price_eur_per_kwh'] = days.reindex(readings['datetime'].dt.floor(interval)).to_numpy()
+        return readings
+
+    def _add(self, value: float, price: float, expensive: bool, ranked: bool):
+        self.n += 1
+        delta_value = value - self.mean_value
+        delta_price = price - self.mean_price
+        self.mean_value += delta_value / self.n
+        self.mean_price += delta_price / self.n
+        self.m2_value += delta_value * (value - self.mean_value)
+        self.m2_price += delta_price * (price - self.mean_price)
+        self.comoment += delta_value * (price - self.mean_price)
+        self._add_sums(value, price, expensive, ranked, 1)
+
+    def _remove(self, value: float, price: float, expensive: bool, ranked: bool):
+        if self.n == 1:
+            self._reset_sums()
+            return
+        self.n -= 1
+        delta_value = value - self.mean_value
+        delta_price = price - self.mean_price
+        self.mean_value -= delta_value / self.n
+        self.mean_price -= delta_price / self.n
+        self.m2_value -= delta_value * (value - self.mean_value)
+        self.m2_price -= delta_price * (price - self.mean_price)
+        self.comoment -= delta_value * (price - self.mean_price)
+        self._add_sums(value, price, expensive, ranked, -1)
+
+    def _add_sums(self, value: float, price: float, expensive: bool, ranked: bool, sign: int):
+        self.total_consumption += sign * value
+        self.total_cost += sign * value * price
+        if expensive:
+            self.consumption_expensive += sign * value
+            self.cost_expensive += sign * value * price
+        if not ranked:
+            self.unranked += sign
+
+    def _oldest(self) -> tuple:
+        if self._log is not None and self._log.count > 0:
+            return self._log.peek()
+        return self.readings[0]
+
+    def _pop_oldest(self) -> tuple:
+        if self._log is not None and self._log.count > 0:
+            return self._log.pop()
+        return self.readings.popleft()
+
+    def update(self, timestamp: datetime, value: float, price: float):
+        """
+        Add one reading and evict the readings that left the window.
+
+        Parameters:
+        timestamp (datetime): Start of the metering interval; must be later than the previous reading
+        value (float): Consumption in the interval (kWh)
+        price (float): Price of the interval (€/kWh)
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if self._last is not None and timestamp <= self._last:
+            raise ValueError(f"Reading at {timestamp} is not newer than the last reading {self._last}")
+
+        threshold = self.day_thresholds.get(timestamp.date().isoformat())
+        ranked = threshold is not None
+        expensive = ranked and price >= threshold
+        self.readings.append((timestamp, float(value), float(price), expensive, ranked))
+        self._last = timestamp
+        self._add(float(value), float(price), expensive, ranked)
+
+        # Evict what fell out of the window, as the historic analysis covers [end - days, end]
+        window_start = timestamp - timedelta(days=self.window_days)
+        while self._oldest()[0] < window_start:
+            _, old_value, old_price, old_expensive, old_ranked = self._pop_oldest()
+            self._remove(old_value, old_price, old_expensive, old_ranked)
+
+        # Thresholds of days before the window are no longer needed (pruned once per day)
+        first_day = window_start.date().isoformat()
+        if first_day != self._first_day:
+            self.day_thresholds = {day: t for day, t in self.day_thresholds.items() if day >= first_day}
+            self._first_day = first_day
+
+    def update_many(self, readings: pd.DataFrame):
+        """
+        Add a batch of readings in time order.
+
+        Parameters:
+        readings (pd.DataFrame): Columns ['datetime', 'value', 'price_eur_per_kwh'] with kWh per interval
+        """
+        readings = readings.sort_values('datetime')
+        for timestamp, value, price in zip(pd.to_datetime(readings['datetime']), readings['value'],
+                                           readings['price_eur_per_kwh']):
+            self.update(timestamp, value, price)
+
+    def metrics(self) -> dict:
+        """
+        Current risk metrics of the window.
+
+        Returns:
+        dict: market_avg_price and price_volatility of the priced intervals, user_weighted_price,
+              price_differential(_pct), risk_exposure, total_consumption, total_cost, correlation,
+              consumption_coincidence_pct, cost_coincidence_pct, num_hours, unranked_intervals and
+              analysis_period
+        """
+        if self.n == 0:
+            raise ValueError("No readings in the window")
+
+        market_avg_price = self.mean_price
+        user_weighted_price = self.total_cost / self.total_consumption if self.total_consumption > 0 else 0.0
+        price_differential = user_weighted_price - market_avg_price
+        price_differential_pct = (price_differential / market_avg_price * 100) if market_avg_price > 0 else 0.0
+        price_volatility = math.sqrt(max(self.m2_price, 0.0) / (self.n - 1)) if self.n > 1 else 0.0
+
+        # Insufficient variance gives no correlation
+        variance_product = self.m2_value * self.m2_price
+        correlation = self.comoment / math.sqrt(variance_product) if variance_product > 1e-18 else 0.0
+
+        return {
+            'market_avg_price': round(market_avg_price, 4),
+            'user_weighted_price': round(user_weighted_price, 4),
+            'price_differential': round(price_differential, 4),
+            'price_differential_pct': round(price_differential_pct, 2),
+            'risk_exposure': 'favorable' if price_differential < 0 else 'unfavorable',
+            'total_consumption': round(self.total_consumption, 2),
+            'total_cost': round(self.total_cost, 2),
+            'price_volatility': round(price_volatility, 4),
+            'correlation': round(max(-1.0, min(1.0, correlation)), 4),
+            'expensive_hours_pct': float(self.expensive_hours_pct),
+            'consumption_coincidence_pct': round(self.consumption_expensive / self.total_consumption * 100, 2)
+            if self.total_consumption > 0 else 0.0,
+            'cost_coincidence_pct': round(self.cost_expensive / self.total_cost * 100, 2)
+            if self.total_cost > 0 else 0.0,
+            'num_hours': int(self.n),
+            'unranked_intervals': int(self.unranked),
+            'analysis_period': {
+                'start': self._oldest()[0].isoformat(),
+                'end': self._last.isoformat()
+            }
+        }
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serializable state: settings, day thresholds, running sums and moments.
+
+        The window readings are not part of it; save() appends them to the readings log.
+        """
+        return {
+            'customer_id': self.customer_id,
+            'window_days': self.window_days,
+            'expensive_hours_pct': self.expensive_hours_pct,
+            'day_thresholds': self.day_thresholds,
+            'first_day': self._first_day,
+            'last_reading': self._last.isoformat() if self._last is not None else None,
+            'sums': {field: getattr(self, field) for field in SUM_FIELDS},
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'OnlineRiskAccumulator':
+        """Restore the sums of a state without replaying its readings (see to_dict)"""
+        accumulator = cls(state['window_days'], state['expensive_hours_pct'], state.get('customer_id'))
+        accumulator.day_thresholds = dict(state['day_thresholds'])
+        accumulator._first_day = state.get('first_day')
+        accumulator._last = pd.Timestamp(state['last_reading']) if state.get('last_reading') else None
+        for field, value in state['sums'].items():
+            setattr(accumulator, field, value)
+        return accumulator
+
+    def _compact(self, log_path: str):
+        """
+        Rewrite the readings log without the evicted readings.
+
+        The window is read anyway, so the sums are rebuilt from it as well, which also
+        discards the rounding drift of many add/remove updates. Runs once per COMPACT_BYTES
+        of evicted readings, so its cost is amortized over the readings that caused it.
+        """
+        window = self._log.remaining() + list(self.readings)
+        self._reset_sums()
+        for _, value, price, expensive, ranked in window:
+            self._add(value, price, expensive, ranked)
+        saved = len(window) - len(self.readings)
+        tmp_path = f"{log_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            for reading in window[:saved]:
+                f.write(_encode_reading(reading))
+            end = f.tell()
+        os.replace(tmp_path, log_path)
+        self._log = _ReadingsLog(log_path, 0, end, saved)
+
+    def save(self, state_dir: str = DEFAULT_STATE_DIR):
+        """
+        Append the new readings to <state_dir>/<customer_id>.readings.jsonl and write the
+        state to <state_dir>/<customer_id>.json atomically.
+        """
+        path = _state_path(state_dir, self.customer_id)
+        log_path = _log_path(state_dir, self.customer_id)
+        os.makedirs(state_dir, exist_ok=True)
+
+        if self._log is not None and self._log.offset > COMPACT_BYTES and self._log.offset > self._log.end // 2:
+            self._compact(log_path)
+        log = self._log or _ReadingsLog(log_path, 0, 0, 0)
+        log.close()
+        with open(log_path, "r+b" if self._log is not None else "wb") as f:
+            # Drop lines appended by a save that never wrote its state
+            f.seek(log.end)
+            f.truncate()
+            for reading in self.readings:
+                f.write(_encode_reading(reading))
+            end = f.tell()
+        self._log = _ReadingsLog(log_path, log.offset, end, log.count + len(self.readings))
+        self.readings.clear()
+
+        state = {**self.to_dict(), 'log': {'offset': self._log.offset, 'end': end, 'count': self._log.count}}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, customer_id: str, state_dir: str = DEFAULT_STATE_DIR, window_days: int = None,
+             expensive_hours_pct: float = None) -> 'OnlineRiskAccumulator':
+        """
+        Load a customer's saved state, or start an empty accumulator.
+
+        Loading reads the sums and moments only; the window readings stay in the log until
+        they are evicted.
+
+        Parameters:
+        customer_id (str): Customer whose state to load
+        state_dir (str): Directory of the saved states
+        window_days (int): Window for a new accumulator; must match a saved state if given
+        expensive_hours_pct (float): Expensive share for a new accumulator; must match a saved state if given
+
+        Raises:
+        ValueError: If window_days or expensive_hours_pct differ from the saved state
+        """
+        path = _state_path(state_dir, customer_id)
+        if not os.path.exists(path):
+            settings = {'window_days': window_days, 'expensive_hours_pct': expensive_hours_pct}
+            return cls(customer_id=customer_id, **{k: v for k, v in settings.items() if v is not None})
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        for name, requested in (('window_days', window_days), ('expensive_hours_pct', expensive_hours_pct)):
+            if requested is not None and requested != state[name]:
+                raise ValueError(f"The state of customer '{customer_id}' uses {name}={state[name]}, "
+                                 f"not {requested}. Delete the state to change it.")
+        accumulator = cls.from_dict(state)
+        log = state['log']
+        accumulator._log = _ReadingsLog(_log_path(state_dir, customer_id), log['offset'], log['end'], log['count'])
+        return accumulator